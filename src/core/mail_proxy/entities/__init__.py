@@ -7,6 +7,7 @@ optionally an endpoint.py (REST API operations).
 
 Tables:
     AccountsTable: SMTP account configurations with encrypted passwords.
+    AttachmentBlobsTable: Deduplicated inline attachment content.
     CommandLogTable: Audit log for API command tracking.
     InstanceTable: Singleton service configuration.
     MessageEventTable: Delivery event tracking (sent, error, deferred).
@@ -36,6 +37,7 @@ Note:
 """
 
 from .account.table import AccountsTable
+from .attachment_blob.table import AttachmentBlobsTable
 from .command_log.table import CommandLogTable
 from .instance.table import InstanceTable
 from .message.table import MessagesTable
@@ -44,6 +46,7 @@ from .tenant.table import TenantsTable
 
 __all__ = [
     "AccountsTable",
+    "AttachmentBlobsTable",
     "CommandLogTable",
     "InstanceTable",
     "MessageEventTable",
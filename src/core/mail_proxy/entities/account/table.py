@@ -48,6 +48,7 @@ Note:
 
 from __future__ import annotations
 
+import zlib
 from typing import Any
 
 from genro_toolbox import get_uuid
@@ -127,6 +128,8 @@ class AccountsTable(Table):
             limit_behavior: Rate limit action ("defer" or "reject").
             use_tls: TLS mode (1=STARTTLS, 0=none, NULL=auto).
             batch_size: Messages per SMTP connection.
+            dispatch_hash: crc32 of pk, selecting the dispatcher process
+                of the account (see smtp.partition).
             created_at: Record creation timestamp.
             updated_at: Last modification timestamp.
 
@@ -149,10 +152,22 @@ class AccountsTable(Table):
         c.column("limit_behavior", String)
         c.column("use_tls", Integer)
         c.column("batch_size", Integer)
+        c.column("dispatch_hash", Integer)
         c.column("created_at", Timestamp, default="CURRENT_TIMESTAMP")
         c.column("updated_at", Timestamp, default="CURRENT_TIMESTAMP")
         # EE columns added by AccountsTable_EE.configure()
 
+    @staticmethod
+    def dispatch_hash(pk: str) -> int:
+        """Value of the dispatch_hash column (smtp.partition.account_hash())."""
+        return zlib.crc32(pk.encode()) & 0x7FFFFFFF
+
+    async def trigger_on_inserting(self, record: dict[str, Any]) -> dict[str, Any]:
+        """Generate the pk and store its dispatch_hash."""
+        record = await super().trigger_on_inserting(record)
+        record["dispatch_hash"] = self.dispatch_hash(record["pk"])
+        return record
+
     async def migrate_from_legacy_schema(self) -> bool:
         """Migrate from composite primary key to UUID primary key.
 
@@ -451,12 +466,21 @@ class AccountsTable(Table):
     async def sync_schema(self) -> None:
         """Synchronize table schema with column definitions.
 
-        Adds missing columns and ensures the UNIQUE index on
-        (tenant_id, id) exists for multi-tenant isolation.
+        Adds missing columns, ensures the UNIQUE index on (tenant_id, id)
+        exists for multi-tenant isolation and fills dispatch_hash for the
+        accounts created before the column existed.
 
         Safe to call on every startup.
         """
         await super().sync_schema()
+        rows = await self.db.adapter.fetch_all(
+            "SELECT pk FROM accounts WHERE dispatch_hash IS NULL AND pk IS NOT NULL"
+        )
+        if rows:
+            await self.db.adapter.execute_many(
+                "UPDATE accounts SET dispatch_hash = :hash WHERE pk = :pk",
+                [{"pk": row["pk"], "hash": self.dispatch_hash(row["pk"])} for row in rows],
+            )
         # Ensure UNIQUE index for tenant isolation
         try:
             await self.execute(
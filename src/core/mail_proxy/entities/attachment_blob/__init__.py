@@ -0,0 +1,14 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Attachment blob entity: content-addressed storage for inline attachments.
+
+Components:
+    AttachmentBlobsTable: Deduplicated attachment content keyed by MD5.
+
+Note:
+    This table is internal and has no REST endpoint. Blobs are written by
+    MessagesTable.insert_batch() and read by the attachment manager.
+"""
+
+from .table import AttachmentBlobsTable
+
+__all__ = ["AttachmentBlobsTable"]
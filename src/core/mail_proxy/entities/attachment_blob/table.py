@@ -0,0 +1,120 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Attachment blobs table: content-addressed store for inline attachments.
+
+Inline base64 attachments are extracted from message payloads at enqueue
+time and stored here once per distinct content, keyed by MD5. The payload
+keeps only a ``blob:<md5>`` reference, so a campaign sending the same PDF
+to ten thousand recipients stores it once instead of ten thousand times.
+
+Content is kept as base64 text so the column is portable between SQLite
+and PostgreSQL without a binary type.
+
+Example:
+    Store and resolve a blob::
+
+        blobs = proxy.db.table("attachment_blobs")
+        md5, size = await blobs.put(b"%PDF-1.4 ...")
+        content = await blobs.get_content(md5)
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from sql import Integer, String, Table
+
+
+class AttachmentBlobsTable(Table):
+    """Attachment blobs table: deduplicated attachment content.
+
+    Schema: md5 (PK), content (base64 text), size (decoded bytes),
+    created_ts (last time the blob was stored or referenced again).
+    """
+
+    name = "attachment_blobs"
+    pkey = "md5"
+
+    def configure(self) -> None:
+        c = self.columns
+        c.column("md5", String)
+        c.column("content", String, nullable=False)
+        c.column("size", Integer, nullable=False, default=0)
+        c.column("created_ts", Integer, nullable=False, default=0)
+
+    async def put(self, content: bytes) -> tuple[str, int]:
+        """Store content if not already present.
+
+        Storing content that already exists only refreshes its created_ts,
+        which keeps it out of a concurrent remove_unreferenced() sweep.
+
+        Args:
+            content: Raw attachment bytes.
+
+        Returns:
+            Tuple of (md5, size) identifying the stored blob.
+        """
+        md5 = hashlib.md5(content).hexdigest()
+        await self.db.adapter.execute(
+            """
+            INSERT INTO attachment_blobs (md5, content, size, created_ts)
+            VALUES (:md5, :content, :size, :created_ts)
+            ON CONFLICT (md5) DO UPDATE SET created_ts = excluded.created_ts
+            """,
+            {
+                "md5": md5,
+                "content": base64.b64encode(content).decode("ascii"),
+                "size": len(content),
+                "created_ts": int(time.time()),
+            },
+        )
+        return md5, len(content)
+
+    async def get_content(self, md5: str) -> bytes | None:
+        """Return the decoded content of a blob, or None if not stored."""
+        row = await self.db.adapter.fetch_one(
+            "SELECT content FROM attachment_blobs WHERE md5 = :md5",
+            {"md5": md5.lower()},
+        )
+        if not row:
+            return None
+        return base64.b64decode(row["content"])
+
+    async def remove_unreferenced(self, referenced: Iterable[str], older_than_ts: int) -> int:
+        """Delete blobs no longer referenced by any message.
+
+        Orphans are deleted batch_chunk_size at a time, one statement per
+        chunk. The created_ts condition is repeated in the DELETE so a blob
+        stored again since the SELECT survives.
+
+        Args:
+            referenced: MD5 hashes still referenced by message payloads.
+            older_than_ts: Only blobs stored before this Unix timestamp are
+                removed, protecting blobs of messages being enqueued.
+
+        Returns:
+            Number of blobs removed.
+        """
+        keep = set(referenced)
+        rows = await self.db.adapter.fetch_all(
+            "SELECT md5 FROM attachment_blobs WHERE created_ts < :older_than_ts",
+            {"older_than_ts": older_than_ts},
+        )
+        orphans = [row["md5"] for row in rows if row["md5"] not in keep]
+        removed = 0
+        for chunk in self._chunks(orphans):
+            params: dict[str, Any] = {f"md5_{i}": md5 for i, md5 in enumerate(chunk)}
+            params["older_than_ts"] = older_than_ts
+            placeholders = ", ".join(f":md5_{i}" for i in range(len(chunk)))
+            removed += await self.db.adapter.execute(
+                f"DELETE FROM attachment_blobs WHERE md5 IN ({placeholders}) "
+                "AND created_ts < :older_than_ts",
+                params,
+            )
+        return removed
+
+
+__all__ = ["AttachmentBlobsTable"]
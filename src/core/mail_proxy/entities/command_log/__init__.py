@@ -7,6 +7,7 @@ trail of all state-modifying API commands in the mail proxy.
 Components:
     CommandLogTable: Database table manager for log storage.
     CommandLogEndpoint: REST API endpoint for querying logs.
+    CommandLogWriter: Buffered, batched writer used by MailProxy.handle_command.
 
 Use Cases:
     - Debugging: Trace command history to diagnose issues
@@ -37,6 +38,7 @@ Example:
 """
 
 from .endpoint import CommandLogEndpoint
-from .table import CommandLogTable
+from .table import COMMAND_LOG_POLICIES, CommandLogTable
+from .writer import CommandLogWriter
 
-__all__ = ["CommandLogEndpoint", "CommandLogTable"]
+__all__ = ["COMMAND_LOG_POLICIES", "CommandLogEndpoint", "CommandLogTable", "CommandLogWriter"]
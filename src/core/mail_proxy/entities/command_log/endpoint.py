@@ -14,6 +14,7 @@ Example:
         mail-proxy command_log list --tenant-id acme --limit 50
         mail-proxy command_log get --command-id 123
         mail-proxy command_log export --tenant-id acme
+        mail-proxy command_log export-stream --since-ts 1700000000 > audit.ndjson
         mail-proxy command_log purge --threshold-ts 1700000000
 
 Note:
@@ -23,6 +24,7 @@ Note:
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from typing import TYPE_CHECKING, Any
 
 from ...interface.endpoint_base import POST, BaseEndpoint
@@ -135,6 +137,28 @@ class CommandLogEndpoint(BaseEndpoint):
             until_ts=until_ts,
         )
 
+    async def export_stream(
+        self,
+        tenant_id: str | None = None,
+        since_ts: int | None = None,
+        until_ts: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream commands in replay-friendly format, one record at a time.
+
+        Same records as export(), read with a database cursor and sent by
+        the API as NDJSON (gzip when accepted), so memory use does not
+        depend on the size of the log.
+
+        Args:
+            tenant_id: Filter by tenant.
+            since_ts: Include commands with command_ts >= since_ts.
+            until_ts: Include commands with command_ts <= until_ts.
+
+        Returns:
+            Async iterator of command dicts.
+        """
+        return self.table.iter_export(tenant_id=tenant_id, since_ts=since_ts, until_ts=until_ts)
+
     @POST
     async def purge(self, threshold_ts: int) -> dict[str, Any]:
         """Delete command logs older than threshold.
@@ -41,15 +41,51 @@ Example:
 
         # Export for replay
         export = await log.export_commands(tenant_id="acme")
+
+Payload Policies:
+    Message payloads can be large (HTML bodies, inline attachments), so
+    what is stored is configurable (see reduce_payload()):
+
+    - full: The request as received. Required for export/replay.
+    - headers: Messages keep their envelope and headers; bodies and
+      attachment content are dropped.
+    - digest: A SHA-256 of the request, its scalar fields and the ids of
+      the messages it carried, which reference the message rows.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import time
+from collections.abc import AsyncIterator, Sequence
 from typing import Any
 
-from sql import Integer, String, Table
+from sql import Integer, String, Table, replica_read
+from tools.compression import compress_value, decompress_value
+
+COMMAND_LOG_POLICIES = ("full", "headers", "digest")
+
+_MESSAGE_HEADER_FIELDS = (
+    "id",
+    "tenant_id",
+    "account_id",
+    "priority",
+    "deferred_ts",
+    "batch_code",
+    "from",
+    "from_addr",
+    "to",
+    "cc",
+    "bcc",
+    "reply_to",
+    "return_path",
+    "subject",
+    "message_id",
+    "content_type",
+    "headers",
+)
+_ATTACHMENT_HEADER_FIELDS = ("filename", "mime_type", "fetch_mode", "size", "content_md5")
 
 
 class CommandLogTable(Table):
@@ -157,14 +193,108 @@ class CommandLogTable(Table):
             "command_ts": ts,
             "endpoint": endpoint,
             "tenant_id": tenant_id,
-            "payload": json.dumps(payload),
+            "payload": self._encode_json(payload),
             "response_status": response_status,
-            "response_body": json.dumps(response_body) if response_body else None,
+            "response_body": self._encode_json(response_body) if response_body else None,
         }
 
         await self.insert(record)
         return int(record.get("id", 0))
 
+    async def log_commands(self, entries: Sequence[dict[str, Any]]) -> int:
+        """Record several commands with a single batched insert.
+
+        Args:
+            entries: Dicts with the log_command() arguments (endpoint,
+                payload, and optional tenant_id, response_status,
+                response_body, command_ts).
+
+        Returns:
+            Number of entries written.
+        """
+        if not entries:
+            return 0
+        now = int(time.time())
+        rows = [
+            {
+                "command_ts": entry.get("command_ts") or now,
+                "endpoint": entry["endpoint"],
+                "tenant_id": entry.get("tenant_id"),
+                "payload": self._encode_json(entry.get("payload") or {}),
+                "response_status": entry.get("response_status"),
+                "response_body": (
+                    self._encode_json(entry["response_body"])
+                    if entry.get("response_body")
+                    else None
+                ),
+            }
+            for entry in entries
+        ]
+        return await self.db.adapter.execute_many(
+            """
+            INSERT INTO command_log
+                (command_ts, endpoint, tenant_id, payload, response_status, response_body)
+            VALUES
+                (:command_ts, :endpoint, :tenant_id, :payload, :response_status, :response_body)
+            """,
+            rows,
+        )
+
+    @staticmethod
+    def reduce_payload(payload: dict[str, Any], policy: str) -> dict[str, Any]:
+        """Reduce a request payload according to a storage policy.
+
+        Args:
+            payload: Request body as received.
+            policy: One of COMMAND_LOG_POLICIES.
+
+        Returns:
+            Payload to store. The input is never modified.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy == "full":
+            return payload
+        if policy == "headers":
+            reduced = dict(payload)
+            if isinstance(payload.get("messages"), list):
+                reduced["messages"] = [
+                    _message_headers(msg) if isinstance(msg, dict) else msg
+                    for msg in payload["messages"]
+                ]
+            return reduced
+        if policy == "digest":
+            encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+            reduced = {k: v for k, v in payload.items() if _is_scalar(v)}
+            reduced["digest"] = f"sha256:{hashlib.sha256(encoded).hexdigest()}"
+            reduced["size"] = len(encoded)
+            messages = payload.get("messages")
+            if isinstance(messages, list):
+                reduced["message_ids"] = [
+                    msg.get("id") for msg in messages if isinstance(msg, dict)
+                ]
+            elif isinstance(payload.get("ids"), list):
+                reduced["message_ids"] = list(payload["ids"])
+            return reduced
+        raise ValueError(f"Unknown command log policy: {policy}")
+
+    @staticmethod
+    def reduce_response(response: dict[str, Any], policy: str) -> dict[str, Any]:
+        """Reduce a response body according to a storage policy.
+
+        Responses are kept whole except under the digest policy, which
+        keeps scalar fields and replaces lists by their length.
+        """
+        if policy != "digest":
+            return response
+        return {
+            key: len(value) if isinstance(value, list) else value
+            for key, value in response.items()
+            if _is_scalar(value) or isinstance(value, list)
+        }
+
+    @replica_read
     async def list_commands(
         self,
         *,
@@ -230,22 +360,7 @@ class CommandLogTable(Table):
             params,
         )
 
-        result = []
-        for row in rows:
-            record = dict(row)
-            # Parse JSON fields
-            if record.get("payload"):
-                try:
-                    record["payload"] = json.loads(record["payload"])
-                except (json.JSONDecodeError, TypeError):
-                    pass
-            if record.get("response_body"):
-                try:
-                    record["response_body"] = json.loads(record["response_body"])
-                except (json.JSONDecodeError, TypeError):
-                    pass
-            result.append(record)
-        return result
+        return [self._decode_record(row) for row in rows]
 
     async def get_command(self, command_id: int) -> dict[str, Any] | None:
         """Retrieve a single command log entry by ID.
@@ -266,20 +381,28 @@ class CommandLogTable(Table):
         )
         if not row:
             return None
+        return self._decode_record(row)
+
+    def _encode_json(self, value: dict[str, Any]) -> str:
+        """Serialize a JSON field, compressed with the configured codec."""
+        return compress_value(json.dumps(value), self.db.payload_codec)
 
+    @staticmethod
+    def _decode_record(row: dict[str, Any]) -> dict[str, Any]:
+        """Decompress and parse the JSON fields of a command log row.
+
+        Fields that cannot be parsed are returned as stored.
+        """
         record = dict(row)
-        if record.get("payload"):
-            try:
-                record["payload"] = json.loads(record["payload"])
-            except (json.JSONDecodeError, TypeError):
-                pass
-        if record.get("response_body"):
-            try:
-                record["response_body"] = json.loads(record["response_body"])
-            except (json.JSONDecodeError, TypeError):
-                pass
+        for field in ("payload", "response_body"):
+            if record.get(field):
+                try:
+                    record[field] = json.loads(decompress_value(record[field]))
+                except (ValueError, TypeError):
+                    pass
         return record
 
+    @replica_read
     async def export_commands(
         self,
         *,
@@ -310,22 +433,80 @@ class CommandLogTable(Table):
                 for cmd in export:
                     await api.call(cmd["endpoint"], cmd["payload"])
         """
-        commands = await self.list_commands(
-            tenant_id=tenant_id,
-            since_ts=since_ts,
-            until_ts=until_ts,
-            limit=100000,  # Large limit for export
-        )
-
         return [
-            {
+            cmd
+            async for cmd in self.iter_export(
+                tenant_id=tenant_id, since_ts=since_ts, until_ts=until_ts
+            )
+        ]
+
+    async def iter_export(
+        self,
+        *,
+        tenant_id: str | None = None,
+        since_ts: int | None = None,
+        until_ts: int | None = None,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream commands in export_commands() format, without materializing them.
+
+        Yields:
+            Command dicts with endpoint, tenant_id, payload and command_ts.
+        """
+        async for cmd in self.iter_commands(
+            tenant_id=tenant_id, since_ts=since_ts, until_ts=until_ts, chunk_size=chunk_size
+        ):
+            yield {
                 "endpoint": cmd["endpoint"],
                 "tenant_id": cmd["tenant_id"],
                 "payload": cmd["payload"],
                 "command_ts": cmd["command_ts"],
             }
-            for cmd in commands
-        ]
+
+    async def iter_commands(
+        self,
+        *,
+        tenant_id: str | None = None,
+        since_ts: int | None = None,
+        until_ts: int | None = None,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream logged commands in timestamp order, without a row limit.
+
+        Filters are the same as list_commands(). Rows are read chunk_size
+        at a time by keyset (see DbAdapter.fetch_keyset()), so memory does
+        not grow with the log size and a slow consumer holds no lock
+        between chunks.
+
+        Yields:
+            Command records with parsed JSON fields.
+        """
+        conditions = []
+        params: dict[str, Any] = {}
+        if tenant_id:
+            conditions.append("tenant_id = :tenant_id")
+            params["tenant_id"] = tenant_id
+        if since_ts:
+            conditions.append("command_ts >= :since_ts")
+            params["since_ts"] = since_ts
+        if until_ts:
+            conditions.append("command_ts <= :until_ts")
+            params["until_ts"] = until_ts
+        where_clause = " AND ".join(conditions) if conditions else "1=1"
+
+        chunks = self.db.adapter.fetch_keyset(
+            f"""
+            SELECT id, command_ts, endpoint, tenant_id, payload, response_status, response_body
+            FROM command_log
+            WHERE {where_clause}
+            """,
+            params,
+            [("command_ts", "command_ts"), ("id", "id")],
+            chunk_size,
+        )
+        async for rows in chunks:
+            for row in rows:
+                yield self._decode_record(row)
 
     async def purge_before(self, threshold_ts: int) -> int:
         """Delete command logs older than threshold.
@@ -362,4 +543,22 @@ class CommandLogTable(Table):
         return count
 
 
-__all__ = ["CommandLogTable"]
+def _is_scalar(value: Any) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def _message_headers(message: dict[str, Any]) -> dict[str, Any]:
+    """Envelope and header fields of a message, with attachment metadata only."""
+    reduced = {k: message[k] for k in _MESSAGE_HEADER_FIELDS if k in message}
+    attachments = message.get("attachments")
+    if isinstance(attachments, list):
+        reduced["attachments"] = [
+            {k: att[k] for k in _ATTACHMENT_HEADER_FIELDS if k in att}
+            if isinstance(att, dict)
+            else att
+            for att in attachments
+        ]
+    return reduced
+
+
+__all__ = ["COMMAND_LOG_POLICIES", "CommandLogTable"]
@@ -0,0 +1,190 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Buffered writer for the command audit log.
+
+Writing the audit entry of every command before answering adds a database
+round trip (and, for addMessages, the whole request body) to each API
+call. CommandLogWriter takes entries without waiting, reduces them with
+the configured payload policy, and inserts them in batches from a
+background task.
+
+Entries become visible in command_log within flush_interval seconds.
+Entries still buffered when the process dies are lost, which is the
+trade-off for keeping audit writes off the request path; set batch_size
+to 0 or 1 in CommandLogConfig to write each entry before responding.
+
+The buffer is bounded by the JSON size of its entries (max_pending_bytes).
+When it is full, submit() waits for the buffered entries to be written,
+so a slow database slows the commands down instead of losing audit
+entries; drop_when_full=True drops the new entry instead.
+
+Example:
+    Buffer audit entries::
+
+        writer = CommandLogWriter(db, policy="headers")
+
+        await writer.submit("addMessages", payload, tenant_id="acme",
+                            response_status=200, response_body=result)
+
+        await writer.stop()  # Writes buffered entries
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Any
+
+from .table import COMMAND_LOG_POLICIES, CommandLogTable
+
+if TYPE_CHECKING:
+    from sql import SqlDb
+
+
+class CommandLogWriter:
+    """Non-blocking, batched writer for command_log entries.
+
+    Attributes:
+        policy: Payload policy applied to each entry (see CommandLogTable).
+        batch_size: Maximum entries per insert.
+        flush_interval: Seconds entries are buffered before being written.
+        max_pending_bytes: Bound of the buffer, in bytes of entry JSON.
+        drop_when_full: Drop new entries when the buffer is full instead
+            of waiting for it to be written.
+        pending_bytes: JSON size of the buffered entries.
+        dropped: Number of entries dropped because the buffer was full.
+    """
+
+    def __init__(
+        self,
+        db: SqlDb,
+        policy: str = "full",
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        max_pending_bytes: int = 16 * 1024 * 1024,
+        drop_when_full: bool = False,
+        logger: logging.Logger | None = None,
+    ):
+        """Initialize the writer.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in COMMAND_LOG_POLICIES:
+            raise ValueError(f"Unknown command log policy: {policy}")
+        self.db = db
+        self.policy = policy
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.max_pending_bytes = max(1, int(max_pending_bytes))
+        self.drop_when_full = drop_when_full
+        self.logger = logger or logging.getLogger(__name__)
+        self.pending_bytes = 0
+        self.dropped = 0
+        self._pending: list[tuple[dict[str, Any], int]] = []
+        self._wakeup: asyncio.Event | None = None
+        self._flush_now: asyncio.Event | None = None
+        self._written: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._closing = False
+
+    async def submit(
+        self,
+        endpoint: str,
+        payload: dict[str, Any],
+        *,
+        tenant_id: str | None = None,
+        response_status: int | None = None,
+        response_body: dict[str, Any] | None = None,
+    ) -> None:
+        """Buffer an audit entry without waiting for the write.
+
+        Takes the same arguments as CommandLogTable.log_command(). The
+        command timestamp is taken now, not at write time. Waits only
+        when the buffer is full (see drop_when_full).
+        """
+        entry = {
+            "command_ts": int(time.time()),
+            "endpoint": endpoint,
+            "tenant_id": tenant_id,
+            "payload": CommandLogTable.reduce_payload(payload, self.policy),
+            "response_status": response_status,
+            "response_body": (
+                CommandLogTable.reduce_response(response_body, self.policy)
+                if response_body
+                else None
+            ),
+        }
+        size = len(json.dumps(entry, default=str))
+        self._ensure_running()
+        # pending_bytes includes the batch being written. An entry larger
+        # than the whole buffer is still taken when the buffer is empty.
+        while self.pending_bytes and self.pending_bytes + size > self.max_pending_bytes:
+            if self.drop_when_full:
+                self.dropped += 1
+                self.logger.warning("Command log buffer full, dropping entry for %s", endpoint)
+                return
+            self._written.clear()  # type: ignore[union-attr]
+            self._wakeup.set()  # type: ignore[union-attr]
+            self._flush_now.set()  # type: ignore[union-attr]
+            await self._written.wait()  # type: ignore[union-attr]
+        self._pending.append((entry, size))
+        self.pending_bytes += size
+        self._wakeup.set()  # type: ignore[union-attr]
+        if len(self._pending) >= self.batch_size:
+            self._flush_now.set()  # type: ignore[union-attr]
+
+    def _ensure_running(self) -> None:
+        """Start the flush task on first use."""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        self._written = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="command-log-writer")
+
+    async def _run(self) -> None:
+        """Write buffered entries periodically until stopped."""
+        assert self._wakeup is not None and self._flush_now is not None
+        while self._pending or not self._closing:
+            await self._wakeup.wait()
+            if not self._flush_now.is_set():
+                try:
+                    await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            self._flush_now.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write every buffered entry now.
+
+        Write errors are logged and the affected entries discarded, as the
+        audit log must never make commands fail.
+        """
+        while self._pending:
+            batch = self._pending[: self.batch_size]
+            self._pending = self._pending[self.batch_size :]
+            try:
+                await self.db.table("command_log").log_commands([entry for entry, _ in batch])
+            except Exception as e:
+                self.logger.warning("Failed to write %d command log entries: %s", len(batch), e)
+            self.pending_bytes -= sum(size for _, size in batch)
+            if self._written is not None:
+                self._written.set()
+
+    async def stop(self) -> None:
+        """Write the buffered entries and stop the flush task."""
+        self._closing = True
+        if self._task is not None:
+            self._wakeup.set()  # type: ignore[union-attr]
+            self._flush_now.set()  # type: ignore[union-attr]
+            await self._task
+            self._task = None
+        await self.flush()
+        self._closing = False
+
+
+__all__ = ["CommandLogWriter"]
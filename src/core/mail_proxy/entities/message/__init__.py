@@ -7,6 +7,7 @@ subject, body, attachments) and progress through delivery states.
 
 Components:
     MessagesTable: Database table manager for message queue.
+    QueueStats: In-memory queue counts kept by MessagesTable.
     MessageEndpoint: REST API endpoint for CRUD operations.
     MessageStatus: Enum for message delivery status.
     FetchMode: Enum for attachment fetch modes.
@@ -64,6 +65,7 @@ from .endpoint import (
     MessageEndpoint,
     MessageStatus,
 )
+from .stats import QueueStats
 from .table import MessagesTable
 
 __all__ = [
@@ -72,4 +74,5 @@ __all__ = [
     "MessageEndpoint",
     "MessagesTable",
     "MessageStatus",
+    "QueueStats",
 ]
@@ -17,6 +17,7 @@ Example:
         mail-proxy messages delete --message-pk uuid-...
         mail-proxy messages add-batch --messages '[{...}, {...}]'
         mail-proxy messages cleanup --tenant-id acme
+        mail-proxy messages export --tenant-id acme > messages.ndjson
 
 Note:
     Enterprise Edition (EE) extends this with MessageEndpoint_EE mixin
@@ -25,6 +26,7 @@ Note:
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from enum import Enum
 from typing import TYPE_CHECKING, Annotated, Any, Literal
 
@@ -44,12 +46,14 @@ class FetchMode(str, Enum):
         HTTP_URL: Fetch directly from a full HTTP/HTTPS URL.
         BASE64: Inline base64-encoded content.
         FILESYSTEM: Fetch from local filesystem path.
+        BLOB: Content-addressed blob stored by the proxy (``blob:<md5>``).
     """
 
     ENDPOINT = "endpoint"
     HTTP_URL = "http_url"
     BASE64 = "base64"
     FILESYSTEM = "filesystem"
+    BLOB = "blob"
 
 
 class MessageStatus(str, Enum):
@@ -78,9 +82,13 @@ class AttachmentPayload(BaseModel):
             - http_url: full URL (e.g., "https://files.example.com/file.pdf")
             - base64: base64-encoded content
             - filesystem: absolute path (e.g., "/var/attachments/file.pdf")
+            - blob: ``blob:<md5>`` reference, set by the proxy for inline
+              attachments stored once at enqueue time
         mime_type: Optional MIME type override.
         fetch_mode: Explicit fetch mode. If not provided, inferred from path.
         content_md5: MD5 hash for cache lookup.
+        size: Declared content size in bytes, used to admit the fetch
+            against the attachment memory budget without probing the source.
         auth: Optional authentication override for HTTP requests.
 
     Example:
@@ -102,6 +110,7 @@ class AttachmentPayload(BaseModel):
     content_md5: Annotated[
         str | None, Field(default=None, pattern=r"^[a-fA-F0-9]{32}$", description="MD5 hash")
     ]
+    size: Annotated[int | None, Field(default=None, ge=0, description="Content size in bytes")]
     auth: Annotated[dict[str, Any] | None, Field(default=None, description="Auth override")]
 
 
@@ -133,6 +142,11 @@ class MessageEndpoint(BaseEndpoint):
 
             # List messages
             messages = await endpoint.list(tenant_id="acme")
+
+            # Or one page at a time
+            page = await endpoint.list_page(tenant_id="acme")
+            while page["next_cursor"]:
+                page = await endpoint.list_page(tenant_id="acme", cursor=page["next_cursor"])
     """
 
     name = "messages"
@@ -239,6 +253,10 @@ class MessageEndpoint(BaseEndpoint):
             message_id: Client-provided message identifier.
             tenant_id: Tenant identifier.
 
+        Messages already moved to the cold archive by retention are read
+        from there and flagged with ``archived: True``; their event history
+        is included.
+
         Returns:
             Message dict with status and payload.
 
@@ -247,7 +265,10 @@ class MessageEndpoint(BaseEndpoint):
         """
         message = await self.table.get(message_id, tenant_id)
         if not message:
-            raise ValueError(f"Message '{message_id}' not found")
+            message = await self.table.get_archived(message_id, tenant_id)
+            if not message:
+                raise ValueError(f"Message '{message_id}' not found")
+            message["archived"] = True
         return self._add_status(message)
 
     async def list(
@@ -273,6 +294,96 @@ class MessageEndpoint(BaseEndpoint):
         )
         return [self._add_status(m) for m in messages]
 
+    async def list_page(
+        self,
+        tenant_id: str,
+        active_only: bool = False,
+        include_history: bool = False,
+        fields: str | None = None,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> dict:
+        """List messages for a tenant, one page at a time.
+
+        Messages are ordered by priority, creation time and pk. Pass the
+        returned next_cursor back as cursor to read the following page.
+
+        Args:
+            tenant_id: Tenant to list messages for.
+            active_only: Only return pending messages.
+            include_history: Include event history for each message.
+            fields: Comma-separated fields to return (e.g. "id,account_id,message").
+                Defaults to every field except the payload; add "message"
+                to get the payload. pk, id, priority, created_at,
+                deferred_ts, smtp_ts, error and status are always returned.
+            limit: Page size (at most 1000).
+            cursor: next_cursor of the previous page.
+
+        Returns:
+            Dict with "messages" (message dicts with status info) and
+            "next_cursor" (None on the last page).
+
+        Raises:
+            ValueError: If a field is unknown or the cursor is invalid.
+        """
+        messages, next_cursor = await self.table.list_page(
+            tenant_id=tenant_id,
+            active_only=active_only,
+            include_history=include_history,
+            fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+            limit=limit,
+            cursor=cursor,
+        )
+        return {
+            "messages": [self._add_status(m) for m in messages],
+            "next_cursor": next_cursor,
+        }
+
+    async def export(
+        self,
+        tenant_id: str,
+        active_only: bool = False,
+    ) -> AsyncIterator[dict]:
+        """Stream all messages of a tenant, with payload, one at a time.
+
+        Messages are read with a database cursor and sent by the API as
+        NDJSON (gzip when accepted), so memory use does not depend on the
+        number of messages.
+
+        Args:
+            tenant_id: Tenant to export messages for.
+            active_only: Only export pending messages.
+
+        Returns:
+            Async iterator of message dicts with status info.
+        """
+
+        async def records() -> AsyncIterator[dict]:
+            async for message in self.table.iter_all(tenant_id=tenant_id, active_only=active_only):
+                yield self._add_status(message)
+
+        return records()
+
+    async def export_events(
+        self,
+        tenant_id: str,
+        since_ts: int | None = None,
+        until_ts: int | None = None,
+    ) -> AsyncIterator[dict]:
+        """Stream the delivery events of a tenant's messages, one at a time.
+
+        Args:
+            tenant_id: Tenant to export events for.
+            since_ts: Include events with event_ts >= since_ts.
+            until_ts: Include events with event_ts <= until_ts.
+
+        Returns:
+            Async iterator of event dicts in chronological order.
+        """
+        return self.table.db.table("message_events").iter_events(
+            tenant_id=tenant_id, since_ts=since_ts, until_ts=until_ts
+        )
+
     @POST
     async def delete(self, message_pk: str) -> bool:
         """Delete a message by internal primary key.
@@ -447,26 +558,24 @@ class MessageEndpoint(BaseEndpoint):
                 - not_found: List of IDs that don't exist
                 - unauthorized: List of IDs belonging to other tenants
         """
-        removed = 0
         not_found: list[str] = []
         unauthorized: list[str] = []
 
         tenant_ids = await self.table.get_ids_for_tenant(ids, tenant_id)
+        foreign = [msg_id for msg_id in ids if msg_id not in tenant_ids]
+        existing = await self.table.existing_ids(foreign) if foreign else set()
+
+        owned = [msg_id for msg_id in ids if msg_id in tenant_ids]
+        removed_ids = await self.table.remove_for_tenant(owned, tenant_id) if owned else set()
 
         for msg_id in ids:
-            if msg_id not in tenant_ids:
-                existing = await self.table.existing_ids([msg_id])
-                if msg_id in existing:
-                    unauthorized.append(msg_id)
-                else:
-                    not_found.append(msg_id)
+            if msg_id in removed_ids:
                 continue
-
-            msg = await self.table.get(msg_id, tenant_id)
-            if msg and await self.table.remove_by_pk(msg["pk"]):
-                removed += 1
+            if msg_id not in tenant_ids and msg_id in existing:
+                unauthorized.append(msg_id)
             else:
                 not_found.append(msg_id)
+        removed = len(removed_ids)
 
         return {
             "ok": True,
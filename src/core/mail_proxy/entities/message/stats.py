@@ -0,0 +1,186 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Materialised queue statistics for the messages table.
+
+Counting the queue with ``SELECT COUNT(*)`` after every dispatch cycle,
+enqueue and purge scans the pending rows each time. QueueStats keeps the
+counts in memory instead, per (tenant_id, account_id, priority):
+
+- pending: waiting for delivery (smtp_ts IS NULL, deferred_ts IS NULL)
+- deferred: scheduled for a later retry (smtp_ts IS NULL, deferred_ts set)
+- in_flight: claimed by the dispatcher of this process and being sent
+- oldest pending creation time
+
+The counts are updated incrementally by the paths that change the queue:
+MessagesTable.insert_batch() adds new messages, the dispatcher moves
+messages to in_flight and out of it with the outcome of the send.
+Changes the structure cannot follow exactly (deletes, upserts of queued
+messages, other processes writing the same database) mark it dirty.
+MessagesTable.reconcile_stats() rebuilds it from one grouped query; the
+proxy runs it when the stats are dirty or older than
+TimingConfig.queue_stats_interval.
+
+The oldest pending time is exact after a reconciliation. Between
+reconciliations it can only lag behind (report an older message than
+the real oldest), which errs on the side of alerting.
+
+Example:
+    Read the current queue shape::
+
+        stats = proxy.db.table("messages").stats
+        for (tenant_id, account_id, priority), counts in stats.snapshot().items():
+            print(tenant_id, account_id, priority, counts.pending, counts.deferred)
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, replace
+from typing import Any
+
+QueueKey = tuple[str, str, int]
+"""(tenant_id, account_id, priority) of a group of queued messages."""
+
+STATES = ("pending", "deferred", "in_flight")
+
+
+@dataclass
+class QueueCounts:
+    """Queue counts of one (tenant_id, account_id, priority) group."""
+
+    pending: int = 0
+    deferred: int = 0
+    in_flight: int = 0
+    oldest_pending_ts: float | None = None
+
+    @property
+    def total(self) -> int:
+        """Messages not yet processed (pending + deferred + in_flight)."""
+        return self.pending + self.deferred + self.in_flight
+
+
+def queue_key(row: dict[str, Any]) -> QueueKey:
+    """Return the stats key of a message row."""
+    priority = row.get("priority")
+    return (
+        row.get("tenant_id") or "",
+        row.get("account_id") or "",
+        int(priority) if priority is not None else 2,
+    )
+
+
+class QueueStats:
+    """In-memory queue counts, incrementally maintained and periodically reconciled.
+
+    Attributes:
+        reconciled_at: Monotonic time of the last reconciliation, or None.
+        dirty: True when a change could not be applied incrementally.
+    """
+
+    def __init__(self) -> None:
+        self._counts: dict[QueueKey, QueueCounts] = {}
+        # pk -> (key, previous state) of messages being sent
+        self._in_flight: dict[str, tuple[QueueKey, str]] = {}
+        self.reconciled_at: float | None = None
+        self.dirty = False
+
+    # ----------------------------------------------------------------- reading
+    def snapshot(self) -> dict[QueueKey, QueueCounts]:
+        """Return a copy of the counts of every non-empty group."""
+        return {key: replace(counts) for key, counts in self._counts.items() if counts.total}
+
+    def total(self, tenant_id: str | None = None) -> int:
+        """Messages not yet processed, optionally for one tenant."""
+        return sum(
+            counts.total
+            for key, counts in self._counts.items()
+            if tenant_id is None or key[0] == tenant_id
+        )
+
+    def is_fresh(self, max_age: float) -> bool:
+        """True when the counts can be used without reconciling first."""
+        if self.reconciled_at is None or self.dirty:
+            return False
+        return time.monotonic() - self.reconciled_at < max_age
+
+    # ----------------------------------------------------------------- updates
+    def added(self, row: dict[str, Any], created_ts: float | None = None) -> None:
+        """Count a newly queued message."""
+        counts = self._counts.setdefault(queue_key(row), QueueCounts())
+        if row.get("deferred_ts") is not None:
+            counts.deferred += 1
+            return
+        counts.pending += 1
+        if counts.oldest_pending_ts is None:
+            counts.oldest_pending_ts = created_ts if created_ts is not None else time.time()
+
+    def dispatch_started(self, row: dict[str, Any]) -> None:
+        """Move a message fetched for delivery to in_flight."""
+        pk = row.get("pk")
+        if not pk or pk in self._in_flight:
+            return
+        key = queue_key(row)
+        state = "deferred" if row.get("deferred_ts") is not None else "pending"
+        counts = self._counts.setdefault(key, QueueCounts())
+        setattr(counts, state, max(0, getattr(counts, state) - 1))
+        counts.in_flight += 1
+        self._in_flight[pk] = (key, state)
+        self._clear_oldest(counts)
+
+    def dispatch_finished(self, pk: str | None, outcome: str | None) -> None:
+        """Take a message out of in_flight with the outcome of its send.
+
+        Args:
+            pk: Message pk passed to dispatch_started().
+            outcome: "sent" or "error" (message processed), "deferred"
+                (scheduled for retry), or None when the message was left
+                unchanged (e.g. an unexpected exception).
+        """
+        entry = self._in_flight.pop(pk, None) if pk else None
+        if entry is None:
+            return
+        key, state = entry
+        counts = self._counts.setdefault(key, QueueCounts())
+        counts.in_flight = max(0, counts.in_flight - 1)
+        if outcome == "deferred":
+            counts.deferred += 1
+        elif outcome is None:
+            setattr(counts, state, getattr(counts, state) + 1)
+
+    def invalidate(self) -> None:
+        """Mark the counts stale; the next refresh reconciles them."""
+        self.dirty = True
+
+    def reconcile(self, rows: list[dict[str, Any]]) -> None:
+        """Replace the counts with the result of a grouped query.
+
+        Rows hold tenant_id, account_id, priority, pending, deferred and
+        oldest_pending_ts. Messages still in flight are counted by the
+        database as waiting; they are moved back to in_flight.
+        """
+        counts: dict[QueueKey, QueueCounts] = {}
+        for row in rows:
+            counts[queue_key(row)] = QueueCounts(
+                pending=int(row["pending"] or 0),
+                deferred=int(row["deferred"] or 0),
+                oldest_pending_ts=row.get("oldest_pending_ts"),
+            )
+        for key, state in self._in_flight.values():
+            group = counts.setdefault(key, QueueCounts())
+            if getattr(group, state):
+                setattr(group, state, getattr(group, state) - 1)
+            elif state == "deferred" and group.pending:
+                group.pending -= 1  # Deferral already cleared by the dispatcher
+            group.in_flight += 1
+        for group in counts.values():
+            self._clear_oldest(group)
+        self._counts = counts
+        self.reconciled_at = time.monotonic()
+        self.dirty = False
+
+    @staticmethod
+    def _clear_oldest(counts: QueueCounts) -> None:
+        if not counts.pending:
+            counts.oldest_pending_ts = None
+
+
+__all__ = ["STATES", "QueueCounts", "QueueKey", "QueueStats", "queue_key"]
@@ -51,13 +51,51 @@ Note:
 
 from __future__ import annotations
 
+import base64
+import binascii
 import json
-from collections.abc import Iterable, Sequence
-from typing import Any
+import time
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
 
 from genro_toolbox import get_uuid
 
-from sql import Integer, String, Table, Timestamp
+from sql import Integer, String, Table, Timestamp, replica_read
+from tools.compression import COMPRESSED_PREFIX, CompressionError, compress_value, decompress_value
+
+from .stats import QueueStats
+
+if TYPE_CHECKING:
+    from sql import SqlDb
+
+BLOB_MIN_SIZE = 1024
+"""Inline attachments smaller than this (decoded bytes) stay in the payload."""
+
+LIST_FIELDS = (
+    "pk",
+    "id",
+    "tenant_id",
+    "account_id",
+    "priority",
+    "batch_code",
+    "created_at",
+    "updated_at",
+    "deferred_ts",
+    "smtp_ts",
+    "is_pec",
+    "tenant_name",
+    "error_ts",
+    "error",
+    "message",
+)
+"""Fields list_page() can return; "message" is the decoded payload."""
+
+DEFAULT_LIST_FIELDS = tuple(f for f in LIST_FIELDS if f != "message")
+"""Fields returned by list_page() when none are requested (no payload)."""
+
+_LIST_KEY_FIELDS = ("pk", "id", "priority", "created_at", "deferred_ts", "smtp_ts", "error")
+"""Always returned by list_page(): keyset columns and what the status needs."""
 
 
 class MessagesTable(Table):
@@ -70,6 +108,8 @@ class MessagesTable(Table):
     Attributes:
         name: Table name ("messages").
         pkey: Primary key column ("pk", UUID string).
+        stats: In-memory queue counts (QueueStats), kept up to date by
+            insert_batch() and the dispatcher, rebuilt by reconcile_stats().
 
     Table Schema:
         - pk: UUID primary key (generated on insert)
@@ -106,19 +146,72 @@ class MessagesTable(Table):
 
     name = "messages"
     pkey = "pk"
+    partition_column = "created_at"
+
+    copy_min_rows: int = 200
+    """New messages in one insert_batch() from which adapters with a bulk-load
+    protocol (PostgreSQL COPY) are used instead of row-by-row inserts."""
+
+    stats_max_age: float = 30.0
+    """Seconds the in-memory queue stats are trusted before reconcile_stats()
+    (MailProxy sets it from TimingConfig.queue_stats_interval)."""
+
+    stats_counts: bool = True
+    """Whether count_pending_for_tenant() may answer from the in-memory stats.
+
+    The stats only follow the sends of this process, so MailProxy disables
+    this in processes that do not dispatch every account (see
+    ProxyConfig.role); they always query the table."""
+
+    list_page_size: int = 100
+    """Messages per list_page() page when no limit is given."""
+
+    list_page_max: int = 1000
+    """Upper bound of the list_page() page size."""
+
+    LIST_INDEXES: dict[str, str] = {
+        "idx_messages_list": '"priority", "created_at", "pk"',
+        "idx_messages_tenant_list": '"tenant_id", "priority", "created_at", "pk"',
+    }
+    """Indexes matching the (priority, created_at, pk) order of list_page() and
+    fetch_ready(), so keyset pages are read from the index without a sort."""
+
+    _BATCH_COLUMNS = (
+        "id",
+        "tenant_id",
+        "account_id",
+        "account_pk",
+        "priority",
+        "payload",
+        "blob_refs",
+        "batch_code",
+        "deferred_ts",
+        "is_pec",
+    )
+
+    @property
+    def unique_key(self) -> tuple[str, ...]:
+        """Columns of the UNIQUE constraint making inserts idempotent.
+
+        (tenant_id, id), plus created_at when the table is partitioned:
+        PostgreSQL only enforces uniqueness within a partition, so ids are
+        then deduplicated by insert_batch() checking existing rows first.
+        """
+        if self.partition_interval is not None:
+            return ("tenant_id", "id", "created_at")
+        return ("tenant_id", "id")
 
-    def create_table_sql(self) -> str:
-        """Generate CREATE TABLE with UNIQUE constraint.
-
-        Adds UNIQUE (tenant_id, id) constraint to ensure idempotent
-        inserts and multi-tenant isolation.
+    def table_constraints(self) -> list[str]:
+        """Add the UNIQUE constraint on unique_key.
 
-        Returns:
-            SQL CREATE TABLE statement with UNIQUE constraint.
+        Ensures idempotent inserts and multi-tenant isolation.
         """
-        sql = super().create_table_sql()
-        last_paren = sql.rfind(")")
-        return sql[:last_paren] + ',\n    UNIQUE ("tenant_id", "id")\n)'
+        columns = ", ".join(f'"{name}"' for name in self.unique_key)
+        return [f"UNIQUE ({columns})"]
+
+    def __init__(self, db: SqlDb) -> None:
+        super().__init__(db)
+        self.stats = QueueStats()
 
     def configure(self) -> None:
         """Define table columns.
@@ -131,6 +224,9 @@ class MessagesTable(Table):
             account_pk: FK to accounts.pk UUID.
             priority: Delivery priority (0-3, default 2).
             payload: JSON email content.
+            blob_refs: Comma-separated MD5s of the attachment_blobs the
+                payload references ('' for none, NULL for rows written
+                before the column existed).
             batch_code: Optional batch/campaign identifier.
             created_at, updated_at: Timestamps.
             deferred_ts: Unix timestamp for retry scheduling.
@@ -145,6 +241,7 @@ class MessagesTable(Table):
         c.column("account_pk", String)
         c.column("priority", Integer, nullable=False, default=2)
         c.column("payload", String, nullable=False)
+        c.column("blob_refs", String)
         c.column("batch_code", String)
         c.column("created_at", Timestamp, default="CURRENT_TIMESTAMP")
         c.column("updated_at", Timestamp, default="CURRENT_TIMESTAMP")
@@ -152,6 +249,22 @@ class MessagesTable(Table):
         c.column("smtp_ts", Integer)
         c.column("is_pec", Integer, default=0)
 
+    async def sync_schema(self) -> None:
+        """Add missing columns, then the LIST_INDEXES.
+
+        Runs after migrate_from_legacy_schema(): a legacy table has no pk
+        column to index yet.
+        """
+        await super().sync_schema()
+        await self.ensure_indexes()
+
+    async def ensure_indexes(self) -> None:
+        """Create the LIST_INDEXES that do not exist yet. Safe on every startup."""
+        for name, columns in self.LIST_INDEXES.items():
+            await self.db.adapter.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {self.name} ({columns})"
+            )
+
     async def migrate_from_legacy_schema(self) -> bool:
         """Migrate from INTEGER pk to UUID pk schema.
 
@@ -190,21 +303,40 @@ class MessagesTable(Table):
             )
         """)
 
-        rows = await self.db.adapter.fetch_all(
-            "SELECT id, tenant_id, account_id, priority, payload, batch_code, "
-            "created_at, updated_at, deferred_ts, smtp_ts, is_pec FROM messages"
+        # Copy in keyset-paginated chunks: memory stays flat, and no read
+        # cursor is left open while writing (SQLite would refuse the commit)
+        columns = (
+            "id, tenant_id, account_id, priority, payload, batch_code, "
+            "created_at, updated_at, deferred_ts, smtp_ts, is_pec"
         )
-        for row in rows:
-            pk = get_uuid()
-            await self.db.adapter.execute(
+        chunk_size = self.batch_chunk_size
+        last: dict[str, Any] | None = None
+        while True:
+            if last is None:
+                rows = await self.db.adapter.fetch_all(
+                    f"SELECT {columns} FROM messages ORDER BY tenant_id, id LIMIT :limit",
+                    {"limit": chunk_size},
+                )
+            else:
+                rows = await self.db.adapter.fetch_all(
+                    f"""SELECT {columns} FROM messages
+                        WHERE tenant_id > :last_tenant
+                           OR (tenant_id = :last_tenant AND id > :last_id)
+                        ORDER BY tenant_id, id LIMIT :limit""",
+                    {**last, "limit": chunk_size},
+                )
+            if not rows:
+                break
+            await self.db.adapter.execute_many(
                 """INSERT INTO messages_new
                    (pk, id, tenant_id, account_id, priority, payload, batch_code,
                     created_at, updated_at, deferred_ts, smtp_ts, is_pec)
                    VALUES (:pk, :id, :tenant_id, :account_id, :priority, :payload,
                            :batch_code, :created_at, :updated_at, :deferred_ts,
                            :smtp_ts, :is_pec)""",
-                {"pk": pk, **dict(row)},
+                [{"pk": get_uuid(), **dict(row)} for row in rows],
             )
+            last = {"last_tenant": rows[-1]["tenant_id"], "last_id": rows[-1]["id"]}
 
         await self.db.adapter.execute("DROP TABLE messages")
         await self.db.adapter.execute("ALTER TABLE messages_new RENAME TO messages")
@@ -297,68 +429,263 @@ class MessagesTable(Table):
             pec_account_ids = await self.db.table("accounts").get_pec_account_ids()
 
         pec_accounts = pec_account_ids or set()
-        result: list[dict[str, str]] = []
-
+        rows: list[dict[str, Any]] = []
         for entry in entries:
-            msg_id = entry["id"]
             entry_tenant_id = entry.get("tenant_id") or tenant_id
             if not entry_tenant_id:
                 continue
-
             account_id = entry.get("account_id")
-            account_pk = entry.get("account_pk")
-            priority = int(entry.get("priority", 2))
-            deferred_ts = entry.get("deferred_ts")
-            batch_code = entry.get("batch_code")
-            is_pec = 1 if account_id in pec_accounts else 0
-            payload = json.dumps(entry["payload"])
-
-            if account_id and not account_pk:
-                acc_row = await self.db.adapter.fetch_one(
-                    "SELECT pk FROM accounts WHERE tenant_id = :tenant_id AND id = :account_id",
-                    {"tenant_id": entry_tenant_id, "account_id": account_id},
-                )
-                if acc_row:
-                    account_pk = acc_row["pk"]
+            payload = await self._store_inline_blobs(entry["payload"])
+            rows.append(
+                {
+                    "id": entry["id"],
+                    "tenant_id": entry_tenant_id,
+                    "account_id": account_id,
+                    "account_pk": entry.get("account_pk"),
+                    "priority": int(entry.get("priority", 2)),
+                    "payload": self._encode_payload(payload),
+                    "blob_refs": self._blob_refs(payload),
+                    "batch_code": entry.get("batch_code"),
+                    "deferred_ts": entry.get("deferred_ts"),
+                    "is_pec": 1 if account_id in pec_accounts else 0,
+                }
+            )
+
+        copied: dict[int, str] = {}
+        if self.db.adapter.supports_copy and len(rows) >= self.copy_min_rows:
+            copied = await self._copy_new_rows(rows)
+            now = time.time()
+            for i in copied:
+                self.stats.added(rows[i], now)
+
+        result: list[dict[str, str]] = []
+        for i, row in enumerate(rows):
+            pk = copied.get(i) or await self._upsert_row(row)
+            if pk:
+                result.append({"id": row["id"], "pk": pk})
+
+        if result:
+            self.db.notify("dispatch")
+        return result
+
+    async def _upsert_row(self, row: dict[str, Any]) -> str | None:
+        """Insert a new message or update a pending one, row by row.
 
-            existing = await self.db.adapter.fetch_one(
-                "SELECT pk, smtp_ts FROM messages WHERE tenant_id = :tenant_id AND id = :id",
-                {"tenant_id": entry_tenant_id, "id": msg_id},
+        Returns:
+            The message pk, or None if the message was already processed.
+        """
+        account_pk = row["account_pk"]
+        if row["account_id"] and not account_pk:
+            acc_row = await self.db.adapter.fetch_one(
+                "SELECT pk FROM accounts WHERE tenant_id = :tenant_id AND id = :account_id",
+                {"tenant_id": row["tenant_id"], "account_id": row["account_id"]},
             )
+            if acc_row:
+                account_pk = acc_row["pk"]
 
-            if existing:
-                if existing["smtp_ts"] is not None:
-                    continue
-
-                pk = existing["pk"]
-                async with self.record(pk) as rec:
-                    rec["account_id"] = account_id
-                    rec["account_pk"] = account_pk
-                    rec["priority"] = priority
-                    rec["payload"] = payload
-                    rec["batch_code"] = batch_code
-                    rec["deferred_ts"] = deferred_ts
-                    rec["is_pec"] = is_pec
-            else:
-                pk = get_uuid()
-                await self.insert(
-                    {
-                        "pk": pk,
-                        "id": msg_id,
-                        "tenant_id": entry_tenant_id,
-                        "account_id": account_id,
-                        "account_pk": account_pk,
-                        "priority": priority,
-                        "payload": payload,
-                        "batch_code": batch_code,
-                        "deferred_ts": deferred_ts,
-                        "is_pec": is_pec,
-                    }
+        existing = await self.db.adapter.fetch_one(
+            "SELECT pk, smtp_ts FROM messages WHERE tenant_id = :tenant_id AND id = :id",
+            {"tenant_id": row["tenant_id"], "id": row["id"]},
+        )
+
+        values = {
+            "account_id": row["account_id"],
+            "account_pk": account_pk,
+            "priority": row["priority"],
+            "payload": row["payload"],
+            "blob_refs": row["blob_refs"],
+            "batch_code": row["batch_code"],
+            "deferred_ts": row["deferred_ts"],
+            "is_pec": row["is_pec"],
+        }
+        if existing:
+            if existing["smtp_ts"] is not None:
+                return None
+            # Conditional: skip if the message was sent since the check above
+            updated = await self.update_returning(
+                values, {"pk": existing["pk"]}, condition="smtp_ts IS NULL", returning=["pk"]
+            )
+            if updated is None:
+                return None
+            self.stats.invalidate()  # State, priority or account may have changed
+            return existing["pk"]
+
+        pk = get_uuid()
+        await self.insert({"pk": pk, "id": row["id"], "tenant_id": row["tenant_id"], **values})
+        self.stats.added(row)
+        return pk
+
+    async def _copy_new_rows(self, rows: list[dict[str, Any]]) -> dict[int, str]:
+        """Bulk-load the messages of a batch that do not exist yet.
+
+        New messages are loaded with DbAdapter.copy_merge() (staging table
+        and merge) when there are at least copy_min_rows of them. Rows that
+        already exist, or were inserted concurrently, are left to the
+        row-by-row path.
+
+        Returns:
+            Map of row index to pk for the rows inserted here.
+        """
+        keys = [(row["tenant_id"], row["id"]) for row in rows]
+        if len(set(keys)) != len(keys):
+            return {}  # Repeated ids are upserted in order, row by row
+
+        existing = await self._existing_keys(rows)
+        new = [i for i, key in enumerate(keys) if key not in existing]
+        if len(new) < self.copy_min_rows:
+            return {}
+
+        await self._resolve_account_pks([rows[i] for i in new])
+        new_pks = {i: get_uuid() for i in new}
+        inserted = set(
+            await self.db.adapter.copy_merge(
+                self.name,
+                ("pk", *self._BATCH_COLUMNS),
+                [(new_pks[i], *(rows[i][c] for c in self._BATCH_COLUMNS)) for i in new],
+                conflict=self.unique_key,
+                returning="pk",
+                types=self._column_types(),
+            )
+        )
+        return {i: pk for i, pk in new_pks.items() if pk in inserted}
+
+    async def _existing_keys(self, rows: list[dict[str, Any]]) -> set[tuple[str, str]]:
+        """Return the (tenant_id, id) pairs of rows already stored."""
+        ids_by_tenant: dict[str, list[str]] = {}
+        for row in rows:
+            ids_by_tenant.setdefault(row["tenant_id"], []).append(row["id"])
+
+        existing: set[tuple[str, str]] = set()
+        for tenant_id, ids in ids_by_tenant.items():
+            for start in range(0, len(ids), self.batch_chunk_size):
+                chunk = ids[start : start + self.batch_chunk_size]
+                params: dict[str, Any] = {f"id_{i}": v for i, v in enumerate(chunk)}
+                params["tenant_id"] = tenant_id
+                placeholders = ", ".join(f":id_{i}" for i in range(len(chunk)))
+                found = await self.db.adapter.fetch_all(
+                    f"SELECT id FROM messages WHERE tenant_id = :tenant_id AND id IN ({placeholders})",
+                    params,
                 )
+                existing.update((tenant_id, row["id"]) for row in found)
+        return existing
+
+    async def _resolve_account_pks(self, rows: list[dict[str, Any]]) -> None:
+        """Fill account_pk of rows from their account_id, one query per tenant."""
+        tenants = {row["tenant_id"] for row in rows if row["account_id"] and not row["account_pk"]}
+        for tenant_id in tenants:
+            accounts = await self.db.adapter.fetch_all(
+                "SELECT pk, id FROM accounts WHERE tenant_id = :tenant_id",
+                {"tenant_id": tenant_id},
+            )
+            pk_by_id = {acc["id"]: acc["pk"] for acc in accounts}
+            for row in rows:
+                if row["tenant_id"] == tenant_id and row["account_id"] and not row["account_pk"]:
+                    row["account_pk"] = pk_by_id.get(row["account_id"])
 
-            result.append({"id": msg_id, "pk": pk})
+    async def _store_inline_blobs(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Move inline base64 attachments to the attachment_blobs store.
 
-        return result
+        Each inline attachment of at least BLOB_MIN_SIZE bytes is stored once
+        by content MD5 and replaced with a ``blob:<md5>`` reference carrying
+        content_md5 and size, so the sender resolves it through the cache.
+        The caller's payload is not modified.
+
+        Args:
+            payload: Email content dict.
+
+        Returns:
+            The payload to persist, a shallow copy if anything was extracted.
+        """
+        attachments = payload.get("attachments") if isinstance(payload, dict) else None
+        if not attachments or "attachment_blobs" not in self.db.tables:
+            return payload
+
+        blobs = self.db.table("attachment_blobs")
+        stored: list[Any] = []
+        changed = False
+        for att in attachments:
+            content = self._inline_content(att)
+            if content is None or len(content) < BLOB_MIN_SIZE:
+                stored.append(att)
+                continue
+            md5, size = await blobs.put(content)
+            stored.append(
+                {
+                    **att,
+                    "storage_path": f"blob:{md5}",
+                    "fetch_mode": "blob",
+                    "content_md5": md5,
+                    "size": size,
+                }
+            )
+            changed = True
+
+        if not changed:
+            return payload
+        return {**payload, "attachments": stored}
+
+    @staticmethod
+    def _inline_content(att: Any) -> bytes | None:
+        """Decode an inline base64 attachment, None if not inline or invalid."""
+        if not isinstance(att, dict):
+            return None
+        storage_path = att.get("storage_path")
+        if not isinstance(storage_path, str):
+            return None
+        fetch_mode = att.get("fetch_mode")
+        if fetch_mode == "base64":
+            data = storage_path.removeprefix("base64:")
+        elif not fetch_mode and storage_path.startswith("base64:"):
+            data = storage_path[7:]
+        else:
+            return None
+        try:
+            return base64.b64decode(data.strip(), validate=True)
+        except (binascii.Error, ValueError):
+            return None  # Left inline: the sender reports the invalid content
+
+    @staticmethod
+    def _blob_refs(payload: dict[str, Any]) -> str:
+        """Return the blob_refs column value of a payload to persist."""
+        attachments = payload.get("attachments") if isinstance(payload, dict) else None
+        md5s = {
+            str(att.get("storage_path", "")).removeprefix("blob:")
+            for att in attachments or []
+            if isinstance(att, dict) and att.get("fetch_mode") == "blob"
+        }
+        return ",".join(sorted(md5s))
+
+    async def referenced_blob_md5s(self) -> set[str]:
+        """Return MD5s of attachment blobs referenced by stored messages.
+
+        Reads the blob_refs column in pk order, batch_chunk_size rows per
+        query, skipping messages without references. Only rows whose
+        blob_refs was never computed (written before the column existed)
+        have their payload read and decoded.
+        """
+        chunks = self.db.adapter.fetch_keyset(
+            """
+            SELECT pk, blob_refs,
+                   CASE WHEN blob_refs IS NULL THEN payload END AS payload
+            FROM messages
+            WHERE (blob_refs <> ''
+                   OR (blob_refs IS NULL AND (payload LIKE :pattern OR payload LIKE :compressed)))
+            """,
+            {"pattern": "%blob:%", "compressed": f"{COMPRESSED_PREFIX}%"},
+            keys=[("pk", "pk")],
+            chunk_size=self.batch_chunk_size,
+        )
+        referenced: set[str] = set()
+        async for rows in chunks:
+            for row in rows:
+                refs = row["blob_refs"]
+                if refs is None:
+                    try:
+                        refs = self._blob_refs(json.loads(decompress_value(row["payload"])))
+                    except (TypeError, ValueError):
+                        continue
+                referenced.update(md5 for md5 in refs.split(",") if md5)
+        return referenced
 
     async def fetch_ready(
         self,
@@ -367,6 +694,10 @@ class MessagesTable(Table):
         now_ts: int,
         priority: int | None = None,
         min_priority: int | None = None,
+        offset: int = 0,
+        include_payload: bool = True,
+        partition: int = 0,
+        partitions: int = 1,
     ) -> list[dict[str, Any]]:
         """Fetch messages ready for SMTP delivery.
 
@@ -378,6 +709,18 @@ class MessagesTable(Table):
             now_ts: Current Unix timestamp for deferred check.
             priority: Exact priority to filter (0-3).
             min_priority: Minimum priority to filter.
+            offset: Number of ready messages to skip. Used by the dispatcher
+                to peek at the batch following the one being sent.
+            include_payload: If False, the payload column is not read and
+                'message' is None in every row. The dispatcher uses this to
+                scan only scheduling columns and load payloads with
+                fetch_payloads() for the messages it actually sends.
+            partition: With partitions > 1, only the messages of the
+                accounts whose dispatch_hash modulo partitions is partition
+                are returned, plus, for partition 0, the messages without an
+                existing account. Used by partitioned dispatchers, see
+                smtp.partition.
+            partitions: Number of dispatch partitions. 1 returns every account.
 
         Returns:
             List of message dicts with decoded payload.
@@ -392,7 +735,7 @@ class MessagesTable(Table):
             "m.smtp_ts IS NULL",
             "(m.deferred_ts IS NULL OR m.deferred_ts <= :now_ts)",
         ]
-        params: dict[str, Any] = {"now_ts": now_ts, "limit": limit}
+        params: dict[str, Any] = {"now_ts": now_ts, "limit": limit, "offset": offset}
 
         if priority is not None:
             conditions.append("m.priority = :priority")
@@ -401,6 +744,15 @@ class MessagesTable(Table):
             conditions.append("m.priority >= :min_priority")
             params["min_priority"] = min_priority
 
+        if partitions > 1:
+            owned = "a.dispatch_hash % :partitions = :partition"
+            if partition == 0:
+                # NULL account_pk, deleted account, or hash not backfilled yet
+                owned = f"(a.pk IS NULL OR a.dispatch_hash IS NULL OR {owned})"
+            conditions.append(owned)
+            params["partitions"] = partitions
+            params["partition"] = partition
+
         suspension_filter = """
             (
                 t.suspended_batches IS NULL
@@ -417,19 +769,67 @@ class MessagesTable(Table):
         params["like_suffix"] = ",%"
         conditions.append(suspension_filter)
 
+        payload_column = ", m.payload" if include_payload else ""
         query = f"""
-            SELECT m.pk, m.id, m.tenant_id, m.account_id, m.priority, m.payload, m.batch_code, m.deferred_ts, m.is_pec
+            SELECT m.pk, m.id, m.tenant_id, m.account_id, m.priority{payload_column}, m.batch_code, m.deferred_ts, m.is_pec
             FROM messages m
             LEFT JOIN accounts a ON m.account_pk = a.pk
             LEFT JOIN tenants t ON m.tenant_id = t.id
             WHERE {" AND ".join(conditions)}
             ORDER BY m.priority ASC, m.created_at ASC, m.pk ASC
-            LIMIT :limit
+            LIMIT :limit OFFSET :offset
         """
 
         rows = await self.db.adapter.fetch_all(query, params)
         return [self._decode_payload(row) for row in rows]
 
+    async def fetch_payloads(self, pks: Sequence[str]) -> dict[str, dict[str, Any]]:
+        """Load and decode the payloads of several messages in one query.
+
+        Args:
+            pks: Message UUID primary keys.
+
+        Returns:
+            Dict mapping pk to decoded payload. Messages that no longer
+            exist are missing from the result.
+        """
+        pk_list = [pk for pk in pks if pk]
+        if not pk_list:
+            return {}
+
+        params = {f"pk_{i}": pk for i, pk in enumerate(pk_list)}
+        placeholders = ", ".join(f":pk_{i}" for i in range(len(pk_list)))
+        rows = await self.db.adapter.fetch_all(
+            f"SELECT pk, payload FROM messages WHERE pk IN ({placeholders})",
+            params,
+        )
+        return {row["pk"]: self._decode_payload(dict(row))["message"] for row in rows}
+
+    async def fetch_attachment_refs(self, pks: Sequence[str]) -> dict[str, list[dict[str, Any]]]:
+        """Return the attachment specifications of several messages, without their content.
+
+        Used by the dispatcher's prefetch lookahead, which needs to know
+        where attachments live but not the rest of the payload. Inline
+        base64 attachments are left out: they need no download.
+
+        Args:
+            pks: Message UUID primary keys.
+
+        Returns:
+            Dict mapping pk to its non-inline attachments. Messages without
+            any, or that no longer exist, are missing from the result.
+        """
+        refs: dict[str, list[dict[str, Any]]] = {}
+        for pk, payload in (await self.fetch_payloads(pks)).items():
+            attachments = [
+                att
+                for att in (payload or {}).get("attachments") or []
+                if isinstance(att, dict) and self._inline_content(att) is None
+            ]
+            if attachments:
+                refs[pk] = attachments
+        return refs
+
     async def set_deferred(self, pk: str, deferred_ts: int) -> None:
         """Schedule message for retry at specified timestamp.
 
@@ -439,9 +839,9 @@ class MessagesTable(Table):
             pk: Message UUID primary key.
             deferred_ts: Unix timestamp for retry.
         """
-        async with self.record(pk) as rec:
-            rec["deferred_ts"] = deferred_ts
-            rec["smtp_ts"] = None
+        await self.update_returning(
+            {"deferred_ts": deferred_ts, "smtp_ts": None}, {"pk": pk}, returning=["pk"]
+        )
 
     async def clear_deferred(self, pk: str) -> None:
         """Clear deferred timestamp, making message immediately ready.
@@ -449,8 +849,12 @@ class MessagesTable(Table):
         Args:
             pk: Message UUID primary key.
         """
-        async with self.record(pk) as rec:
-            rec["deferred_ts"] = None
+        await self.update_returning(
+            {"deferred_ts": None},
+            {"pk": pk},
+            condition="deferred_ts IS NOT NULL",
+            returning=["pk"],
+        )
 
     async def mark_sent(self, pk: str, smtp_ts: int) -> None:
         """Mark message as successfully sent.
@@ -459,9 +863,9 @@ class MessagesTable(Table):
             pk: Message UUID primary key.
             smtp_ts: Unix timestamp of successful SMTP send.
         """
-        async with self.record(pk) as rec:
-            rec["smtp_ts"] = smtp_ts
-            rec["deferred_ts"] = None
+        await self.update_returning(
+            {"smtp_ts": smtp_ts, "deferred_ts": None}, {"pk": pk}, returning=["pk"]
+        )
 
     async def mark_error(self, pk: str, smtp_ts: int) -> None:
         """Mark message as sent with error.
@@ -470,9 +874,9 @@ class MessagesTable(Table):
             pk: Message UUID primary key.
             smtp_ts: Unix timestamp of failed SMTP attempt.
         """
-        async with self.record(pk) as rec:
-            rec["smtp_ts"] = smtp_ts
-            rec["deferred_ts"] = None
+        await self.update_returning(
+            {"smtp_ts": smtp_ts, "deferred_ts": None}, {"pk": pk}, returning=["pk"]
+        )
 
     async def update_payload(self, pk: str, payload: dict[str, Any]) -> None:
         """Update message payload.
@@ -481,8 +885,12 @@ class MessagesTable(Table):
             pk: Message UUID primary key.
             payload: New email content dict.
         """
-        async with self.record(pk) as rec:
-            rec["payload"] = json.dumps(payload)
+        payload = await self._store_inline_blobs(payload)
+        await self.update_returning(
+            {"payload": self._encode_payload(payload), "blob_refs": self._blob_refs(payload)},
+            {"pk": pk},
+            returning=["pk"],
+        )
 
     async def get(self, msg_id: str, tenant_id: str) -> dict[str, Any] | None:
         """Get message by client ID and tenant.
@@ -529,8 +937,49 @@ class MessagesTable(Table):
             True if deleted, False if not found.
         """
         rowcount = await self.delete(where={"pk": pk})
+        if rowcount:
+            self.stats.invalidate()
         return rowcount > 0
 
+    async def remove_for_tenant(self, ids: Iterable[str], tenant_id: str) -> set[str]:
+        """Delete messages by client ID, restricted to a tenant's messages.
+
+        Ownership is checked through the accounts table, as in
+        get_ids_for_tenant(). Keys are resolved with one SELECT per chunk
+        and removed with delete_batch().
+
+        Args:
+            ids: Message IDs to delete.
+            tenant_id: Tenant owning the messages.
+
+        Returns:
+            Set of IDs actually deleted. IDs not owned by the tenant or not
+            found are left out.
+        """
+        id_list = list(dict.fromkeys(mid for mid in ids if mid))
+        found: dict[str, str] = {}
+        for chunk in self._chunks(id_list):
+            params: dict[str, Any] = {"tenant_id": tenant_id}
+            params.update({f"id_{i}": mid for i, mid in enumerate(chunk)})
+            placeholders = ", ".join(f":id_{i}" for i in range(len(chunk)))
+            rows = await self.db.adapter.fetch_all(
+                f"""
+                SELECT m.pk, m.id
+                FROM messages m
+                JOIN accounts a ON m.account_pk = a.pk
+                WHERE m.id IN ({placeholders})
+                  AND a.tenant_id = :tenant_id
+                """,
+                params,
+            )
+            found.update({row["pk"]: row["id"] for row in rows})
+
+        if not found:
+            return set()
+        await self.delete_batch(list(found))
+        self.stats.invalidate()
+        return set(found.values())
+
     async def purge_for_account(self, account_id: str) -> None:
         """Delete all messages for an account.
 
@@ -538,6 +987,7 @@ class MessagesTable(Table):
             account_id: Account identifier.
         """
         await self.delete(where={"account_id": account_id})
+        self.stats.invalidate()
 
     async def existing_ids(self, ids: Iterable[str]) -> set[str]:
         """Check which message IDs already exist.
@@ -591,40 +1041,186 @@ class MessagesTable(Table):
         )
         return {row["id"] for row in rows}
 
-    async def remove_fully_reported_before(self, threshold_ts: int) -> int:
-        """Delete messages whose events are all reported before threshold.
+    async def purge_reported_chunk(
+        self,
+        threshold_ts: int,
+        after_pk: str = "",
+        limit: int | None = None,
+        tenant_id: str | None = None,
+    ) -> tuple[int, int, str | None]:
+        """Delete fully reported messages within one keyset window.
 
-        A message can be removed when:
+        Scans the next ``limit`` processed messages in pk order after
+        ``after_pk`` and deletes, in one transaction, those that can be
+        removed together with their events. A message can be removed when:
             - It has been processed (smtp_ts IS NOT NULL)
-            - All its events have been reported
+            - It has events, all of them reported
             - Most recent reported_ts is older than threshold
 
+        Each call touches a bounded number of rows, so the writer lock is
+        held briefly. Call again with the returned cursor to continue.
+
+        When the cold archive is enabled (ProxyConfig.archive_path), the
+        messages and their events are first written to the archive and
+        indexed in the same transaction as the deletes.
+
         Args:
             threshold_ts: Unix timestamp threshold.
+            after_pk: Keyset cursor; the scan starts after this pk.
+            limit: Messages scanned per window. Defaults to batch_chunk_size.
+            tenant_id: If provided, only scan messages of this tenant.
 
         Returns:
-            Number of deleted messages.
+            Tuple of (deleted messages, deleted events, cursor). The cursor
+            is the last pk scanned, or None when the scan reached the end.
         """
-        return await self.execute(
-            """
-            DELETE FROM messages
-            WHERE smtp_ts IS NOT NULL
-              AND pk IN (
-                  SELECT m.pk FROM messages m
-                  WHERE m.smtp_ts IS NOT NULL
-                    AND NOT EXISTS (
-                        SELECT 1 FROM message_events e
-                        WHERE e.message_pk = m.pk AND e.reported_ts IS NULL
-                    )
-                    AND (
-                        SELECT MAX(e.reported_ts) FROM message_events e
-                        WHERE e.message_pk = m.pk
-                    ) < :threshold_ts
-              )
+        size = max(1, int(limit or self.batch_chunk_size))
+        params: dict[str, Any] = {"after_pk": after_pk, "limit": size}
+        tenant_join = ""
+        if tenant_id:
+            tenant_join = "JOIN accounts a ON m.account_pk = a.pk AND a.tenant_id = :tenant_id"
+            params["tenant_id"] = tenant_id
+        rows = await self.db.adapter.fetch_all(
+            f"""
+            SELECT w.pk,
+                   COUNT(e.id) AS events,
+                   COUNT(e.reported_ts) AS reported,
+                   MAX(e.reported_ts) AS last_reported_ts
+            FROM (
+                SELECT m.pk FROM messages m
+                {tenant_join}
+                WHERE m.smtp_ts IS NOT NULL AND m.pk > :after_pk
+                ORDER BY m.pk
+                LIMIT :limit
+            ) w
+            LEFT JOIN message_events e ON e.message_pk = w.pk
+            GROUP BY w.pk
+            ORDER BY w.pk
             """,
-            {"threshold_ts": threshold_ts},
+            params,
+        )
+        if not rows:
+            return 0, 0, None
+        cursor = rows[-1]["pk"] if len(rows) >= size else None
+        purgeable = [
+            row
+            for row in rows
+            if row["events"]
+            and row["reported"] == row["events"]
+            and row["last_reported_ts"] < threshold_ts
+        ]
+        if not purgeable:
+            return 0, 0, cursor
+
+        # Re-check inside the transaction: an event may have been added
+        # since the scan, in which case the message and its events stay.
+        unreported = (
+            "NOT EXISTS (SELECT 1 FROM message_events u "
+            "WHERE u.message_pk = :pk AND u.reported_ts IS NULL)"
+        )
+        keys = [{"pk": row["pk"]} for row in purgeable]
+        statements = await self._archive_statements([row["pk"] for row in purgeable])
+        *_, deleted_events, deleted = await self.db.adapter.execute_batch(
+            statements
+            + [
+                (f"DELETE FROM message_events WHERE message_pk = :pk AND {unreported}", keys),
+                (f"DELETE FROM messages WHERE pk = :pk AND {unreported}", keys),
+            ]
+        )
+        return deleted, deleted_events, cursor
+
+    async def drop_reported_partitions(self, threshold_ts: int, detach: bool = False) -> list[str]:
+        """Drop the partitions whose messages can all be removed.
+
+        Partitioned tables only (see Table.partition_column). A partition
+        ending before threshold_ts is dropped when every message in it is
+        removable as in purge_reported_chunk(). Their events are dropped
+        with the message_events partitions
+        (MessageEventTable.drop_reported_partitions()).
+
+        Args:
+            threshold_ts: Unix timestamp threshold.
+            detach: Detach the partitions instead of dropping them.
+
+        Returns:
+            Names of the partitions dropped or detached.
+        """
+        return await self.drop_expired_partitions(
+            threshold_ts,
+            keep_if="""t.smtp_ts IS NULL
+                OR NOT EXISTS (SELECT 1 FROM message_events e WHERE e.message_pk = t.pk)
+                OR EXISTS (
+                    SELECT 1 FROM message_events e
+                    WHERE e.message_pk = t.pk
+                      AND (e.reported_ts IS NULL OR e.reported_ts >= :threshold_ts)
+                )""",
+            params={"threshold_ts": threshold_ts},
+            detach=detach,
+            before_drop=self._archive_partition if self._archive() else None,
         )
 
+    def _archive(self) -> Any:
+        """Return the message_archive table when the cold archive is enabled."""
+        archive = self.db.tables.get("message_archive")
+        return archive if archive is not None and archive.enabled else None
+
+    async def _archive_statements(self, pks: list[str]) -> list[tuple[str, list[dict]]]:
+        """Archive messages with their history; return the index statements.
+
+        Returns an empty list when the cold archive is disabled.
+        """
+        archive = self._archive()
+        if archive is None or not pks:
+            return []
+        placeholders = ", ".join(f":pk_{i}" for i in range(len(pks)))
+        rows = await self.db.adapter.fetch_all(
+            f"SELECT * FROM messages WHERE pk IN ({placeholders}) ORDER BY pk",
+            {f"pk_{i}": pk for i, pk in enumerate(pks)},
+        )
+        records = await self._add_history_to_messages([self._decode_payload(r) for r in rows])
+        return archive.index_statements(await archive.write_block(records))
+
+    async def _archive_partition(self, partition: str) -> None:
+        """Archive every message of a partition about to be dropped."""
+        after_pk = ""
+        while True:
+            rows = await self.db.adapter.fetch_all(
+                f'SELECT pk FROM "{partition}" WHERE pk > :after_pk ORDER BY pk LIMIT :limit',
+                {"after_pk": after_pk, "limit": self.batch_chunk_size},
+            )
+            if not rows:
+                return
+            pks = [row["pk"] for row in rows]
+            await self.db.adapter.execute_batch(await self._archive_statements(pks))
+            after_pk = pks[-1]
+
+    async def get_archived(self, msg_id: str, tenant_id: str) -> dict[str, Any] | None:
+        """Get a message from the cold archive by client ID and tenant.
+
+        Returns:
+            Message dict as archived (decoded payload and "history"), or
+            None if the archive is disabled or holds no such message.
+        """
+        archive = self._archive()
+        if archive is None:
+            return None
+        return await archive.lookup(msg_id, tenant_id)
+
+    async def remove_fully_reported_before(self, threshold_ts: int) -> int:
+        """Delete messages whose events are all reported before threshold.
+
+        Runs purge_reported_chunk() over the whole table, so the lock is
+        released between chunks; the messages' events are deleted too.
+        For a time-bounded purge use RetentionPurger.
+
+        Args:
+            threshold_ts: Unix timestamp threshold.
+
+        Returns:
+            Number of deleted messages.
+        """
+        return await self._purge_reported(threshold_ts)
+
     async def remove_fully_reported_before_for_tenant(
         self, threshold_ts: int, tenant_id: str
     ) -> int:
@@ -637,27 +1233,20 @@ class MessagesTable(Table):
         Returns:
             Number of deleted messages.
         """
-        return await self.execute(
-            """
-            DELETE FROM messages
-            WHERE pk IN (
-                SELECT m.pk FROM messages m
-                JOIN accounts a ON m.account_pk = a.pk
-                WHERE a.tenant_id = :tenant_id
-                  AND m.smtp_ts IS NOT NULL
-                  AND NOT EXISTS (
-                      SELECT 1 FROM message_events e
-                      WHERE e.message_pk = m.pk AND e.reported_ts IS NULL
-                  )
-                  AND (
-                      SELECT MAX(e.reported_ts) FROM message_events e
-                      WHERE e.message_pk = m.pk
-                  ) < :threshold_ts
+        return await self._purge_reported(threshold_ts, tenant_id=tenant_id)
+
+    async def _purge_reported(self, threshold_ts: int, tenant_id: str | None = None) -> int:
+        """Run purge_reported_chunk() until the scan completes."""
+        removed = 0
+        cursor: str | None = ""
+        while cursor is not None:
+            deleted, _, cursor = await self.purge_reported_chunk(
+                threshold_ts, after_pk=cursor, tenant_id=tenant_id
             )
-            """,
-            {"threshold_ts": threshold_ts, "tenant_id": tenant_id},
-        )
+            removed += deleted
+        return removed
 
+    @replica_read
     async def list_all(
         self,
         *,
@@ -675,59 +1264,209 @@ class MessagesTable(Table):
         Returns:
             List of message dicts with decoded payload and optional history.
         """
-        params: dict[str, Any] = {}
-        where_clauses: list[str] = []
+        messages = [
+            message async for message in self.iter_all(tenant_id=tenant_id, active_only=active_only)
+        ]
 
-        error_subquery = """
-            SELECT message_pk, event_ts as error_ts, description as error
-            FROM message_events
-            WHERE event_type = 'error'
-            AND id = (
-                SELECT MAX(id) FROM message_events e2
-                WHERE e2.message_pk = message_events.message_pk
-                AND e2.event_type = 'error'
-            )
-        """
+        if include_history and messages:
+            messages = await self._add_history_to_messages(messages)
 
+        return messages
+
+    async def iter_all(
+        self,
+        *,
+        tenant_id: str | None = None,
+        active_only: bool = False,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream messages in list_all() order, without materializing them.
+
+        Messages are read chunk_size at a time by keyset (see
+        DbAdapter.fetch_keyset()), so a slow consumer such as an NDJSON
+        export holds no lock between chunks; the last error of the
+        messages of each chunk is looked up with the chunk.
+
+        Args:
+            tenant_id: Filter by tenant.
+            active_only: Only yield pending messages (smtp_ts IS NULL).
+            chunk_size: Rows read per round trip.
+
+        Yields:
+            Message dicts with decoded payload (no event history).
+        """
+        params: dict[str, Any] = {}
+        where_clauses = ["1=1"]
         if tenant_id:
-            query = f"""
-                SELECT m.pk, m.id, m.tenant_id, m.account_id, m.priority, m.payload, m.batch_code,
-                       m.deferred_ts, m.smtp_ts, m.created_at, m.updated_at, m.is_pec,
-                       t.name as tenant_name,
-                       err.error_ts, err.error
-                FROM messages m
-                LEFT JOIN accounts a ON m.account_pk = a.pk
-                LEFT JOIN tenants t ON m.tenant_id = t.id
-                LEFT JOIN ({error_subquery}) err ON m.pk = err.message_pk
-            """
             where_clauses.append("m.tenant_id = :tenant_id")
             params["tenant_id"] = tenant_id
-        else:
-            query = f"""
-                SELECT m.pk, m.id, m.tenant_id, m.account_id, m.priority, m.payload, m.batch_code,
-                       m.deferred_ts, m.smtp_ts, m.created_at, m.updated_at, m.is_pec,
-                       t.name as tenant_name,
-                       err.error_ts, err.error
-                FROM messages m
-                LEFT JOIN tenants t ON m.tenant_id = t.id
-                LEFT JOIN ({error_subquery}) err ON m.pk = err.message_pk
-            """
-
         if active_only:
             where_clauses.append("m.smtp_ts IS NULL")
 
-        if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
+        query = f"""
+            SELECT m.pk, m.id, m.tenant_id, m.account_id, m.priority, m.payload, m.batch_code,
+                   m.deferred_ts, m.smtp_ts, m.created_at, m.updated_at, m.is_pec,
+                   t.name as tenant_name
+            FROM messages m
+            LEFT JOIN tenants t ON m.tenant_id = t.id
+            WHERE {" AND ".join(where_clauses)}
+        """
+        keys = [
+            ("m.priority", "priority"),
+            ("m.created_at", "created_at"),
+            ("m.id", "id"),
+            ("m.pk", "pk"),
+        ]
+        async for rows in self.db.adapter.fetch_keyset(query, params, keys, chunk_size):
+            errors = await self._last_errors([row["pk"] for row in rows])
+            for row in rows:
+                row["error_ts"], row["error"] = errors.get(row["pk"], (None, None))
+                yield self._decode_payload(row)
+
+    @replica_read
+    async def list_page(
+        self,
+        *,
+        tenant_id: str | None = None,
+        active_only: bool = False,
+        include_history: bool = False,
+        fields: Sequence[str] | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """Return one page of messages in (priority, created_at, pk) order.
+
+        Pages are read by keyset: the cursor holds the sort key of the last
+        message of the previous page, so every page costs the same however
+        deep the listing goes. Only the requested columns are read; the
+        payload is decoded only when "message" is among the fields, and
+        the last error is looked up for the messages of the page only.
+
+        Args:
+            tenant_id: Filter by tenant.
+            active_only: Only return pending messages (smtp_ts IS NULL).
+            include_history: Include event history for each message.
+            fields: Fields to return, from LIST_FIELDS. Defaults to
+                DEFAULT_LIST_FIELDS. The fields of _LIST_KEY_FIELDS are
+                always returned.
+            limit: Page size, capped at list_page_max. Defaults to
+                list_page_size.
+            cursor: next_cursor of the previous page, or None for the first.
 
-        query += " ORDER BY m.priority ASC, m.created_at ASC, m.id ASC"
+        Returns:
+            Tuple of (messages, next_cursor). next_cursor is None on the
+            last page.
 
-        rows = await self.db.adapter.fetch_all(query, params)
-        messages = [self._decode_payload(row) for row in rows]
+        Raises:
+            ValueError: If a field is unknown or the cursor is malformed.
+        """
+        wanted = self._list_fields(fields)
+        size = min(max(1, int(limit or self.list_page_size)), self.list_page_max)
+        params: dict[str, Any] = {"limit": size + 1}
+
+        columns = [
+            f"m.{name}"
+            for name in LIST_FIELDS
+            if name in wanted and name not in ("tenant_name", "error_ts", "error", "message")
+        ]
+        joins = ""
+        if "message" in wanted:
+            columns.append("m.payload")
+        if "tenant_name" in wanted:
+            columns.append("t.name AS tenant_name")
+            joins = "LEFT JOIN tenants t ON m.tenant_id = t.id"
 
-        if include_history and messages:
-            messages = await self._add_history_to_messages(messages)
+        where_clauses: list[str] = []
+        if tenant_id:
+            where_clauses.append("m.tenant_id = :tenant_id")
+            params["tenant_id"] = tenant_id
+        if active_only:
+            where_clauses.append("m.smtp_ts IS NULL")
+        if cursor:
+            params["c_priority"], params["c_created_at"], params["c_pk"] = self._decode_cursor(
+                cursor
+            )
+            where_clauses.append(
+                "(m.priority, m.created_at, m.pk) > (:c_priority, :c_created_at, :c_pk)"
+            )
+        where = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
 
-        return messages
+        rows = await self.db.adapter.fetch_all(
+            f"""
+            SELECT {", ".join(columns)}
+            FROM messages m
+            {joins}
+            {where}
+            ORDER BY m.priority ASC, m.created_at ASC, m.pk ASC
+            LIMIT :limit
+            """,
+            params,
+        )
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            last = rows[-1]
+            next_cursor = self._encode_cursor(last["priority"], last["created_at"], last["pk"])
+
+        messages = [dict(row) for row in rows]
+        for message in messages:
+            if "payload" in message:
+                self._decode_payload(message)
+            elif "is_pec" in message:
+                message["is_pec"] = bool(message["is_pec"])
+        if messages:
+            errors = await self._last_errors([m["pk"] for m in messages])
+            for message in messages:
+                error_ts, error = errors.get(message["pk"], (None, None))
+                message["error"] = error
+                if "error_ts" in wanted:
+                    message["error_ts"] = error_ts
+            if include_history:
+                messages = await self._add_history_to_messages(messages)
+        return messages, next_cursor
+
+    @staticmethod
+    def _list_fields(fields: Sequence[str] | None) -> set[str]:
+        """Validate a list_page() projection and add the key fields."""
+        if fields is None:
+            return set(DEFAULT_LIST_FIELDS)
+        unknown = sorted(set(fields) - set(LIST_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown message fields: {', '.join(unknown)}")
+        return set(fields) | set(_LIST_KEY_FIELDS)
+
+    async def _last_errors(self, pks: list[str]) -> dict[str, tuple[Any, Any]]:
+        """Return {pk: (error_ts, description)} of the last error event of each message."""
+        params = {f"pk_{i}": pk for i, pk in enumerate(pks)}
+        placeholders = ", ".join(f":pk_{i}" for i in range(len(pks)))
+        rows = await self.db.adapter.fetch_all(
+            f"""
+            SELECT message_pk, event_ts, description
+            FROM message_events
+            WHERE event_type = 'error' AND message_pk IN ({placeholders})
+            ORDER BY id ASC
+            """,
+            params,
+        )
+        return {row["message_pk"]: (row["event_ts"], row["description"]) for row in rows}
+
+    @staticmethod
+    def _encode_cursor(priority: Any, created_at: Any, pk: str) -> str:
+        """Encode the sort key of a message as an opaque list_page() cursor."""
+        if isinstance(created_at, datetime):
+            created_at = created_at.isoformat(sep=" ")
+        raw = json.dumps([priority, created_at, pk], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[int, str, str]:
+        """Decode a list_page() cursor into (priority, created_at, pk)."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            priority, created_at, pk = json.loads(raw)
+            return int(priority), str(created_at), str(pk)
+        except (binascii.Error, ValueError, TypeError) as exc:
+            raise ValueError("Invalid message list cursor") from exc
 
     async def _add_history_to_messages(
         self, messages: list[dict[str, Any]]
@@ -781,6 +1520,7 @@ class MessagesTable(Table):
         )
         return int(row["cnt"]) if row else 0
 
+    @replica_read
     async def count_pending_for_tenant(self, tenant_id: str, batch_code: str | None = None) -> int:
         """Count pending messages for a tenant.
 
@@ -788,35 +1528,114 @@ class MessagesTable(Table):
             tenant_id: Tenant identifier.
             batch_code: Optional batch code filter.
 
+        Messages are counted by their own tenant_id, whether or not their
+        account still exists. Without batch_code the count comes from the
+        queue stats while they are fresh (see stats_max_age and
+        stats_counts), without querying the table.
+
         Returns:
             Number of pending messages.
         """
+        if batch_code is None and self.stats_counts and self.stats.is_fresh(self.stats_max_age):
+            return self.stats.total(tenant_id)
         params: dict[str, Any] = {"tenant_id": tenant_id}
 
+        # Same rows as the stats (see reconcile_stats()): by messages.tenant_id
         if batch_code is not None:
             query = """
                 SELECT COUNT(*) as cnt
-                FROM messages m
-                JOIN accounts a ON m.account_pk = a.pk
-                WHERE a.tenant_id = :tenant_id
-                  AND m.batch_code = :batch_code
-                  AND m.smtp_ts IS NULL
+                FROM messages
+                WHERE tenant_id = :tenant_id
+                  AND batch_code = :batch_code
+                  AND smtp_ts IS NULL
             """
             params["batch_code"] = batch_code
         else:
             query = """
                 SELECT COUNT(*) as cnt
-                FROM messages m
-                JOIN accounts a ON m.account_pk = a.pk
-                WHERE a.tenant_id = :tenant_id
-                  AND m.smtp_ts IS NULL
+                FROM messages
+                WHERE tenant_id = :tenant_id
+                  AND smtp_ts IS NULL
             """
 
         row = await self.db.adapter.fetch_one(query, params)
         return int(row["cnt"]) if row else 0
 
+    async def reconcile_stats(self) -> QueueStats:
+        """Rebuild the queue stats from the table with one grouped query.
+
+        Returns:
+            The reconciled stats (self.stats).
+        """
+        rows = await self.db.adapter.fetch_all(
+            """
+            SELECT tenant_id, account_id, priority,
+                   SUM(CASE WHEN deferred_ts IS NULL THEN 1 ELSE 0 END) AS pending,
+                   SUM(CASE WHEN deferred_ts IS NOT NULL THEN 1 ELSE 0 END) AS deferred,
+                   MIN(CASE WHEN deferred_ts IS NULL THEN created_at END) AS oldest_pending
+            FROM messages
+            WHERE smtp_ts IS NULL
+            GROUP BY tenant_id, account_id, priority
+            """
+        )
+        self.stats.reconcile(
+            [{**row, "oldest_pending_ts": self._epoch(row["oldest_pending"])} for row in rows]
+        )
+        return self.stats
+
+    async def status_counts(self) -> dict[str, int]:
+        """Count all messages by delivery status with aggregate queries.
+
+        Returns:
+            Dict with total, pending, deferred, sent and error counts.
+            Error counts processed messages with an error event.
+        """
+        row = await self.db.adapter.fetch_one(
+            """
+            SELECT COUNT(*) AS total,
+                   SUM(CASE WHEN smtp_ts IS NULL AND deferred_ts IS NULL
+                       THEN 1 ELSE 0 END) AS pending,
+                   SUM(CASE WHEN smtp_ts IS NULL AND deferred_ts IS NOT NULL
+                       THEN 1 ELSE 0 END) AS deferred,
+                   SUM(CASE WHEN smtp_ts IS NOT NULL THEN 1 ELSE 0 END) AS processed
+            FROM messages
+            """
+        )
+        errors = await self.db.adapter.fetch_one(
+            """
+            SELECT COUNT(DISTINCT e.message_pk) AS cnt
+            FROM message_events e
+            JOIN messages m ON m.pk = e.message_pk
+            WHERE e.event_type = 'error' AND m.smtp_ts IS NOT NULL
+            """
+        )
+        counts = {k: int((row or {}).get(k) or 0) for k in ("total", "pending", "deferred")}
+        processed = int((row or {}).get("processed") or 0)
+        error = int(errors["cnt"]) if errors else 0
+        return {**counts, "sent": processed - error, "error": error}
+
+    @staticmethod
+    def _epoch(value: Any) -> float | None:
+        """Convert a stored UTC timestamp (datetime or text) to Unix time."""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        if isinstance(value, datetime):
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return value.timestamp()
+        return float(value)
+
+    def _encode_payload(self, payload: dict[str, Any]) -> str:
+        """Serialize a payload to JSON, compressed with the configured codec."""
+        return compress_value(json.dumps(payload), self.db.payload_codec)
+
     def _decode_payload(self, data: dict[str, Any]) -> dict[str, Any]:
-        """Decode payload JSON and convert is_pec to bool.
+        """Decode (and decompress) payload JSON and convert is_pec to bool.
 
         Args:
             data: Raw database row dict.
@@ -827,8 +1646,8 @@ class MessagesTable(Table):
         payload = data.pop("payload", None)
         if payload is not None:
             try:
-                data["message"] = json.loads(payload)
-            except json.JSONDecodeError:
+                data["message"] = json.loads(decompress_value(payload))
+            except (json.JSONDecodeError, CompressionError):
                 data["message"] = {"raw_payload": payload}
         else:
             data["message"] = None
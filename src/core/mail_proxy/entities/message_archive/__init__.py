@@ -0,0 +1,15 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Message archive entity: cold tier for fully reported messages.
+
+Components:
+    MessageArchiveTable: Index of messages archived in compressed segments.
+
+Note:
+    This table is internal and has no REST endpoint. It is written by
+    retention (MessagesTable.purge_reported_chunk()) and read through
+    MessageEndpoint.get().
+"""
+
+from .table import MessageArchiveTable
+
+__all__ = ["MessageArchiveTable"]
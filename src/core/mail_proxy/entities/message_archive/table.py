@@ -0,0 +1,266 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Message archive table: index of the cold archive of reported messages.
+
+Once all events of a message have been reported, the message is only
+read for support lookups. When ProxyConfig.archive_path is set, retention
+moves such messages out of the hot messages table instead of deleting
+them:
+
+- Messages (with decoded payload and event history) are appended to a
+  per-day segment file, ``<archive_path>/YYYY-MM-DD.seg`` (UTC day of
+  archiving), as compressed blocks of JSON lines. Segments are
+  append-only: a block is never rewritten. Blocks are appended with
+  O_APPEND under an exclusive file lock, so several proxy processes can
+  share the archive directory (where file locks are unavailable, each
+  process writes its own ``YYYY-MM-DD-<pid>.seg`` segments instead).
+- Attachments stored in attachment_blobs are copied into the block, once
+  per distinct content, so archived messages do not keep blobs alive and
+  a lookup returns them inline even after the blob is collected.
+- This table indexes every archived message by (tenant_id, id) with the
+  segment, offset and size of its block, so a lookup reads and
+  decompresses one block only.
+
+Blocks are compressed with the payload codec (tools.compression), falling
+back to zlib when payload compression is disabled. The index rows are
+written in the same transaction that deletes the messages from the hot
+tables (see MessagesTable.purge_reported_chunk()).
+
+Example:
+    Look up an archived message::
+
+        archive = proxy.db.table("message_archive")
+        message = await archive.lookup("msg-001", "acme")
+        if message:
+            print(message["history"])
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from sql import Integer, String, Table
+from tools.compression import get_codec
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+SEGMENT_SUFFIX = ".seg"
+
+BLOB_KEY = "blob_md5"
+"""Key of the block lines carrying attachment blob content."""
+
+
+class MessageArchiveTable(Table):
+    """Index of archived messages.
+
+    Schema: pk (message pk), tenant_id, id, segment (file name in the
+    archive directory), block_offset, block_size, codec, archived_ts.
+    UNIQUE (tenant_id, id) - a message archived again (e.g. retried and
+    reported after a first archiving attempt) points to its newest block.
+    """
+
+    name = "message_archive"
+    pkey = "pk"
+
+    def configure(self) -> None:
+        c = self.columns
+        c.column("pk", String)
+        c.column("tenant_id", String, nullable=False)
+        c.column("id", String, nullable=False)
+        c.column("segment", String, nullable=False)
+        c.column("block_offset", Integer, nullable=False)
+        c.column("block_size", Integer, nullable=False)
+        c.column("codec", String, nullable=False)
+        c.column("archived_ts", Integer, nullable=False, default=0)
+
+    def table_constraints(self) -> list[str]:
+        """One index row per client message."""
+        return ['UNIQUE ("tenant_id", "id")']
+
+    @property
+    def enabled(self) -> bool:
+        """True when an archive directory is configured."""
+        return bool(self.db.archive_path)
+
+    @property
+    def codec(self) -> str:
+        """Codec compressing new blocks."""
+        return self.db.payload_codec or "zlib"
+
+    async def write_block(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Append messages to today's segment as one compressed block.
+
+        The block is flushed and fsynced before returning, so the caller
+        can delete the messages from the hot tables. The content of the
+        ``blob:<md5>`` attachments they reference is written to the block
+        as extra lines, one per distinct blob.
+
+        Args:
+            messages: Message dicts to archive. Each needs pk, tenant_id
+                and id; values must be JSON serializable (datetimes are
+                stored as strings).
+
+        Returns:
+            Index rows for the messages, to be stored with index_statements().
+        """
+        if not messages:
+            return []
+        codec = self.codec
+        records = [*messages, *await self._blob_records(messages)]
+        lines = "".join(json.dumps(r, default=str, sort_keys=True) + "\n" for r in records)
+        block = get_codec(codec).compress(lines.encode("utf-8"))
+        now = time.time()
+        segment = datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%d")
+        if fcntl is None:
+            segment += f"-{os.getpid()}"
+        segment += SEGMENT_SUFFIX
+        offset = await asyncio.to_thread(self._append, segment, block)
+        return [
+            {
+                "pk": m["pk"],
+                "tenant_id": m["tenant_id"],
+                "id": m["id"],
+                "segment": segment,
+                "block_offset": offset,
+                "block_size": len(block),
+                "codec": codec,
+                "archived_ts": int(now),
+            }
+            for m in messages
+        ]
+
+    def index_statements(self, entries: list[dict[str, Any]]) -> list[tuple[str, list[dict]]]:
+        """Return the statements storing index rows, for Table.execute_batch().
+
+        Existing rows for the same (tenant_id, id) or pk are replaced.
+        """
+        if not entries:
+            return []
+        keys = [{"pk": e["pk"], "tenant_id": e["tenant_id"], "id": e["id"]} for e in entries]
+        return [
+            (
+                "DELETE FROM message_archive "
+                "WHERE pk = :pk OR (tenant_id = :tenant_id AND id = :id)",
+                keys,
+            ),
+            (
+                """INSERT INTO message_archive
+                   (pk, tenant_id, id, segment, block_offset, block_size, codec, archived_ts)
+                   VALUES (:pk, :tenant_id, :id, :segment, :block_offset, :block_size,
+                           :codec, :archived_ts)""",
+                entries,
+            ),
+        ]
+
+    async def lookup(self, msg_id: str, tenant_id: str) -> dict[str, Any] | None:
+        """Return an archived message by client ID and tenant.
+
+        Returns:
+            The message dict as archived (decoded payload in "message",
+            event list in "history"), or None if not archived or if its
+            segment is no longer available.
+        """
+        row = await self.db.adapter.fetch_one(
+            "SELECT * FROM message_archive WHERE tenant_id = :tenant_id AND id = :id",
+            {"tenant_id": tenant_id, "id": msg_id},
+        )
+        if row is None or not self.enabled:
+            return None
+        try:
+            block = await asyncio.to_thread(
+                self._read, row["segment"], row["block_offset"], row["block_size"]
+            )
+        except OSError:
+            return None
+        lines = get_codec(row["codec"]).decompress(block).decode("utf-8")
+        found = None
+        blobs: dict[str, str] = {}
+        for line in lines.splitlines():
+            record = json.loads(line)
+            if BLOB_KEY in record:
+                blobs[record[BLOB_KEY]] = record["content"]
+            elif record.get("pk") == row["pk"]:
+                found = record
+        if found is not None and blobs:
+            self._inline_blobs(found, blobs)
+        return found
+
+    async def _blob_records(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Return one block line with the content of each blob the messages reference."""
+        if "attachment_blobs" not in self.db.tables:
+            return []
+        md5s = sorted(
+            {md5 for m in messages for _, md5 in self._blob_attachments(m.get("message"))}
+        )
+        blobs = self.db.table("attachment_blobs")
+        records = []
+        for md5 in md5s:
+            content = await blobs.get_content(md5)
+            if content is not None:
+                records.append(
+                    {BLOB_KEY: md5, "content": base64.b64encode(content).decode("ascii")}
+                )
+        return records
+
+    @staticmethod
+    def _blob_attachments(payload: Any) -> list[tuple[int, str]]:
+        """Return (index, md5) of the blob attachments of a payload."""
+        if not isinstance(payload, dict):
+            return []
+        return [
+            (i, str(att.get("storage_path", "")).removeprefix("blob:"))
+            for i, att in enumerate(payload.get("attachments") or [])
+            if isinstance(att, dict) and att.get("fetch_mode") == "blob"
+        ]
+
+    def _inline_blobs(self, record: dict[str, Any], blobs: dict[str, str]) -> None:
+        """Replace blob references of an archived record with inline base64 content."""
+        payload = record.get("message")
+        for i, md5 in self._blob_attachments(payload):
+            if md5 in blobs:
+                att = payload["attachments"][i]  # type: ignore[index]
+                att["storage_path"] = f"base64:{blobs[md5]}"
+                att["fetch_mode"] = "base64"
+
+    def _segment_path(self, segment: str) -> str:
+        return os.path.join(self.db.archive_path, segment)  # type: ignore[arg-type]
+
+    def _append(self, segment: str, block: bytes) -> int:
+        """Append a block to a segment file; return its offset (runs in a thread).
+
+        The exclusive lock spans reading the end offset and writing the
+        block, so concurrent writers (tasks or processes) never interleave.
+        """
+        os.makedirs(self.db.archive_path, exist_ok=True)  # type: ignore[arg-type]
+        fd = os.open(self._segment_path(segment), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            offset = os.lseek(fd, 0, os.SEEK_END)
+            view = memoryview(block)
+            while view:
+                view = view[os.write(fd, view) :]
+            os.fsync(fd)
+        finally:
+            os.close(fd)  # Releases the lock
+        return offset
+
+    def _read(self, segment: str, offset: int, size: int) -> bytes:
+        """Read one block from a segment file (runs in a thread)."""
+        with open(self._segment_path(segment), "rb") as f:
+            f.seek(offset)
+            block = f.read(size)
+        if len(block) != size:
+            raise OSError(f"Truncated archive block in {segment} at {offset}")
+        return block
+
+
+__all__ = ["MessageArchiveTable"]
@@ -51,6 +51,7 @@ Note:
 from __future__ import annotations
 
 import json
+from collections.abc import AsyncIterator, Sequence
 from typing import Any
 
 from sql import Integer, String, Table
@@ -94,6 +95,7 @@ class MessageEventTable(Table):
 
     name = "message_events"
     pkey = "id"
+    partition_column = "event_ts"
 
     def new_pkey_value(self) -> None:
         """Return None for INTEGER PRIMARY KEY autoincrement."""
@@ -148,17 +150,20 @@ class MessageEventTable(Table):
         elif event_type == "error":
             await messages.mark_error(message_pk, event_ts)
         elif event_type == "deferred":
-            metadata = record.get("metadata")
-            if metadata:
-                try:
-                    meta_dict = json.loads(metadata) if isinstance(metadata, str) else metadata
-                    deferred_ts = meta_dict.get("deferred_ts", event_ts)
-                except (json.JSONDecodeError, TypeError):
-                    deferred_ts = event_ts
-            else:
-                deferred_ts = event_ts
+            deferred_ts = self._deferred_until(record.get("metadata"), event_ts)
             await messages.set_deferred(message_pk, deferred_ts)
 
+    @staticmethod
+    def _deferred_until(metadata: Any, event_ts: int) -> int:
+        """Return the retry timestamp of a deferred event (metadata or event_ts)."""
+        if not metadata:
+            return event_ts
+        try:
+            meta_dict = json.loads(metadata) if isinstance(metadata, str) else metadata
+            return meta_dict.get("deferred_ts", event_ts)
+        except (json.JSONDecodeError, TypeError, AttributeError):
+            return event_ts
+
     async def add_event(
         self,
         message_pk: str,
@@ -193,6 +198,78 @@ class MessageEventTable(Table):
             }
         )
 
+    async def add_events(self, events: Sequence[dict[str, Any]]) -> int:
+        """Record several events and apply their message updates in one transaction.
+
+        Bulk counterpart of add_event() used by the group-commit writer:
+        events are inserted with a single executemany, and the message
+        state changes that trigger_on_inserted() would make are applied
+        as set-based UPDATEs. When a batch holds several state-changing
+        events for one message, the last one wins, as with sequential
+        add_event() calls.
+
+        Args:
+            events: Dicts with the add_event() arguments (message_pk,
+                event_type, event_ts, and optional description, metadata).
+
+        Returns:
+            Number of events inserted.
+        """
+        if not events:
+            return 0
+
+        rows: list[dict[str, Any]] = []
+        # message_pk -> (column set to the timestamp, timestamp); later events override
+        states: dict[str, tuple[str, int]] = {}
+        for event in events:
+            metadata = event.get("metadata")
+            rows.append(
+                {
+                    "message_pk": event["message_pk"],
+                    "event_type": event["event_type"],
+                    "event_ts": event["event_ts"],
+                    "description": event.get("description"),
+                    "metadata": json.dumps(metadata) if metadata else None,
+                }
+            )
+            if not event["message_pk"] or not event["event_ts"]:
+                continue
+            if event["event_type"] in ("sent", "error"):
+                states[event["message_pk"]] = ("smtp_ts", event["event_ts"])
+            elif event["event_type"] == "deferred":
+                deferred_ts = self._deferred_until(metadata, event["event_ts"])
+                states[event["message_pk"]] = ("deferred_ts", deferred_ts)
+
+        # Group messages receiving the same update into one UPDATE ... WHERE pk IN (...)
+        groups: dict[tuple[str, int], list[str]] = {}
+        for message_pk, state in states.items():
+            groups.setdefault(state, []).append(message_pk)
+
+        steps: list[tuple[str, list[dict[str, Any]]]] = [
+            (
+                """
+                INSERT INTO message_events (message_pk, event_type, event_ts, description, metadata)
+                VALUES (:message_pk, :event_type, :event_ts, :description, :metadata)
+                """,
+                rows,
+            )
+        ]
+        for (column, ts), pks in groups.items():
+            other = "deferred_ts" if column == "smtp_ts" else "smtp_ts"
+            params: dict[str, Any] = {"ts": ts}
+            params.update({f"pk_{i}": pk for i, pk in enumerate(pks)})
+            placeholders = ", ".join(f":pk_{i}" for i in range(len(pks)))
+            steps.append(
+                (
+                    f"UPDATE messages SET {column} = :ts, {other} = NULL "
+                    f"WHERE pk IN ({placeholders})",
+                    [params],
+                )
+            )
+
+        await self.db.adapter.execute_batch(steps)
+        return len(rows)
+
     async def fetch_unreported(self, limit: int) -> list[dict[str, Any]]:
         """Fetch events not yet reported to clients.
 
@@ -253,10 +330,7 @@ class MessageEventTable(Table):
         """
         if not event_ids:
             return
-        await self.update_batch_raw(
-            pkeys=event_ids,
-            updater={"reported_ts": reported_ts},
-        )
+        await self.update_batch(event_ids, {"reported_ts": reported_ts})
 
     async def get_events_for_message(self, message_pk: str) -> list[dict[str, Any]]:
         """Get all events for a message, ordered chronologically.
@@ -288,6 +362,73 @@ class MessageEventTable(Table):
             result.append(event)
         return result
 
+    async def iter_events(
+        self,
+        *,
+        tenant_id: str | None = None,
+        since_ts: int | None = None,
+        until_ts: int | None = None,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream events in chronological order, without materializing them.
+
+        Rows are read chunk_size at a time by keyset (see
+        DbAdapter.fetch_keyset()), so memory does not grow with the number
+        of events and a slow consumer holds no lock between chunks.
+
+        Args:
+            tenant_id: Only events of messages of this tenant.
+            since_ts: Include events with event_ts >= since_ts.
+            until_ts: Include events with event_ts <= until_ts.
+            chunk_size: Rows read per round trip.
+
+        Yields:
+            Event dicts as in fetch_unreported(), plus reported_ts.
+        """
+        conditions = []
+        params: dict[str, Any] = {}
+        if tenant_id:
+            conditions.append("m.tenant_id = :tenant_id")
+            params["tenant_id"] = tenant_id
+        if since_ts:
+            conditions.append("e.event_ts >= :since_ts")
+            params["since_ts"] = since_ts
+        if until_ts:
+            conditions.append("e.event_ts <= :until_ts")
+            params["until_ts"] = until_ts
+        where_clause = " AND ".join(conditions) if conditions else "1=1"
+
+        chunks = self.db.adapter.fetch_keyset(
+            f"""
+            SELECT
+                e.id as event_id,
+                e.message_pk,
+                m.id as message_id,
+                e.event_type,
+                e.event_ts,
+                e.description,
+                e.metadata,
+                e.reported_ts,
+                m.account_id,
+                m.tenant_id
+            FROM message_events e
+            JOIN messages m ON e.message_pk = m.pk
+            WHERE {where_clause}
+            """,
+            params,
+            [("e.event_ts", "event_ts"), ("e.id", "event_id")],
+            chunk_size,
+        )
+        async for rows in chunks:
+            for row in rows:
+                event = dict(row)
+                if event.get("metadata"):
+                    try:
+                        event["metadata"] = json.loads(event["metadata"])
+                    except (json.JSONDecodeError, TypeError):
+                        event["metadata"] = None
+                yield event
+
     async def delete_for_message(self, message_pk: str) -> int:
         """Delete all events for a message.
 
@@ -318,5 +459,27 @@ class MessageEventTable(Table):
         )
         return int(row["cnt"]) if row else 0
 
+    async def drop_reported_partitions(self, threshold_ts: int, detach: bool = False) -> list[str]:
+        """Drop the partitions holding only reported events of removed messages.
+
+        Partitioned tables only (see Table.partition_column). A partition
+        ending before threshold_ts is dropped when all its events are
+        reported and none of their messages is still stored, so message
+        history stays complete while the message exists.
+
+        Args:
+            threshold_ts: Unix timestamp threshold.
+            detach: Detach the partitions instead of dropping them.
+
+        Returns:
+            Names of the partitions dropped or detached.
+        """
+        return await self.drop_expired_partitions(
+            threshold_ts,
+            keep_if="""t.reported_ts IS NULL
+                OR EXISTS (SELECT 1 FROM messages m WHERE m.pk = t.message_pk)""",
+            detach=detach,
+        )
+
 
 __all__ = ["MessageEventTable"]
@@ -43,35 +43,93 @@ Note:
     All interfaces are generated dynamically from endpoint class
     method signatures via introspection. No hardcoded routes or
     commands required.
+
+    Only BaseEndpoint and EndpointDispatcher are imported eagerly; the
+    other names load their module on first access.
 """
 
-from .api_base import create_app
-from .api_base import register_endpoint as register_api_endpoint
-from .cli_base import register_endpoint as register_cli_endpoint
-from .cli_commands import (
-    add_connect_command,
-    add_current_command,
-    add_list_command,
-    add_restart_command,
-    add_run_now_command,
-    add_send_command,
-    add_serve_command,
-    add_stats_command,
-    add_stop_command,
-    add_token_command,
-    add_use_command,
-    require_context,
-    resolve_context,
-)
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .endpoint_base import BaseEndpoint, EndpointDispatcher
-from .forms import (
-    DynamicForm,
-    create_form,
-    new_account,
-    new_message,
-    new_tenant,
-    set_proxy,
-)
+
+if TYPE_CHECKING:
+    from .api_base import create_app
+    from .api_base import register_endpoint as register_api_endpoint
+    from .cli_base import register_endpoint as register_cli_endpoint
+    from .cli_commands import (
+        add_connect_command,
+        add_current_command,
+        add_list_command,
+        add_restart_command,
+        add_run_now_command,
+        add_send_command,
+        add_serve_command,
+        add_stats_command,
+        add_stop_command,
+        add_token_command,
+        add_use_command,
+        require_context,
+        resolve_context,
+    )
+    from .forms import (
+        DynamicForm,
+        create_form,
+        new_account,
+        new_message,
+        new_tenant,
+        set_proxy,
+    )
+
+# FastAPI (api_base), Click (cli_base, cli_commands) and Rich (forms) are
+# imported on first access, so importing the package for BaseEndpoint or
+# EndpointDispatcher does not pay for them.
+_LAZY: dict[str, tuple[str, str]] = {
+    "create_app": ("api_base", "create_app"),
+    "register_api_endpoint": ("api_base", "register_endpoint"),
+    "register_cli_endpoint": ("cli_base", "register_endpoint"),
+    **{
+        name: ("cli_commands", name)
+        for name in (
+            "add_connect_command",
+            "add_current_command",
+            "add_list_command",
+            "add_restart_command",
+            "add_run_now_command",
+            "add_send_command",
+            "add_serve_command",
+            "add_stats_command",
+            "add_stop_command",
+            "add_token_command",
+            "add_use_command",
+            "require_context",
+            "resolve_context",
+        )
+    },
+    **{
+        name: ("forms", name)
+        for name in (
+            "DynamicForm",
+            "create_form",
+            "new_account",
+            "new_message",
+            "new_tenant",
+            "set_proxy",
+        )
+    },
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _LAZY[name]
+    value = getattr(importlib.import_module(f".{module_name}", __name__), attr)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "BaseEndpoint",
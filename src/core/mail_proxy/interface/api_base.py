@@ -7,6 +7,7 @@ by introspecting method signatures and creating appropriate handlers.
 Components:
     create_app: FastAPI application factory.
     register_endpoint: Register endpoint methods as FastAPI routes.
+    ndjson_response: Stream an async iterator of records as NDJSON.
     verify_tenant_token: Token verification for tenant-scoped requests.
     require_admin_token: Admin-only endpoint protection.
     require_token: General authentication dependency.
@@ -34,6 +35,10 @@ Example:
         register_endpoint(app, endpoint)
 
 Note:
+    Endpoint methods returning an async iterator (e.g. exports) are
+    streamed as NDJSON, one JSON record per line, gzip-compressed when
+    the request accepts it.
+
     Authentication uses X-API-Token header. Global token grants admin
     access to all tenants. Tenant tokens restrict access to own resources.
 """
@@ -41,16 +46,18 @@ Note:
 from __future__ import annotations
 
 import inspect
+import json
 import logging
 import secrets
-from collections.abc import Callable
+import zlib
+from collections.abc import AsyncIterator, Callable
 from collections.abc import Callable as CallableType
 from contextlib import AbstractAsyncContextManager
 from typing import TYPE_CHECKING, Any
 
 from fastapi import APIRouter, Depends, FastAPI, HTTPException, Query, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import APIKeyHeader
 
 from .endpoint_base import BaseEndpoint
@@ -67,6 +74,10 @@ api_key_scheme = APIKeyHeader(name=API_TOKEN_HEADER_NAME, auto_error=False)
 # Global service reference (set by create_app)
 _service: MailProxy | None = None
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_CHUNK_SIZE = 64 * 1024
+"""Bytes of NDJSON buffered before a chunk of a streamed response is sent."""
+
 
 def _get_http_method_fallback(method_name: str) -> str:
     """Infer HTTP method from method name prefix.
@@ -204,10 +215,17 @@ def _register_query_route(
         default = param.default if param.default is not inspect.Parameter.empty else ...
         params.append((param_name, ann, default))
 
-    async def handler(**kwargs: Any) -> Any:
-        return await method(**kwargs)
+    async def handler(http_request: Request, **kwargs: Any) -> Any:
+        result = await method(**kwargs)
+        if isinstance(result, AsyncIterator):
+            return ndjson_response(result, http_request)
+        return result
 
     new_params = [
+        inspect.Parameter(
+            name="http_request", kind=inspect.Parameter.KEYWORD_ONLY, annotation=Request
+        )
+    ] + [
         inspect.Parameter(
             name=p[0],
             kind=inspect.Parameter.KEYWORD_ONLY,
@@ -225,6 +243,58 @@ def _register_query_route(
         app.delete(path, summary=doc.split("\n")[0])(handler)
 
 
+def ndjson_response(
+    records: AsyncIterator[dict[str, Any]], request: Request | None = None
+) -> StreamingResponse:
+    """Stream records as newline-delimited JSON.
+
+    Records are serialized as they are produced and sent in chunks of
+    about STREAM_CHUNK_SIZE bytes, so memory use is independent of the
+    number of records. The body is gzip-compressed when the request
+    accepts it (Accept-Encoding: gzip).
+
+    Args:
+        records: Async iterator of JSON-serializable dicts (values that
+            are not JSON types, such as datetimes, are sent as strings).
+        request: Incoming request, for content negotiation.
+
+    Returns:
+        StreamingResponse with media type application/x-ndjson.
+    """
+    accept = request.headers.get("accept-encoding", "") if request is not None else ""
+    compress = "gzip" in accept.lower()
+    headers = {"Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        _ndjson_chunks(records, compress), media_type=NDJSON_MEDIA_TYPE, headers=headers
+    )
+
+
+async def _ndjson_chunks(
+    records: AsyncIterator[dict[str, Any]], compress: bool
+) -> AsyncIterator[bytes]:
+    """Serialize records to NDJSON chunks, optionally gzip-compressed."""
+    gzip = zlib.compressobj(wbits=31) if compress else None  # 31: gzip container
+    buffer = bytearray()
+    try:
+        async for record in records:
+            buffer += json.dumps(record, default=str, separators=(",", ":")).encode("utf-8")
+            buffer += b"\n"
+            if len(buffer) >= STREAM_CHUNK_SIZE:
+                chunk = gzip.compress(bytes(buffer)) if gzip else bytes(buffer)
+                buffer.clear()
+                if chunk:
+                    yield chunk
+        tail = gzip.compress(bytes(buffer)) + gzip.flush() if gzip else bytes(buffer)
+        if tail:
+            yield tail
+    finally:
+        aclose = getattr(records, "aclose", None)
+        if aclose is not None:
+            await aclose()  # Release the database cursor on disconnect
+
+
 def _make_body_handler(method: Callable, RequestModel: type) -> Callable:
     """Create handler that accepts body and calls method."""
 
@@ -529,6 +599,7 @@ __all__ = [
     "api_key_scheme",
     "auth_dependency",
     "create_app",
+    "ndjson_response",
     "register_endpoint",
     "require_admin_token",
     "require_token",
@@ -34,6 +34,7 @@ Note:
     - Optional params become --options
     - Boolean params become --flag/--no-flag toggles
     - Method underscores become dashes (add_batch → add-batch)
+    - Methods returning an async iterator (exports) print NDJSON lines
 """
 
 from __future__ import annotations
@@ -41,7 +42,7 @@ from __future__ import annotations
 import asyncio
 import inspect
 import json
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
 from typing import Any, Literal, get_args, get_origin
 
 import click
@@ -136,6 +137,12 @@ def _format_list_as_table(data: list[dict], console: Any) -> None:
     console.print(table)
 
 
+async def _echo_ndjson(records: AsyncIterator[dict]) -> None:
+    """Print streamed records as NDJSON, one line per record."""
+    async for record in records:
+        click.echo(json.dumps(record, default=str))
+
+
 def _create_click_command(
     method: Callable, run_async: Callable, endpoint_name: str = ""
 ) -> click.Command:
@@ -240,7 +247,9 @@ def _create_click_command(
         result = run_async(method(**py_kwargs))
 
         # Format output based on method type
-        if is_delete_command:
+        if isinstance(result, AsyncIterator):
+            run_async(_echo_ndjson(result))
+        elif is_delete_command:
             # Show success message instead of True/False
             if result is True or result is None:
                 # Try to get the ID from kwargs
@@ -60,6 +60,7 @@ from __future__ import annotations
 import asyncio
 import json
 import sys
+import time
 from collections.abc import Callable
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
@@ -67,6 +68,8 @@ from typing import TYPE_CHECKING, Any
 import click
 from rich.console import Console
 
+from ..proxy_config import PROXY_ROLES
+
 if TYPE_CHECKING:
     from core.mail_proxy.mailproxy_db import MailProxyDb
 
@@ -185,7 +188,9 @@ def add_stats_command(
 ) -> None:
     """Register 'stats' command for aggregate queue statistics.
 
-    Displays tenant/account/message counts with breakdown by status.
+    Displays tenant/account/message counts with breakdown by status, and
+    the waiting messages per tenant, account and priority. Counts come
+    from aggregate queries; messages are not loaded.
 
     Args:
         group: Click group to register command on.
@@ -206,25 +211,29 @@ def add_stats_command(
         async def _stats() -> dict[str, Any]:
             tenants = await db.table("tenants").list_all()
             accounts = await db.table("accounts").list_all()
-
-            all_messages: list[dict] = []
-            for tenant in tenants:
-                tenant_messages = await db.table("messages").list_all(tenant["id"])
-                all_messages.extend(tenant_messages)
-
-            pending = sum(1 for m in all_messages if not m.get("smtp_ts") and not m.get("error_ts"))
-            sent = sum(1 for m in all_messages if m.get("smtp_ts"))
-            errors = sum(1 for m in all_messages if m.get("error_ts"))
-
+            messages = db.table("messages")
+            counts = await messages.status_counts()
+            stats = await messages.reconcile_stats()
+
+            now = time.time()
+            queues = [
+                {
+                    "tenant_id": tenant_id,
+                    "account_id": account_id,
+                    "priority": priority,
+                    "pending": queue.pending,
+                    "deferred": queue.deferred,
+                    "oldest_pending_age": (
+                        int(now - queue.oldest_pending_ts) if queue.oldest_pending_ts else None
+                    ),
+                }
+                for (tenant_id, account_id, priority), queue in sorted(stats.snapshot().items())
+            ]
             return {
                 "tenants": len(tenants),
                 "accounts": len(accounts),
-                "messages": {
-                    "total": len(all_messages),
-                    "pending": pending,
-                    "sent": sent,
-                    "error": errors,
-                },
+                "messages": counts,
+                "queues": queues,
             }
 
         data = _run_async(_stats())
@@ -239,8 +248,19 @@ def add_stats_command(
         console.print("  Messages:")
         console.print(f"    Total:    {data['messages']['total']}")
         console.print(f"    Pending:  {data['messages']['pending']}")
+        console.print(f"    Deferred: {data['messages']['deferred']}")
         console.print(f"    Sent:     {data['messages']['sent']}")
         console.print(f"    Errors:   {data['messages']['error']}")
+        if data["queues"]:
+            console.print("  Queues:")
+            for queue in data["queues"]:
+                age = queue["oldest_pending_age"]
+                console.print(
+                    f"    {queue['tenant_id']}/{queue['account_id'] or '-'} "
+                    f"p{queue['priority']}: {queue['pending']} pending, "
+                    f"{queue['deferred']} deferred"
+                    + (f", oldest {age}s" if age is not None else "")
+                )
         console.print()
 
 
@@ -473,9 +493,7 @@ def _list_instances() -> list[str]:
     return [
         item.name
         for item in _MAIL_PROXY_DIR.iterdir()
-        if item.is_dir() and (
-            (item / "config.ini").exists() or (item / "mail_service.db").exists()
-        )
+        if item.is_dir() and ((item / "config.ini").exists() or (item / "mail_service.db").exists())
     ]
 
 
@@ -655,20 +673,22 @@ def require_instance(explicit: str | None = None) -> str:
     return instance
 
 
-def _get_pid_file(name: str) -> Path:
-    """Get the PID file path for an instance."""
-    return _get_instance_dir(name) / "server.pid"
+def _get_pid_file(name: str, role: str = "all") -> Path:
+    """Get the PID file path for an instance (one per process role)."""
+    if role == "all":
+        return _get_instance_dir(name) / "server.pid"
+    return _get_instance_dir(name) / f"server-{role}.pid"
 
 
-def _is_instance_running(name: str) -> tuple[bool, int | None, int | None]:
-    """Check if an instance is running.
+def _is_instance_running(name: str, role: str = "all") -> tuple[bool, int | None, int | None]:
+    """Check if an instance (or one of its role processes) is running.
 
     Returns:
         (is_running, pid, port) tuple
     """
     import os
 
-    pid_file = _get_pid_file(name)
+    pid_file = _get_pid_file(name, role)
     if not pid_file.exists():
         return False, None, None
 
@@ -687,14 +707,16 @@ def _is_instance_running(name: str) -> tuple[bool, int | None, int | None]:
         return False, None, None
 
 
-def _remove_pid_file(name: str) -> None:
+def _remove_pid_file(name: str, role: str = "all") -> None:
     """Remove PID file for an instance."""
-    pid_file = _get_pid_file(name)
+    pid_file = _get_pid_file(name, role)
     if pid_file.exists():
         pid_file.unlink()
 
 
-def _stop_instance(name: str, signal_type: int = 15, timeout: float = 5.0, fallback_kill: bool = True) -> bool:
+def _stop_instance(
+    name: str, signal_type: int = 15, timeout: float = 5.0, fallback_kill: bool = True
+) -> bool:
     """Stop a running instance by sending a signal.
 
     Args:
@@ -753,7 +775,9 @@ def _get_instance_config(name: str) -> dict[str, Any] | None:
 
     return {
         "name": config.get("server", "name", fallback=name),
-        "db_path": config.get("server", "db_path", fallback=str(_get_instance_dir(name) / "mail_service.db")),
+        "db_path": config.get(
+            "server", "db_path", fallback=str(_get_instance_dir(name) / "mail_service.db")
+        ),
         "host": config.get("server", "host", fallback="0.0.0.0"),
         "port": config.getint("server", "port", fallback=8000),
         "api_token": config.get("server", "api_token", fallback=""),
@@ -761,17 +785,22 @@ def _get_instance_config(name: str) -> dict[str, Any] | None:
     }
 
 
-def _write_pid_file(name: str, pid: int, port: int, host: str) -> None:
+def _write_pid_file(name: str, pid: int, port: int, host: str, role: str = "all") -> None:
     """Write PID file for an instance."""
     from datetime import datetime
 
-    pid_file = _get_pid_file(name)
-    pid_file.write_text(json.dumps({
-        "pid": pid,
-        "port": port,
-        "host": host,
-        "started_at": datetime.now().isoformat(),
-    }, indent=2))
+    pid_file = _get_pid_file(name, role)
+    pid_file.write_text(
+        json.dumps(
+            {
+                "pid": pid,
+                "port": port,
+                "host": host,
+                "started_at": datetime.now().isoformat(),
+            },
+            indent=2,
+        )
+    )
 
 
 _DEFAULT_CONFIG_TEMPLATE = """\
@@ -814,6 +843,7 @@ retry_delays = 60, 300, 900, 3600, 7200
 def _generate_api_token() -> str:
     """Generate a random API token."""
     import secrets
+
     return secrets.token_urlsafe(32)
 
 
@@ -870,6 +900,14 @@ def add_serve_command(group: click.Group) -> None:
             mail-proxy serve myserver           # Start/create myserver
             mail-proxy serve myserver -p 8080   # Start on specific port
             mail-proxy serve myserver -c        # Start and open REPL
+
+            # API workers and background workers as separate processes
+            mail-proxy serve myserver --role api --workers 4
+            mail-proxy serve myserver --role dispatcher -p 8001
+            mail-proxy serve myserver --role reporter -p 8002
+
+            # Four dispatcher processes, each sending for a quarter of the accounts
+            mail-proxy serve myserver --role dispatcher --workers 4
     """
     import os
 
@@ -880,6 +918,20 @@ def add_serve_command(group: click.Group) -> None:
     @click.option("--reload", is_flag=True, help="Enable auto-reload for development.")
     @click.option("--connect", "-c", is_flag=True, help="Start in background and open REPL.")
     @click.option("--foreground", "-f", is_flag=True, help="Run in foreground (default behavior).")
+    @click.option(
+        "--role",
+        type=click.Choice(PROXY_ROLES),
+        default="all",
+        show_default=True,
+        help="Parts of the service this process runs.",
+    )
+    @click.option(
+        "--workers",
+        "-w",
+        type=int,
+        default=1,
+        help="Worker processes (--role api or dispatcher only).",
+    )
     def serve_cmd(
         name: str,
         host: str | None,
@@ -887,12 +939,23 @@ def add_serve_command(group: click.Group) -> None:
         reload: bool,
         connect: bool,
         foreground: bool,
+        role: str,
+        workers: int,
     ) -> None:
         """Start a mail-proxy server instance.
 
         If the instance doesn't exist, creates it with default config.
         If already running, shows status and exits.
 
+        With --role, the API and the background work (dispatcher, reporter)
+        run as separate processes on the same database; each role process
+        has its own PID file and must listen on its own port.
+
+        --role dispatcher --workers N starts N dispatcher processes, each
+        owning a hash partition of the accounts, under a supervisor that
+        restarts them and rebalances the accounts on SIGTTIN/SIGTTOU
+        (one worker more/less).
+
         NAME is the instance name (default: default-mailer).
         """
         import subprocess
@@ -900,8 +963,15 @@ def add_serve_command(group: click.Group) -> None:
 
         import uvicorn
 
+        if workers > 1 and role not in ("api", "dispatcher"):
+            console.print(
+                "[red]Error:[/red] Only --role api and --role dispatcher can run several "
+                "workers (other roles would duplicate background work)"
+            )
+            sys.exit(1)
+
         # Check if already running
-        is_running, pid, running_port = _is_instance_running(name)
+        is_running, pid, running_port = _is_instance_running(name, role)
         if is_running:
             if connect:
                 console.print(f"[dim]Instance '{name}' already running, connecting...[/dim]")
@@ -934,9 +1004,19 @@ def add_serve_command(group: click.Group) -> None:
             # Start in background and show connection info
             console.print(f"[bold cyan]Starting {name} in background...[/bold cyan]")
 
-            cmd = ["mail-proxy", "serve", name, "--host", effective_host, "--port", str(effective_port)]
+            cmd = [
+                "mail-proxy",
+                "serve",
+                name,
+                "--host",
+                effective_host,
+                "--port",
+                str(effective_port),
+            ]
             if reload:
                 cmd.append("--reload")
+            if role != "all":
+                cmd.extend(["--role", role, "--workers", str(workers)])
 
             subprocess.Popen(
                 cmd,
@@ -948,7 +1028,7 @@ def add_serve_command(group: click.Group) -> None:
             # Wait for server to be ready
             for _ in range(50):  # Max 5 seconds
                 time.sleep(0.1)
-                is_running, pid, _ = _is_instance_running(name)
+                is_running, pid, _ = _is_instance_running(name, role)
                 if is_running:
                     break
 
@@ -967,15 +1047,29 @@ def add_serve_command(group: click.Group) -> None:
         os.environ["GMP_DB_PATH"] = db_path
         os.environ["GMP_PORT"] = str(effective_port)
         os.environ["GMP_HOST"] = effective_host
+        os.environ["GMP_ROLE"] = role
+        os.environ["GMP_WAKE_DIR"] = str(_get_instance_dir(name) / "wake")
 
         console.print(f"\n[bold cyan]Starting {name}[/bold cyan]")
         console.print(f"  Config:  {config_file}")
         console.print(f"  DB:      {db_path}")
         console.print(f"  Listen:  {effective_host}:{effective_port}")
+        if role != "all":
+            console.print(f"  Role:    {role} ({workers} worker(s))")
         console.print()
 
         # Write PID file before starting uvicorn
-        _write_pid_file(name, os.getpid(), effective_port, effective_host)
+        _write_pid_file(name, os.getpid(), effective_port, effective_host, role)
+
+        if role == "dispatcher" and workers > 1:
+            # Headless dispatchers, each owning a partition of the accounts
+            from ..supervisor import DispatchSupervisor
+
+            try:
+                DispatchSupervisor(workers).run()
+            finally:
+                _remove_pid_file(name, role)
+            return
 
         try:
             uvicorn.run(
@@ -983,11 +1077,12 @@ def add_serve_command(group: click.Group) -> None:
                 host=effective_host,
                 port=effective_port,
                 reload=reload,
+                workers=workers,
                 log_level="info",
             )
         finally:
             # Clean up PID file on exit
-            _remove_pid_file(name)
+            _remove_pid_file(name, role)
 
 
 def add_list_command(group: click.Group) -> None:
@@ -1043,14 +1138,16 @@ def add_list_command(group: click.Group) -> None:
 
                 is_running, pid, running_port = _is_instance_running(instance_name)
 
-                instances.append({
-                    "name": instance_name,
-                    "port": running_port or port,
-                    "host": host,
-                    "running": is_running,
-                    "pid": pid,
-                    "legacy": is_legacy,
-                })
+                instances.append(
+                    {
+                        "name": instance_name,
+                        "port": running_port or port,
+                        "host": host,
+                        "running": is_running,
+                        "pid": pid,
+                        "legacy": is_legacy,
+                    }
+                )
 
         if not instances:
             console.print("[dim]No instances configured.[/dim]")
@@ -1106,7 +1203,9 @@ def add_stop_command(group: click.Group) -> None:
 
     @group.command("stop")
     @click.argument("name", default="*")
-    @click.option("--force", "-f", is_flag=True, help="Force kill (SIGKILL) instead of graceful shutdown.")
+    @click.option(
+        "--force", "-f", is_flag=True, help="Force kill (SIGKILL) instead of graceful shutdown."
+    )
     def stop_cmd(name: str, force: bool) -> None:
         """Stop running mail-proxy instance(s).
 
@@ -1188,7 +1287,9 @@ def add_use_command(group: click.Group) -> None:
         if new_instance is None:
             current_instance, _ = _get_current_context()
             if not current_instance:
-                console.print("[red]Error:[/red] No current instance. Use 'mail-proxy use <instance>' first.")
+                console.print(
+                    "[red]Error:[/red] No current instance. Use 'mail-proxy use <instance>' first."
+                )
                 sys.exit(1)
             new_instance = current_instance
 
@@ -1243,7 +1344,9 @@ def add_current_command(group: click.Group) -> None:
     """
 
     @group.command("current")
-    @click.option("--export", "-e", "do_export", is_flag=True, help="Output as shell export statements.")
+    @click.option(
+        "--export", "-e", "do_export", is_flag=True, help="Output as shell export statements."
+    )
     def current_cmd(do_export: bool) -> None:
         """Show the current instance and tenant.
 
@@ -1282,7 +1385,9 @@ def add_current_command(group: click.Group) -> None:
                     status = "[green]●[/green]" if is_running else "[dim]○[/dim]"
                     console.print(f"  {status} {name}")
                 console.print()
-                console.print("Use 'mail-proxy use <instance>' or 'mail-proxy use <instance>/<tenant>'.")
+                console.print(
+                    "Use 'mail-proxy use <instance>' or 'mail-proxy use <instance>/<tenant>'."
+                )
             return
 
         is_running, pid, port = _is_instance_running(instance)
@@ -32,8 +32,9 @@ Example:
         result = await dispatcher.dispatch("addMessages", {"messages": [...]})
 
 Note:
-    BaseEndpoint.discover() scans CE and EE packages for endpoint classes
-    and composes them when both exist for an entity.
+    BaseEndpoint.discover() returns the endpoint classes precomputed in
+    core.mail_proxy.registry, composing CE and EE classes when both exist
+    for an entity. BaseEndpoint.scan() regenerates the registry entries.
 """
 
 from __future__ import annotations
@@ -256,10 +257,11 @@ class BaseEndpoint:
 
     @classmethod
     def discover(cls) -> list[type[BaseEndpoint]]:
-        """Autodiscover all endpoint classes from entities/ directories.
+        """Return all endpoint classes from the entity registry.
 
-        Scans CE and EE packages for endpoint.py and endpoint_ee.py modules.
-        When both exist for an entity, composes them with EE mixin first.
+        Endpoint classes are listed in core.mail_proxy.registry (generated
+        by scan()). When an EE mixin exists for an entity, it is composed
+        with the CE class, EE mixin first.
 
         Returns:
             List of endpoint classes ready for instantiation.
@@ -272,28 +274,33 @@ class BaseEndpoint:
                     endpoint = endpoint_class(table)
                     register_endpoint(app, endpoint)
         """
+        from ..registry import endpoint_classes
+
+        return list(endpoint_classes())
+
+    @classmethod
+    def scan(cls) -> dict[str, tuple[str, str | None]]:
+        """Scan CE and EE packages for endpoint.py and endpoint_ee.py modules.
+
+        Returns:
+            Dict of entity name -> ("module:Class" of the CE endpoint,
+            "module:Class" of the EE mixin or None).
+        """
         ce_modules = cls._find_entity_modules(_CE_ENTITIES_PACKAGE, "endpoint")
         ee_modules = cls._find_entity_modules(_EE_ENTITIES_PACKAGE, "endpoint_ee")
 
-        endpoints: list[type[BaseEndpoint]] = []
+        result: dict[str, tuple[str, str | None]] = {}
         for entity_name, ce_module in ce_modules.items():
             ce_class = cls._get_class_from_module(ce_module, "Endpoint")
             if not ce_class:
                 continue
-
             ee_module = ee_modules.get(entity_name)
-            if ee_module:
-                ee_mixin = cls._get_ee_mixin_from_module(ee_module, "_EE")
-                if ee_mixin:
-                    composed_class = type(
-                        ce_class.__name__, (ee_mixin, ce_class), {"__module__": ce_class.__module__}
-                    )
-                    endpoints.append(composed_class)
-                    continue
-
-            endpoints.append(ce_class)
-
-        return endpoints
+            ee_mixin = cls._get_ee_mixin_from_module(ee_module, "_EE") if ee_module else None
+            result[entity_name] = (
+                f"{ce_class.__module__}:{ce_class.__name__}",
+                f"{ee_mixin.__module__}:{ee_mixin.__name__}" if ee_mixin else None,
+            )
+        return result
 
     @classmethod
     def _find_entity_modules(cls, base_package: str, module_name: str) -> dict[str, Any]:
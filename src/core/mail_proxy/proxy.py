@@ -6,6 +6,7 @@ MailProxy extends MailProxyBase with the full runtime for email dispatch:
 Components:
     - SmtpSender: Connection pool, rate limiting, dispatch loop
     - ClientReporter: Delivery report sync to upstream services
+    - RetentionPurger: Incremental removal of reported messages
     - AttachmentManager: Fetch attachments with two-tier cache
     - Prometheus MailMetrics: Counters and gauges for monitoring
 
@@ -34,6 +35,22 @@ Command Handling:
 Background Tasks:
     - SmtpSender.dispatch_loop: Fetch pending messages, send via SMTP
     - ClientReporter.sync_loop: Report delivery events to upstream
+    - RetentionPurger.purge_loop: Remove reported messages past retention
+
+Process Roles (config.role):
+    - all: API and every background task in one process (default)
+    - api: API only, no background task; run as many workers as needed
+    - dispatcher: SmtpSender dispatch loop
+    - reporter: ClientReporter, RetentionPurger and EE receivers
+
+    Several dispatcher processes can share the work: each one owns a hash
+    partition of the accounts (config.dispatch_partition of
+    config.dispatch_partitions, see smtp.partition) and fetches only their
+    messages. `mail-proxy serve --role dispatcher --workers N` supervises them.
+
+    Processes sharing a database coordinate through it; with config.wake_dir
+    set, API writes also wake the background workers at once through a
+    WakeChannel instead of waiting for their next poll.
 
 Usage (recommended factory):
     proxy = await MailProxy.create(db_path="/data/mail.db", start_active=True)
@@ -60,16 +77,21 @@ from typing import Any
 
 from tools.prometheus import MailMetrics
 
+from .entities.command_log import COMMAND_LOG_POLICIES, CommandLogTable, CommandLogWriter
 from .interface import EndpointDispatcher
 from .proxy_base import MailProxyBase
-from .proxy_config import ProxyConfig
-from .reporting import DEFAULT_SYNC_INTERVAL, ClientReporter
+from .proxy_config import PROXY_ROLES, ProxyConfig
+from .reporting import DEFAULT_SYNC_INTERVAL, ClientReporter, RetentionPurger
 from .smtp import (
     AttachmentManager,
+    ByteBudget,
+    DispatchPartition,
+    EventWriter,
     SmtpSender,
     TieredCache,
 )
 from .smtp.retry import RetryStrategy
+from .wake import WakeChannel
 
 PRIORITY_LABELS = {
     0: "immediate",
@@ -87,6 +109,7 @@ class MailProxy(MailProxyBase):
     Extends MailProxyBase with:
     - SmtpSender: SMTP connection pool, rate limiter, dispatch loop
     - ClientReporter: Delivery report sync loop
+    - RetentionPurger: Chunked retention purge loop
     - AttachmentManager: Fetch attachments with caching
     - MailMetrics: Prometheus counters and gauges
 
@@ -101,6 +124,8 @@ class MailProxy(MailProxyBase):
     Instance Attributes (runtime):
         smtp_sender: SmtpSender instance (pool, rate_limiter, dispatch)
         client_reporter: ClientReporter instance (sync loop)
+        retention_purger: RetentionPurger instance (purge loop)
+        role: Process role (see ProxyConfig.role)
         attachments: AttachmentManager instance
         metrics: MailMetrics instance
         logger: Logger for diagnostics
@@ -165,6 +190,8 @@ class MailProxy(MailProxyBase):
         import math
 
         cfg = config or ProxyConfig()
+        if cfg.role not in PROXY_ROLES:
+            raise ValueError(f"Unknown proxy role: {cfg.role}")
 
         # Initialize base class (config, db with autodiscovered tables, endpoints)
         MailProxyBase.__init__(self, config=cfg)
@@ -180,6 +207,9 @@ class MailProxy(MailProxyBase):
 
         # SmtpSender manages pool, rate_limiter, dispatch loop, email building
         self.smtp_sender = SmtpSender(self)
+        self.smtp_sender.partition = DispatchPartition(
+            cfg.dispatch_partition, cfg.dispatch_partitions
+        )
         self._queue_put_timeout = cfg.queue.put_timeout
         self._max_enqueue_batch = cfg.queue.max_enqueue_batch
         self._attachment_timeout = cfg.timing.attachment_timeout
@@ -190,6 +220,10 @@ class MailProxy(MailProxyBase):
 
         self._stop = asyncio.Event()
         self._active = cfg.start_active
+        self.role = cfg.role
+        self._wake_channel: WakeChannel | None = None
+        if cfg.wake_dir and WakeChannel.supported():
+            self._wake_channel = WakeChannel(cfg.wake_dir)
 
         self._send_loop_interval = math.inf if self._test_mode else base_send_interval
         self._result_queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(
@@ -199,6 +233,15 @@ class MailProxy(MailProxyBase):
         # ClientReporter manages delivery report sync loop
         self.client_reporter = ClientReporter(self)
 
+        # RetentionPurger removes reported messages on its own schedule
+        self.retention_purger = RetentionPurger(
+            self,
+            interval=cfg.timing.retention_interval,
+            chunk_size=cfg.queue.retention_chunk_size,
+            time_budget=cfg.timing.retention_time_budget,
+            detach_partitions=cfg.db_partition_detach,
+        )
+
         self._client_sync_url = cfg.client_sync.url
         self._client_sync_user = cfg.client_sync.user
         self._client_sync_password = cfg.client_sync.password
@@ -222,6 +265,38 @@ class MailProxy(MailProxyBase):
         self._max_concurrent_per_account = max(1, int(cfg.concurrency.max_per_account))
         self._max_concurrent_attachments = max(1, int(cfg.concurrency.max_attachments))
         self._attachment_semaphore: asyncio.Semaphore | None = None
+        self._attachment_budget_bytes = max(0, int(cfg.concurrency.max_attachment_mb * 1024 * 1024))
+        self._attachment_budget: ByteBudget | None = None
+        self._prefetch_budget_bytes = max(0, int(cfg.cache.prefetch_max_mb * 1024 * 1024))
+        self._prefetch_messages = max(0, int(cfg.cache.prefetch_messages))
+        self.db.table("messages").stats_max_age = cfg.timing.queue_stats_interval
+        # Only a process dispatching every account sees the sends that update the stats
+        self.db.table("messages").stats_counts = (
+            self.runs("dispatcher") and cfg.dispatch_partitions <= 1
+        )
+        self._event_writer: EventWriter | None = None
+        if cfg.queue.event_batch_size > 1:
+            self._event_writer = EventWriter(
+                self.db,
+                max_batch=cfg.queue.event_batch_size,
+                max_delay=cfg.timing.event_flush_interval,
+            )
+
+        # Audit log: buffered off the request path unless batch_size <= 1
+        if cfg.command_log.policy not in COMMAND_LOG_POLICIES:
+            raise ValueError(f"Unknown command log policy: {cfg.command_log.policy}")
+        self._command_log_policy = cfg.command_log.policy
+        self._command_log_writer: CommandLogWriter | None = None
+        if cfg.command_log.batch_size > 1:
+            self._command_log_writer = CommandLogWriter(
+                self.db,
+                policy=cfg.command_log.policy,
+                batch_size=cfg.command_log.batch_size,
+                flush_interval=cfg.command_log.flush_interval,
+                max_pending_bytes=cfg.command_log.max_pending_bytes,
+                drop_when_full=cfg.command_log.drop_when_full,
+                logger=self.logger,
+            )
 
         # Initialize endpoint dispatcher for command routing
         self._dispatcher = EndpointDispatcher(self.db, proxy=self)
@@ -315,10 +390,16 @@ class MailProxy(MailProxyBase):
         # Initialize attachment manager (tenant-specific config applied per-message)
         # storage_manager=None means only absolute paths work; tenant-specific managers are
         # created in _get_attachment_manager_for_message() with tenant's storage config
-        self.attachments = AttachmentManager(storage_manager=None, cache=self._attachment_cache)
+        self.attachments = AttachmentManager(
+            storage_manager=None,
+            cache=self._attachment_cache,
+            blob_store=self.db.table("attachment_blobs"),
+        )
 
         # Initialize attachment fetch semaphore to limit memory pressure
         self._attachment_semaphore = asyncio.Semaphore(self._max_concurrent_attachments)
+        if self._attachment_budget_bytes > 0:
+            self._attachment_budget = ByteBudget(self._attachment_budget_bytes)
 
     def _normalise_priority(self, value: Any, default: Any = DEFAULT_PRIORITY) -> tuple[int, str]:
         """Convert a priority value to internal numeric representation.
@@ -421,7 +502,9 @@ class MailProxy(MailProxyBase):
         - ``addTenant``, ``getTenant``, ``listTenants``, ``updateTenant``, ``deleteTenant``: Tenant management
 
         State-modifying commands are automatically logged to the command_log table
-        for audit trail and replay capability.
+        for audit trail and replay capability. Entries are buffered and written
+        in batches by CommandLogWriter, reduced by the configured payload policy
+        (ProxyConfig.command_log).
 
         Args:
             cmd: Command name to execute.
@@ -442,13 +525,27 @@ class MailProxy(MailProxyBase):
         if should_log:
             try:
                 ok = result.get("ok", False) if isinstance(result, dict) else False
-                await self.db.table("command_log").log_command(
-                    endpoint=cmd,
-                    payload=payload,
-                    tenant_id=tenant_id,
-                    response_status=200 if ok else 400,
-                    response_body=result,
-                )
+                if self._command_log_writer is not None:
+                    # Buffered: the response waits for the audit write only
+                    # when the buffer is full
+                    await self._command_log_writer.submit(
+                        cmd,
+                        payload,
+                        tenant_id=tenant_id,
+                        response_status=200 if ok else 400,
+                        response_body=result,
+                    )
+                else:
+                    policy = self._command_log_policy
+                    await self.db.table("command_log").log_command(
+                        endpoint=cmd,
+                        payload=CommandLogTable.reduce_payload(payload, policy),
+                        tenant_id=tenant_id,
+                        response_status=200 if ok else 400,
+                        response_body=(
+                            CommandLogTable.reduce_response(result, policy) if result else None
+                        ),
+                    )
             except Exception as e:
                 self.logger.warning(f"Failed to log command {cmd}: {e}")
 
@@ -466,6 +563,8 @@ class MailProxy(MailProxyBase):
                 tenant_id = payload.get("tenant_id") if isinstance(payload, dict) else None
                 self.smtp_sender.wake()
                 self.client_reporter.wake(tenant_id)
+                self.notify_workers("dispatch")
+                self.notify_workers("report", tenant_id)
                 return {"ok": True}
 
             case "listTenantsSyncStatus":
@@ -684,19 +783,13 @@ class MailProxy(MailProxyBase):
         # Get messages that belong to this tenant (via account relationship)
         authorized_ids = await self.db.table("messages").get_ids_for_tenant(list(ids), tenant_id)
 
-        removed = 0
-        missing: list[str] = []
-        unauthorized: list[str] = []
-
-        for mid in sorted(ids):
-            if mid not in authorized_ids:
-                unauthorized.append(mid)
-                continue
-            if await self.db.table("messages").delete(mid, tenant_id):
-                removed += 1
-            else:
-                missing.append(mid)
-        return removed, missing, unauthorized
+        unauthorized = sorted(ids - authorized_ids)
+        owned = sorted(ids & authorized_ids)
+        removed_ids = (
+            await self.db.table("messages").remove_for_tenant(owned, tenant_id) if owned else set()
+        )
+        missing = [mid for mid in owned if mid not in removed_ids]
+        return len(removed_ids), missing, unauthorized
 
     async def _cleanup_reported_messages(
         self, older_than_seconds: int | None = None, tenant_id: str | None = None
@@ -777,19 +870,26 @@ class MailProxy(MailProxyBase):
     async def start(self) -> None:
         """Start the background scheduler and maintenance tasks.
 
-        Initializes the persistence layer and spawns background tasks for:
-        - SMTP dispatch via smtp_sender
-        - Client report loop: sends delivery reports to upstream services
+        Initializes the persistence layer and spawns the background tasks
+        of this process's role:
+        - SMTP dispatch via smtp_sender (dispatcher)
+        - Client report loop: sends delivery reports to upstream services (reporter)
+        - Retention purge loop: removes reported messages past retention (reporter)
         """
-        self.logger.debug("Starting MailProxy...")
+        self.logger.debug("Starting MailProxy (role=%s)...", self.role)
         await self.init()
         self._stop.clear()
-        self.logger.debug("Starting SMTP sender...")
-        await self.smtp_sender.start()
-        self.logger.debug("Starting client reporter...")
-        await self.client_reporter.start()
-        # Start EE components (overridden in MailProxy_EE mixin)
-        await self._start_proxy_ee()
+        if self.runs("dispatcher"):
+            self.logger.debug("Starting SMTP sender...")
+            await self.smtp_sender.start()
+        if self.runs("reporter"):
+            self.logger.debug("Starting client reporter...")
+            await self.client_reporter.start()
+            await self.retention_purger.start()
+            # Start EE components (overridden in MailProxy_EE mixin)
+            await self._start_proxy_ee()
+        if self._wake_channel is not None and self.role != "api":
+            await self._wake_channel.listen(self.role, self._on_wake)
         self.logger.debug("All background tasks created")
 
     async def stop(self) -> None:
@@ -799,12 +899,44 @@ class MailProxy(MailProxyBase):
         Outstanding operations are allowed to finish before returning.
         """
         self._stop.set()
+        if self._wake_channel is not None:
+            self._wake_channel.close()
         await self.smtp_sender.stop()
+        if self._event_writer is not None:
+            await self._event_writer.stop()
         await self.client_reporter.stop()
+        await self.retention_purger.stop()
+        if self._command_log_writer is not None:
+            await self._command_log_writer.stop()
         # Stop EE components (overridden in MailProxy_EE mixin)
         await self._stop_proxy_ee()
         await self.db.adapter.close()
 
+    def runs(self, role: str) -> bool:
+        """Whether this process runs the background tasks of role ("dispatcher", "reporter")."""
+        return self.role in ("all", role)
+
+    def notify_workers(self, target: str, key: str | None = None) -> None:
+        """Wake background workers of other processes through the wake channel.
+
+        Called on writes that create work (see SqlDb.notify). Without a
+        channel, or when no other process listens, this does nothing: the
+        workers find the work at their next poll.
+
+        Args:
+            target: "dispatch" (new messages) or "report" (new events).
+            key: Optional tenant id.
+        """
+        if self._wake_channel is not None:
+            self._wake_channel.send(target, key)
+
+    def _on_wake(self, target: str, key: str | None) -> None:
+        """Handle a wake-up received from another process."""
+        if target == "dispatch" and self.runs("dispatcher"):
+            self.smtp_sender.wake()
+        elif target == "report" and self.runs("reporter"):
+            self.client_reporter.wake(key)
+
     # -------------------------------------------------------------------------
     # Messaging and metrics (internal)
     # -------------------------------------------------------------------------
@@ -890,17 +1022,20 @@ class MailProxy(MailProxyBase):
         await self._put_with_backpressure(self._result_queue, event, "result")
 
     async def _refresh_queue_gauge(self) -> None:
-        """Update the Prometheus gauge for pending message count.
+        """Update the Prometheus queue gauges from the queue stats.
 
-        Queries the database for active (unsent, unreported) messages
-        and updates the metrics collector.
+        The in-memory stats of the messages table are reconciled with the
+        database only when they are dirty or older than
+        queue_stats_interval; otherwise no query is run.
         """
+        messages = self.db.table("messages")
         try:
-            count = await self.db.table("messages").count_active()
+            if not messages.stats.is_fresh(messages.stats_max_age):
+                await messages.reconcile_stats()
         except Exception:  # pragma: no cover - defensive
             self.logger.exception("Failed to refresh queue gauge")
             return
-        self.metrics.set_pending(count)
+        self.metrics.set_queue_stats(messages.stats.snapshot())
 
     async def _init_account_metrics(self) -> None:
         """Initialize Prometheus counters for all existing accounts.
@@ -17,6 +17,8 @@ Discovery Mechanism:
     Tables from `core.mail_proxy.entities.*/table.py` are composed with
     optional EE mixins from `enterprise.mail_proxy.entities.*/table_ee.py`.
     Endpoints follow the same pattern with `endpoint.py` and `endpoint_ee.py`.
+    The result of the package scan is precomputed in `registry.py`, so
+    startup imports only the listed modules and composes classes once.
 
     Discovered entities (CE):
         - tenants: Multi-tenant isolation
@@ -49,7 +51,10 @@ import pkgutil
 from typing import TYPE_CHECKING, Any
 
 from sql import SqlDb
+from sql.partitioning import PARTITION_INTERVALS
+from tools.compression import get_codec
 
+from . import registry
 from .interface import BaseEndpoint
 from .proxy_config import ProxyConfig
 
@@ -84,11 +89,19 @@ class MailProxyBase:
             config: ProxyConfig instance. If None, creates default.
         """
         self.config = config or ProxyConfig()
+        if self.config.db_partitioning not in (None, *PARTITION_INTERVALS):
+            raise ValueError(f"Unknown partition interval: {self.config.db_partitioning}")
+        if self.config.payload_codec:
+            get_codec(self.config.payload_codec)  # fail now, not on the first insert
 
         self._encryption_key: bytes | None = None
         self._load_encryption_key()
 
-        self.db = SqlDb(self.config.db_path or ":memory:", parent=self)
+        self.db = SqlDb(
+            self.config.db_path or ":memory:",
+            parent=self,
+            replicas=self.config.db_replicas,
+        )
         self._discover_tables()
 
         self.endpoints: dict[str, BaseEndpoint] = {}
@@ -134,6 +147,21 @@ class MailProxyBase:
         """Encryption key for database field encryption. None if not configured."""
         return self._encryption_key
 
+    @property
+    def payload_codec(self) -> str | None:
+        """Compression codec for stored payloads. None if compression is disabled."""
+        return self.config.payload_codec
+
+    @property
+    def partition_interval(self) -> str | None:
+        """Time partitioning interval of large tables. None if partitioning is disabled."""
+        return self.config.db_partitioning
+
+    @property
+    def archive_path(self) -> str | None:
+        """Directory of the cold message archive. None if archiving is disabled."""
+        return self.config.archive_path
+
     def set_encryption_key(self, key: bytes) -> None:
         """Set encryption key programmatically (for testing)."""
         if len(key) != 32:
@@ -141,26 +169,33 @@ class MailProxyBase:
         self._encryption_key = key
 
     def _discover_tables(self) -> None:
-        """Autodiscover Table classes from entities/ and compose with EE mixins."""
-        ce_modules = self._find_entity_modules(_CE_ENTITIES_PACKAGE, "table")
-        ee_modules = self._find_entity_modules(_EE_ENTITIES_PACKAGE, "table_ee")
+        """Register Table classes from the entity registry (CE composed with EE mixins)."""
+        for table_class in registry.table_classes():
+            self.db.add_table(table_class)
 
+    @classmethod
+    def scan_tables(cls) -> dict[str, tuple[str, str | None]]:
+        """Scan entities/ for Table classes and EE mixins (generates registry.TABLES).
+
+        Returns:
+            Dict of entity name -> ("module:Class" of the CE table,
+            "module:Class" of the EE mixin or None).
+        """
+        ce_modules = cls._find_entity_modules(_CE_ENTITIES_PACKAGE, "table")
+        ee_modules = cls._find_entity_modules(_EE_ENTITIES_PACKAGE, "table_ee")
+
+        result: dict[str, tuple[str, str | None]] = {}
         for entity_name, ce_module in ce_modules.items():
-            ce_class = self._get_class_from_module(ce_module, "Table")
+            ce_class = cls._get_class_from_module(ce_module, "Table")
             if not ce_class:
                 continue
-
             ee_module = ee_modules.get(entity_name)
-            if ee_module:
-                ee_mixin = self._get_ee_mixin_from_module(ee_module, "_EE")
-                if ee_mixin:
-                    composed_class = type(
-                        ce_class.__name__, (ee_mixin, ce_class), {"__module__": ce_class.__module__}
-                    )
-                    self.db.add_table(composed_class)
-                    continue
-
-            self.db.add_table(ce_class)
+            ee_mixin = cls._get_ee_mixin_from_module(ee_module, "_EE") if ee_module else None
+            result[entity_name] = (
+                f"{ce_class.__module__}:{ce_class.__name__}",
+                f"{ee_mixin.__module__}:{ee_mixin.__name__}" if ee_mixin else None,
+            )
+        return result
 
     def _discover_endpoints(self) -> None:
         """Autodiscover Endpoint classes and compose with EE mixins."""
@@ -236,7 +271,8 @@ class MailProxyBase:
     # Discovery helpers (private)
     # -------------------------------------------------------------------------
 
-    def _find_entity_modules(self, base_package: str, module_name: str) -> dict[str, Any]:
+    @staticmethod
+    def _find_entity_modules(base_package: str, module_name: str) -> dict[str, Any]:
         """Scan package for entity subpackages containing module_name."""
         result: dict[str, Any] = {}
         try:
@@ -259,7 +295,8 @@ class MailProxyBase:
                 pass
         return result
 
-    def _get_class_from_module(self, module: Any, class_suffix: str) -> type | None:
+    @staticmethod
+    def _get_class_from_module(module: Any, class_suffix: str) -> type | None:
         """Extract CE Table/Endpoint class by suffix (excludes _EE mixins)."""
         for attr_name in dir(module):
             if attr_name.startswith("_"):
@@ -275,7 +312,8 @@ class MailProxyBase:
                 return obj
         return None
 
-    def _get_ee_mixin_from_module(self, module: Any, class_suffix: str) -> type | None:
+    @staticmethod
+    def _get_ee_mixin_from_module(module: Any, class_suffix: str) -> type | None:
         """Extract EE mixin class (suffix _EE) for composition with CE class."""
         for name in dir(module):
             if name.startswith("_"):
@@ -29,6 +29,7 @@ Nested Config Classes:
     - ClientSyncConfig: Upstream reporting (URL, auth)
     - RetryConfig: Retry behavior (max attempts, delays)
     - CacheConfig: Attachment cache (memory/disk tiers)
+    - CommandLogConfig: Audit log payload policy and write batching
 """
 
 from __future__ import annotations
@@ -37,6 +38,9 @@ from collections.abc import Awaitable, Callable
 from dataclasses import dataclass, field
 from typing import Any
 
+PROXY_ROLES = ("all", "api", "dispatcher", "reporter")
+"""Process roles: which parts of the service a process runs (see ProxyConfig.role)."""
+
 
 @dataclass
 class TimingConfig:
@@ -51,6 +55,18 @@ class TimingConfig:
     report_retention_seconds: int = 7 * 24 * 3600
     """How long to retain reported messages (default 7 days)."""
 
+    event_flush_interval: float = 0.005
+    """Seconds delivery events are collected before a group commit."""
+
+    retention_interval: float = 60.0
+    """Seconds between retention purger runs (0 disables the purger)."""
+
+    retention_time_budget: float = 0.5
+    """Seconds a retention purger run may spend before yielding to the next run."""
+
+    queue_stats_interval: float = 30.0
+    """Seconds between reconciliations of the in-memory queue stats with the database."""
+
 
 @dataclass
 class QueueConfig:
@@ -68,6 +84,12 @@ class QueueConfig:
     max_enqueue_batch: int = 1000
     """Maximum messages allowed in single addMessages call."""
 
+    event_batch_size: int = 500
+    """Maximum delivery events per group commit (0 or 1 writes each event directly)."""
+
+    retention_chunk_size: int = 500
+    """Messages scanned per retention purger transaction."""
+
 
 @dataclass
 class ConcurrencyConfig:
@@ -80,7 +102,11 @@ class ConcurrencyConfig:
     """Maximum concurrent sends per SMTP account."""
 
     max_attachments: int = 3
-    """Maximum concurrent attachment fetches."""
+    """Maximum concurrent attachment fetches of unknown size (see max_attachment_mb)."""
+
+    max_attachment_mb: float = 64.0
+    """Byte budget in MB for attachment content being fetched, built into messages
+    and sent. 0 disables it: fetches are then limited by max_attachments only."""
 
 
 @dataclass
@@ -133,12 +159,41 @@ class CacheConfig:
     disk_threshold_kb: float = 100.0
     """Size threshold for disk vs memory (items larger go to disk)."""
 
+    prefetch_max_mb: float = 20.0
+    """Byte budget in MB for prefetching attachments of the next ready batch. 0 disables."""
+
+    prefetch_messages: int = 100
+    """Maximum messages inspected when looking ahead at the next ready batch."""
+
     @property
     def enabled(self) -> bool:
         """Check if caching is enabled (disk dir configured)."""
         return self.disk_dir is not None
 
 
+@dataclass
+class CommandLogConfig:
+    """Audit trail (command_log) storage settings."""
+
+    policy: str = "full"
+    """Payload detail stored per command: "full", "headers" or "digest"."""
+
+    batch_size: int = 200
+    """Maximum log entries per insert (0 or 1 writes each entry before responding)."""
+
+    flush_interval: float = 0.5
+    """Seconds entries are buffered before being written."""
+
+    max_pending_bytes: int = 16 * 1024 * 1024
+    """Bound of the write buffer, in bytes of entry JSON. When it is full,
+    commands wait for the buffered entries to be written."""
+
+    drop_when_full: bool = False
+    """Drop new entries with a warning when the buffer is full, instead of waiting.
+
+    Keeps command latency independent of the database at the cost of audit entries."""
+
+
 @dataclass
 class ProxyConfig:
     """Main configuration container for MailProxy (CE).
@@ -156,12 +211,22 @@ class ProxyConfig:
         client_sync: Upstream reporting (URL, auth)
         retry: Retry behavior (max attempts, delays)
         cache: Attachment cache (memory/disk tiers)
+        command_log: Audit log payload policy and write batching
 
     Top-Level Settings:
         db_path: SQLite/PostgreSQL database path
+        db_replicas: PostgreSQL read replicas for replica-safe reads
+        db_partitioning: PostgreSQL time partitioning of messages and events
+        db_partition_detach: Detach expired partitions instead of dropping them
+        archive_path: Directory of the cold archive of reported messages
         instance_name: Service identifier for display
+        role: Parts of the service this process runs
+        wake_dir: Directory of the wake-up channel between processes
+        dispatch_partition: Account partition sent by this dispatcher
+        dispatch_partitions: Number of dispatcher processes sharing the accounts
         port: Default API server port
         api_token: Optional bearer token for API auth
+        payload_codec: Compression codec for stored payloads
         default_priority: Default message priority (0-3)
         test_mode: Disable auto-processing for tests
         log_delivery_activity: Verbose delivery logging
@@ -181,15 +246,58 @@ class ProxyConfig:
     db_path: str = "/data/mail_service.db"
     """SQLite database path for persistence."""
 
+    db_replicas: list[str] = field(default_factory=list)
+    """PostgreSQL read-replica URLs. Heavy API reads (listings, exports, counts) use them."""
+
+    db_partitioning: str | None = None
+    """Range-partition messages and message_events by "day" or "week" (PostgreSQL, new tables).
+
+    Retention then drops whole partitions instead of deleting rows. None disables."""
+
+    db_partition_detach: bool = False
+    """Detach expired partitions (e.g. to archive them) instead of dropping them."""
+
+    archive_path: str | None = None
+    """Directory of the cold archive. Retention moves reported messages there instead of deleting.
+
+    Archived messages stay readable through MessageEndpoint.get(). None disables."""
+
     instance_name: str = "mail-proxy"
     """Instance name for display and identification."""
 
+    role: str = "all"
+    """Parts of the service this process runs (one of PROXY_ROLES).
+
+    "all" runs everything in one process. "api" serves requests only and can
+    run as many workers; "dispatcher" runs the SMTP dispatch loop; "reporter"
+    runs delivery reports, retention and the EE receivers."""
+
+    wake_dir: str | None = None
+    """Directory of the wake-up channel (see wake.WakeChannel) shared by the processes
+    of one deployment. None disables it: workers then only poll."""
+
+    dispatch_partition: int = 0
+    """Account partition dispatched by this process (0 to dispatch_partitions - 1).
+
+    See smtp.partition: each dispatcher process sends the messages of the accounts
+    whose pk hashes to its partition."""
+
+    dispatch_partitions: int = 1
+    """Number of dispatcher processes sharing the accounts. 1 dispatches every account."""
+
     port: int = 8000
     """Default port for API server."""
 
     api_token: str | None = None
     """API authentication token. If None, no auth required."""
 
+    payload_codec: str | None = None
+    """Codec compressing stored message and command payloads ("zlib", "zstd"). None disables.
+
+    Opt-in: processes of an older version cannot read compressed payloads, so
+    enable it once every process of the deployment (and any rollback target)
+    reads them. Rows are readable whatever the setting."""
+
     timing: TimingConfig = field(default_factory=TimingConfig)
     """Timing and interval settings."""
 
@@ -208,6 +316,9 @@ class ProxyConfig:
     cache: CacheConfig = field(default_factory=CacheConfig)
     """Attachment cache settings."""
 
+    command_log: CommandLogConfig = field(default_factory=CommandLogConfig)
+    """Audit log settings."""
+
     default_priority: int = 2
     """Default message priority (0=immediate, 1=high, 2=medium, 3=low)."""
 
@@ -225,8 +336,10 @@ class ProxyConfig:
 
 
 __all__ = [
+    "PROXY_ROLES",
     "CacheConfig",
     "ClientSyncConfig",
+    "CommandLogConfig",
     "ConcurrencyConfig",
     "ProxyConfig",
     "QueueConfig",
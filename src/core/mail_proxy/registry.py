@@ -0,0 +1,150 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Precomputed registry of entity Table and Endpoint classes.
+
+MailProxyBase and BaseEndpoint.discover() used to scan the entities/
+packages with pkgutil at every startup. The registry lists the same
+classes as "module:Class" references, so startup imports exactly the
+modules it needs, and composes each CE class with its EE mixin once per
+process (table_classes() and endpoint_classes() are cached).
+
+EE references are optional: when the enterprise package is not
+installed the CE class is used alone.
+
+The TABLES and ENDPOINTS literals are generated from a package scan.
+After adding or renaming an entity, regenerate them with::
+
+    python -m core.mail_proxy.registry
+
+tests/core/mail_proxy/test_registry.py fails when they are out of date.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+from typing import Any
+
+# entity -> (CE class, EE mixin or None), in package scan order
+TABLES: dict[str, tuple[str, str | None]] = {
+    "account": (
+        "core.mail_proxy.entities.account.table:AccountsTable",
+        "enterprise.mail_proxy.entities.account.table_ee:AccountsTable_EE",
+    ),
+    "attachment_blob": (
+        "core.mail_proxy.entities.attachment_blob.table:AttachmentBlobsTable",
+        None,
+    ),
+    "command_log": (
+        "core.mail_proxy.entities.command_log.table:CommandLogTable",
+        None,
+    ),
+    "instance": (
+        "core.mail_proxy.entities.instance.table:InstanceTable",
+        "enterprise.mail_proxy.entities.instance.table_ee:InstanceTable_EE",
+    ),
+    "message": (
+        "core.mail_proxy.entities.message.table:MessagesTable",
+        "enterprise.mail_proxy.entities.message.table_ee:MessagesTable_EE",
+    ),
+    "message_archive": (
+        "core.mail_proxy.entities.message_archive.table:MessageArchiveTable",
+        None,
+    ),
+    "message_event": (
+        "core.mail_proxy.entities.message_event.table:MessageEventTable",
+        None,
+    ),
+    "storage": (
+        "core.mail_proxy.entities.storage.table:StoragesTable",
+        None,
+    ),
+    "tenant": (
+        "core.mail_proxy.entities.tenant.table:TenantsTable",
+        "enterprise.mail_proxy.entities.tenant.table_ee:TenantsTable_EE",
+    ),
+}
+
+ENDPOINTS: dict[str, tuple[str, str | None]] = {
+    "account": (
+        "core.mail_proxy.entities.account.endpoint:AccountEndpoint",
+        "enterprise.mail_proxy.entities.account.endpoint_ee:AccountEndpoint_EE",
+    ),
+    "command_log": (
+        "core.mail_proxy.entities.command_log.endpoint:CommandLogEndpoint",
+        None,
+    ),
+    "instance": (
+        "core.mail_proxy.entities.instance.endpoint:InstanceEndpoint",
+        "enterprise.mail_proxy.entities.instance.endpoint_ee:InstanceEndpoint_EE",
+    ),
+    "message": (
+        "core.mail_proxy.entities.message.endpoint:MessageEndpoint",
+        None,
+    ),
+    "storage": (
+        "core.mail_proxy.entities.storage.endpoint:StorageEndpoint",
+        None,
+    ),
+    "tenant": (
+        "core.mail_proxy.entities.tenant.endpoint:TenantEndpoint",
+        "enterprise.mail_proxy.entities.tenant.endpoint_ee:TenantEndpoint_EE",
+    ),
+}
+
+
+@functools.cache
+def table_classes() -> tuple[type, ...]:
+    """Table classes to register, composed with their EE mixins."""
+    return tuple(_compose(ce_ref, ee_ref) for ce_ref, ee_ref in TABLES.values())
+
+
+@functools.cache
+def endpoint_classes() -> tuple[type, ...]:
+    """Endpoint classes to instantiate, composed with their EE mixins."""
+    return tuple(_compose(ce_ref, ee_ref) for ce_ref, ee_ref in ENDPOINTS.values())
+
+
+def _load(ref: str) -> Any:
+    """Import a "module:Class" reference."""
+    module_name, _, attr = ref.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _compose(ce_ref: str, ee_ref: str | None) -> type:
+    """Load a CE class and put its EE mixin (if installed) first in the MRO."""
+    ce_class = _load(ce_ref)
+    if ee_ref is None:
+        return ce_class
+    try:
+        ee_mixin = _load(ee_ref)
+    except ImportError:
+        return ce_class
+    return type(ce_class.__name__, (ee_mixin, ce_class), {"__module__": ce_class.__module__})
+
+
+def generate() -> str:
+    """Scan the entity packages and return the source of TABLES and ENDPOINTS."""
+    from .interface.endpoint_base import BaseEndpoint
+    from .proxy_base import MailProxyBase
+
+    lines: list[str] = []
+    for var, scanned in (
+        ("TABLES", MailProxyBase.scan_tables()),
+        ("ENDPOINTS", BaseEndpoint.scan()),
+    ):
+        lines.append(f"{var}: dict[str, tuple[str, str | None]] = {{")
+        for entity, (ce_ref, ee_ref) in scanned.items():
+            lines.append(f'    "{entity}": (')
+            lines.append(f'        "{ce_ref}",')
+            lines.append(f'        "{ee_ref}",' if ee_ref else "        None,")
+            lines.append("    ),")
+        lines.append("}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+__all__ = ["ENDPOINTS", "TABLES", "endpoint_classes", "generate", "table_classes"]
+
+
+if __name__ == "__main__":
+    print(generate())
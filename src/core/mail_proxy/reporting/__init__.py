@@ -2,16 +2,18 @@
 """Client reporting subsystem.
 
 This package provides the ClientReporter component for delivery report
-synchronization with upstream clients.
+synchronization with upstream clients, and the RetentionPurger removing
+reported messages once their retention period is over.
 
 Usage:
-    from core.mail_proxy.reporting import ClientReporter
+    from core.mail_proxy.reporting import ClientReporter, RetentionPurger
 
-    # ClientReporter is instantiated by MailProxy
+    # Both are instantiated by MailProxy
     proxy.client_reporter.start()
     proxy.client_reporter.stop()
 """
 
 from .client_reporter import DEFAULT_SYNC_INTERVAL, ClientReporter
+from .retention import RetentionPurger
 
-__all__ = ["ClientReporter", "DEFAULT_SYNC_INTERVAL"]
+__all__ = ["ClientReporter", "DEFAULT_SYNC_INTERVAL", "RetentionPurger"]
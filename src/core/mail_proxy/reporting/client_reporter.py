@@ -5,7 +5,9 @@ This module provides ClientReporter, the component responsible for:
 - Fetching unreported delivery events from message_events table
 - Sending delivery reports to tenant-specific or global sync URLs
 - Handling "do not disturb" schedules via next_sync_after
-- Managing report retention cleanup
+
+Reported messages are removed by RetentionPurger (retention.py), which
+runs on its own schedule.
 
 ClientReporter is instantiated by MailProxy and accessed via proxy.client_reporter.
 
@@ -27,8 +29,6 @@ from collections import defaultdict
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any
 
-import aiohttp
-
 from ..entities.tenant import get_tenant_sync_url
 
 DEFAULT_SYNC_INTERVAL = 300  # 5 minutes
@@ -45,7 +45,6 @@ class ClientReporter:
     - Groups events by tenant and sends to appropriate sync URLs
     - Handles authentication (bearer token, basic auth)
     - Respects "do not disturb" schedules from client responses
-    - Cleans up old reported messages based on retention policy
 
     Attributes:
         proxy: Parent MailProxy instance for accessing db, config, etc.
@@ -101,11 +100,6 @@ class ClientReporter:
         """Batch size via proxy."""
         return self.proxy._smtp_batch_size
 
-    @property
-    def _report_retention_seconds(self) -> int:
-        """Report retention via proxy."""
-        return self.proxy._report_retention_seconds
-
     @property
     def _client_sync_url(self) -> str | None:
         """Global sync URL via proxy."""
@@ -202,6 +196,8 @@ class ClientReporter:
         Returns:
             Total number of messages queued by all clients.
         """
+        import aiohttp
+
         if not self._active:
             return 0
 
@@ -298,7 +294,6 @@ class ClientReporter:
             reported_ts = self._utc_now_epoch()
             await self.db.table("message_events").mark_reported(acked_event_ids, reported_ts)
 
-        await self._apply_retention()
         return total_queued
 
     def _events_to_payloads(self, events: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -341,15 +336,6 @@ class ClientReporter:
 
         return payloads
 
-    async def _apply_retention(self) -> None:
-        """Remove messages with all events reported older than retention period."""
-        if self._report_retention_seconds <= 0:
-            return
-        threshold = self._utc_now_epoch() - self._report_retention_seconds
-        removed = await self.db.table("messages").remove_fully_reported_before(threshold)
-        if removed:
-            await self.proxy._refresh_queue_gauge()
-
     async def _wait_for_wakeup(self, timeout: float | None) -> None:
         """Pause the report loop until timeout or wake event."""
         if self._stop.is_set():
@@ -382,6 +368,8 @@ class ClientReporter:
         Returns:
             Tuple of (message IDs processed, queued count, next_sync_after timestamp or None).
         """
+        import aiohttp
+
         if self._report_delivery_callable is not None:
             if self._log_delivery_activity:
                 batch_size = len(payloads)
@@ -497,6 +485,8 @@ class ClientReporter:
             aiohttp.ClientError: If the HTTP request fails.
             asyncio.TimeoutError: If the request times out.
         """
+        import aiohttp
+
         sync_url = get_tenant_sync_url(tenant)
         if not sync_url:
             raise RuntimeError(f"Tenant {tenant.get('id')} has no sync URL configured")
@@ -0,0 +1,251 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Retention Purger - incremental removal of reported messages.
+
+Messages whose events have all been reported to the client are kept for
+report_retention_seconds and then removed with their events. Doing this
+with one large DELETE holds the database writer for as long as the
+statement runs and blocks dispatch, so RetentionPurger works through the
+messages table in keyset order instead:
+
+- Each transaction scans at most chunk_size messages
+  (MessagesTable.purge_reported_chunk()) and deletes the removable ones
+  together with their message_events rows.
+- A run stops when its time budget is spent. The keyset cursor is kept,
+  and the next run resumes from it.
+- A pass (one scan of the whole table) uses a fixed threshold. When a pass
+  ends, attachment blobs no longer referenced are collected.
+
+On PostgreSQL with time-partitioned tables (ProxyConfig.db_partitioning)
+no rows are deleted: each run creates the upcoming partitions and drops
+(or detaches) the expired partitions of messages and message_events whose
+rows are all removable, which leaves no dead tuples behind.
+
+The purger runs on its own schedule, independent of the report loop:
+every interval seconds when idle, and with a pause of one time budget
+between runs while a pass is in progress.
+
+Example:
+    # RetentionPurger is created and started by MailProxy
+    await proxy.start()
+
+    # Run a purge step now
+    proxy.retention_purger.wake()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..proxy import MailProxy
+
+
+class RetentionPurger:
+    """Background purger of fully reported messages.
+
+    Attributes:
+        proxy: Parent MailProxy instance for accessing db, config, etc.
+        interval: Seconds between runs when no pass is in progress.
+        chunk_size: Messages scanned per transaction.
+        time_budget: Seconds a run may spend before yielding.
+        detach_partitions: Detach expired partitions instead of dropping them.
+    """
+
+    def __init__(
+        self,
+        proxy: MailProxy,
+        interval: float = 60.0,
+        chunk_size: int = 500,
+        time_budget: float = 0.5,
+        detach_partitions: bool = False,
+    ) -> None:
+        """Initialize RetentionPurger.
+
+        Args:
+            proxy: Parent MailProxy instance.
+            interval: Seconds between runs when idle. 0 disables the loop;
+                run_once() can still be called directly.
+            chunk_size: Messages scanned per transaction.
+            time_budget: Seconds per run. At least one chunk is always
+                processed.
+            detach_partitions: On partitioned tables, detach expired
+                partitions (to archive them) instead of dropping them.
+        """
+        self.proxy = proxy
+        self.interval = max(0.0, float(interval))
+        self.chunk_size = max(1, int(chunk_size))
+        self.time_budget = max(0.0, float(time_budget))
+        self.detach_partitions = detach_partitions
+
+        self._task: asyncio.Task | None = None
+        self._stop = asyncio.Event()
+        self._wake_event = asyncio.Event()
+
+        # Pass state: keyset cursor and threshold of the pass in progress
+        self._cursor: str | None = None
+        self._threshold: int | None = None
+        self._pass_removed = 0
+
+    # ----------------------------------------------------------------- properties
+    @property
+    def db(self):
+        """Database access via proxy."""
+        return self.proxy.db
+
+    @property
+    def logger(self):
+        """Logger via proxy."""
+        return self.proxy.logger
+
+    @property
+    def metrics(self):
+        """Prometheus metrics via proxy."""
+        return self.proxy.metrics
+
+    @property
+    def in_progress(self) -> bool:
+        """True while a pass has been started and not finished."""
+        return self._threshold is not None
+
+    # ----------------------------------------------------------------- lifecycle
+    async def start(self) -> None:
+        """Start the background purge loop (no-op when interval is 0)."""
+        if self.interval <= 0:
+            return
+        self._stop.clear()
+        self.logger.debug("Starting RetentionPurger loop...")
+        self._task = asyncio.create_task(self._purge_loop(), name="retention-purger")
+
+    async def stop(self) -> None:
+        """Stop the background purge loop, letting the current chunk finish."""
+        self._stop.set()
+        self._wake_event.set()
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def wake(self) -> None:
+        """Wake the purge loop for an immediate run."""
+        self._wake_event.set()
+
+    # ----------------------------------------------------------------- purge loop
+    async def _purge_loop(self) -> None:
+        """Background loop running purge steps on the purger's own schedule."""
+        while not self._stop.is_set():
+            if self.proxy._test_mode:
+                timeout = math.inf
+            elif self.in_progress:
+                timeout = self.time_budget
+            else:
+                timeout = self.interval
+            await self._wait_for_wakeup(timeout)
+            if self._stop.is_set():
+                break
+            try:
+                await self.run_once()
+            except Exception as exc:  # pragma: no cover - defensive
+                self.logger.exception("Unhandled error in retention purger: %s", exc)
+
+    async def run_once(self) -> int:
+        """Purge chunks until the time budget is spent or the pass ends.
+
+        Returns:
+            Number of messages removed in this run, or of partitions
+            dropped when the tables are partitioned.
+        """
+        retention = self.proxy._report_retention_seconds
+        if retention <= 0 or not self.proxy._active:
+            return 0
+        messages = self.db.table("messages")
+        if self._threshold is None:
+            if await messages.partitions() is not None:
+                return await self._drop_partitions(self.proxy._utc_now_epoch() - retention)
+            self._threshold = self.proxy._utc_now_epoch() - retention
+            self._pass_removed = 0
+
+        started = time.monotonic()
+        removed = events = 0
+        while True:
+            deleted, deleted_events, cursor = await messages.purge_reported_chunk(
+                self._threshold, after_pk=self._cursor or "", limit=self.chunk_size
+            )
+            removed += deleted
+            events += deleted_events
+            self._cursor = cursor
+            if cursor is None or self._stop.is_set():
+                break
+            if time.monotonic() - started >= self.time_budget:
+                break
+            await asyncio.sleep(0)  # Let dispatch run between chunks
+
+        self._pass_removed += removed
+        pass_completed_ts = None
+        if self._cursor is None:
+            await self._finish_pass()
+            pass_completed_ts = time.time()
+        if removed:
+            await self.proxy._refresh_queue_gauge()
+        self.metrics.record_retention_run(
+            removed, events, time.monotonic() - started, pass_completed_ts
+        )
+        return removed
+
+    async def _drop_partitions(self, threshold: int) -> int:
+        """Retention on partitioned tables: add upcoming partitions, drop expired ones."""
+        started = time.monotonic()
+        messages = self.db.table("messages")
+        events = self.db.table("message_events")
+        for table in (messages, events):
+            await table.ensure_partitions()
+        dropped = await messages.drop_reported_partitions(threshold, self.detach_partitions)
+        dropped_events = await events.drop_reported_partitions(threshold, self.detach_partitions)
+        if dropped:
+            await self._collect_blobs(threshold)
+            await self.proxy._refresh_queue_gauge()
+        if dropped or dropped_events:
+            self.logger.info(
+                "Retention dropped partitions: %s", ", ".join(dropped + dropped_events)
+            )
+        self.metrics.record_retention_run(
+            0,
+            0,
+            time.monotonic() - started,
+            time.time(),
+            partitions=len(dropped) + len(dropped_events),
+        )
+        return len(dropped) + len(dropped_events)
+
+    async def _finish_pass(self) -> None:
+        """Collect unreferenced attachment blobs and reset the pass state."""
+        threshold = self._threshold
+        removed = self._pass_removed
+        self._threshold = None
+        self._pass_removed = 0
+        if removed:
+            await self._collect_blobs(threshold)  # type: ignore[arg-type]
+            self.logger.debug("Retention pass removed %d messages", removed)
+
+    async def _collect_blobs(self, threshold: int) -> None:
+        """Remove attachment blobs no longer referenced by any message."""
+        if "attachment_blobs" in self.db.tables:
+            messages = self.db.table("messages")
+            await self.db.table("attachment_blobs").remove_unreferenced(
+                await messages.referenced_blob_md5s(), older_than_ts=threshold
+            )
+
+    async def _wait_for_wakeup(self, timeout: float) -> None:
+        """Pause the purge loop until timeout, wake or stop."""
+        if math.isinf(timeout):
+            await self._wake_event.wait()
+        else:
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=max(0.0, timeout))
+            except asyncio.TimeoutError:
+                return
+        self._wake_event.clear()
+
+
+__all__ = ["RetentionPurger"]
@@ -6,7 +6,15 @@ with ASGI servers like uvicorn, hypercorn, or gunicorn+uvicorn.
 
 Configuration via environment variables:
     GMP_DB_PATH: Database path (SQLite file or PostgreSQL URL)
+    GMP_DB_REPLICAS: Comma-separated PostgreSQL read-replica URLs
+    GMP_DB_PARTITIONING: Time partitioning of large PostgreSQL tables (day or week)
     GMP_API_TOKEN: API authentication token
+    GMP_PAYLOAD_CODEC: Payload compression codec (zlib or zstd; unset stores plain JSON)
+    GMP_COMMAND_LOG_POLICY: Audit log payload policy (full, headers, or digest)
+    GMP_ROLE: Process role (all, api, dispatcher, or reporter)
+    GMP_WAKE_DIR: Wake-up channel directory shared by the processes of a deployment
+    GMP_DISPATCH_PARTITION: Account partition sent by this dispatcher (0-based)
+    GMP_DISPATCH_PARTITIONS: Number of dispatcher processes sharing the accounts
 
 Components:
     app: FastAPI application with full MailProxy lifecycle management.
@@ -18,6 +26,15 @@ Example:
         GMP_DB_PATH=/data/mail.db GMP_API_TOKEN=secret \\
             uvicorn core.mail_proxy.server:app --host 0.0.0.0 --port 8000
 
+    Run stateless API workers next to the background workers::
+
+        GMP_ROLE=api GMP_WAKE_DIR=/run/mail-proxy \\
+            uvicorn core.mail_proxy.server:app --port 8000 --workers 4
+        GMP_ROLE=dispatcher GMP_WAKE_DIR=/run/mail-proxy \\
+            uvicorn core.mail_proxy.server:app --port 8001
+        GMP_ROLE=reporter GMP_WAKE_DIR=/run/mail-proxy \\
+            uvicorn core.mail_proxy.server:app --port 8002
+
     Run with Docker::
 
         docker run -e GMP_DB_PATH=postgresql://... -e GMP_API_TOKEN=secret ...
@@ -41,14 +58,39 @@ Design Decision (2025-02):
 import os
 
 from .proxy import MailProxy
-from .proxy_config import ProxyConfig
+from .proxy_config import CommandLogConfig, ProxyConfig
 
 
 def _config_from_env() -> ProxyConfig:
     """Build ProxyConfig from GMP_* environment variables."""
     db_path = os.environ.get("GMP_DB_PATH", "/data/mail_service.db")
+    db_replicas = [
+        url.strip() for url in os.environ.get("GMP_DB_REPLICAS", "").split(",") if url.strip()
+    ]
+    db_partitioning = os.environ.get("GMP_DB_PARTITIONING") or None
+    archive_path = os.environ.get("GMP_ARCHIVE_PATH") or None
     api_token = os.environ.get("GMP_API_TOKEN")
-    return ProxyConfig(db_path=db_path, api_token=api_token)
+    payload_codec: str | None = os.environ.get("GMP_PAYLOAD_CODEC") or None
+    if payload_codec is not None and payload_codec.lower() == "none":
+        payload_codec = None
+    command_log = CommandLogConfig(policy=os.environ.get("GMP_COMMAND_LOG_POLICY", "full"))
+    role = os.environ.get("GMP_ROLE") or "all"
+    wake_dir = os.environ.get("GMP_WAKE_DIR") or None
+    dispatch_partition = int(os.environ.get("GMP_DISPATCH_PARTITION") or 0)
+    dispatch_partitions = int(os.environ.get("GMP_DISPATCH_PARTITIONS") or 1)
+    return ProxyConfig(
+        db_path=db_path,
+        db_replicas=db_replicas,
+        db_partitioning=db_partitioning,
+        archive_path=archive_path,
+        api_token=api_token,
+        payload_codec=payload_codec,
+        command_log=command_log,
+        role=role,
+        wake_dir=wake_dir,
+        dispatch_partition=dispatch_partition,
+        dispatch_partitions=dispatch_partitions,
+    )
 
 
 # Create proxy and expose its API (includes lifespan management)
@@ -10,6 +10,9 @@ Components:
     RateLimiter: Per-account sliding-window rate limiting.
     RetryStrategy: Configurable retry with exponential backoff.
     AttachmentManager: Multi-backend attachment fetching.
+    ByteBudget: Byte-weighted semaphore bounding in-flight attachment memory.
+    EventWriter: Group-commit writer for delivery events.
+    DispatchPartition: Slice of the accounts dispatched by one process.
     TieredCache: Memory + disk cache for attachment content.
 
 Example:
@@ -32,7 +35,10 @@ Note:
 """
 
 from .attachments import AttachmentManager
+from .budget import ByteBudget
 from .cache import TieredCache
+from .event_writer import EventWriter
+from .partition import DispatchPartition, account_partition
 from .pool import SMTPPool
 from .rate_limiter import RateLimiter
 from .retry import DEFAULT_MAX_RETRIES, DEFAULT_RETRY_DELAYS, RetryStrategy
@@ -48,5 +54,9 @@ __all__ = [
     "AccountConfigurationError",
     "AttachmentTooLargeError",
     "AttachmentManager",
+    "ByteBudget",
+    "EventWriter",
+    "DispatchPartition",
+    "account_partition",
     "TieredCache",
 ]
@@ -11,6 +11,8 @@ Supported fetch_mode values:
 - endpoint: HTTP POST to tenant's attachment URL
 - http_url: Direct HTTP fetch from URL in storage_path
 - base64: Inline base64-encoded content in storage_path
+- blob: Content stored once in the attachment_blobs table, storage_path is
+  ``blob:<md5>`` (written at enqueue time for inline attachments)
 - filesystem: Local filesystem path (absolute or relative to base_dir)
 
 If fetch_mode is not specified, it is inferred from storage_path format:
@@ -26,15 +28,41 @@ import asyncio
 import base64
 import mimetypes
 import re
+from collections.abc import AsyncIterator
 from pathlib import Path
-from typing import Any
-
-import aiohttp
+from typing import TYPE_CHECKING, Any
 
 from .cache import TieredCache
 
+if TYPE_CHECKING:
+    import aiohttp
+
 MD5_MARKER_PATTERN = re.compile(r"\{MD5:([a-fA-F0-9]+)\}")
 
+STREAM_CHUNK_SIZE = 1024 * 1024
+"""Chunk size in bytes used when streaming attachments (1 MB)."""
+
+RANGE_CHUNK_SIZE = 4 * 1024 * 1024
+"""Size in bytes of each HTTP Range request for large downloads (4 MB)."""
+
+RANGE_PARALLELISM = 4
+"""Maximum concurrent Range requests per download."""
+
+RANGE_RETRIES = 3
+"""Attempts per Range request before the download fails."""
+
+CONTENT_RANGE_PATTERN = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class RangeMismatchError(ValueError):
+    """A Range download no longer matches the resource it started on.
+
+    Raised when the origin answers a ranged request with the full body
+    (it ignored Range, or If-Range found the resource changed) or with a
+    range of the wrong size. Retrying the same range cannot succeed, so it
+    is never retried.
+    """
+
 
 class Base64Fetcher:
     """Decoder for base64-encoded inline attachment content."""
@@ -126,6 +154,47 @@ class StorageFetcher:
 
         return await asyncio.to_thread(file_path.read_bytes)
 
+    async def iter_chunks(
+        self, path: str, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Stream file content in chunks, with the same path rules as fetch()."""
+        if not path:
+            raise ValueError("Empty path provided")
+
+        if ":" in path and not path.startswith("/"):
+            if not self._storage_manager:
+                raise ValueError("StorageManager not configured. Cannot resolve mount paths.")
+            node = self._storage_manager.node(path)
+            if not await node.exists():
+                raise FileNotFoundError(f"File not found: {path}")
+            async for chunk in node.iter_bytes(chunk_size):
+                yield chunk
+            return
+
+        if path.startswith("/"):
+            file_path = Path(path).resolve()
+            if not file_path.is_file():
+                raise FileNotFoundError(f"File not found: {file_path}")
+            with file_path.open("rb") as f:
+                while chunk := await asyncio.to_thread(f.read, chunk_size):
+                    yield chunk
+            return
+
+        raise ValueError(f"Invalid path format: '{path}'. Use 'mount:path' or absolute path.")
+
+    async def size(self, path: str) -> int | None:
+        """Return the size in bytes of a stored file, or None if unknown."""
+        try:
+            if ":" in path and not path.startswith("/"):
+                if not self._storage_manager:
+                    return None
+                return await self._storage_manager.node(path).size()
+            if path.startswith("/"):
+                return Path(path).stat().st_size
+        except (OSError, ValueError, NotImplementedError):
+            return None
+        return None
+
     @property
     def storage_manager(self) -> Any:
         """Get the StorageManager instance."""
@@ -133,15 +202,35 @@ class StorageFetcher:
 
 
 class HttpFetcher:
-    """Fetcher for HTTP-served attachments with authentication support."""
+    """Fetcher for HTTP-served attachments with authentication support.
+
+    Direct URL downloads (GET) are requested with a ``Range`` header for
+    the first chunk. If the origin answers ``206 Partial Content`` the
+    remaining chunks are fetched in parallel, each retried independently
+    and sent with ``If-Range`` carrying the first response's validator, so
+    a resource changed mid-download fails with RangeMismatchError instead
+    of mixing versions. When a cache with a disk tier is given, chunks are
+    written there as they arrive, so a download interrupted by a timeout
+    resumes from the chunks already on disk on the next attempt. Origins
+    that ignore ``Range`` answer ``200`` with the full body, which is used
+    as is. Endpoint fetches (POST) are always a single request.
+    """
 
     def __init__(
         self,
         default_endpoint: str | None = None,
         auth_config: dict[str, str] | None = None,
+        cache: TieredCache | None = None,
+        range_chunk_size: int = RANGE_CHUNK_SIZE,
+        range_parallelism: int = RANGE_PARALLELISM,
+        range_retries: int = RANGE_RETRIES,
     ):
         self._default_endpoint = default_endpoint
         self._auth_config = auth_config or {}
+        self._cache = cache
+        self._range_chunk_size = range_chunk_size
+        self._range_parallelism = max(1, range_parallelism)
+        self._range_retries = max(1, range_retries)
 
     def _parse_path(self, path: str) -> tuple[str, str]:
         if path.startswith("["):
@@ -174,22 +263,189 @@ class HttpFetcher:
         return {}
 
     async def fetch(self, path: str, auth_override: dict[str, str] | None = None) -> bytes:
+        import aiohttp
+
         server_url, params = self._parse_path(path)
         headers = self._get_auth_headers(auth_override)
 
         async with aiohttp.ClientSession() as session:
-            if not params:
-                async with session.get(server_url, headers=headers) as response:
-                    response.raise_for_status()
-                    return await response.read()
-            else:
-                async with session.post(
-                    server_url,
-                    json={"storage_path": params},
-                    headers=headers,
-                ) as response:
+            if self._range_chunk_size > 0 and not params:
+                return await self._fetch_ranged(session, server_url, headers)
+            async with self._request(session, server_url, params, headers) as response:
+                response.raise_for_status()
+                return await response.read()
+
+    @staticmethod
+    def _request(
+        session: aiohttp.ClientSession, server_url: str, params: str, headers: dict[str, str]
+    ) -> Any:
+        """GET the URL directly, or POST the storage path to the endpoint."""
+        if not params:
+            return session.get(server_url, headers=headers)
+        return session.post(server_url, json={"storage_path": params}, headers=headers)
+
+    async def _fetch_ranged(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: dict[str, str],
+    ) -> bytes:
+        """Download a URL with parallel, resumable Range requests when supported.
+
+        Chunks are written into a bytearray preallocated from Content-Range,
+        which is returned as is (it supports the bytes operations callers use).
+        """
+        chunk_size = self._range_chunk_size
+        first_headers = {**headers, "Range": f"bytes=0-{chunk_size - 1}"}
+        async with session.get(url, headers=first_headers) as response:
+            response.raise_for_status()
+            if response.status != 206:
+                return await response.read()
+            total = self._parse_content_range(response.headers.get("Content-Range"))
+            validator = self._range_validator(response.headers)
+            first = await response.read()
+
+        if total is None or len(first) >= total:
+            return first
+
+        # Chunks are keyed by source, size and validator: a changed resource never
+        # reuses stale chunks from an earlier interrupted download
+        chunk_store = self._cache if self._cache is not None and self._cache.has_disk else None
+        download_key = TieredCache.compute_md5(f"range:{url}::{total}:{validator or ''}".encode())
+        offsets = list(range(len(first), total, chunk_size))
+        if chunk_store:
+            await chunk_store.set_chunk(download_key, 0, first)
+
+        content = bytearray(total)
+        content[: len(first)] = first
+        if validator:
+            headers = {**headers, "If-Range": validator}
+        semaphore = asyncio.Semaphore(self._range_parallelism)
+
+        async def fetch_chunk(start: int) -> None:
+            end = min(start + chunk_size, total) - 1
+            expected = end - start + 1
+            chunk = None
+            if chunk_store:
+                chunk = await chunk_store.get_chunk(download_key, start)
+            if chunk is None or len(chunk) != expected:
+                async with semaphore:
+                    chunk = await self._fetch_range(session, url, headers, start, end, expected)
+                if chunk_store:
+                    await chunk_store.set_chunk(download_key, start, chunk)
+            content[start : end + 1] = chunk
+
+        try:
+            await asyncio.gather(*[fetch_chunk(start) for start in offsets])
+        except RangeMismatchError:
+            if chunk_store:
+                await chunk_store.discard_chunks(download_key, [0, *offsets])
+            raise
+        if chunk_store:
+            await chunk_store.discard_chunks(download_key, [0, *offsets])
+        return content  # type: ignore[return-value]  # Returned without a bytes() copy
+
+    async def _fetch_range(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: dict[str, str],
+        start: int,
+        end: int,
+        expected: int,
+    ) -> bytes:
+        """Fetch one byte range, retrying transient failures.
+
+        Raises:
+            RangeMismatchError: Without retrying, if the origin answers with
+                the full body or a range of the wrong size.
+        """
+        import aiohttp
+
+        range_headers = {**headers, "Range": f"bytes={start}-{end}"}
+        last_error: Exception | None = None
+        for attempt in range(self._range_retries):
+            if attempt:
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+            try:
+                async with session.get(url, headers=range_headers) as response:
                     response.raise_for_status()
-                    return await response.read()
+                    if response.status != 206:
+                        raise RangeMismatchError(
+                            f"Origin answered {response.status} to Range bytes={start}-{end}: "
+                            "range ignored or resource changed"
+                        )
+                    chunk = await response.read()
+                if len(chunk) != expected:
+                    raise RangeMismatchError(
+                        f"Short range bytes={start}-{end}: got {len(chunk)} bytes"
+                    )
+                return chunk
+            except RangeMismatchError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+                last_error = exc
+        raise ValueError(f"Range bytes={start}-{end} failed: {last_error}") from last_error
+
+    @staticmethod
+    def _range_validator(headers: Any) -> str | None:
+        """Return the validator to send as If-Range: a strong ETag, else Last-Modified."""
+        etag = headers.get("ETag")
+        if etag and not etag.startswith("W/"):
+            return str(etag)
+        last_modified = headers.get("Last-Modified")
+        return str(last_modified) if last_modified else None
+
+    @staticmethod
+    def _parse_content_range(value: str | None) -> int | None:
+        """Return the total length from a Content-Range header, if known."""
+        if not value:
+            return None
+        match = CONTENT_RANGE_PATTERN.match(value)
+        if not match or match.group(3) == "*":
+            return None
+        return int(match.group(3))
+
+    async def iter_chunks(
+        self,
+        path: str,
+        auth_override: dict[str, str] | None = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """Stream the response body in chunks instead of reading it whole."""
+        import aiohttp
+
+        server_url, params = self._parse_path(path)
+        headers = self._get_auth_headers(auth_override)
+
+        async with aiohttp.ClientSession() as session:
+            async with self._request(session, server_url, params, headers) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+
+    async def content_length(
+        self, path: str, auth_override: dict[str, str] | None = None
+    ) -> int | None:
+        """Return the Content-Length announced by a HEAD request, or None.
+
+        Only direct URL paths are probed: endpoint paths are fetched with a
+        POST whose response size cannot be known in advance.
+        """
+        import aiohttp
+
+        server_url, params = self._parse_path(path)
+        if params:
+            return None
+        headers = self._get_auth_headers(auth_override)
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.head(server_url, headers=headers) as response:
+                    if response.status >= 400:
+                        return None
+                    return response.content_length
+        except aiohttp.ClientError:
+            return None
 
     @property
     def default_endpoint(self) -> str | None:
@@ -205,14 +461,17 @@ class AttachmentManager:
         http_endpoint: str | None = None,
         http_auth_config: dict[str, str] | None = None,
         cache: TieredCache | None = None,
+        blob_store: Any = None,
     ):
         self._base64_fetcher = Base64Fetcher()
         self._storage_fetcher = StorageFetcher(storage_manager=storage_manager)
         self._http_fetcher = HttpFetcher(
             default_endpoint=http_endpoint,
             auth_config=http_auth_config,
+            cache=cache,
         )
         self._cache = cache
+        self._blob_store = blob_store
 
     @staticmethod
     def parse_filename(filename: str) -> tuple[str, str | None]:
@@ -256,6 +515,8 @@ class AttachmentManager:
             return ("base64", path)
         if fetch_mode in ("storage", "filesystem"):
             return ("storage", path)
+        if fetch_mode == "blob":
+            return ("blob", path.removeprefix("blob:"))
 
         raise ValueError(f"Unknown fetch_mode: {fetch_mode}")
 
@@ -279,6 +540,14 @@ class AttachmentManager:
             if cached is not None:
                 return cached, clean_filename
 
+        if not cache_key and self._cache:
+            # Content warmed by prefetch() without a declared MD5: consume once
+            source_key = self._source_key(storage_path, fetch_mode)
+            cached = await self._cache.get(source_key)
+            if cached is not None:
+                await self._cache.discard(source_key)
+                return cached, clean_filename
+
         content = await self._fetch_from_backend(
             storage_path, fetch_mode=fetch_mode, auth_override=auth
         )
@@ -291,6 +560,139 @@ class AttachmentManager:
 
         return content, clean_filename
 
+    async def iter_chunks(
+        self, att: dict[str, Any], chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Stream attachment content from its backend in chunks.
+
+        Used for content that must not be fully buffered, such as oversized
+        attachments routed to large-file storage. The cache is bypassed.
+
+        Args:
+            att: Attachment specification, as passed to fetch().
+            chunk_size: Maximum size of each yielded chunk.
+
+        Yields:
+            Consecutive chunks of the attachment content.
+        """
+        storage_path = att.get("storage_path")
+        if not storage_path:
+            raise ValueError("Empty storage_path")
+        path_type, parsed_path = self._parse_storage_path(storage_path, att.get("fetch_mode"))
+
+        if path_type in ("base64", "blob"):
+            content = await self._fetch_from_backend(storage_path, att.get("fetch_mode"))
+            if content:
+                yield content
+            return
+        if path_type == "storage":
+            async for chunk in self._storage_fetcher.iter_chunks(parsed_path, chunk_size):
+                yield chunk
+            return
+        if path_type == "http":
+            async for chunk in self._http_fetcher.iter_chunks(
+                parsed_path, att.get("auth"), chunk_size
+            ):
+                yield chunk
+            return
+        raise ValueError(f"Unknown path type: {path_type}")
+
+    async def estimate_size(self, att: dict[str, Any]) -> int | None:
+        """Estimate the content size of an attachment before fetching it.
+
+        Uses, in order: the declared ``size``, the size of the cached
+        content, the length of inline base64 content, the stored file size
+        for storage paths, and the Content-Length of a HEAD request for
+        direct URLs.
+
+        Args:
+            att: Attachment specification, as passed to fetch().
+
+        Returns:
+            Size in bytes, or None if it cannot be determined cheaply.
+        """
+        declared = att.get("size")
+        if declared is not None:
+            try:
+                return max(0, int(declared))
+            except (TypeError, ValueError):
+                pass
+
+        storage_path = att.get("storage_path")
+        if not storage_path:
+            return None
+
+        if self._cache:
+            _, md5_from_marker = self.parse_filename(att.get("filename", "file.bin"))
+            cache_key = att.get("content_md5") or md5_from_marker
+            cached_size = await self._cache.size(
+                cache_key or self._source_key(storage_path, att.get("fetch_mode"))
+            )
+            if cached_size is not None:
+                return cached_size
+
+        try:
+            path_type, parsed_path = self._parse_storage_path(storage_path, att.get("fetch_mode"))
+        except ValueError:
+            return None
+
+        if path_type == "base64":
+            return len(parsed_path) * 3 // 4
+        if path_type == "storage":
+            return await self._storage_fetcher.size(parsed_path)
+        if path_type == "http":
+            try:
+                return await self._http_fetcher.content_length(parsed_path, att.get("auth"))
+            except ValueError:
+                return None
+        return None
+
+    async def prefetch(self, att: dict[str, Any]) -> int:
+        """Warm the cache with an attachment ahead of its send.
+
+        Attachments with a declared MD5 (``content_md5`` or filename marker)
+        are stored under their content hash as fetch() would. Others are
+        stored only under a key derived from their storage_path, which the
+        next fetch() of the same source consumes once. Inline base64 content
+        is skipped since decoding it needs no I/O.
+
+        Args:
+            att: Attachment specification, as passed to fetch().
+
+        Returns:
+            Number of bytes downloaded, 0 if nothing was fetched.
+        """
+        storage_path = att.get("storage_path")
+        if not storage_path or not self._cache:
+            return 0
+
+        fetch_mode = att.get("fetch_mode")
+        path_type, _ = self._parse_storage_path(storage_path, fetch_mode)
+        if path_type == "base64":
+            return 0
+
+        _, md5_from_marker = self.parse_filename(att.get("filename", "file.bin"))
+        cache_key = att.get("content_md5") or md5_from_marker
+        lookup_key = cache_key or self._source_key(storage_path, fetch_mode)
+        if await self._cache.size(lookup_key) is not None:
+            return 0
+
+        content = await self._fetch_from_backend(
+            storage_path, fetch_mode=fetch_mode, auth_override=att.get("auth")
+        )
+        if content is None:
+            return 0
+
+        await self._cache.set(
+            TieredCache.compute_md5(content) if cache_key else lookup_key, content
+        )
+        return len(content)
+
+    @staticmethod
+    def _source_key(storage_path: str, fetch_mode: str | None) -> str:
+        """Cache key for prefetched content that has no declared MD5."""
+        return TieredCache.compute_md5(f"source:{fetch_mode or ''}:{storage_path}".encode())
+
     async def _fetch_from_backend(
         self,
         storage_path: str,
@@ -308,6 +710,11 @@ class AttachmentManager:
         if path_type == "http":
             return await self._http_fetcher.fetch(parsed_path, auth_override)
 
+        if path_type == "blob":
+            if self._blob_store is None:
+                raise ValueError("Attachment blob store not configured")
+            return await self._blob_store.get_content(parsed_path)
+
         raise ValueError(f"Unknown path type: {path_type}")
 
     @staticmethod
@@ -0,0 +1,131 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Weighted async semaphore bounding in-flight attachment bytes.
+
+A plain ``asyncio.Semaphore`` counts fetches: three 50MB downloads and
+three 10KB downloads occupy the same slots, so memory use is unpredictable
+and small attachments queue behind large ones. ByteBudget admits work
+against a byte capacity instead, each holder reserving the number of bytes
+it expects to keep in memory.
+
+Waiters are served in FIFO order: a reservation that does not fit waits
+behind the earlier ones, and later reservations wait behind it even if they
+would fit, so a large attachment cannot be starved by a stream of small
+ones. A reservation larger than the whole capacity is clamped to it, and is
+therefore admitted only when the budget is idle.
+
+Example:
+    Bound attachment memory to 64MB::
+
+        budget = ByteBudget(64 * 1024 * 1024)
+
+        async with budget.reserve(declared_size):
+            content = await fetch()
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class ByteBudget:
+    """Async semaphore weighted by bytes.
+
+    Attributes:
+        capacity: Total bytes that may be reserved at once.
+        in_use: Bytes currently reserved.
+    """
+
+    def __init__(self, capacity: int):
+        """Initialize the budget.
+
+        Args:
+            capacity: Byte capacity. Must be positive.
+
+        Raises:
+            ValueError: If capacity is not positive.
+        """
+        if capacity <= 0:
+            raise ValueError("ByteBudget capacity must be positive")
+        self.capacity = int(capacity)
+        self.in_use = 0
+        self._waiters: deque[tuple[int, asyncio.Future[None]]] = deque()
+
+    @property
+    def available(self) -> int:
+        """Bytes that can be reserved without waiting."""
+        return self.capacity - self.in_use
+
+    def weight(self, nbytes: int) -> int:
+        """Return the weight actually reserved for a request of nbytes."""
+        return min(max(0, int(nbytes)), self.capacity)
+
+    async def acquire(self, nbytes: int) -> int:
+        """Reserve bytes, waiting until they fit in the budget.
+
+        Args:
+            nbytes: Bytes to reserve. Clamped to [0, capacity].
+
+        Returns:
+            The weight reserved, to be passed back to release().
+        """
+        weight = self.weight(nbytes)
+        if not self._waiters and self.in_use + weight <= self.capacity:
+            self.in_use += weight
+            return weight
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (weight, future)
+        self._waiters.append(entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before cancellation: give the bytes back
+                self.release(weight)
+            raise
+        finally:
+            if entry in self._waiters:
+                # A cancelled head may have been blocking waiters that fit
+                self._waiters.remove(entry)
+                self._admit()
+        return weight
+
+    def release(self, weight: int) -> None:
+        """Return a reservation made with acquire() and admit waiters that now fit."""
+        self.in_use = max(0, self.in_use - weight)
+        self._admit()
+
+    def _admit(self) -> None:
+        """Admit waiters in arrival order, stopping at the first that does not fit."""
+        while self._waiters:
+            waiter_weight, future = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if self.in_use + waiter_weight > self.capacity:
+                return
+            self.in_use += waiter_weight
+            future.set_result(None)
+            self._waiters.popleft()
+
+    @asynccontextmanager
+    async def reserve(self, nbytes: int) -> AsyncIterator[int]:
+        """Context manager holding a reservation for the duration of the block.
+
+        Args:
+            nbytes: Bytes to reserve.
+
+        Yields:
+            The weight reserved.
+        """
+        weight = await self.acquire(nbytes)
+        try:
+            yield weight
+        finally:
+            self.release(weight)
+
+
+__all__ = ["ByteBudget"]
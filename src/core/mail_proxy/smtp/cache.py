@@ -82,6 +82,17 @@ class MemoryCache:
         self._cache[md5_hash] = (content, time.time())
         self._current_bytes += content_size
 
+    def size(self, md5_hash: str) -> int | None:
+        """Return the size of a live entry without reading it, or None."""
+        entry = self._cache.get(md5_hash)
+        if entry is None or time.time() - entry[1] > self._ttl_seconds:
+            return None
+        return len(entry[0])
+
+    def remove(self, md5_hash: str) -> None:
+        """Remove an entry, if present."""
+        self._remove(md5_hash)
+
     def _remove(self, md5_hash: str) -> None:
         if md5_hash in self._cache:
             content, _ = self._cache.pop(md5_hash)
@@ -156,6 +167,16 @@ class DiskCache:
         except OSError:
             return None
 
+    async def size(self, md5_hash: str) -> int | None:
+        """Return the size of a live entry from its file metadata, or None."""
+        try:
+            stat = await asyncio.to_thread(self._file_path(md5_hash).stat)
+        except OSError:
+            return None
+        if time.time() - stat.st_mtime > self._ttl_seconds:
+            return None
+        return stat.st_size
+
     async def set(self, md5_hash: str, content: bytes) -> None:
         content_size = len(content)
 
@@ -169,6 +190,10 @@ class DiskCache:
             file_path.parent.mkdir(parents=True, exist_ok=True)
             await asyncio.to_thread(file_path.write_bytes, content)
 
+    async def remove(self, md5_hash: str) -> None:
+        """Remove an entry file, if present."""
+        await self._remove(md5_hash)
+
     async def _remove(self, md5_hash: str) -> None:
         file_path = self._file_path(md5_hash)
         try:
@@ -319,6 +344,49 @@ class TieredCache:
         elif self._disk:
             await self._disk.set(md5_hash, content)
 
+    async def size(self, md5_hash: str) -> int | None:
+        """Return the size of a cached entry without reading it, or None if not cached."""
+        size = self._memory.size(md5_hash)
+        if size is None and self._disk:
+            size = await self._disk.size(md5_hash)
+        return size
+
+    @property
+    def has_disk(self) -> bool:
+        """True if a disk tier is configured."""
+        return self._disk is not None
+
+    @staticmethod
+    def _chunk_key(md5_hash: str, offset: int) -> str:
+        return f"{md5_hash}.part{offset}"
+
+    async def get_chunk(self, md5_hash: str, offset: int) -> bytes | None:
+        """Read a partial-download chunk from the disk tier.
+
+        Chunks live next to regular entries (same prefix directory), so they
+        share the disk tier's TTL expiry and size limit.
+        """
+        if not self._disk:
+            return None
+        return await self._disk.get(self._chunk_key(md5_hash, offset))
+
+    async def set_chunk(self, md5_hash: str, offset: int, content: bytes) -> None:
+        """Write a partial-download chunk to the disk tier, regardless of size."""
+        if self._disk:
+            await self._disk.set(self._chunk_key(md5_hash, offset), content)
+
+    async def discard_chunks(self, md5_hash: str, offsets: list[int]) -> None:
+        """Remove the chunks of a completed download from the disk tier."""
+        if self._disk:
+            for offset in offsets:
+                await self._disk.remove(self._chunk_key(md5_hash, offset))
+
+    async def discard(self, md5_hash: str) -> None:
+        """Remove an entry from both tiers, if present."""
+        self._memory.remove(md5_hash)
+        if self._disk:
+            await self._disk.remove(md5_hash)
+
     async def cleanup_expired(self) -> tuple[int, int]:
         memory_removed = self._memory.cleanup_expired()
         disk_removed = 0
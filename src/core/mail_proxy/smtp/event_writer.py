@@ -0,0 +1,157 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Group-commit writer for message delivery events.
+
+Recording an outcome with MessageEventTable.add_event() costs an INSERT
+plus a trigger-driven SELECT and UPDATE of the message, each in its own
+transaction. Under load the dispatch workers spend most of their time
+waiting on those small writes.
+
+EventWriter collects the events submitted by all workers for a short
+window (or until a batch is full) and commits them together with
+MessageEventTable.add_events(): one executemany insert and set-based
+message updates in a single transaction.
+
+add_event() returns only after the batch holding the event is committed,
+so callers can rely on the message state (rate limiter accounting, result
+publishing, the report loop) exactly as with a direct write. A failed
+commit is raised to every caller of the batch.
+
+Example:
+    Record outcomes from concurrent workers::
+
+        writer = EventWriter(db, max_batch=500, max_delay=0.005)
+
+        await writer.add_event(pk, "sent", sent_ts)
+
+        await writer.stop()  # Flushes pending events
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from sql import SqlDb
+
+
+class EventWriter:
+    """Batches message events into group commits.
+
+    Attributes:
+        max_batch: Maximum events committed in one transaction.
+        max_delay: Seconds a batch waits for more events before committing.
+    """
+
+    def __init__(self, db: SqlDb, max_batch: int = 500, max_delay: float = 0.005):
+        """Initialize the writer.
+
+        Args:
+            db: Database holding the message_events table.
+            max_batch: Maximum events per commit. Must be positive.
+            max_delay: Collection window in seconds.
+        """
+        self.db = db
+        self.max_batch = max(1, int(max_batch))
+        self.max_delay = max(0.0, float(max_delay))
+        self._pending: list[tuple[dict[str, Any], asyncio.Future[None]]] = []
+        self._has_pending: asyncio.Event | None = None
+        self._batch_full: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._closing = False
+
+    async def add_event(
+        self,
+        message_pk: str,
+        event_type: str,
+        event_ts: int,
+        description: str | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        """Queue an event and wait until it is committed.
+
+        Takes the same arguments as MessageEventTable.add_event().
+
+        Raises:
+            Exception: Whatever the commit of the event's batch raised.
+        """
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        event = {
+            "message_pk": message_pk,
+            "event_type": event_type,
+            "event_ts": event_ts,
+            "description": description,
+            "metadata": metadata,
+        }
+        self._pending.append((event, future))
+        self._ensure_running()
+        self._has_pending.set()  # type: ignore[union-attr]
+        if len(self._pending) >= self.max_batch:
+            self._batch_full.set()  # type: ignore[union-attr]
+        await future
+
+    def _ensure_running(self) -> None:
+        """Start the flush task on first use."""
+        if self._task is not None and not self._task.done():
+            return
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="message-event-writer")
+
+    async def _run(self) -> None:
+        """Commit pending events in batches until stopped."""
+        assert self._has_pending is not None and self._batch_full is not None
+        while self._pending or not self._closing:
+            await self._has_pending.wait()
+            if len(self._pending) < self.max_batch and self.max_delay > 0 and not self._closing:
+                # Collection window: let other workers join this commit
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), timeout=self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush_once()
+
+    async def _flush_once(self) -> None:
+        """Commit up to max_batch pending events and resolve their waiters."""
+        batch = self._pending[: self.max_batch]
+        self._pending = self._pending[self.max_batch :]
+        if self._batch_full is not None and len(self._pending) < self.max_batch:
+            self._batch_full.clear()
+        if self._has_pending is not None and not self._pending:
+            self._has_pending.clear()
+        if not batch:
+            return
+
+        try:
+            await self.db.table("message_events").add_events([event for event, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    async def flush(self) -> None:
+        """Commit every pending event now."""
+        while self._pending:
+            await self._flush_once()
+
+    async def stop(self) -> None:
+        """Commit the remaining events and stop the flush task.
+
+        A batch already being committed is allowed to finish, so no waiter
+        is left unresolved.
+        """
+        self._closing = True
+        if self._task is not None:
+            self._has_pending.set()  # type: ignore[union-attr]
+            self._batch_full.set()  # type: ignore[union-attr]
+            await self._task
+            self._task = None
+        await self.flush()
+        self._closing = False
+
+
+__all__ = ["EventWriter"]
@@ -0,0 +1,94 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Hash partitioning of SMTP accounts between dispatcher processes.
+
+One dispatch loop is bound to one core (MIME building, TLS, JSON). To use
+more, several dispatcher processes run side by side, each owning a stable
+slice of the accounts: account_partition() hashes the account pk, and a
+process only fetches the messages of the accounts it owns.
+
+The hash (account_hash()) is stored in accounts.dispatch_hash, so
+MessagesTable.fetch_ready() selects a partition with a modulo in SQL,
+whatever the number of accounts.
+
+Ownership is decided by the pk alone, so no claim table or lock is needed,
+and all the messages of an account are sent by one process: the in-memory
+RateLimiter and per-account concurrency limits stay correct. Messages
+without an account (sent through the default SMTP server) or whose account
+no longer exists belong to partition 0, so they are never left pending.
+
+Every process of a deployment must use the same partition count; the
+dispatch supervisor (see supervisor.DispatchSupervisor) stops all of them
+before starting them again with a new count.
+
+Example:
+    Dispatcher 1 of 4::
+
+        partition = DispatchPartition(index=1, count=4)
+        partition.owns(account["pk"])
+"""
+
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+
+
+def account_hash(account_pk: str) -> int:
+    """Stable hash of an account pk, stored in accounts.dispatch_hash.
+
+    crc32 is stable across processes and Python versions (unlike hash()),
+    kept to 31 bits to fit a signed INTEGER column on every database.
+    Same as AccountsTable.dispatch_hash().
+    """
+    return zlib.crc32(account_pk.encode()) & 0x7FFFFFFF
+
+
+def account_partition(account_pk: str | None, partitions: int) -> int:
+    """Partition index owning an account.
+
+    Args:
+        account_pk: Account UUID primary key, or None for the default account.
+        partitions: Number of partitions.
+
+    Returns:
+        Index between 0 and partitions - 1.
+    """
+    if account_pk is None or partitions <= 1:
+        return 0
+    return account_hash(account_pk) % partitions
+
+
+@dataclass(frozen=True)
+class DispatchPartition:
+    """Slice of the accounts dispatched by one process.
+
+    Attributes:
+        index: Partition owned by this process (0-based).
+        count: Total number of partitions (dispatcher processes).
+    """
+
+    index: int = 0
+    count: int = 1
+
+    def __post_init__(self) -> None:
+        if self.count < 1:
+            raise ValueError("Dispatch partition count must be at least 1")
+        if not 0 <= self.index < self.count:
+            raise ValueError(f"Dispatch partition {self.index} out of range 0..{self.count - 1}")
+
+    @property
+    def partitioned(self) -> bool:
+        """Whether other processes share the accounts."""
+        return self.count > 1
+
+    @property
+    def owns_unassigned(self) -> bool:
+        """Whether this process sends the messages without an existing account."""
+        return self.index == 0
+
+    def owns(self, account_pk: str | None) -> bool:
+        """Whether this process dispatches the messages of an account."""
+        return account_partition(account_pk, self.count) == self.index
+
+
+__all__ = ["DispatchPartition", "account_hash", "account_partition"]
@@ -26,12 +26,17 @@ import asyncio
 import math
 import uuid
 from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime, timezone
 from email.message import EmailMessage
 from typing import TYPE_CHECKING, Any
 
 from ..entities.tenant import LargeFileAction, get_tenant_attachment_url
 from .attachments import AttachmentManager
+from .budget import ByteBudget
+from .event_writer import EventWriter
+from .partition import DispatchPartition
 from .pool import SMTPPool
 from .rate_limiter import RateLimiter
 from .retry import RetryStrategy
@@ -95,6 +100,8 @@ class SmtpSender:
         proxy: Parent MailProxy instance for accessing db, config, metrics.
         pool: SMTP connection pool for connection reuse.
         rate_limiter: Per-account rate limiting controller.
+        partition: Accounts dispatched by this process (all of them unless
+            several dispatcher processes share the work, see smtp.partition).
     """
 
     def __init__(self, proxy: MailProxy) -> None:
@@ -106,6 +113,7 @@ class SmtpSender:
         self.proxy = proxy
         self.pool = SMTPPool()
         self.rate_limiter = RateLimiter(self)
+        self.partition = DispatchPartition()
 
         # Background task handles
         self._task_dispatch: asyncio.Task | None = None
@@ -195,11 +203,31 @@ class SmtpSender:
         """Attachment semaphore via proxy."""
         return self.proxy._attachment_semaphore
 
+    @property
+    def _attachment_budget(self) -> ByteBudget | None:
+        """Attachment byte budget via proxy."""
+        return self.proxy._attachment_budget
+
+    @property
+    def _event_writer(self) -> EventWriter | None:
+        """Group-commit event writer via proxy."""
+        return self.proxy._event_writer
+
     @property
     def _attachment_cache(self):
         """Attachment cache via proxy."""
         return self.proxy._attachment_cache
 
+    @property
+    def _prefetch_budget_bytes(self) -> int:
+        """Attachment prefetch byte budget via proxy."""
+        return self.proxy._prefetch_budget_bytes
+
+    @property
+    def _prefetch_messages(self) -> int:
+        """Attachment prefetch lookahead size via proxy."""
+        return self.proxy._prefetch_messages
+
     @property
     def _log_delivery_activity(self) -> bool:
         """Log delivery activity flag via proxy."""
@@ -275,6 +303,7 @@ class SmtpSender:
                 if processed:
                     self.logger.debug("Messages sent, triggering client report sync")
                     self.proxy.client_reporter._wake_event.set()
+                    self.db.notify("report")
             except Exception as exc:  # pragma: no cover - defensive
                 self.logger.exception("Unhandled error in SMTP dispatch loop: %s", exc)
                 processed = False
@@ -293,10 +322,11 @@ class SmtpSender:
         """
         now_ts = self._utc_now_epoch()
         processed_any = False
+        owned = self._partition_filter()
 
         # First, process immediate priority messages (priority=0)
         immediate_batch = await self.db.table("messages").fetch_ready(
-            limit=self._smtp_batch_size, now_ts=now_ts, priority=0
+            limit=self._smtp_batch_size, now_ts=now_ts, priority=0, include_payload=False, **owned
         )
         if immediate_batch:
             self.logger.debug(f"Processing {len(immediate_batch)} immediate priority messages")
@@ -305,16 +335,119 @@ class SmtpSender:
 
         # Then, process regular priority messages (priority >= 1)
         regular_batch = await self.db.table("messages").fetch_ready(
-            limit=self._smtp_batch_size, now_ts=now_ts, min_priority=1
+            limit=self._smtp_batch_size,
+            now_ts=now_ts,
+            min_priority=1,
+            include_payload=False,
+            **owned,
         )
         if regular_batch:
             self.logger.debug(f"Processing {len(regular_batch)} regular priority messages")
-            await self._dispatch_batch(regular_batch, now_ts)
+            # Warm the attachment cache for the following batch while this one is sent
+            prefetch_task = None
+            if self._attachment_cache is not None and self._prefetch_budget_bytes > 0:
+                prefetch_task = asyncio.create_task(
+                    self._prefetch_next_batch(now_ts, offset=len(regular_batch), owned=owned),
+                    name="smtp-attachment-prefetch",
+                )
+            try:
+                await self._dispatch_batch(regular_batch, now_ts)
+            finally:
+                if prefetch_task:
+                    await asyncio.gather(prefetch_task, return_exceptions=True)
             processed_any = True
 
         await self.proxy._refresh_queue_gauge()
         return processed_any
 
+    def _partition_filter(self) -> dict[str, Any]:
+        """fetch_ready() arguments restricting a cycle to this process's accounts.
+
+        Empty when this process dispatches every account. Ownership is a
+        modulo of accounts.dispatch_hash evaluated by the query, so new
+        accounts are picked up by their owner without any lookup here.
+        """
+        if not self.partition.partitioned:
+            return {}
+        return {"partition": self.partition.index, "partitions": self.partition.count}
+
+    async def _prefetch_next_batch(
+        self, now_ts: int, offset: int, owned: dict[str, Any] | None = None
+    ) -> int:
+        """Prefetch attachments of the next ready batch into the attachment cache.
+
+        Peeks at the regular-priority messages that follow the batch being
+        dispatched and downloads their attachments until the prefetch byte
+        budget is spent, so that the next cycle's _build_email() is served
+        from the cache instead of waiting on the attachment origin. Only
+        message ids and attachment specifications are read, not payloads.
+
+        Args:
+            now_ts: Current UTC timestamp, as used for the dispatched batch.
+            offset: Number of ready messages already taken by the current batch.
+            owned: Partition filter of the cycle (see _partition_filter()).
+
+        Returns:
+            Total bytes prefetched.
+        """
+        if self._prefetch_messages <= 0:
+            return 0
+        messages = self.db.table("messages")
+        try:
+            upcoming = await messages.fetch_ready(
+                limit=self._prefetch_messages,
+                now_ts=now_ts,
+                min_priority=1,
+                offset=offset,
+                include_payload=False,
+                **(owned or {}),
+            )
+            refs = await messages.fetch_attachment_refs([entry["pk"] for entry in upcoming])
+        except Exception as exc:
+            self.logger.warning("Attachment prefetch lookahead failed: %s", exc)
+            return 0
+
+        budget = self._prefetch_budget_bytes
+        fetched = 0
+        for entry in upcoming:
+            attachments = refs.get(entry["pk"])
+            if not attachments:
+                continue
+            if fetched >= budget or self._stop.is_set():
+                break
+            manager = await self._get_attachment_manager_for_message(entry)
+            results = await asyncio.gather(
+                *[self._prefetch_attachment(att, manager) for att in attachments],
+                return_exceptions=True,
+            )
+            for att, result in zip(attachments, results, strict=True):
+                if isinstance(result, BaseException):
+                    # Not fatal: the attachment is fetched again when the message is sent
+                    self.logger.debug(
+                        "Prefetch of attachment %s failed: %s", att.get("filename"), result
+                    )
+                    continue
+                fetched += result
+
+        if fetched:
+            self.logger.debug(f"Prefetched {fetched} bytes of attachments for next batch")
+        return fetched
+
+    async def _prefetch_attachment(self, att: dict[str, Any], manager: AttachmentManager) -> int:
+        """Prefetch one attachment sharing the fetch admission and timeout limits."""
+        async with self._reserve_attachment_bytes([att], manager):
+            if self._attachment_budget is not None:
+                return await asyncio.wait_for(
+                    manager.prefetch(att), timeout=self._attachment_timeout
+                )
+            semaphore = self._attachment_semaphore or asyncio.Semaphore(
+                self._max_concurrent_attachments
+            )
+            async with semaphore:
+                return await asyncio.wait_for(
+                    manager.prefetch(att), timeout=self._attachment_timeout
+                )
+
     async def _dispatch_batch(self, batch: list[dict[str, Any]], now_ts: int) -> None:
         """Dispatch a batch of messages in parallel with concurrency limits.
 
@@ -361,18 +494,31 @@ class SmtpSender:
             for entry in messages_to_send:
                 all_messages_to_send.append((entry, account_id))
 
+        # Payloads are read only for the messages that passed the account limits
+        all_messages_to_send = await self._load_payloads(all_messages_to_send)
         if not all_messages_to_send:
             return
 
         # Global semaphore to limit overall concurrency
         global_semaphore = asyncio.Semaphore(self._max_concurrent_sends)
 
+        # Claimed messages count as in flight until their outcome is known
+        stats = self.db.table("messages").stats
+        for entry, _ in all_messages_to_send:
+            stats.dispatch_started(entry)
+
         async def dispatch_with_limits(entry: dict, account_id: str) -> None:
             """Dispatch a single message respecting concurrency limits."""
-            account_semaphore = self._get_account_semaphore(account_id)
-            async with global_semaphore, account_semaphore:
-                self.logger.debug(f"Dispatching message {entry.get('id')} for account {account_id}")
-                await self._dispatch_message(entry, now_ts)
+            outcome = None
+            try:
+                account_semaphore = self._get_account_semaphore(account_id)
+                async with global_semaphore, account_semaphore:
+                    self.logger.debug(
+                        f"Dispatching message {entry.get('id')} for account {account_id}"
+                    )
+                    outcome = await self._dispatch_message(entry, now_ts)
+            finally:
+                stats.dispatch_finished(entry.get("pk"), outcome)
 
         # Dispatch all messages in parallel with concurrency limits
         tasks = [dispatch_with_limits(entry, acc_id) for entry, acc_id in all_messages_to_send]
@@ -386,6 +532,38 @@ class SmtpSender:
                     f"Unexpected error dispatching message {entry.get('id')} for account {account_id}: {result}"
                 )
 
+    async def _load_payloads(
+        self, items: list[tuple[dict[str, Any], str]]
+    ) -> list[tuple[dict[str, Any], str]]:
+        """Load in one query the payloads of entries fetched without them.
+
+        Entries whose message was removed since the scheduling query are
+        dropped. Entries that already carry a payload are left untouched.
+
+        Args:
+            items: (entry, account_id) pairs selected for dispatch.
+
+        Returns:
+            The pairs that can be dispatched, with 'message' populated.
+        """
+        missing = [
+            entry["pk"] for entry, _ in items if entry.get("message") is None and entry.get("pk")
+        ]
+        if not missing:
+            return items
+
+        payloads = await self.db.table("messages").fetch_payloads(missing)
+        loaded: list[tuple[dict[str, Any], str]] = []
+        for entry, account_id in items:
+            if entry.get("message") is None and entry.get("pk"):
+                message = payloads.get(entry["pk"])
+                if message is None:
+                    self.logger.debug(f"Message {entry.get('id')} no longer queued, skipping")
+                    continue
+                entry["message"] = message
+            loaded.append((entry, account_id))
+        return loaded
+
     def _get_account_semaphore(self, account_id: str) -> asyncio.Semaphore:
         """Get or create a semaphore for per-account concurrency limiting."""
         if account_id not in self._account_semaphores:
@@ -394,7 +572,7 @@ class SmtpSender:
             )
         return self._account_semaphores[account_id]
 
-    async def _dispatch_message(self, entry: dict[str, Any], now_ts: int) -> None:
+    async def _dispatch_message(self, entry: dict[str, Any], now_ts: int) -> str:
         """Attempt to deliver a single message via SMTP.
 
         Builds the email, resolves the SMTP account, applies rate limits,
@@ -403,6 +581,9 @@ class SmtpSender:
         Args:
             entry: Message entry dict with pk, id, message payload, and metadata.
             now_ts: Current UTC timestamp for error/sent timestamp recording.
+
+        Returns:
+            Outcome of the attempt: "sent", "error" or "deferred".
         """
         pk = entry.get("pk")
         msg_id = entry.get("id")
@@ -417,45 +598,45 @@ class SmtpSender:
             )
         if pk:
             await self.db.table("messages").clear_deferred(pk)
-        try:
-            email_msg, envelope_from = await self._build_email(message)
-        except KeyError as exc:
-            reason = f"missing {exc}"
-            if pk:
-                await self.db.table("message_events").add_event(
-                    pk, "error", now_ts, description=reason
+        # Attachment bytes stay reserved until the built message has been sent
+        async with AsyncExitStack() as reservation:
+            try:
+                email_msg, envelope_from = await self._build_email(message, reservation)
+            except KeyError as exc:
+                reason = f"missing {exc}"
+                if pk:
+                    await self._record_event(pk, "error", now_ts, description=reason)
+                await self._publish_result(
+                    {
+                        "id": msg_id,
+                        "status": "error",
+                        "error": reason,
+                        "timestamp": self._utc_now_iso(),
+                        "account": message.get("account_id"),
+                    }
                 )
-            await self._publish_result(
-                {
-                    "id": msg_id,
-                    "status": "error",
-                    "error": reason,
-                    "timestamp": self._utc_now_iso(),
-                    "account": message.get("account_id"),
-                }
-            )
-            return
-        except ValueError as exc:
-            reason = str(exc)
-            if pk:
-                await self.db.table("message_events").add_event(
-                    pk, "error", now_ts, description=reason
+                return "error"
+            except ValueError as exc:
+                reason = str(exc)
+                if pk:
+                    await self._record_event(pk, "error", now_ts, description=reason)
+                await self._publish_result(
+                    {
+                        "id": msg_id,
+                        "status": "error",
+                        "error": reason,
+                        "timestamp": self._utc_now_iso(),
+                        "account": message.get("account_id"),
+                    }
                 )
-            await self._publish_result(
-                {
-                    "id": msg_id,
-                    "status": "error",
-                    "error": reason,
-                    "timestamp": self._utc_now_iso(),
-                    "account": message.get("account_id"),
-                }
-            )
-            return
+                return "error"
 
-        # Pass entry (with tenant_id, account_id at top level) not just message payload
-        event = await self._send_with_limits(email_msg, envelope_from, pk, msg_id, entry)
-        if event:
-            await self._publish_result(event)
+            # Pass entry (with tenant_id, account_id at top level) not just message payload
+            event = await self._send_with_limits(email_msg, envelope_from, pk, msg_id, entry)
+            if event:
+                await self._publish_result(event)
+                return event["status"]
+            return "deferred"  # Rate limited, retried later
 
     async def _send_with_limits(
         self,
@@ -493,9 +674,7 @@ class SmtpSender:
         except AccountConfigurationError as exc:
             error_ts = self._utc_now_epoch()
             if pk:
-                await self.db.table("message_events").add_event(
-                    pk, "error", error_ts, description=str(exc)
-                )
+                await self._record_event(pk, "error", error_ts, description=str(exc))
             return {
                 "id": msg_id,
                 "status": "error",
@@ -529,7 +708,7 @@ class SmtpSender:
                 )
                 error_ts = self._utc_now_epoch()
                 if pk:
-                    await self.db.table("message_events").add_event(
+                    await self._record_event(
                         pk, "error", error_ts, description="rate_limit_exceeded"
                     )
                 return {
@@ -544,7 +723,7 @@ class SmtpSender:
             # Rate limit hit - defer message for later retry
             if pk:
                 now_ts = self._utc_now_epoch()
-                await self.db.table("message_events").add_event(
+                await self._record_event(
                     pk,
                     "deferred",
                     now_ts,
@@ -586,7 +765,7 @@ class SmtpSender:
                 error_info = f"{exc} (SMTP {smtp_code})" if smtp_code else str(exc)
                 if pk:
                     await self.db.table("messages").update_payload(pk, updated_payload)
-                    await self.db.table("message_events").add_event(
+                    await self._record_event(
                         pk,
                         "deferred",
                         now_ts,
@@ -635,7 +814,7 @@ class SmtpSender:
                     )
 
                 if pk:
-                    await self.db.table("message_events").add_event(
+                    await self._record_event(
                         pk,
                         "error",
                         error_ts,
@@ -656,7 +835,7 @@ class SmtpSender:
 
         sent_ts = self._utc_now_epoch()
         if pk:
-            await self.db.table("message_events").add_event(pk, "sent", sent_ts)
+            await self._record_event(pk, "sent", sent_ts)
         await self.rate_limiter.log_send(resolved_account_id)
         self.metrics.inc_sent(**metric_labels)
         return {
@@ -698,7 +877,9 @@ class SmtpSender:
         raise AccountConfigurationError()
 
     # ----------------------------------------------------------------- email building
-    async def _build_email(self, data: dict[str, Any]) -> tuple[EmailMessage, str]:
+    async def _build_email(
+        self, data: dict[str, Any], reservation: AsyncExitStack | None = None
+    ) -> tuple[EmailMessage, str]:
         """Build an EmailMessage from a message payload.
 
         Constructs headers (From, To, Cc, Bcc, Subject, etc.), sets the body
@@ -706,6 +887,9 @@ class SmtpSender:
 
         Args:
             data: Message payload with from, to, subject, body, attachments, etc.
+            reservation: Exit stack receiving the attachment byte reservation,
+                so that the caller holds it until the message is sent. Without
+                one the reservation is released once the message is built.
 
         Returns:
             Tuple of (EmailMessage, envelope_sender_address).
@@ -761,7 +945,9 @@ class SmtpSender:
 
         attachments = data.get("attachments", []) or []
         if attachments:
-            await self._process_attachments(msg, data, attachments, content_subtype)
+            await self._process_attachments(
+                msg, data, attachments, content_subtype, reservation=reservation
+            )
 
         return msg, envelope_from
 
@@ -771,6 +957,7 @@ class SmtpSender:
         data: dict[str, Any],
         attachments: list[dict[str, Any]],
         content_subtype: str,
+        reservation: AsyncExitStack | None = None,
     ) -> None:
         """Process and attach files to the email message.
 
@@ -779,6 +966,8 @@ class SmtpSender:
             data: Original message payload.
             attachments: List of attachment specifications.
             content_subtype: 'html' or 'plain' for body type.
+            reservation: Exit stack that takes over the attachment byte
+                reservation (see _build_email()).
         """
         # Get tenant configuration for large file handling
         large_file_config = await self._get_large_file_config_for_message(data)
@@ -788,6 +977,142 @@ class SmtpSender:
 
         # Determine which attachment manager to use
         attachment_manager = await self._get_attachment_manager_for_message(data)
+
+        # Probe sizes before downloading: oversized attachments are rejected or
+        # streamed to large-file storage, the rest are admitted by byte budget
+        routing = bool(large_file_config and large_file_config.get("enabled"))
+        sizes: list[int | None] | None = None
+        if routing or self._attachment_budget is not None:
+            sizes = await self._probe_attachment_sizes(attachments, attachment_manager)
+
+        rewritten_attachments: list[dict[str, Any]] = []
+        if routing and sizes is not None:
+            attachments, sizes, rewritten_attachments = await self._route_oversized_attachments(
+                attachments, sizes, attachment_manager, large_file_config, large_file_storage
+            )
+
+        # Content stays in memory until sent, so the whole message is admitted at once
+        async with AsyncExitStack() as local:
+            await (reservation or local).enter_async_context(
+                self._reserve_attachment_bytes(attachments, attachment_manager, sizes)
+            )
+            rewritten_attachments += await self._fetch_and_attach(
+                msg,
+                attachments,
+                attachment_manager,
+                large_file_config,
+                large_file_storage,
+            )
+
+        # If we have rewritten attachments, append download links to the body
+        if rewritten_attachments:
+            self._append_download_links_to_email(msg, rewritten_attachments, content_subtype)
+
+    async def _route_oversized_attachments(
+        self,
+        attachments: list[dict[str, Any]],
+        sizes: list[int | None],
+        manager: AttachmentManager,
+        large_file_config: dict[str, Any],
+        large_file_storage: LargeFileStorage | None,
+    ) -> tuple[list[dict[str, Any]], list[int | None], list[dict[str, Any]]]:
+        """Handle attachments known to exceed max_size_mb before downloading them.
+
+        With action 'reject' the message fails without fetching anything. With
+        action 'rewrite' the content is streamed chunk by chunk from its origin
+        into large-file storage, so it is never fully held in memory. If the
+        upload fails the message fails too (see _stream_to_large_file_storage).
+
+        Returns:
+            Tuple of (remaining attachments, their sizes, rewritten link entries).
+        """
+        max_size_mb = large_file_config.get("max_size_mb", 10.0)
+        action = large_file_config.get("action", "warn")
+        remaining: list[dict[str, Any]] = []
+        remaining_sizes: list[int | None] = []
+        rewritten: list[dict[str, Any]] = []
+
+        for att, size in zip(attachments, sizes, strict=True):
+            size_mb = (size or 0) / (1024 * 1024)
+            if size is None or size_mb <= max_size_mb:
+                remaining.append(att)
+                remaining_sizes.append(size)
+                continue
+            filename, _ = manager.parse_filename(att.get("filename", "file.bin"))
+            if action == LargeFileAction.REJECT.value:
+                raise AttachmentTooLargeError(filename, size_mb, max_size_mb)
+            if action == LargeFileAction.REWRITE.value and large_file_storage:
+                rewritten.append(
+                    await self._stream_to_large_file_storage(
+                        att, filename, size_mb, manager, large_file_config, large_file_storage
+                    )
+                )
+                continue
+            remaining.append(att)
+            remaining_sizes.append(size)
+
+        return remaining, remaining_sizes, rewritten
+
+    async def _stream_to_large_file_storage(
+        self,
+        att: dict[str, Any],
+        filename: str,
+        size_mb: float,
+        manager: AttachmentManager,
+        large_file_config: dict[str, Any],
+        large_file_storage: LargeFileStorage,
+    ) -> dict[str, Any]:
+        """Stream an attachment from its origin into large-file storage.
+
+        The attachment is known to be too large to buffer, so a failed upload
+        is not retried by fetching it whole: the message fails. Whatever was
+        written of the object is deleted, also when the send is cancelled.
+
+        Returns:
+            Download link entry.
+
+        Raises:
+            ValueError: If the upload fails or times out.
+        """
+        import aiohttp
+
+        file_id = str(uuid.uuid4())
+        uploaded = False
+        try:
+            await asyncio.wait_for(
+                large_file_storage.upload_stream(file_id, manager.iter_chunks(att), filename),
+                timeout=self._attachment_timeout,
+            )
+            ttl_days = large_file_config.get("file_ttl_days", 30)
+            download_url = large_file_storage.get_download_url(
+                file_id, filename, expires_in=ttl_days * 86400
+            )
+            uploaded = True
+        except (LargeFileStorageError, asyncio.TimeoutError, aiohttp.ClientPayloadError) as e:
+            self.logger.error("Failed to stream large attachment %s: %s", filename, e)
+            raise ValueError(f"Large attachment {filename} could not be stored: {e}") from e
+        except asyncio.CancelledError:
+            self.logger.warning("Streaming of large attachment %s cancelled", filename)
+            raise
+        finally:
+            if not uploaded:
+                await asyncio.shield(large_file_storage.delete(file_id, filename))
+        self.logger.info("Large attachment %s (%.1f MB) streamed to storage", filename, size_mb)
+        return {"filename": filename, "size_mb": size_mb, "url": download_url}
+
+    async def _fetch_and_attach(
+        self,
+        msg: EmailMessage,
+        attachments: list[dict[str, Any]],
+        attachment_manager: AttachmentManager,
+        large_file_config: dict[str, Any] | None,
+        large_file_storage: LargeFileStorage | None,
+    ) -> list[dict[str, Any]]:
+        """Fetch attachments and add them to the message.
+
+        Returns:
+            Download link entries for attachments uploaded to large-file storage.
+        """
         results = await asyncio.gather(
             *[self._fetch_attachment_with_timeout(att, attachment_manager) for att in attachments],
             return_exceptions=True,
@@ -866,9 +1191,7 @@ class SmtpSender:
                     content, maintype=maintype, subtype=subtype, filename=resolved_filename
                 )
 
-        # If we have rewritten attachments, append download links to the body
-        if rewritten_attachments:
-            self._append_download_links_to_email(msg, rewritten_attachments, content_subtype)
+        return rewritten_attachments
 
     def _append_download_links_to_email(
         self,
@@ -980,28 +1303,107 @@ class SmtpSender:
             http_endpoint=tenant_attachment_url,
             http_auth_config=http_auth_config,
             cache=self._attachment_cache,
+            blob_store=self.db.table("attachment_blobs"),
         )
 
+    @asynccontextmanager
+    async def _reserve_attachment_bytes(
+        self,
+        attachments: list[dict[str, Any]],
+        manager: AttachmentManager,
+        sizes: list[int | None] | None = None,
+    ) -> AsyncIterator[None]:
+        """Hold the attachment byte budget for a set of attachments.
+
+        The reservation is the sum of the attachment weights, taken in a single
+        acquire so that a message never holds part of the budget while
+        waiting for the rest. Without a budget this is a no-op and fetches
+        are limited by count in _fetch_attachment_with_timeout().
+
+        Args:
+            attachments: Attachment specifications.
+            manager: AttachmentManager used to probe sizes.
+            sizes: Already probed sizes, aligned with attachments.
+        """
+        budget = self._attachment_budget
+        if budget is None:
+            yield
+            return
+        if sizes is None:
+            sizes = await self._probe_attachment_sizes(attachments, manager)
+        total = sum(self._attachment_weight(size) for size in sizes)
+        async with budget.reserve(total):
+            yield
+
+    async def _probe_attachment_sizes(
+        self, attachments: list[dict[str, Any]], manager: AttachmentManager
+    ) -> list[int | None]:
+        """Probe the sizes of a message's attachments concurrently.
+
+        Declared and cached sizes are resolved without I/O; only the others
+        cost a stat or a HEAD request, and those run in parallel.
+        """
+        return list(
+            await asyncio.gather(
+                *[self._probe_attachment_size(att, manager) for att in attachments]
+            )
+        )
+
+    async def _probe_attachment_size(
+        self, att: dict[str, Any], manager: AttachmentManager
+    ) -> int | None:
+        """Return the size of an attachment before fetching it, or None if unknown.
+
+        Uses the declared size, base64 length, storage size or HEAD Content-Length.
+        """
+        try:
+            return await asyncio.wait_for(
+                manager.estimate_size(att), timeout=self._attachment_timeout
+            )
+        except Exception:
+            return None
+
+    def _attachment_weight(self, size: int | None) -> int:
+        """Return the budget weight of an attachment of the given size.
+
+        Attachments of unknown size weigh an equal share of the budget per
+        max_attachments, matching the old count-based limit.
+        """
+        if size is not None:
+            return size
+        budget = self._attachment_budget
+        capacity = budget.capacity if budget is not None else 0
+        return capacity // max(1, self._max_concurrent_attachments)
+
     async def _fetch_attachment_with_timeout(
         self,
         att: dict[str, Any],
         attachment_manager: AttachmentManager | None = None,
     ) -> tuple[bytes, str] | None:
-        """Fetch an attachment using the configured timeout budget."""
+        """Fetch an attachment using the configured timeout budget.
+
+        When a byte budget is configured admission is handled by the caller
+        (see _reserve_attachment_bytes), otherwise fetches are limited by count.
+        """
         manager = attachment_manager or self.attachments
+        if self._attachment_budget is not None:
+            return await self._fetch_with_timeout(att, manager)
         semaphore = self._attachment_semaphore or asyncio.Semaphore(
             self._max_concurrent_attachments
         )
         async with semaphore:
-            try:
-                result = await asyncio.wait_for(
-                    manager.fetch(att), timeout=self._attachment_timeout
-                )
-            except asyncio.TimeoutError as exc:
-                raise TimeoutError(
-                    f"Attachment {att.get('filename', 'file.bin')} fetch timed out"
-                ) from exc
-            return result
+            return await self._fetch_with_timeout(att, manager)
+
+    async def _fetch_with_timeout(
+        self, att: dict[str, Any], manager: AttachmentManager
+    ) -> tuple[bytes, str] | None:
+        """Run manager.fetch() under the attachment timeout."""
+        try:
+            return await asyncio.wait_for(manager.fetch(att), timeout=self._attachment_timeout)
+        except asyncio.TimeoutError as exc:
+            raise TimeoutError(
+                f"Attachment {att.get('filename', 'file.bin')} fetch timed out"
+            ) from exc
 
     # ----------------------------------------------------------------- cleanup loop
     async def _cleanup_loop(self) -> None:
@@ -1049,6 +1451,25 @@ class SmtpSender:
             return
         self._wake_event.clear()
 
+    async def _record_event(
+        self,
+        pk: str,
+        event_type: str,
+        event_ts: int,
+        description: str | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        """Record a delivery event, batched through the event writer when enabled.
+
+        Returns once the event and the resulting message state are committed.
+        """
+        if self._event_writer is not None:
+            await self._event_writer.add_event(pk, event_type, event_ts, description, metadata)
+            return
+        await self.db.table("message_events").add_event(
+            pk, event_type, event_ts, description=description, metadata=metadata
+        )
+
     async def _publish_result(self, event: dict[str, Any]) -> None:
         """Publish a delivery event to the result queue."""
         await self.proxy._publish_result(event)
@@ -0,0 +1,232 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Supervisor of partitioned dispatcher processes.
+
+`mail-proxy serve --role dispatcher --workers N` runs DispatchSupervisor
+instead of uvicorn. It starts N headless dispatcher processes, worker i
+owning partition i of N of the accounts (see smtp.partition), and:
+
+- restarts a worker that exits, on the same partition;
+- changes the number of workers on SIGTTIN (one more) and SIGTTOU (one
+  less), as gunicorn does;
+- stops the workers on SIGTERM or SIGINT.
+
+A change of the worker count changes the owner of most accounts, so the
+supervisor stops every worker before starting the new set: two processes
+never dispatch the same account, and the per-account rate limits of each
+worker stay correct. Messages are only delayed during the switch.
+
+Workers are configured through the GMP_* environment variables read by
+server.py, plus GMP_DISPATCH_PARTITION and GMP_DISPATCH_PARTITIONS. A
+worker process runs this module::
+
+    GMP_ROLE=dispatcher GMP_DISPATCH_PARTITION=1 GMP_DISPATCH_PARTITIONS=4 \\
+        python -m core.mail_proxy.supervisor
+
+Example:
+    Run four dispatchers until SIGTERM::
+
+        DispatchSupervisor(4).run()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from collections.abc import Mapping, Sequence
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .proxy import MailProxy
+
+logger = logging.getLogger(__name__)
+
+WORKER_COMMAND = (sys.executable, "-m", "core.mail_proxy.supervisor")
+
+
+class DispatchSupervisor:
+    """Start, restart and rebalance the dispatcher processes of a deployment.
+
+    Attributes:
+        workers: Number of dispatcher processes (and account partitions).
+        env: Environment of the workers, without the partition variables.
+        command: Command line of a worker process.
+        stop_timeout: Seconds a worker has to finish its batch when stopped.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        env: Mapping[str, str] | None = None,
+        command: Sequence[str] = WORKER_COMMAND,
+        stop_timeout: float = 30.0,
+    ):
+        """Initialize the supervisor.
+
+        Args:
+            workers: Number of dispatcher processes. Must be at least 1.
+            env: Environment of the workers. Defaults to os.environ.
+            command: Command line of a worker process.
+            stop_timeout: Seconds to wait for a worker before killing it.
+
+        Raises:
+            ValueError: If workers is less than 1.
+        """
+        if workers < 1:
+            raise ValueError("DispatchSupervisor needs at least one worker")
+        self.workers = workers
+        self.env = dict(os.environ if env is None else env)
+        self.command = list(command)
+        self.stop_timeout = stop_timeout
+        self._processes: dict[int, subprocess.Popen[bytes]] = {}
+        self._target = workers
+        self._stopping = False
+
+    @property
+    def pids(self) -> dict[int, int]:
+        """Partition index -> pid of the running workers."""
+        return {index: proc.pid for index, proc in self._processes.items()}
+
+    def worker_env(self, index: int) -> dict[str, str]:
+        """Environment of the worker owning partition index."""
+        return {
+            **self.env,
+            "GMP_ROLE": "dispatcher",
+            "GMP_DISPATCH_PARTITION": str(index),
+            "GMP_DISPATCH_PARTITIONS": str(self.workers),
+        }
+
+    def start(self) -> None:
+        """Start the workers that are not running."""
+        for index in range(self.workers):
+            if index not in self._processes:
+                self._spawn(index)
+
+    def stop(self) -> None:
+        """Stop all the workers: SIGTERM, then SIGKILL after stop_timeout."""
+        processes = list(self._processes.values())
+        self._processes.clear()
+        for proc in processes:
+            if proc.poll() is None:
+                proc.terminate()
+        deadline = time.monotonic() + self.stop_timeout
+        for proc in processes:
+            try:
+                proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                logger.warning("Dispatcher %s did not stop in time, killing it", proc.pid)
+                proc.kill()
+                proc.wait()
+
+    def resize(self, workers: int) -> None:
+        """Rebalance the accounts over a new number of workers.
+
+        Every worker is stopped before the new set starts, so that no
+        account is ever owned by two processes.
+
+        Args:
+            workers: New number of workers (at least 1).
+        """
+        workers = max(1, workers)
+        self._target = workers  # SIGTTIN/SIGTTOU received meanwhile apply on top
+        if workers == self.workers and len(self._processes) == workers:
+            return
+        logger.info("Rebalancing dispatch from %d to %d workers", self.workers, workers)
+        self.stop()
+        self.workers = workers
+        self.start()
+
+    def check(self) -> int:
+        """Restart the workers that exited.
+
+        Returns:
+            Number of workers restarted.
+        """
+        restarted = 0
+        for index, proc in list(self._processes.items()):
+            code = proc.poll()
+            if code is None:
+                continue
+            logger.warning(
+                "Dispatcher %d/%d (pid %s) exited with code %s, restarting",
+                index,
+                self.workers,
+                proc.pid,
+                code,
+            )
+            del self._processes[index]
+            self._spawn(index)
+            restarted += 1
+        return restarted
+
+    def run(self, poll_interval: float = 1.0) -> None:
+        """Supervise the workers until SIGTERM or SIGINT.
+
+        Args:
+            poll_interval: Seconds between two checks of the workers.
+        """
+        handlers = {
+            signal.SIGTERM: self._on_stop,
+            signal.SIGINT: self._on_stop,
+        }
+        if hasattr(signal, "SIGTTIN"):
+            handlers[signal.SIGTTIN] = self._on_more
+            handlers[signal.SIGTTOU] = self._on_less
+        previous = {sig: signal.signal(sig, handler) for sig, handler in handlers.items()}
+        self._stopping = False
+        try:
+            self.start()
+            while not self._stopping:
+                if self._target != self.workers:
+                    self.resize(self._target)
+                self.check()
+                time.sleep(poll_interval)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            self.stop()
+
+    def _spawn(self, index: int) -> None:
+        proc = subprocess.Popen(self.command, env=self.worker_env(index))
+        self._processes[index] = proc
+        logger.info("Started dispatcher %d/%d (pid %s)", index, self.workers, proc.pid)
+
+    def _on_stop(self, signum: int, frame: object) -> None:
+        self._stopping = True
+
+    def _on_more(self, signum: int, frame: object) -> None:
+        self._target += 1
+
+    def _on_less(self, signum: int, frame: object) -> None:
+        self._target = max(1, self._target - 1)
+
+
+async def serve_worker(proxy: MailProxy) -> None:
+    """Run a headless proxy (no API) until SIGTERM or SIGINT."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    await proxy.start()
+    try:
+        await stop.wait()
+    finally:
+        await proxy.stop()
+
+
+def run_worker() -> None:
+    """Run one dispatcher process configured by the GMP_* environment variables."""
+    from .server import _proxy
+
+    asyncio.run(serve_worker(_proxy))
+
+
+__all__ = ["DispatchSupervisor", "WORKER_COMMAND", "run_worker", "serve_worker"]
+
+
+if __name__ == "__main__":
+    run_worker()
@@ -0,0 +1,126 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Cross-process wake-up channel between process roles.
+
+When the proxy runs as separate processes (see ProxyConfig.role), the
+API workers write messages that a dispatcher process sends and a reporter
+process reports. Their loops poll the database anyway; WakeChannel only
+cuts the latency by telling them right away that there is work.
+
+The channel is a directory of Unix datagram sockets, one per listening
+process (``<role>-<pid>.sock``). send() writes a tiny datagram to every
+socket but its own and never blocks: a full or vanished listener is
+skipped (and its stale socket file removed), since missing a wake-up
+only delays work to the next poll.
+
+Messages are ``<target>\\n<key>``, where target is "dispatch" or
+"report" and key an optional tenant id.
+
+Example:
+    Wake the dispatcher from an API worker::
+
+        channel = WakeChannel("/run/mail-proxy/wake")
+        await channel.listen("dispatcher", on_wake)  # in the dispatcher
+        channel.send("dispatch")                     # in an API worker
+        channel.close()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+from collections.abc import Callable
+from pathlib import Path
+
+WakeCallback = Callable[[str, str | None], None]
+
+
+class _WakeProtocol(asyncio.DatagramProtocol):
+    def __init__(self, callback: WakeCallback):
+        self._callback = callback
+
+    def datagram_received(self, data: bytes, addr: object) -> None:
+        target, _, key = data.decode(errors="replace").partition("\n")
+        self._callback(target, key or None)
+
+
+class WakeChannel:
+    """Directory of Unix datagram sockets used to wake other processes.
+
+    Attributes:
+        directory: Directory shared by all processes of one deployment.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str]):
+        self.directory = Path(directory)
+        self._path: Path | None = None
+        self._transport: asyncio.DatagramTransport | None = None
+        self._sock: socket.socket | None = None
+
+    @staticmethod
+    def supported() -> bool:
+        """Whether the platform has Unix datagram sockets."""
+        return hasattr(socket, "AF_UNIX")
+
+    async def listen(self, name: str, callback: WakeCallback) -> None:
+        """Start receiving wake-ups.
+
+        Args:
+            name: Socket name prefix, usually the process role.
+            callback: Called with (target, key) for every wake-up received.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._path = self.directory / f"{name}-{os.getpid()}.sock"
+        self._path.unlink(missing_ok=True)
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _WakeProtocol(callback),
+            local_addr=str(self._path),  # type: ignore[arg-type]
+            family=socket.AF_UNIX,
+        )
+
+    def send(self, target: str, key: str | None = None) -> int:
+        """Wake the other listening processes.
+
+        Args:
+            target: What to wake ("dispatch" or "report").
+            key: Optional tenant id.
+
+        Returns:
+            Number of processes notified.
+        """
+        try:
+            paths = [p for p in self.directory.glob("*.sock") if p != self._path]
+        except OSError:
+            return 0
+        if not paths:
+            return 0
+        if self._sock is None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+        data = f"{target}\n{key or ''}".encode()
+        sent = 0
+        for path in paths:
+            try:
+                self._sock.sendto(data, str(path))
+                sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                path.unlink(missing_ok=True)  # Listener is gone
+            except OSError:
+                pass  # Listener busy: it is awake already
+        return sent
+
+    def close(self) -> None:
+        """Stop listening and remove this process's socket."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._path is not None:
+            self._path.unlink(missing_ok=True)
+            self._path = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+__all__ = ["WakeChannel"]
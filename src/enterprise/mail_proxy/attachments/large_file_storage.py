@@ -26,6 +26,7 @@ Example:
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import hmac
 import logging
@@ -34,6 +35,8 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from fsspec import AbstractFileSystem
 
 logger = logging.getLogger(__name__)
@@ -154,20 +157,80 @@ class LargeFileStorage:
         path = self._get_file_path(file_id, filename)
 
         try:
-            # Ensure parent directory exists
-            parent = f"{self.base_path}/{file_id}"
-            self.fs.makedirs(parent, exist_ok=True)
-
-            # Upload file
-            with self.fs.open(path, "wb") as f:
-                f.write(content)
-
+            await asyncio.to_thread(self._write_file, file_id, path, content)
             logger.info(f"Uploaded {len(content)} bytes to {path}")
             return path
 
         except Exception as e:
             raise UploadError(f"Failed to upload {filename} to {path}: {e}") from e
 
+    def _write_file(self, file_id: str, path: str, content: bytes) -> None:
+        """Create the file_id directory and write content (runs in a thread)."""
+        self.fs.makedirs(f"{self.base_path}/{file_id}", exist_ok=True)
+        with self.fs.open(path, "wb") as f:
+            f.write(content)
+
+    async def upload_stream(self, file_id: str, chunks: AsyncIterator[bytes], filename: str) -> str:
+        """Upload a file to storage from a stream of chunks.
+
+        Each chunk is written as soon as it arrives, so the content is never
+        held in memory as a whole. Storage calls run in a worker thread, off
+        the event loop. A partially written file is removed if the stream or
+        the write fails, or if the upload is cancelled (e.g. by a timeout).
+
+        Args:
+            file_id: Unique identifier for this file (e.g., UUID).
+            chunks: Async iterator yielding the file content.
+            filename: Original filename.
+
+        Returns:
+            The storage path where the file was uploaded.
+
+        Raises:
+            UploadError: If reading the stream or writing to storage fails.
+        """
+        path = self._get_file_path(file_id, filename)
+        written = 0
+        completed = False
+
+        try:
+            parent = f"{self.base_path}/{file_id}"
+            await asyncio.to_thread(self.fs.makedirs, parent, exist_ok=True)
+
+            f = await asyncio.to_thread(self.fs.open, path, "wb")
+            try:
+                async for chunk in chunks:
+                    await asyncio.to_thread(f.write, chunk)
+                    written += len(chunk)
+            except BaseException:
+                # Abort instead of committing a partial object where supported
+                await asyncio.shield(asyncio.to_thread(getattr(f, "discard", f.close)))
+                raise
+            await asyncio.to_thread(f.close)
+            completed = True
+
+            logger.info(f"Streamed {written} bytes to {path}")
+            return path
+
+        except Exception as e:
+            raise UploadError(f"Failed to stream {filename} to {path}: {e}") from e
+
+        finally:
+            if not completed:
+                await asyncio.shield(asyncio.to_thread(self._remove_file, path))
+
+    async def delete(self, file_id: str, filename: str) -> None:
+        """Remove a stored file, if present. Failures are logged, not raised."""
+        await asyncio.to_thread(self._remove_file, self._get_file_path(file_id, filename))
+
+    def _remove_file(self, path: str) -> None:
+        """Remove a file if it exists, logging failures (runs in a thread)."""
+        try:
+            if self.fs.exists(path):
+                self.fs.rm(path)
+        except Exception as e:
+            logger.warning(f"Failed to remove {path}: {e}")
+
     def get_download_url(self, file_id: str, filename: str, expires_in: int = 86400) -> str:
         """Generate a download URL for a file.
 
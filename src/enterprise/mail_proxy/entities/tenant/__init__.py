@@ -7,6 +7,7 @@ support including tenant CRUD operations and API key management.
 Components:
     TenantsTable_EE: Mixin adding tenant management methods.
     TenantEndpoint_EE: Mixin adding tenant management API.
+    TokenCache: In-process cache of API token verifications.
 
 Example:
     Create a new tenant with API key::
@@ -25,5 +26,6 @@ Note:
 
 from .endpoint_ee import TenantEndpoint_EE
 from .table_ee import TenantsTable_EE
+from .token_cache import TokenCache
 
-__all__ = ["TenantEndpoint_EE", "TenantsTable_EE"]
+__all__ = ["TenantEndpoint_EE", "TenantsTable_EE", "TokenCache"]
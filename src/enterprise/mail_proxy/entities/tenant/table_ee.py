@@ -8,6 +8,7 @@ and API key authentication.
 Multi-tenant features:
 - Tenant CRUD operations (add, list, update, remove)
 - Tenant API key management for scoped authentication
+- Cached token verification (see token_cache.TokenCache)
 
 Note: Batch suspension is available in CE (core/tenant/table.py).
 
@@ -23,6 +24,8 @@ import secrets
 from datetime import datetime, timezone
 from typing import Any
 
+from .token_cache import TokenCache
+
 
 class TenantsTable_EE:
     """Enterprise Edition: Multi-tenant management.
@@ -30,8 +33,16 @@ class TenantsTable_EE:
     Adds methods for:
     - Creating and managing multiple tenants
     - Tenant API key authentication
+
+    Attributes:
+        token_cache: Results of get_tenant_by_token(), invalidated by the
+            methods changing keys or tenants.
     """
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.token_cache = TokenCache()
+
     async def add(self, tenant: dict[str, Any]) -> str:
         """Insert or update a tenant configuration.
 
@@ -64,6 +75,7 @@ class TenantsTable_EE:
                 rec["rate_limits"] = tenant.get("rate_limits")
                 rec["large_file_config"] = tenant.get("large_file_config")
                 rec["active"] = 1 if tenant.get("active", True) else 0
+            self.token_cache.invalidate_tenant(tenant_id)
             return ""  # Key unchanged
 
         # New tenant - generate API key
@@ -84,6 +96,7 @@ class TenantsTable_EE:
                 "api_key_hash": key_hash,
             }
         )
+        self.token_cache.discard(key_hash)
         return raw_key
 
     async def list_all(self, active_only: bool = False) -> list[dict[str, Any]]:
@@ -133,6 +146,7 @@ class TenantsTable_EE:
                     "client_attachment_path",
                 ):
                     rec[key] = value
+        self.token_cache.invalidate_tenant(tenant_id)
         return True
 
     async def remove(self, tenant_id: str) -> bool:
@@ -159,6 +173,7 @@ class TenantsTable_EE:
         )
         # Delete the tenant
         rowcount = await self.delete(where={"id": tenant_id})  # type: ignore[attr-defined]
+        self.token_cache.invalidate_tenant(tenant_id)
         return rowcount > 0
 
     # ----------------------------------------------------------------- API Keys
@@ -193,13 +208,16 @@ class TenantsTable_EE:
             """,
             {"tenant_id": tenant_id, "key_hash": key_hash, "expires_at": expires_at},
         )
+        self.token_cache.invalidate_tenant(tenant_id)
+        self.token_cache.discard(key_hash)
         return raw_key
 
     async def get_tenant_by_token(self, raw_key: str) -> dict[str, Any] | None:
         """Find tenant by API key token.
 
         Looks up the tenant associated with the given API key.
-        Validates that the key has not expired.
+        Validates that the key has not expired. Results, valid or not,
+        are served from token_cache while fresh.
 
         Args:
             raw_key: The raw API key to look up.
@@ -208,30 +226,39 @@ class TenantsTable_EE:
             Tenant dict if found and not expired, None otherwise.
         """
         key_hash = hashlib.sha256(raw_key.encode()).hexdigest()
+        found, cached = self.token_cache.get(key_hash)
+        if found:
+            return cached
+
         tenant = await self.fetch_one(  # type: ignore[attr-defined]
             "SELECT * FROM tenants WHERE api_key_hash = :key_hash",
             {"key_hash": key_hash},
         )
         if not tenant:
+            self.token_cache.set_invalid(key_hash)
             return None
 
-        expires_at = tenant.get("api_key_expires_at")
-        if expires_at:
-            # Handle both datetime (PostgreSQL) and int (SQLite) types
-            if isinstance(expires_at, datetime):
-                now = datetime.now(timezone.utc)
-                # Make expires_at timezone-aware if it isn't
-                if expires_at.tzinfo is None:
-                    expires_at = expires_at.replace(tzinfo=timezone.utc)
-                if expires_at < now:
-                    return None  # Expired
-            else:
-                # SQLite returns int (Unix timestamp)
-                now_ts = datetime.now(timezone.utc).timestamp()
-                if expires_at < now_ts:
-                    return None  # Expired
-
-        return self._decode_active(tenant)  # type: ignore[attr-defined]
+        expires_ts = self._expires_ts(tenant.get("api_key_expires_at"))
+        if expires_ts is not None and expires_ts < datetime.now(timezone.utc).timestamp():
+            self.token_cache.set_invalid(key_hash)
+            return None  # Expired
+
+        tenant = self._decode_active(tenant)  # type: ignore[attr-defined]
+        self.token_cache.set(key_hash, tenant, expires_ts)
+        return tenant
+
+    @staticmethod
+    def _expires_ts(expires_at: Any) -> float | None:
+        """Return api_key_expires_at as a Unix timestamp (None if unset)."""
+        if not expires_at:
+            return None
+        # Handle both datetime (PostgreSQL) and int (SQLite) types
+        if isinstance(expires_at, datetime):
+            # Make expires_at timezone-aware if it isn't
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            return expires_at.timestamp()
+        return float(expires_at)
 
     async def revoke_api_key(self, tenant_id: str) -> bool:
         """Revoke the API key for a tenant.
@@ -255,6 +282,7 @@ class TenantsTable_EE:
             """,
             {"tenant_id": tenant_id},
         )
+        self.token_cache.invalidate_tenant(tenant_id)
         return rowcount > 0
 
 
@@ -0,0 +1,113 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: BSL-1.1
+"""In-process cache of tenant API token verifications.
+
+Every request authenticated with a tenant token resolves the token to its
+tenant (TenantsTable_EE.get_tenant_by_token()). TokenCache keeps the
+result of these lookups, keyed by the SHA-256 hash of the token, so the
+busiest clients do not cost one tenants query per request:
+
+- Valid tokens are cached for ttl seconds, and never beyond the key's
+  api_key_expires_at.
+- Unknown, revoked or expired tokens are cached as invalid for
+  negative_ttl seconds, so repeated attempts with a bad token do not
+  reach the database.
+- create_api_key(), revoke_api_key(), update_fields() and remove()
+  invalidate the entries of the tenant immediately. Other processes
+  sharing the database see the change within ttl seconds.
+
+The cache is bounded (least recently used entries are evicted first), so
+a flood of distinct bad tokens cannot grow it without limit.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class TokenCache:
+    """Bounded TTL cache of token hash -> tenant (or invalid).
+
+    Attributes:
+        ttl: Seconds a valid token is trusted without a database lookup.
+        negative_ttl: Seconds an invalid token is rejected without a lookup.
+        maxsize: Maximum number of cached tokens.
+        hits: Lookups served from the cache.
+        misses: Lookups that had to query the database.
+    """
+
+    def __init__(self, ttl: float = 30.0, negative_ttl: float = 10.0, maxsize: int = 10_000):
+        self.ttl = max(0.0, float(ttl))
+        self.negative_ttl = max(0.0, float(negative_ttl))
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        # key_hash -> (tenant or None, monotonic deadline)
+        self._entries: OrderedDict[str, tuple[dict[str, Any] | None, float]] = OrderedDict()
+
+    def get(self, key_hash: str) -> tuple[bool, dict[str, Any] | None]:
+        """Look up a token hash.
+
+        Returns:
+            Tuple of (found, tenant). found is False on a miss; when True,
+            tenant is a copy of the cached tenant, or None for a token
+            known to be invalid.
+        """
+        entry = self._entries.get(key_hash)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key_hash]
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self._entries.move_to_end(key_hash)
+        tenant = entry[0]
+        return True, dict(tenant) if tenant is not None else None
+
+    def set(self, key_hash: str, tenant: dict[str, Any], expires_at: float | None = None) -> None:
+        """Cache a valid token.
+
+        Args:
+            key_hash: SHA-256 hex digest of the token.
+            tenant: Tenant the token belongs to.
+            expires_at: Unix timestamp when the key expires, if any.
+        """
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        self._store(key_hash, dict(tenant), ttl)
+
+    def set_invalid(self, key_hash: str) -> None:
+        """Cache a token that does not authenticate any tenant."""
+        self._store(key_hash, None, self.negative_ttl)
+
+    def discard(self, key_hash: str) -> None:
+        """Forget a token hash."""
+        self._entries.pop(key_hash, None)
+
+    def invalidate_tenant(self, tenant_id: str) -> None:
+        """Forget the valid tokens of a tenant (key replaced, revoked or tenant removed)."""
+        for key_hash in [
+            k for k, (tenant, _) in self._entries.items() if tenant and tenant["id"] == tenant_id
+        ]:
+            del self._entries[key_hash]
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key_hash: str, tenant: dict[str, Any] | None, ttl: float) -> None:
+        if ttl <= 0:
+            self._entries.pop(key_hash, None)
+            return
+        self._entries[key_hash] = (tenant, time.monotonic() + ttl)
+        self._entries.move_to_end(key_hash)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+__all__ = ["TokenCache"]
@@ -10,6 +10,8 @@ import logging
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from fsspec import AbstractFileSystem
 
 logger = logging.getLogger(__name__)
@@ -132,6 +134,12 @@ class StorageNode_EE:
             data = f.read()
             return data if isinstance(data, bytes) else data.encode()
 
+    async def _cloud_iter_bytes(self, chunk_size: int) -> AsyncIterator[bytes]:
+        fs = self._get_fs()
+        with fs.open(self._get_cloud_path(), "rb") as f:
+            while chunk := f.read(chunk_size):
+                yield chunk if isinstance(chunk, bytes) else chunk.encode()
+
     async def _cloud_write_bytes(self, data: bytes) -> None:
         fs = self._get_fs()
         cloud_path = self._get_cloud_path()
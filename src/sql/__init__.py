@@ -9,6 +9,10 @@ Components:
     Table: Base class for table definitions with Columns schema.
     DbAdapter: Abstract base for SQLite/PostgreSQL adapters.
     Column, Columns: Schema definition with types and constraints.
+    replica_read, replica_reads, primary_reads: Read routing to
+        PostgreSQL replicas (see sql.routing).
+    partition_column: Table attribute enabling time-range partitioning on
+        PostgreSQL (see sql.partitioning).
 
 Example:
     Using SqlDb (recommended for table-based access)::
@@ -47,6 +51,7 @@ Note:
 
 from .adapters import DbAdapter, get_adapter
 from .column import Boolean, Column, Columns, Integer, String, Timestamp
+from .routing import primary_reads, replica_read, replica_reads
 from .sqldb import SqlDb
 from .table import Table
 
@@ -64,6 +69,10 @@ __all__ = [
     # Adapters
     "DbAdapter",
     "get_adapter",
+    # Read routing
+    "primary_reads",
+    "replica_read",
+    "replica_reads",
     # Backward compatibility
     "create_adapter",
 ]
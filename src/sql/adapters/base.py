@@ -4,10 +4,53 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import AsyncIterator, Callable, Sequence
+
+
+class StatementCache:
+    """Bounded LRU cache of compiled statements and row decoders.
+
+    Keys are tuples describing the statement shape (e.g. operation, table
+    and column names), never parameter values, so the cache stays small
+    for the fixed set of queries an application issues.
+
+    Attributes:
+        maxsize: Maximum number of entries kept.
+        hits: Lookups served from the cache.
+        misses: Lookups that had to build the entry.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Any, Any] = OrderedDict()
+
+    def get(self, key: Any, build: Callable[[], Any]) -> Any:
+        """Return the entry for key, building and storing it on a miss."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = build()
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return value
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. after a schema change)."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class DbAdapter(ABC):
@@ -20,13 +63,32 @@ class DbAdapter(ABC):
 
     Subclasses must implement the abstract methods and set the placeholder
     attribute for parameter binding (`:name` for SQLite, `%(name)s` for PostgreSQL).
+
+    SQL built by the CRUD helpers is cached per statement shape in
+    ``statements``, an LRU of statement_cache_size entries that adapters
+    also use for placeholder conversion and row decoders.
     """
 
     placeholder: str = ":name"  # Override in subclass
-
-    def pk_column(self, name: str) -> str:
-        """Return SQL definition for autoincrement primary key column."""
-        return f'"{name}" INTEGER PRIMARY KEY'
+    statement_cache_size: int = 256
+    supports_copy: bool = False  # True when copy_records() uses a bulk-load protocol
+    supports_partitioning: bool = False  # True when tables can be range-partitioned
+
+    @property
+    def statements(self) -> StatementCache:
+        """Per-adapter cache of compiled statements, created on first use."""
+        cache = self.__dict__.get("_statements")
+        if cache is None:
+            cache = self.__dict__["_statements"] = StatementCache(self.statement_cache_size)
+        return cache
+
+    def pk_column(self, name: str, primary_key: bool = True) -> str:
+        """Return SQL definition for autoincrement primary key column.
+
+        With primary_key False the key constraint is left out, for tables
+        declaring a composite primary key (partitioned tables).
+        """
+        return f'"{name}" INTEGER PRIMARY KEY' if primary_key else f'"{name}" INTEGER'
 
     def for_update_clause(self) -> str:
         """Return FOR UPDATE clause if supported, empty string otherwise."""
@@ -52,6 +114,33 @@ class DbAdapter(ABC):
         """Execute query multiple times with different params (batch insert)."""
         ...
 
+    async def execute_batch(
+        self, steps: Sequence[tuple[str, Sequence[dict[str, Any]]]]
+    ) -> list[int]:
+        """Execute several executemany steps in a single transaction.
+
+        Steps run in order; an error rolls back all of them. Steps with an
+        empty params list are skipped. This fallback runs each step with
+        execute_many() in the adapter's current transaction, then commits,
+        or rolls back on error: adapters whose execute_many() commits by
+        itself must override it (the bundled adapters do).
+
+        Args:
+            steps: Sequence of (query, params_list) pairs.
+
+        Returns:
+            Rows affected by each step, in order (0 for skipped steps).
+        """
+        counts = []
+        try:
+            for query, params_list in steps:
+                counts.append(await self.execute_many(query, params_list) if params_list else 0)
+            await self.commit()
+        except Exception:
+            await self.rollback()
+            raise
+        return counts
+
     @abstractmethod
     async def fetch_one(
         self, query: str, params: dict[str, Any] | None = None
@@ -66,6 +155,76 @@ class DbAdapter(ABC):
         """Execute query, return all rows as list of dicts."""
         ...
 
+    async def fetch_iter(
+        self, query: str, params: dict[str, Any] | None = None, chunk_size: int = 500
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Execute query and yield rows as dicts, chunk_size rows at a time.
+
+        Memory stays bounded by chunk_size whatever the result size.
+        Adapters override this with a streaming cursor; this fallback
+        materializes the result with fetch_all().
+
+        The read stays open until the iteration ends or the generator is
+        closed: on SQLite it holds a read lock, so do not write to the
+        database from the loop body (collect, then write), and use
+        fetch_keyset() when the consumer is slow (e.g. an HTTP client).
+
+        Args:
+            query: SQL query with :name placeholders.
+            params: Query parameters.
+            chunk_size: Rows fetched per round trip.
+
+        Yields:
+            Row dicts.
+        """
+        for row in await self.fetch_all(query, params):
+            yield row
+
+    async def fetch_keyset(
+        self,
+        query: str,
+        params: dict[str, Any] | None,
+        keys: Sequence[tuple[str, str]],
+        chunk_size: int = 500,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yield the rows of a query in key order, chunk_size rows per list.
+
+        Each chunk is read by a separate fetch_all() continuing after the
+        key of the previous chunk, so nothing (connection, transaction,
+        SQLite read lock) is held between chunks: the consumer may be slow
+        and may write to the database meanwhile. Rows inserted behind the
+        last key read are not returned.
+
+        Args:
+            query: SELECT ending with its WHERE clause ("WHERE 1=1" when
+                unfiltered); the key condition, ORDER BY and LIMIT are
+                appended.
+            params: Query parameters.
+            keys: (SQL expression, result column) pairs of a unique,
+                non-NULL ascending order, e.g. [("e.event_ts", "event_ts"),
+                ("e.id", "event_id")].
+            chunk_size: Rows per chunk.
+
+        Yields:
+            Lists of row dicts.
+        """
+        order = ", ".join(f"{expr} ASC" for expr, _ in keys)
+        row_key = ", ".join(expr for expr, _ in keys)
+        marks = ", ".join(f":keyset_{i}" for i in range(len(keys)))
+        sql = f"{query} ORDER BY {order} LIMIT :keyset_limit"
+        after = f"{query} AND ({row_key}) > ({marks}) ORDER BY {order} LIMIT :keyset_limit"
+        values = {**(params or {}), "keyset_limit": chunk_size}
+        while True:
+            rows = await self.fetch_all(sql, values)
+            if not rows:
+                return
+            last = rows[-1]
+            values.update({f"keyset_{i}": last[column] for i, (_, column) in enumerate(keys)})
+            sql = after
+            yield rows
+            if len(rows) < chunk_size:
+                return
+
     @abstractmethod
     async def execute_script(self, script: str) -> None:
         """Execute multiple statements (for schema creation)."""
@@ -76,6 +235,39 @@ class DbAdapter(ABC):
         """Commit current transaction."""
         ...
 
+    # -------------------------------------------------------------------------
+    # Partitioning
+    # -------------------------------------------------------------------------
+
+    async def list_partitions(self, table: str) -> list[str] | None:
+        """Return the names of a table's partitions.
+
+        Returns:
+            Partition names, or None if the table is not partitioned
+            (always None on adapters without partitioning).
+        """
+        return None
+
+    async def create_partition(
+        self, table: str, partition: str, lower: Any = None, upper: Any = None
+    ) -> None:
+        """Create a range partition [lower, upper) of a table, if missing.
+
+        With lower and upper None, creates the DEFAULT partition.
+
+        Raises:
+            NotImplementedError: If the adapter does not support partitioning.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support partitioning")
+
+    async def drop_partition(self, table: str, partition: str, detach: bool = False) -> None:
+        """Drop a partition, or only detach it from the table.
+
+        Raises:
+            NotImplementedError: If the adapter does not support partitioning.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support partitioning")
+
     @abstractmethod
     async def rollback(self) -> None:
         """Rollback current transaction."""
@@ -107,12 +299,17 @@ class DbAdapter(ABC):
         Returns:
             Number of affected rows (typically 1).
         """
-        cols = list(values.keys())
-        placeholders = ", ".join(self._placeholder(c) for c in cols)
-        col_list = ", ".join(self._sql_name(c) for c in cols)
-        query = f"INSERT INTO {table} ({col_list}) VALUES ({placeholders})"
+        query = self.statements.get(
+            ("insert", table, tuple(values)), lambda: self._insert_sql(table, values)
+        )
         return await self.execute(query, values)
 
+    def _insert_sql(self, table: str, values: dict[str, Any]) -> str:
+        """Build the INSERT statement for the given columns."""
+        placeholders = ", ".join(self._placeholder(c) for c in values)
+        col_list = ", ".join(self._sql_name(c) for c in values)
+        return f"INSERT INTO {table} ({col_list}) VALUES ({placeholders})"
+
     async def insert_returning_id(
         self, table: str, values: dict[str, Any], pk_col: str = "id"
     ) -> Any:
@@ -153,22 +350,61 @@ class DbAdapter(ABC):
         Returns:
             List of row dicts.
         """
+        key = (
+            "select",
+            table,
+            tuple(columns) if columns else None,
+            tuple(where) if where else None,
+            order_by,
+            limit,
+        )
+        query = self.statements.get(
+            key, lambda: self._select_sql(table, columns, where, order_by, limit)
+        )
+        return await self.fetch_all(query, dict(where) if where else {})
+
+    async def select_iter(
+        self,
+        table: str,
+        columns: list[str] | None = None,
+        where: dict[str, Any] | None = None,
+        order_by: str | None = None,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Select rows as a stream through fetch_iter(). Arguments as in select()."""
+        key = (
+            "select",
+            table,
+            tuple(columns) if columns else None,
+            tuple(where) if where else None,
+            order_by,
+            None,
+        )
+        query = self.statements.get(
+            key, lambda: self._select_sql(table, columns, where, order_by, None)
+        )
+        async for row in self.fetch_iter(query, dict(where) if where else {}, chunk_size):
+            yield row
+
+    def _select_sql(
+        self,
+        table: str,
+        columns: list[str] | None,
+        where: dict[str, Any] | None,
+        order_by: str | None,
+        limit: int | None,
+    ) -> str:
+        """Build the SELECT statement for the given shape."""
         cols_sql = ", ".join(self._sql_name(c) for c in columns) if columns else "*"
         query = f"SELECT {cols_sql} FROM {table}"
-
-        params: dict[str, Any] = {}
         if where:
             conditions = [f"{self._sql_name(k)} = {self._placeholder(k)}" for k in where]
             query += " WHERE " + " AND ".join(conditions)
-            params.update(where)
-
         if order_by:
             query += f" ORDER BY {order_by}"
-
         if limit:
             query += f" LIMIT {limit}"
-
-        return await self.fetch_all(query, params)
+        return query
 
     async def select_one(
         self,
@@ -192,14 +428,213 @@ class DbAdapter(ABC):
             Number of affected rows.
         """
         # Prefix value params to avoid collision with where params
+        query = self.statements.get(
+            ("update", table, tuple(values), tuple(where)),
+            lambda: self._update_sql(table, values, where),
+        )
+
+        params = {f"val_{k}": v for k, v in values.items()}
+        params.update({f"whr_{k}": v for k, v in where.items()})
+
+        return await self.execute(query, params)
+
+    def _update_sql(
+        self,
+        table: str,
+        values: dict[str, Any],
+        where: dict[str, Any],
+        condition: str | None = None,
+    ) -> str:
+        """Build the UPDATE statement (without RETURNING) for the given shape."""
         set_parts = [f"{self._sql_name(k)} = {self._placeholder('val_' + k)}" for k in values]
         where_parts = [f"{self._sql_name(k)} = {self._placeholder('whr_' + k)}" for k in where]
+        if condition:
+            where_parts.append(f"({condition})")
+        return f"UPDATE {table} SET {', '.join(set_parts)} WHERE {' AND '.join(where_parts)}"
 
-        query = f"UPDATE {table} SET {', '.join(set_parts)} WHERE {' AND '.join(where_parts)}"
+    async def execute_returning(
+        self, query: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any] | None:
+        """Execute a writing query with RETURNING, commit, return the first row or None."""
+        return await self.fetch_one(query, params)
 
-        params = {f"val_{k}": v for k, v in values.items()}
-        params.update({f"whr_{k}": v for k, v in where.items()})
+    async def update_returning(
+        self,
+        table: str,
+        values: dict[str, Any],
+        where: dict[str, Any],
+        condition: str | None = None,
+        params: dict[str, Any] | None = None,
+        returning: Sequence[str] | None = None,
+    ) -> dict[str, Any] | None:
+        """Update a row with a single UPDATE ... RETURNING statement.
+
+        Args:
+            table: Table name.
+            values: Column-value pairs to update.
+            where: WHERE equality conditions.
+            condition: Extra SQL condition ANDed to the WHERE clause
+                (e.g. "smtp_ts IS NULL").
+            params: Parameters referenced by condition.
+            returning: Columns to return (None = all).
+
+        Returns:
+            The updated row, or None if no row matched.
+        """
+        returning_cols = tuple(returning) if returning else None
+
+        def build() -> str:
+            returning_sql = (
+                ", ".join(self._sql_name(c) for c in returning_cols) if returning_cols else "*"
+            )
+            return f"{self._update_sql(table, values, where, condition)} RETURNING {returning_sql}"
+
+        query = self.statements.get(
+            ("update_returning", table, tuple(values), tuple(where), condition, returning_cols),
+            build,
+        )
+
+        query_params = {f"val_{k}": v for k, v in values.items()}
+        query_params.update({f"whr_{k}": v for k, v in where.items()})
+        if params:
+            query_params.update(params)
+
+        return await self.execute_returning(query, query_params)
+
+    async def update_many(
+        self,
+        table: str,
+        key: str,
+        rows: Sequence[dict[str, Any]],
+        types: dict[str, str] | None = None,
+    ) -> int:
+        """Update several rows, each with its own values, in one operation.
+
+        Every row holds the key column plus the same set of columns to set.
+        This implementation runs one UPDATE per row through execute_many();
+        PostgreSQL overrides it with a single UPDATE ... FROM (VALUES ...).
+
+        Args:
+            table: Table name.
+            key: Column identifying each row.
+            rows: Dicts with the key and the values to set.
+            types: Optional SQL type per column, for adapters that need casts.
+
+        Returns:
+            Number of rows processed.
+        """
+        if not rows:
+            return 0
+        columns = [c for c in rows[0] if c != key]
+        if not columns:
+            return 0
+
+        def build() -> str:
+            set_parts = [f"{self._sql_name(c)} = {self._placeholder(c)}" for c in columns]
+            return (
+                f"UPDATE {table} SET {', '.join(set_parts)} "
+                f"WHERE {self._sql_name(key)} = {self._placeholder(key)}"
+            )
+
+        query = self.statements.get(("update_many", table, key, tuple(columns)), build)
+        return await self.execute_many(query, rows)
+
+    async def copy_records(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Sequence[Sequence[Any]],
+        types: dict[str, str] | None = None,
+    ) -> int:
+        """Bulk-load rows into a table.
+
+        Adapters with supports_copy use the database bulk-load protocol;
+        this implementation runs an executemany INSERT.
+
+        Args:
+            table: Table name.
+            columns: Column names, in the order of the values in each row.
+            rows: Value tuples.
+            types: Optional SQL type per column, for binary protocols.
+
+        Returns:
+            Number of rows loaded.
+        """
+        if not rows:
+            return 0
+        query = self.statements.get(
+            ("insert", table, tuple(columns)),
+            lambda: self._insert_sql(table, dict.fromkeys(columns)),
+        )
+        return await self.execute_many(
+            query, [dict(zip(columns, row, strict=True)) for row in rows]
+        )
+
+    async def copy_merge(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Sequence[Sequence[Any]],
+        conflict: Sequence[str],
+        returning: str,
+        types: dict[str, str] | None = None,
+    ) -> list[Any]:
+        """Bulk-load rows, skipping those that conflict with existing rows.
+
+        Adapters with supports_copy load the rows into a staging table and
+        merge them with INSERT ... SELECT ... ON CONFLICT DO NOTHING. This
+        implementation inserts row by row with the same conflict clause.
+
+        Args:
+            table: Table name.
+            columns: Column names, in the order of the values in each row.
+            rows: Value tuples.
+            conflict: Columns of the unique constraint deciding conflicts.
+            returning: Column whose values are returned for inserted rows.
+            types: Optional SQL type per column, for binary protocols.
+
+        Returns:
+            Values of the returning column for the rows actually inserted.
+        """
+        if not rows:
+            return []
+
+        def build() -> str:
+            conflict_sql = ", ".join(self._sql_name(c) for c in conflict)
+            return (
+                f"{self._insert_sql(table, dict.fromkeys(columns))} "
+                f"ON CONFLICT ({conflict_sql}) DO NOTHING "
+                f"RETURNING {self._sql_name(returning)}"
+            )
+
+        query = self.statements.get(
+            ("insert_ignore", table, tuple(columns), tuple(conflict), returning), build
+        )
+        inserted = []
+        for row in rows:
+            result = await self.execute_returning(query, dict(zip(columns, row, strict=True)))
+            if result is not None:
+                inserted.append(result[returning])
+        return inserted
+
+    async def delete_in(self, table: str, column: str, values: Sequence[Any]) -> int:
+        """Delete rows whose column matches any of the values, in one statement.
+
+        Callers are expected to bound the number of values (see
+        Table.batch_chunk_size).
+
+        Returns:
+            Number of deleted rows.
+        """
+        if not values:
+            return 0
+        params = {f"v_{i}": v for i, v in enumerate(values)}
 
+        def build() -> str:
+            placeholders = ", ".join(self._placeholder(f"v_{i}") for i in range(len(values)))
+            return f"DELETE FROM {table} WHERE {self._sql_name(column)} IN ({placeholders})"
+
+        query = self.statements.get(("delete_in", table, column, len(values)), build)
         return await self.execute(query, params)
 
     async def delete(self, table: str, where: dict[str, Any]) -> int:
@@ -212,14 +647,22 @@ class DbAdapter(ABC):
         Returns:
             Number of deleted rows.
         """
-        where_parts = [f"{self._sql_name(k)} = {self._placeholder(k)}" for k in where]
-        query = f"DELETE FROM {table} WHERE {' AND '.join(where_parts)}"
+
+        def build() -> str:
+            where_parts = [f"{self._sql_name(k)} = {self._placeholder(k)}" for k in where]
+            return f"DELETE FROM {table} WHERE {' AND '.join(where_parts)}"
+
+        query = self.statements.get(("delete", table, tuple(where)), build)
         return await self.execute(query, where)
 
     async def exists(self, table: str, where: dict[str, Any]) -> bool:
         """Check if row exists."""
-        conditions = [f"{self._sql_name(k)} = {self._placeholder(k)}" for k in where]
-        query = f"SELECT 1 FROM {table} WHERE {' AND '.join(conditions)} LIMIT 1"
+
+        def build() -> str:
+            conditions = [f"{self._sql_name(k)} = {self._placeholder(k)}" for k in where]
+            return f"SELECT 1 FROM {table} WHERE {' AND '.join(conditions)} LIMIT 1"
+
+        query = self.statements.get(("exists", table, tuple(where)), build)
         result = await self.fetch_one(query, where)
         return result is not None
 
@@ -233,13 +676,14 @@ class DbAdapter(ABC):
         Returns:
             Row count.
         """
-        query = f"SELECT COUNT(*) as cnt FROM {table}"
-        params: dict[str, Any] = {}
 
-        if where:
-            conditions = [f"{self._sql_name(k)} = {self._placeholder(k)}" for k in where]
-            query += " WHERE " + " AND ".join(conditions)
-            params.update(where)
+        def build() -> str:
+            query = f"SELECT COUNT(*) as cnt FROM {table}"
+            if where:
+                conditions = [f"{self._sql_name(k)} = {self._placeholder(k)}" for k in where]
+                query += " WHERE " + " AND ".join(conditions)
+            return query
 
-        result = await self.fetch_one(query, params)
+        query = self.statements.get(("count", table, tuple(where) if where else None), build)
+        result = await self.fetch_one(query, dict(where) if where else {})
         return result["cnt"] if result else 0
@@ -3,31 +3,65 @@
 
 from __future__ import annotations
 
+import itertools
 import re
 from typing import TYPE_CHECKING, Any
 
+from ..routing import REPLICA, current_read_route
 from .base import DbAdapter
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import AsyncIterator, Sequence
 
 
 class PostgresAdapter(DbAdapter):
     """PostgreSQL async adapter using psycopg3 with connection pooling.
 
-    Converts :name placeholders to %(name)s for psycopg compatibility.
+    Converts :name placeholders to %(name)s for psycopg compatibility. The
+    converted SQL is cached per query text, and data statements (SELECT,
+    INSERT, UPDATE, DELETE, WITH) are executed as server-side prepared
+    statements unless prepare is False (e.g. behind a transaction-mode
+    pgbouncer).
+
+    With replica_dsns, reads marked replica-safe (see sql.routing) are
+    spread round-robin over one pool per replica. Writes and unmarked
+    reads use the primary pool.
     """
 
     placeholder = "%(name)s"
-
-    def pk_column(self, name: str) -> str:
+    supports_copy = True
+    supports_partitioning = True
+
+    # Column types (sql.column) to the names used by binary COPY
+    _COPY_TYPES = {
+        "TEXT": "text",
+        "INTEGER": "integer",
+        "REAL": "float8",
+        "TIMESTAMP": "timestamp",
+        "BLOB": "bytea",
+    }
+
+    def pk_column(self, name: str, primary_key: bool = True) -> str:
         """Return SQL definition for autoincrement primary key column (PostgreSQL)."""
-        return f'"{name}" SERIAL PRIMARY KEY'
+        return f'"{name}" SERIAL PRIMARY KEY' if primary_key else f'"{name}" SERIAL'
+
+    _PREPARABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
 
-    def __init__(self, dsn: str, pool_size: int = 10):
+    def __init__(
+        self,
+        dsn: str,
+        pool_size: int = 10,
+        prepare: bool = True,
+        replica_dsns: Sequence[str] | None = None,
+    ):
         self.dsn = dsn
         self.pool_size = pool_size
+        self.prepare = prepare
+        self.replica_dsns = list(replica_dsns or [])
         self._pool: Any = None
+        self._replica_pools: list[Any] = []
+        self._replica_turn = itertools.count()
+        self._cursor_ids = itertools.count(1)
 
         # Verify psycopg is available at init time
         try:
@@ -45,12 +79,33 @@ class PostgresAdapter(DbAdapter):
         """
         return re.sub(r"(?<!:):([a-zA-Z_][a-zA-Z0-9_]*)", r"%(\1)s", query)
 
+    def _compile(self, query: str) -> tuple[str, bool | None]:
+        """Return the cached (converted SQL, prepare flag) pair for a query.
+
+        The prepare flag is passed to psycopg's execute(): True prepares
+        data statements on first use, None leaves DDL and other statements
+        to psycopg's default threshold. False disables preparing entirely.
+        """
+        return self.statements.get(("pg", query), lambda: self._build_compiled(query))
+
+    def _build_compiled(self, query: str) -> tuple[str, bool | None]:
+        """Convert placeholders and decide whether the statement is prepared."""
+        sql = self._convert_placeholders(query)
+        if not self.prepare:
+            return sql, False
+        return sql, (True if sql.lstrip().upper().startswith(self._PREPARABLE) else None)
+
     async def connect(self) -> None:
-        """Establish connection pool.
+        """Establish connection pools (primary and replicas).
 
         Sets search_path to 'public' schema to ensure tables are created
         in a valid schema even when the connection default is unset.
         """
+        self._pool = await self._open_pool(self.dsn)
+        self._replica_pools = [await self._open_pool(dsn) for dsn in self.replica_dsns]
+
+    async def _open_pool(self, dsn: str) -> Any:
+        """Open a connection pool for a DSN."""
         from psycopg_pool import AsyncConnectionPool
 
         # Configure connection to use 'public' schema by default
@@ -58,26 +113,37 @@ class PostgresAdapter(DbAdapter):
             await conn.execute("SET search_path TO public")
             await conn.commit()
 
-        self._pool = AsyncConnectionPool(
-            self.dsn,
+        pool = AsyncConnectionPool(
+            dsn,
             min_size=1,
             max_size=self.pool_size,
             open=False,
             configure=configure,
         )
-        await self._pool.open()
+        await pool.open()
+        return pool
 
     async def close(self) -> None:
-        """Close connection pool."""
+        """Close connection pools."""
+        for pool in self._replica_pools:
+            await pool.close()
+        self._replica_pools = []
         if self._pool:
             await self._pool.close()
             self._pool = None
 
+    def _read_pool(self) -> Any:
+        """Return the pool serving reads in the current routing context."""
+        if self._replica_pools and current_read_route() == REPLICA:
+            turn = next(self._replica_turn) % len(self._replica_pools)
+            return self._replica_pools[turn]
+        return self._pool
+
     async def execute(self, query: str, params: dict[str, Any] | None = None) -> int:
         """Execute query, return affected row count."""
-        query = self._convert_placeholders(query)
+        sql, prepare = self._compile(query)
         async with self._pool.connection() as conn, conn.cursor() as cur:
-            await cur.execute(query, params or {})
+            await cur.execute(sql, params or {}, prepare=prepare)
             await conn.commit()
             return cur.rowcount
 
@@ -96,50 +162,139 @@ class PostgresAdapter(DbAdapter):
         """
         from psycopg.rows import dict_row
 
-        cols = list(values.keys())
-        placeholders = ", ".join(self._placeholder(c) for c in cols)
-        col_list = ", ".join(self._sql_name(c) for c in cols)
-        query = f'INSERT INTO {table} ({col_list}) VALUES ({placeholders}) RETURNING "{pk_col}"'
-        query = self._convert_placeholders(query)
+        query = self.statements.get(
+            ("insert_returning_id", table, tuple(values), pk_col),
+            lambda: f'{self._insert_sql(table, values)} RETURNING "{pk_col}"',
+        )
+        sql, prepare = self._compile(query)
         async with self._pool.connection() as conn:
             async with conn.cursor(row_factory=dict_row) as cur:
-                await cur.execute(query, values)
+                await cur.execute(sql, values, prepare=prepare)
                 await conn.commit()
                 row = await cur.fetchone()
                 return row[pk_col] if row else None
 
     async def execute_many(self, query: str, params_list: Sequence[dict[str, Any]]) -> int:
         """Execute query multiple times with different params (batch insert)."""
-        query = self._convert_placeholders(query)
+        sql, _ = self._compile(query)
         async with self._pool.connection() as conn, conn.cursor() as cur:
-            await cur.executemany(query, params_list)
+            await cur.executemany(sql, params_list)
             await conn.commit()
             return len(params_list)
 
+    async def execute_batch(
+        self, steps: Sequence[tuple[str, Sequence[dict[str, Any]]]]
+    ) -> list[int]:
+        """Execute several executemany steps in a single transaction.
+
+        Returns:
+            Rows affected by each step, in order (0 for skipped steps).
+        """
+        counts = []
+        async with self._pool.connection() as conn:
+            async with conn.transaction(), conn.cursor() as cur:
+                for query, params_list in steps:
+                    if not params_list:
+                        counts.append(0)
+                        continue
+                    await cur.executemany(self._compile(query)[0], params_list)
+                    counts.append(max(0, cur.rowcount))
+        return counts
+
     async def fetch_one(
         self, query: str, params: dict[str, Any] | None = None
     ) -> dict[str, Any] | None:
         """Execute query, return single row as dict or None."""
         from psycopg.rows import dict_row
 
-        query = self._convert_placeholders(query)
-        async with self._pool.connection() as conn:
+        sql, prepare = self._compile(query)
+        async with self._read_pool().connection() as conn:
             async with conn.cursor(row_factory=dict_row) as cur:
-                await cur.execute(query, params or {})
+                await cur.execute(sql, params or {}, prepare=prepare)
                 return await cur.fetchone()
 
+    async def execute_returning(
+        self, query: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any] | None:
+        """Execute a writing query with RETURNING on the primary, return the first row."""
+        from psycopg.rows import dict_row
+
+        sql, prepare = self._compile(query)
+        async with self._pool.connection() as conn:
+            async with conn.cursor(row_factory=dict_row) as cur:
+                await cur.execute(sql, params or {}, prepare=prepare)
+                row = await cur.fetchone()
+            await conn.commit()
+            return row
+
     async def fetch_all(
         self, query: str, params: dict[str, Any] | None = None
     ) -> list[dict[str, Any]]:
         """Execute query, return all rows as list of dicts."""
         from psycopg.rows import dict_row
 
-        query = self._convert_placeholders(query)
-        async with self._pool.connection() as conn:
+        sql, prepare = self._compile(query)
+        async with self._read_pool().connection() as conn:
             async with conn.cursor(row_factory=dict_row) as cur:
-                await cur.execute(query, params or {})
+                await cur.execute(sql, params or {}, prepare=prepare)
                 return await cur.fetchall()
 
+    def fetch_iter(
+        self, query: str, params: dict[str, Any] | None = None, chunk_size: int = 500
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Execute query and yield rows through a server-side (named) cursor.
+
+        The cursor lives in the transaction of a pooled connection, held
+        until the iteration ends; rows are transferred chunk_size at a time.
+        The pool is chosen when fetch_iter() is called, so the routing
+        context of the caller applies even if iteration happens later.
+        """
+        return self._iter_rows(self._read_pool(), query, params, chunk_size)
+
+    async def _iter_rows(
+        self, pool: Any, query: str, params: dict[str, Any] | None, chunk_size: int
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream rows from a named cursor on a connection of pool."""
+        from psycopg.rows import dict_row
+
+        sql, _ = self._compile(query)
+        name = f"fetch_iter_{next(self._cursor_ids)}"
+        async with pool.connection() as conn:
+            async with conn.cursor(name=name, row_factory=dict_row) as cur:
+                cur.itersize = chunk_size
+                await cur.execute(sql, params or {})
+                async for row in cur:
+                    yield row
+
+    def fetch_keyset(
+        self,
+        query: str,
+        params: dict[str, Any] | None,
+        keys: Sequence[tuple[str, str]],
+        chunk_size: int = 500,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yield the rows of a query in key order, chunk_size rows per list.
+
+        Readers do not block writers on PostgreSQL, so the whole ordered
+        query is streamed through one server-side cursor (see fetch_iter())
+        instead of one query per chunk.
+        """
+        order = ", ".join(f"{expr} ASC" for expr, _ in keys)
+        return self._iter_chunks(self._read_pool(), f"{query} ORDER BY {order}", params, chunk_size)
+
+    async def _iter_chunks(
+        self, pool: Any, query: str, params: dict[str, Any] | None, chunk_size: int
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Stream lists of rows from a named cursor on a connection of pool."""
+        chunk: list[dict[str, Any]] = []
+        async for row in self._iter_rows(pool, query, params, chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
     async def execute_script(self, script: str) -> None:
         """Execute multiple statements (for schema creation)."""
         async with self._pool.connection() as conn:
@@ -147,6 +302,167 @@ class PostgresAdapter(DbAdapter):
                 await cur.execute(script)
             await conn.commit()
 
+    async def update_many(
+        self,
+        table: str,
+        key: str,
+        rows: Sequence[dict[str, Any]],
+        types: dict[str, str] | None = None,
+    ) -> int:
+        """Update several rows with one UPDATE ... FROM (VALUES ...) statement.
+
+        VALUES parameters are untyped in PostgreSQL, so each one is cast to
+        the column type given in types (TEXT when unknown).
+        """
+        if not rows:
+            return 0
+        columns = [c for c in rows[0] if c != key]
+        if not columns:
+            return 0
+        types = types or {}
+        all_columns = [key, *columns]
+        params: dict[str, Any] = {}
+        for i, row in enumerate(rows):
+            for j, col in enumerate(all_columns):
+                params[f"r{i}_{j}"] = row.get(col)
+
+        def build() -> str:
+            tuples = []
+            for i in range(len(rows)):
+                items = [
+                    f"CAST({self._placeholder(f'r{i}_{j}')} AS {types.get(col, 'TEXT')})"
+                    for j, col in enumerate(all_columns)
+                ]
+                tuples.append(f"({', '.join(items)})")
+            col_list = ", ".join(self._sql_name(c) for c in all_columns)
+            set_clause = ", ".join(f"{self._sql_name(c)} = v.{self._sql_name(c)}" for c in columns)
+            return (
+                f"UPDATE {table} AS t SET {set_clause} "
+                f"FROM (VALUES {', '.join(tuples)}) AS v({col_list}) "
+                f"WHERE t.{self._sql_name(key)} = v.{self._sql_name(key)}"
+            )
+
+        shape = tuple(types.get(c, "TEXT") for c in all_columns)
+        query = self.statements.get(
+            ("update_many", table, key, tuple(all_columns), shape, len(rows)), build
+        )
+        return await self.execute(query, params)
+
+    async def copy_records(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Sequence[Sequence[Any]],
+        types: dict[str, str] | None = None,
+    ) -> int:
+        """Bulk-load rows with binary COPY FROM STDIN."""
+        if not rows:
+            return 0
+        async with self._pool.connection() as conn:
+            async with conn.transaction(), conn.cursor() as cur:
+                await self._copy_rows(cur, table, columns, rows, types)
+        return len(rows)
+
+    async def copy_merge(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Sequence[Sequence[Any]],
+        conflict: Sequence[str],
+        returning: str,
+        types: dict[str, str] | None = None,
+    ) -> list[Any]:
+        """Bulk-load rows through a staging table, skipping conflicting rows.
+
+        Rows are copied with binary COPY into a temporary table dropped at
+        commit, then merged with one INSERT ... SELECT ... ON CONFLICT DO
+        NOTHING, all in a single transaction.
+        """
+        if not rows:
+            return []
+        stage = f"_copy_stage_{next(self._cursor_ids)}"
+        col_list = ", ".join(self._sql_name(c) for c in columns)
+        conflict_sql = ", ".join(self._sql_name(c) for c in conflict)
+        async with self._pool.connection() as conn:
+            async with conn.transaction(), conn.cursor() as cur:
+                await cur.execute(
+                    f"CREATE TEMP TABLE {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                await self._copy_rows(cur, stage, columns, rows, types)
+                await cur.execute(
+                    f"INSERT INTO {table} ({col_list}) SELECT {col_list} FROM {stage} "
+                    f"ON CONFLICT ({conflict_sql}) DO NOTHING "
+                    f"RETURNING {self._sql_name(returning)}"
+                )
+                return [row[0] for row in await cur.fetchall()]
+
+    async def _copy_rows(
+        self,
+        cur: Any,
+        table: str,
+        columns: Sequence[str],
+        rows: Sequence[Sequence[Any]],
+        types: dict[str, str] | None,
+    ) -> None:
+        """Write rows to table with binary COPY on an open cursor."""
+        types = types or {}
+        col_list = ", ".join(self._sql_name(c) for c in columns)
+        async with cur.copy(f"COPY {table} ({col_list}) FROM STDIN (FORMAT BINARY)") as copy:
+            copy.set_types(
+                [self._COPY_TYPES.get(types.get(c, "TEXT").upper(), "text") for c in columns]
+            )
+            for row in rows:
+                await copy.write_row(row)
+
+    async def list_partitions(self, table: str) -> list[str] | None:
+        """Return the partitions of a table from the catalog, None if not partitioned."""
+        partitioned = await self.fetch_one(
+            """SELECT 1 AS found FROM pg_partitioned_table pt
+               JOIN pg_class c ON c.oid = pt.partrelid
+               WHERE c.relname = :table AND pg_table_is_visible(c.oid)""",
+            {"table": table},
+        )
+        if partitioned is None:
+            return None
+        rows = await self.fetch_all(
+            """SELECT c.relname AS name FROM pg_inherits i
+               JOIN pg_class c ON c.oid = i.inhrelid
+               JOIN pg_class p ON p.oid = i.inhparent
+               WHERE p.relname = :table AND pg_table_is_visible(p.oid)
+               ORDER BY c.relname""",
+            {"table": table},
+        )
+        return [row["name"] for row in rows]
+
+    async def create_partition(
+        self, table: str, partition: str, lower: Any = None, upper: Any = None
+    ) -> None:
+        """Create a range (or DEFAULT) partition with CREATE TABLE ... PARTITION OF."""
+        if lower is None and upper is None:
+            bounds = "DEFAULT"
+        else:
+            bounds = f"FOR VALUES FROM ({self._literal(lower)}) TO ({self._literal(upper)})"
+        await self.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._sql_name(partition)} "
+            f"PARTITION OF {self._sql_name(table)} {bounds}"
+        )
+
+    async def drop_partition(self, table: str, partition: str, detach: bool = False) -> None:
+        """Drop a partition (DROP TABLE) or detach it (ALTER TABLE ... DETACH PARTITION)."""
+        if detach:
+            await self.execute(
+                f"ALTER TABLE {self._sql_name(table)} DETACH PARTITION {self._sql_name(partition)}"
+            )
+        else:
+            await self.execute(f"DROP TABLE IF EXISTS {self._sql_name(partition)}")
+
+    @staticmethod
+    def _literal(value: Any) -> str:
+        """Render a partition bound as an SQL literal (DDL takes no parameters)."""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return "'" + str(value).replace("'", "''") + "'"
+
     def _sql_name(self, name: str) -> str:
         """Quote identifier for PostgreSQL (handles reserved words like 'user')."""
         return f'"{name}"'
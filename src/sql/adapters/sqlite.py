@@ -10,7 +10,7 @@ import aiosqlite
 from .base import DbAdapter
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
+    from collections.abc import AsyncIterator, Callable, Sequence
 
 
 class SqliteAdapter(DbAdapter):
@@ -25,13 +25,33 @@ class SqliteAdapter(DbAdapter):
     def __init__(self, db_path: str):
         self.db_path = db_path or ":memory:"
 
-    def _normalize_booleans(self, row: dict[str, Any]) -> dict[str, Any]:
-        """Convert SQLite 0/1 to Python False/True for boolean-like columns."""
-        for key, value in row.items():
-            if value in (0, 1):
-                if key.startswith(self._BOOL_PREFIXES) or key in self._BOOL_NAMES:
-                    row[key] = bool(value)
-        return row
+    def _row_decoder(self, description: Any) -> Callable[[Sequence[Any]], dict[str, Any]]:
+        """Return the cached decoder turning result tuples into dicts.
+
+        Boolean-like columns (0/1 converted to False/True) are resolved once
+        per result shape instead of checking every column of every row.
+        """
+        cols = tuple(c[0] for c in description)
+        return self.statements.get(("row", cols), lambda: self._build_row_decoder(cols))
+
+    def _build_row_decoder(
+        self, cols: tuple[str, ...]
+    ) -> Callable[[Sequence[Any]], dict[str, Any]]:
+        """Build a row decoder for the given result columns."""
+        bool_cols = tuple(
+            c for c in cols if c.startswith(self._BOOL_PREFIXES) or c in self._BOOL_NAMES
+        )
+        if not bool_cols:
+            return lambda row: dict(zip(cols, row, strict=True))
+
+        def decode(row: Sequence[Any]) -> dict[str, Any]:
+            record = dict(zip(cols, row, strict=True))
+            for col in bool_cols:
+                if record[col] in (0, 1):
+                    record[col] = bool(record[col])
+            return record
+
+        return decode
 
     async def connect(self) -> None:
         """SQLite connections are opened per-operation, this is a no-op."""
@@ -61,10 +81,9 @@ class SqliteAdapter(DbAdapter):
         Returns:
             The generated primary key value (lastrowid for SQLite).
         """
-        cols = list(values.keys())
-        placeholders = ", ".join(self._placeholder(c) for c in cols)
-        col_list = ", ".join(self._sql_name(c) for c in cols)
-        query = f"INSERT INTO {table} ({col_list}) VALUES ({placeholders})"
+        query = self.statements.get(
+            ("insert", table, tuple(values)), lambda: self._insert_sql(table, values)
+        )
         async with aiosqlite.connect(self.db_path) as db:
             cursor = await db.execute(query, values)
             await db.commit()
@@ -77,6 +96,29 @@ class SqliteAdapter(DbAdapter):
             await db.commit()
             return len(params_list)
 
+    async def execute_batch(
+        self, steps: Sequence[tuple[str, Sequence[dict[str, Any]]]]
+    ) -> list[int]:
+        """Execute several executemany steps in a single transaction.
+
+        Returns:
+            Rows affected by each step, in order (0 for skipped steps).
+        """
+        counts = []
+        async with aiosqlite.connect(self.db_path) as db:
+            try:
+                for query, params_list in steps:
+                    if not params_list:
+                        counts.append(0)
+                        continue
+                    cursor = await db.executemany(query, params_list)
+                    counts.append(max(0, cursor.rowcount))
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+        return counts
+
     async def fetch_one(
         self, query: str, params: dict[str, Any] | None = None
     ) -> dict[str, Any] | None:
@@ -86,8 +128,20 @@ class SqliteAdapter(DbAdapter):
                 row = await cursor.fetchone()
                 if row is None:
                     return None
-                cols = [c[0] for c in cursor.description]
-                return self._normalize_booleans(dict(zip(cols, row, strict=True)))
+                return self._row_decoder(cursor.description)(row)
+
+    async def execute_returning(
+        self, query: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any] | None:
+        """Execute a writing query with RETURNING, commit, return the first row or None."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(query, params or {}) as cursor:
+                row = await cursor.fetchone()
+                decode = self._row_decoder(cursor.description) if row is not None else None
+            await db.commit()
+            if decode is None:
+                return None
+            return decode(row)
 
     async def fetch_all(
         self, query: str, params: dict[str, Any] | None = None
@@ -96,8 +150,22 @@ class SqliteAdapter(DbAdapter):
         async with aiosqlite.connect(self.db_path) as db:
             async with db.execute(query, params or {}) as cursor:
                 rows = await cursor.fetchall()
-                cols = [c[0] for c in cursor.description]
-                return [self._normalize_booleans(dict(zip(cols, row, strict=True))) for row in rows]
+                decode = self._row_decoder(cursor.description)
+                return [decode(row) for row in rows]
+
+    async def fetch_iter(
+        self, query: str, params: dict[str, Any] | None = None, chunk_size: int = 500
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Execute query and yield rows, stepping the cursor chunk_size rows at a time."""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(query, params or {}) as cursor:
+                decode = self._row_decoder(cursor.description)
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield decode(row)
 
     async def execute_script(self, script: str) -> None:
         """Execute multiple statements (for schema creation)."""
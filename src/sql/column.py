@@ -93,6 +93,8 @@ class Columns:
 
     def __init__(self):
         self._columns: dict[str, Column] = {}
+        self._json_names: list[str] | None = None
+        self._encrypted_names: list[str] | None = None
 
     def column(
         self,
@@ -116,6 +118,7 @@ class Columns:
             encrypted=encrypted,
         )
         self._columns[name] = col
+        self._json_names = self._encrypted_names = None
         return col
 
     def items(self):
@@ -135,12 +138,16 @@ class Columns:
         return self._columns.get(name)
 
     def json_columns(self) -> list[str]:
-        """Return names of JSON-encoded columns."""
-        return [name for name, col in self._columns.items() if col.json_encoded]
+        """Return names of JSON-encoded columns (cached, do not modify)."""
+        if self._json_names is None:
+            self._json_names = [name for name, col in self._columns.items() if col.json_encoded]
+        return self._json_names
 
     def encrypted_columns(self) -> list[str]:
-        """Return names of encrypted columns."""
-        return [name for name, col in self._columns.items() if col.encrypted]
+        """Return names of encrypted columns (cached, do not modify)."""
+        if self._encrypted_names is None:
+            self._encrypted_names = [name for name, col in self._columns.items() if col.encrypted]
+        return self._encrypted_names
 
     def __iter__(self):
         return iter(self._columns)
@@ -0,0 +1,114 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Time-range partition layout for partitioned tables.
+
+Tables declaring a partition_column are created as declaratively
+range-partitioned tables on adapters that support it (PostgreSQL) when
+the database has a partition interval. Each partition covers one day or
+one ISO week (starting Monday) in UTC and is named after its lower bound:
+
+    messages_p20261018   -> [2026-10-18, 2026-10-19)   (day)
+    messages_p20261012   -> [2026-10-12, 2026-10-19)   (week)
+
+Rows outside every range partition go to the table's DEFAULT partition.
+Table.ensure_partitions() creates the current partition and the next
+ones ahead of time; retention drops whole partitions instead of deleting
+rows.
+
+Example:
+    Compute the partitions covering today and the next two days::
+
+        from sql.partitioning import partition_ranges, partition_name
+
+        for lower, upper in partition_ranges("day", now, ahead=2):
+            print(partition_name("messages", lower), lower, upper)
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+PARTITION_INTERVALS = ("day", "week")
+"""Supported partition intervals."""
+
+_STEPS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+
+def partition_step(interval: str) -> timedelta:
+    """Return the time span covered by one partition.
+
+    Raises:
+        ValueError: If the interval is not one of PARTITION_INTERVALS.
+    """
+    step = _STEPS.get(interval)
+    if step is None:
+        raise ValueError(f"Unknown partition interval: {interval!r}")
+    return step
+
+
+def partition_start(moment: datetime, interval: str) -> datetime:
+    """Return the lower bound of the partition holding a moment (naive UTC)."""
+    partition_step(interval)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "week":
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def partition_ranges(
+    interval: str, now: datetime, ahead: int = 0
+) -> list[tuple[datetime, datetime]]:
+    """Return the (lower, upper) bounds of the current and the next partitions.
+
+    Args:
+        interval: Partition interval ("day" or "week").
+        now: Current time.
+        ahead: Number of future partitions after the current one.
+    """
+    step = partition_step(interval)
+    lower = partition_start(now, interval)
+    return [(lower + step * i, lower + step * (i + 1)) for i in range(max(0, ahead) + 1)]
+
+
+def partition_name(table: str, lower: datetime) -> str:
+    """Return the name of the partition of a table starting at lower."""
+    return f"{table}_p{lower:%Y%m%d}"
+
+
+def default_partition_name(table: str) -> str:
+    """Return the name of a table's DEFAULT partition."""
+    return f"{table}_default"
+
+
+def partition_lower(table: str, name: str) -> datetime | None:
+    """Return the lower bound encoded in a partition name.
+
+    Returns:
+        The lower bound, or None for names not made by partition_name()
+        (e.g. the DEFAULT partition).
+    """
+    prefix = f"{table}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix) :], "%Y%m%d")
+    except ValueError:
+        return None
+
+
+def utc_datetime(ts: int | float) -> datetime:
+    """Convert a Unix timestamp to a naive UTC datetime."""
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
+
+
+__all__ = [
+    "PARTITION_INTERVALS",
+    "default_partition_name",
+    "partition_lower",
+    "partition_name",
+    "partition_ranges",
+    "partition_start",
+    "partition_step",
+    "utc_datetime",
+]
@@ -0,0 +1,98 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Read routing between the primary database and read replicas.
+
+Queries run on the primary unless the calling code explicitly marks them
+as replica-safe. Marking is done per call scope, through a context
+variable, so it follows the current asyncio task and never leaks into
+concurrent requests:
+
+- replica_read decorates a coroutine method (Table method or endpoint)
+  whose reads tolerate replication lag.
+- replica_reads() marks a block of code the same way.
+- primary_reads() pins a block to the primary, overriding any replica
+  mark inside it. Use it for read-your-writes (e.g. reading back
+  messages just enqueued).
+
+Writes (execute, execute_many, RETURNING statements) always go to the
+primary. Adapters without replicas ignore the marks.
+
+Example:
+    Mark a heavy listing and pin a read-back::
+
+        class MessagesTable(Table):
+            @replica_read
+            async def list_all(self, ...):
+                ...
+
+        await messages.insert_batch(entries)
+        with primary_reads():
+            rows = await messages.list_all(tenant_id="acme")  # On the primary
+"""
+
+from __future__ import annotations
+
+import functools
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+PRIMARY = "primary"
+REPLICA = "replica"
+
+_read_route: ContextVar[str | None] = ContextVar("sql_read_route", default=None)
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def current_read_route() -> str:
+    """Return where reads of the current context go: PRIMARY or REPLICA."""
+    return _read_route.get() or PRIMARY
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """Route reads inside the block to a replica, unless pinned to the primary."""
+    if _read_route.get() == PRIMARY:
+        yield
+        return
+    token = _read_route.set(REPLICA)
+    try:
+        yield
+    finally:
+        _read_route.reset(token)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Route reads inside the block to the primary, overriding replica marks."""
+    token = _read_route.set(PRIMARY)
+    try:
+        yield
+    finally:
+        _read_route.reset(token)
+
+
+def replica_read(method: F) -> F:
+    """Decorator marking a coroutine method's reads as replica-safe.
+
+    The method signature and docstring are preserved, so decorated
+    endpoint methods are exposed unchanged by the API and CLI.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with replica_reads():
+            return await method(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+__all__ = [
+    "PRIMARY",
+    "REPLICA",
+    "current_read_route",
+    "primary_reads",
+    "replica_read",
+    "replica_reads",
+]
@@ -8,6 +8,8 @@ from typing import TYPE_CHECKING, Any
 from .adapters import DbAdapter, get_adapter
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
     from .table import Table
 
 
@@ -24,6 +26,9 @@ class SqlDb:
     - Schema creation and verification
     - CRUD operations via adapter
     - Encryption key access via parent.encryption_key
+    - Payload compression codec via parent.payload_codec
+    - Time partitioning of large tables via parent.partition_interval
+    - Cold archive directory via parent.archive_path
 
     Usage:
         db = SqlDb("/data/mail.db", parent=proxy)
@@ -38,16 +43,23 @@ class SqlDb:
         await db.close()
     """
 
-    def __init__(self, connection_string: str, parent: Any = None):
+    def __init__(
+        self,
+        connection_string: str,
+        parent: Any = None,
+        replicas: Sequence[str] | None = None,
+    ):
         """Initialize database manager.
 
         Args:
             connection_string: Database connection string.
             parent: Parent object (e.g., proxy) that provides encryption_key.
+            replicas: PostgreSQL read-replica connection strings, used for
+                reads marked replica-safe (see sql.routing).
         """
         self.connection_string = connection_string
         self.parent = parent
-        self.adapter: DbAdapter = get_adapter(connection_string)
+        self.adapter: DbAdapter = get_adapter(connection_string, replicas=replicas)
         self.tables: dict[str, Table] = {}
 
     @property
@@ -57,6 +69,38 @@ class SqlDb:
             return None
         return getattr(self.parent, "encryption_key", None)
 
+    @property
+    def payload_codec(self) -> str | None:
+        """Get payload compression codec name from parent. None disables compression."""
+        if self.parent is None:
+            return None
+        return getattr(self.parent, "payload_codec", None)
+
+    @property
+    def partition_interval(self) -> str | None:
+        """Get partition interval ("day", "week") from parent. None disables partitioning."""
+        if self.parent is None:
+            return None
+        return getattr(self.parent, "partition_interval", None)
+
+    @property
+    def archive_path(self) -> str | None:
+        """Get cold archive directory from parent. None disables archiving."""
+        if self.parent is None:
+            return None
+        return getattr(self.parent, "archive_path", None)
+
+    def notify(self, target: str, key: str | None = None) -> None:
+        """Tell the parent that there is new work for a background worker.
+
+        Args:
+            target: What to wake ("dispatch" or "report").
+            key: Optional tenant id.
+        """
+        notify_workers = getattr(self.parent, "notify_workers", None)
+        if notify_workers is not None:
+            notify_workers(target, key)
+
     async def connect(self) -> None:
         """Connect to database."""
         await self.adapter.connect()
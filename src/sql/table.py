@@ -4,13 +4,27 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any
 
 from genro_toolbox import get_uuid
 
-from .column import Columns
+from .adapters.base import StatementCache
+from .column import Columns, Timestamp
+from .partitioning import (
+    default_partition_name,
+    partition_lower,
+    partition_name,
+    partition_ranges,
+    partition_step,
+    utc_datetime,
+)
+from .routing import primary_reads
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+
     from .sqldb import SqlDb
 
 
@@ -95,12 +109,20 @@ class Table:
     Attributes:
         name: Table name in database.
         pkey: Primary key column name (e.g., "pk" or "id").
+        batch_chunk_size: Maximum keys per statement in bulk operations.
+        partition_column: Column range-partitioning the table when the
+            database has a partition interval and the adapter supports
+            partitioning (PostgreSQL). None keeps the table unpartitioned.
+        partition_premake: Partitions created ahead of the current one.
         db: SqlDb instance reference.
         columns: Column definitions.
     """
 
     name: str
     pkey: str | None = None
+    batch_chunk_size: int = 500
+    partition_column: str | None = None
+    partition_premake: int = 4
 
     def __init__(self, db: SqlDb) -> None:
         self.db = db
@@ -109,6 +131,7 @@ class Table:
 
         self.columns = Columns()
         self.configure()
+        self._decoders = StatementCache(64)
 
     def configure(self) -> None:
         """Override to define columns. Called during __init__."""
@@ -170,21 +193,40 @@ class Table:
     # Schema
     # -------------------------------------------------------------------------
 
+    @property
+    def partition_interval(self) -> str | None:
+        """Partition interval applied to this table ("day", "week"), or None."""
+        if self.partition_column is None or not self.db.adapter.supports_partitioning:
+            return None
+        return self.db.partition_interval
+
+    def table_constraints(self) -> list[str]:
+        """Override to add table constraints (e.g. UNIQUE) to CREATE TABLE."""
+        return []
+
     def create_table_sql(self) -> str:
-        """Generate CREATE TABLE IF NOT EXISTS statement."""
+        """Generate CREATE TABLE IF NOT EXISTS statement.
+
+        When partition_interval is set, the table is range-partitioned by
+        partition_column, which is added to the primary key as PostgreSQL
+        requires.
+        """
         # Check if pk is autoincrement (new_pkey_value returns None)
         is_autoincrement = self.pkey and self.new_pkey_value() is None
+        partitioned = self.partition_interval is not None
 
         col_defs = []
         for col in self.columns.values():
             if col.name == self.pkey and is_autoincrement and col.type_ == "INTEGER":
                 # Use adapter's pk_column for autoincrement primary key
-                col_defs.append(self.db.adapter.pk_column(col.name))
+                col_defs.append(self.db.adapter.pk_column(col.name, primary_key=not partitioned))
             elif col.name == self.pkey:
                 # UUID or other non-autoincrement primary key
-                col_defs.append(col.to_sql(primary_key=True))
+                col_defs.append(col.to_sql(primary_key=not partitioned))
             else:
                 col_defs.append(col.to_sql())
+        if partitioned and self.pkey:
+            col_defs.append(f'PRIMARY KEY ("{self.pkey}", "{self.partition_column}")')
 
         # Add foreign key constraints
         for col in self.columns.values():
@@ -193,11 +235,117 @@ class Table:
                     f'FOREIGN KEY ("{col.name}") REFERENCES {col.relation_table}("{col.relation_pk}")'
                 )
 
-        return f"CREATE TABLE IF NOT EXISTS {self.name} (\n    " + ",\n    ".join(col_defs) + "\n)"
+        col_defs.extend(self.table_constraints())
+
+        sql = f"CREATE TABLE IF NOT EXISTS {self.name} (\n    " + ",\n    ".join(col_defs) + "\n)"
+        if partitioned:
+            sql += f' PARTITION BY RANGE ("{self.partition_column}")'
+        return sql
 
     async def create_schema(self) -> None:
-        """Create table if not exists."""
+        """Create table if not exists, with its partitions when partitioned."""
         await self.db.adapter.execute(self.create_table_sql())
+        await self.ensure_partitions()
+
+    # -------------------------------------------------------------------------
+    # Partitions
+    # -------------------------------------------------------------------------
+
+    async def partitions(self) -> list[str] | None:
+        """Return the table's partition names, or None if it is not partitioned.
+
+        A table created before partitioning was enabled stays a plain
+        table: it is reported as not partitioned.
+        """
+        if self.partition_interval is None:
+            return None
+        return await self.db.adapter.list_partitions(self.name)
+
+    async def ensure_partitions(self, now: datetime | None = None) -> list[str]:
+        """Create the DEFAULT partition and the partitions from now on.
+
+        Covers the partition holding now and the next partition_premake
+        ones. Safe to call repeatedly (startup, retention runs).
+
+        Args:
+            now: Reference time. Defaults to the current UTC time.
+
+        Returns:
+            Names of the partitions created.
+        """
+        existing = await self.partitions()
+        if existing is None:
+            return []
+        interval = self.partition_interval
+        assert interval is not None
+        adapter = self.db.adapter
+        created: list[str] = []
+        default = default_partition_name(self.name)
+        if default not in existing:
+            await adapter.create_partition(self.name, default)
+            created.append(default)
+        now = now or datetime.now(timezone.utc)
+        for lower, upper in partition_ranges(interval, now, self.partition_premake):
+            name = partition_name(self.name, lower)
+            if name not in existing:
+                await adapter.create_partition(
+                    self.name, name, self._partition_bound(lower), self._partition_bound(upper)
+                )
+                created.append(name)
+        return created
+
+    async def drop_expired_partitions(
+        self,
+        before_ts: int,
+        keep_if: str | None = None,
+        params: dict[str, Any] | None = None,
+        detach: bool = False,
+        before_drop: Callable[[str], Awaitable[None]] | None = None,
+    ) -> list[str]:
+        """Drop the range partitions ending at or before a time.
+
+        Args:
+            before_ts: Unix timestamp; partitions whose upper bound is not
+                later than this are candidates.
+            keep_if: SQL condition on a partition row (alias ``t``). A
+                candidate holding any row matching it is kept.
+            params: Parameters of keep_if.
+            detach: Detach the partitions instead of dropping them (to
+                archive them before removal).
+            before_drop: Coroutine called with the name of each partition
+                right before it is dropped (e.g. to archive its rows).
+
+        Returns:
+            Names of the partitions dropped or detached.
+        """
+        existing = await self.partitions()
+        if not existing:
+            return []
+        step = partition_step(self.partition_interval)  # type: ignore[arg-type]
+        limit = utc_datetime(before_ts)
+        removed: list[str] = []
+        for name in existing:
+            lower = partition_lower(self.name, name)
+            if lower is None or lower + step > limit:
+                continue
+            if keep_if:
+                blocker = await self.db.adapter.fetch_one(
+                    f'SELECT 1 AS found FROM "{name}" t WHERE {keep_if} LIMIT 1', params
+                )
+                if blocker is not None:
+                    continue
+            if before_drop is not None:
+                await before_drop(name)
+            await self.db.adapter.drop_partition(self.name, name, detach=detach)
+            removed.append(name)
+        return removed
+
+    def _partition_bound(self, moment: datetime) -> Any:
+        """Return a partition bound in the partition column's type."""
+        col = self.columns.get(self.partition_column)  # type: ignore[arg-type]
+        if col is not None and col.type_ == Timestamp:
+            return moment.strftime("%Y-%m-%d %H:%M:%S")
+        return int(moment.replace(tzinfo=timezone.utc).timestamp())
 
     async def add_column_if_missing(self, column_name: str) -> None:
         """Add column if it doesn't exist (migration helper)."""
@@ -250,7 +398,54 @@ class Table:
 
     def _decode_rows(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Decode JSON fields in multiple rows."""
-        return [self._decode_json_fields(row) for row in rows]
+        if not rows:
+            return []
+        decode = self._row_decoder(tuple(rows[0]), decrypt=False)
+        return [decode(row) for row in rows]
+
+    def _decode_row(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Decode JSON fields and decrypt encrypted fields of a stored row."""
+        return self._row_decoder(tuple(row))(row)
+
+    def _decode_records(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Decode and decrypt rows sharing the same columns."""
+        if not rows:
+            return []
+        decode = self._row_decoder(tuple(rows[0]))
+        return [decode(row) for row in rows]
+
+    def _row_decoder(
+        self, keys: tuple[str, ...], decrypt: bool = True
+    ) -> Callable[[dict[str, Any]], dict[str, Any]]:
+        """Return the cached decoder for rows with the given columns.
+
+        Which columns need JSON decoding or decryption is resolved once
+        from the Columns metadata per result shape, not for every row.
+        """
+        return self._decoders.get((keys, decrypt), lambda: self._build_row_decoder(keys, decrypt))
+
+    def _build_row_decoder(
+        self, keys: tuple[str, ...], decrypt: bool
+    ) -> Callable[[dict[str, Any]], dict[str, Any]]:
+        """Build a row decoder for the given result columns."""
+        json_cols = tuple(c for c in self.columns.json_columns() if c in keys)
+        encrypted_cols = (
+            tuple(c for c in self.columns.encrypted_columns() if c in keys) if decrypt else ()
+        )
+        if not json_cols and not encrypted_cols:
+            return dict
+
+        def decode(row: dict[str, Any]) -> dict[str, Any]:
+            result = dict(row)
+            for col_name in json_cols:
+                value = result.get(col_name)
+                if value is not None:
+                    result[col_name] = json.loads(value)
+            if encrypted_cols and self.db.encryption_key is not None:
+                result = self._decrypt_fields(result)
+            return result
+
+        return decode
 
     # -------------------------------------------------------------------------
     # Encryption
@@ -346,7 +541,26 @@ class Table:
     ) -> list[dict[str, Any]]:
         """Select rows."""
         rows = await self.db.adapter.select(self.name, columns, where, order_by, limit)
-        return [self._decrypt_fields(self._decode_json_fields(row)) for row in rows]
+        return self._decode_records(rows)
+
+    async def select_iter(
+        self,
+        columns: list[str] | None = None,
+        where: dict[str, Any] | None = None,
+        order_by: str | None = None,
+        chunk_size: int = 500,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Select rows as a stream, without materializing the full result.
+
+        Rows are read through DbAdapter.fetch_iter(), chunk_size at a time,
+        and decoded one by one. See fetch_iter() for the locking caveat.
+        """
+        decode = None
+        rows = self.db.adapter.select_iter(self.name, columns, where, order_by, chunk_size)
+        async for row in rows:
+            if decode is None:
+                decode = self._row_decoder(tuple(row))
+            yield decode(row)
 
     async def select_one(
         self,
@@ -355,7 +569,7 @@ class Table:
     ) -> dict[str, Any] | None:
         """Select single row."""
         row = await self.db.adapter.select_one(self.name, columns, where)
-        return self._decrypt_fields(self._decode_json_fields(row)) if row else None
+        return self._decode_row(row) if row else None
 
     async def select_for_update(
         self,
@@ -379,8 +593,9 @@ class Table:
         lock_clause = adapter.for_update_clause()
 
         query = f"SELECT {cols_sql} FROM {self.name} WHERE {where_sql}{lock_clause}"
-        row = await adapter.fetch_one(query, where)
-        return self._decrypt_fields(self._decode_json_fields(row)) if row else None
+        with primary_reads():  # Locks are taken on the primary
+            row = await adapter.fetch_one(query, where)
+        return self._decode_row(row) if row else None
 
     def record(
         self,
@@ -434,15 +649,61 @@ class Table:
             await self.trigger_on_updated(record, old_record)
         return result
 
+    async def update_returning(
+        self,
+        values: dict[str, Any],
+        where: dict[str, Any],
+        condition: str | None = None,
+        params: dict[str, Any] | None = None,
+        returning: list[str] | None = None,
+    ) -> dict[str, Any] | None:
+        """Update a row in one round trip: UPDATE ... WHERE ... RETURNING.
+
+        Cheaper than record() or update() for state transitions that set
+        known values: there is no preliminary SELECT and only the given
+        columns are written. An optional condition makes the transition
+        conditional (e.g. "smtp_ts IS NULL"); when it does not hold, no
+        row is returned and nothing is written.
+
+        The previous row is not read, so trigger_on_updating receives the
+        values to set and trigger_on_updated the returned row, both with an
+        empty old_record. Use record() when a trigger needs the old values.
+
+        Args:
+            values: Column-value pairs to set.
+            where: Equality conditions identifying the row.
+            condition: Extra SQL condition ANDed to the WHERE clause.
+            params: Parameters referenced by condition.
+            returning: Columns to return (None = all). Restrict it when the
+                row holds large values the caller does not need.
+
+        Returns:
+            The updated row (decoded), or None if no row matched.
+        """
+        record = await self.trigger_on_updating(dict(values), {})
+        encoded = self._encrypt_fields(self._encode_json_fields(record))
+        row = await self.db.adapter.update_returning(
+            self.name, encoded, where, condition, params, returning
+        )
+        if row is None:
+            return None
+        updated = self._decode_row(row)
+        await self.trigger_on_updated(updated, {})
+        return updated
+
     async def update_batch(
         self,
         pkeys: list[Any],
         updater: dict[str, Any] | None = None,
     ) -> int:
-        """Update multiple records by primary key, calling triggers for each.
+        """Update multiple records by primary key with set-based writes.
 
-        Performs ONE read (SELECT all records) then N writes (UPDATE per record)
-        with trigger_on_updating/trigger_on_updated called for each.
+        Tables without update triggers get a chunked update_batch_raw().
+        Otherwise each chunk of batch_chunk_size keys is read with one
+        SELECT, trigger_on_updating runs in memory, the changed columns are
+        written with one adapter.update_many() (executemany, or a single
+        UPDATE ... FROM (VALUES ...) on PostgreSQL), and trigger_on_updated
+        is called for each record.
 
         Args:
             pkeys: List of primary key values to update.
@@ -458,35 +719,43 @@ class Table:
         if pkey is None:
             raise ValueError(f"Table {self.name} has no primary key defined")
 
-        # Single SELECT to fetch all records
-        adapter = self.db.adapter
-        params: dict[str, Any] = {}
-        params.update({f"pk_{i}": pk for i, pk in enumerate(pkeys)})
-        placeholders = ", ".join(f"{adapter._placeholder(f'pk_{i}')}" for i in range(len(pkeys)))
-        query = f"SELECT * FROM {self.name} WHERE {pkey} IN ({placeholders})"
-        rows = await adapter.fetch_all(query, params)
+        if updater and not (
+            self._has_trigger("trigger_on_updating") or self._has_trigger("trigger_on_updated")
+        ):
+            return await self.update_batch_raw(pkeys, updater)
 
-        # Index by pk for fast lookup
-        records_by_pk = {row[pkey]: dict(row) for row in rows}
-
-        # N writes with triggers
         updated = 0
-        for pk_value in pkeys:
-            old_record = records_by_pk.get(pk_value)
-            if not old_record:
-                continue
-
-            new_record = dict(old_record)
-            if updater:
-                new_record.update(updater)
-
-            # Call triggers and update
-            new_record = await self.trigger_on_updating(new_record, old_record)
-            encoded = self._encode_json_fields(new_record)
-            result = await adapter.update(self.name, encoded, {pkey: pk_value})
-            if result > 0:
-                await self.trigger_on_updated(new_record, old_record)
-                updated += 1
+        for chunk in self._chunks(pkeys):
+            changes = []
+            for old_record in await self._select_by_pkeys(chunk):
+                new_record = dict(old_record)
+                if updater:
+                    new_record.update(updater)
+                new_record = await self.trigger_on_updating(new_record, old_record)
+                changes.append((new_record, old_record))
+
+            # Write only the columns that changed in at least one record
+            columns = sorted(
+                {
+                    k
+                    for new, old in changes
+                    for k, v in new.items()
+                    if k != pkey and (k not in old or old[k] != v)
+                }
+            )
+            if columns:
+                rows = []
+                for new, _ in changes:
+                    encoded = self._encrypt_fields(
+                        self._encode_json_fields({c: new.get(c) for c in columns})
+                    )
+                    encoded[pkey] = new[pkey]
+                    rows.append(encoded)
+                await self.db.adapter.update_many(self.name, pkey, rows, self._column_types())
+
+            for new, old in changes:
+                await self.trigger_on_updated(new, old)
+            updated += len(changes)
 
         return updated
 
@@ -495,10 +764,10 @@ class Table:
         pkeys: list[Any],
         updater: dict[str, Any],
     ) -> int:
-        """Update multiple records with a single UPDATE statement. No triggers.
+        """Update multiple records with UPDATE ... WHERE pk IN (...). No triggers.
 
         Use when you know there are no triggers to call and want maximum efficiency.
-        Performs a single UPDATE ... WHERE pk IN (...) query.
+        Keys are processed in chunks of batch_chunk_size, one statement each.
 
         Args:
             pkeys: List of primary key values to update.
@@ -520,13 +789,76 @@ class Table:
         set_parts = [f"{k} = {adapter._placeholder(k)}" for k in updater]
         set_clause = ", ".join(set_parts)
 
-        # Build IN clause
-        params: dict[str, Any] = dict(updater)
-        params.update({f"pk_{i}": pk for i, pk in enumerate(pkeys)})
-        placeholders = ", ".join(f"{adapter._placeholder(f'pk_{i}')}" for i in range(len(pkeys)))
+        updated = 0
+        for chunk in self._chunks(pkeys):
+            # Build IN clause
+            params: dict[str, Any] = dict(updater)
+            params.update({f"pk_{i}": pk for i, pk in enumerate(chunk)})
+            placeholders = ", ".join(
+                f"{adapter._placeholder(f'pk_{i}')}" for i in range(len(chunk))
+            )
+            query = f"UPDATE {self.name} SET {set_clause} WHERE {pkey} IN ({placeholders})"
+            updated += await adapter.execute(query, params)
+        return updated
+
+    async def delete_batch(self, pkeys: list[Any]) -> int:
+        """Delete multiple records by primary key with chunked DELETE ... IN.
+
+        Each chunk of batch_chunk_size keys is one DELETE statement. When
+        the table has delete triggers, the chunk's records are read with one
+        SELECT and trigger_on_deleting/trigger_on_deleted are called for each
+        record around the statement.
+
+        Args:
+            pkeys: List of primary key values to delete.
+
+        Returns:
+            Number of records deleted.
+        """
+        if not pkeys:
+            return 0
 
-        query = f"UPDATE {self.name} SET {set_clause} WHERE {pkey} IN ({placeholders})"
-        return await adapter.execute(query, params)
+        pkey = self.pkey
+        if pkey is None:
+            raise ValueError(f"Table {self.name} has no primary key defined")
+
+        with_triggers = self._has_trigger("trigger_on_deleting") or self._has_trigger(
+            "trigger_on_deleted"
+        )
+        deleted = 0
+        for chunk in self._chunks(pkeys):
+            records = await self._select_by_pkeys(chunk) if with_triggers else []
+            for record in records:
+                await self.trigger_on_deleting(record)
+            deleted += await self.db.adapter.delete_in(self.name, pkey, chunk)
+            for record in records:
+                await self.trigger_on_deleted(record)
+        return deleted
+
+    def _has_trigger(self, hook: str) -> bool:
+        """Check whether a trigger hook is overridden (by subclass or instance)."""
+        method = getattr(self, hook)
+        return getattr(method, "__func__", None) is not getattr(Table, hook)
+
+    def _chunks(self, pkeys: list[Any]) -> list[list[Any]]:
+        """Split keys into chunks of batch_chunk_size, dropping duplicates."""
+        unique = list(dict.fromkeys(pkeys))
+        size = max(1, self.batch_chunk_size)
+        return [unique[i : i + size] for i in range(0, len(unique), size)]
+
+    def _column_types(self) -> dict[str, str]:
+        """Return the SQL type of each column."""
+        return {name: col.type_ for name, col in self.columns.items()}
+
+    async def _select_by_pkeys(self, pkeys: list[Any]) -> list[dict[str, Any]]:
+        """Select records by primary key with one query, decoded."""
+        adapter = self.db.adapter
+        params = {f"pk_{i}": pk for i, pk in enumerate(pkeys)}
+        placeholders = ", ".join(f"{adapter._placeholder(f'pk_{i}')}" for i in range(len(pkeys)))
+        rows = await adapter.fetch_all(
+            f"SELECT * FROM {self.name} WHERE {self.pkey} IN ({placeholders})", params
+        )
+        return self._decode_records(rows)
 
     async def delete(self, where: dict[str, Any]) -> int:
         """Delete rows. Calls trigger_on_deleting before and trigger_on_deleted after."""
@@ -556,7 +888,7 @@ class Table:
     ) -> dict[str, Any] | None:
         """Execute raw query, return single row."""
         row = await self.db.adapter.fetch_one(query, params)
-        return self._decode_json_fields(row) if row else None
+        return self._row_decoder(tuple(row), decrypt=False)(row) if row else None
 
     async def fetch_all(
         self, query: str, params: dict[str, Any] | None = None
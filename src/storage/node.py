@@ -15,6 +15,8 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
     from .manager import StorageManager
 
 
@@ -156,6 +158,16 @@ class StorageNode:
             return self._get_local_path().read_bytes()
         return await self._cloud_read_bytes()
 
+    async def iter_bytes(self, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        """Read file content in chunks without loading it whole."""
+        if self._protocol == "local":
+            with self._get_local_path().open("rb") as f:
+                while chunk := f.read(chunk_size):
+                    yield chunk
+            return
+        async for chunk in self._cloud_iter_bytes(chunk_size):
+            yield chunk
+
     async def read_text(self, encoding: str = "utf-8") -> str:
         """Read entire file as string."""
         data = await self.read_bytes()
@@ -300,6 +312,9 @@ class StorageNode:
     async def _cloud_read_bytes(self) -> bytes:
         raise NotImplementedError(f"Protocol '{self._protocol}' requires Enterprise Edition")
 
+    def _cloud_iter_bytes(self, chunk_size: int) -> AsyncIterator[bytes]:
+        raise NotImplementedError(f"Protocol '{self._protocol}' requires Enterprise Edition")
+
     async def _cloud_write_bytes(self, data: bytes) -> None:
         raise NotImplementedError(f"Protocol '{self._protocol}' requires Enterprise Edition")
 
@@ -0,0 +1,195 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Pluggable compression for large text values stored in the database.
+
+Message and command payloads are JSON documents (HTML bodies, address
+lists, inline content) that compress well. Values are compressed with a
+named codec and stored as text with a format marker, so TEXT columns stay
+portable between SQLite and PostgreSQL and rows written before compression
+was enabled are returned unchanged.
+
+Stored format::
+
+    ZC:<codec>:<base64 of compressed UTF-8 bytes>
+
+Built-in codecs:
+    zlib: Standard library deflate, always available.
+    zstd: Zstandard, available when the ``zstandard`` package is installed.
+        Accepts an optional pre-trained dictionary.
+
+Usage:
+    from tools.compression import compress_value, decompress_value
+
+    stored = compress_value(json.dumps(payload), "zlib")
+    # Returns: "ZC:zlib:eJy..." (or the input if compression does not help)
+
+    text = decompress_value(stored)
+"""
+
+from __future__ import annotations
+
+import base64
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None  # type: ignore[assignment]
+
+# Prefix to identify compressed values
+COMPRESSED_PREFIX = "ZC:"
+
+COMPRESS_MIN_SIZE = 512
+"""Values shorter than this (in characters) are stored uncompressed."""
+
+
+class CompressionError(ValueError):
+    """Raised when a value cannot be compressed or decompressed."""
+
+    pass
+
+
+class Codec:
+    """Base class for compression codecs.
+
+    Attributes:
+        name: Identifier written in the format marker. Must not contain ':'.
+    """
+
+    name: str = ""
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress raw bytes."""
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        """Decompress bytes produced by compress()."""
+        raise NotImplementedError
+
+
+class ZlibCodec(Codec):
+    """Deflate codec from the standard library."""
+
+    def __init__(self, level: int = 6, name: str = "zlib"):
+        self.name = name
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCodec(Codec):
+    """Zstandard codec, optionally using a pre-trained dictionary.
+
+    A dictionary trained on representative payloads (e.g. one tenant's
+    templates) improves the ratio on small documents. Register it under
+    its own name so rows record which dictionary they need.
+    """
+
+    def __init__(self, level: int = 3, dictionary: bytes | None = None, name: str = "zstd"):
+        if zstandard is None:
+            raise CompressionError("zstd codec requires the 'zstandard' package")
+        self.name = name
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        self._compressor = zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+        self._decompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+_codecs: dict[str, Codec] = {"zlib": ZlibCodec()}
+if zstandard is not None:
+    _codecs["zstd"] = ZstdCodec()
+
+
+def register_codec(codec: Codec) -> None:
+    """Register a codec, replacing any codec with the same name.
+
+    Args:
+        codec: Codec instance. Its name identifies it in stored values.
+
+    Raises:
+        ValueError: If the codec name is empty or contains ':'.
+    """
+    if not codec.name or ":" in codec.name:
+        raise ValueError(f"Invalid codec name: {codec.name!r}")
+    _codecs[codec.name] = codec
+
+
+def get_codec(name: str) -> Codec:
+    """Return a registered codec by name.
+
+    Raises:
+        CompressionError: If no codec with this name is registered.
+    """
+    codec = _codecs.get(name)
+    if codec is None:
+        raise CompressionError(f"Unknown compression codec: {name}")
+    return codec
+
+
+def is_compressed(value: str) -> bool:
+    """Check if a value is compressed (has ZC: prefix)."""
+    return isinstance(value, str) and value.startswith(COMPRESSED_PREFIX)
+
+
+def compress_value(text: str, codec: str | None = "zlib", min_size: int = COMPRESS_MIN_SIZE) -> str:
+    """Compress a text value for storage.
+
+    Args:
+        text: Value to store.
+        codec: Registered codec name. None stores the value as-is.
+        min_size: Values shorter than this are stored as-is.
+
+    Returns:
+        Marked compressed value, or the input when compression is disabled,
+        the value is short, or compressing would not make it smaller.
+    """
+    if not codec or len(text) < min_size or is_compressed(text):
+        return text
+    packed = base64.b64encode(get_codec(codec).compress(text.encode("utf-8"))).decode("ascii")
+    stored = f"{COMPRESSED_PREFIX}{codec}:{packed}"
+    return stored if len(stored) < len(text) else text
+
+
+def decompress_value(value: str) -> str:
+    """Return the original text of a value written by compress_value().
+
+    Values without the compression marker are returned unchanged.
+
+    Raises:
+        CompressionError: If the codec is unknown or the data is corrupted.
+    """
+    if not is_compressed(value):
+        return value
+    name, sep, packed = value[len(COMPRESSED_PREFIX) :].partition(":")
+    if not sep:
+        raise CompressionError("Malformed compressed value")
+    codec = get_codec(name)
+    try:
+        return codec.decompress(base64.b64decode(packed)).decode("utf-8")
+    except CompressionError:
+        raise
+    except Exception as e:
+        raise CompressionError(f"Cannot decompress value with codec {name}: {e}") from e
+
+
+__all__ = [
+    "COMPRESSED_PREFIX",
+    "COMPRESS_MIN_SIZE",
+    "Codec",
+    "CompressionError",
+    "ZlibCodec",
+    "ZstdCodec",
+    "compress_value",
+    "decompress_value",
+    "get_codec",
+    "is_compressed",
+    "register_codec",
+]
@@ -13,6 +13,7 @@ from .client import (
     AccountsAPI,
     MailProxyClient,
     Message,
+    MessageListing,
     MessagesAPI,
     Tenant,
     TenantsAPI,
@@ -25,6 +26,7 @@ __all__ = [
     "AccountsAPI",
     "MailProxyClient",
     "Message",
+    "MessageListing",
     "MessagesAPI",
     "Tenant",
     "TenantsAPI",
@@ -26,11 +26,15 @@ Usage in async context:
     ...     client = MailProxyClient("http://localhost:8000", token="secret")
     ...     status = await client.status()
     ...     messages = await client.messages.list()
+    ...     async for message in client.messages.stream(page_size=500):
+    ...         print(message.id, message.status)
 """
 
 from __future__ import annotations
 
 import builtins
+import json
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -256,6 +260,43 @@ class CommandLogEntry:
 # =============================================================================
 
 
+class MessageListing:
+    """Messages of a listing, fetched from the server one page at a time.
+
+    Returned by ``client.messages.stream()``. Iterate it with ``async for``
+    to stream the messages without holding them all in memory, or await it
+    to get them all as a list. In sync context (REPL) it is iterable with
+    a plain ``for``.
+    """
+
+    def __init__(self, api: MessagesAPI, params: dict[str, Any]):
+        self._api = api
+        self._params = params
+
+    async def __aiter__(self):
+        cursor = None
+        while True:
+            messages, cursor = await self._api.page(cursor=cursor, **self._params)
+            for message in messages:
+                yield message
+            if not cursor:
+                return
+
+    def __iter__(self):
+        cursor = None
+        while True:
+            messages, cursor = self._api.page(cursor=cursor, **self._params)
+            yield from messages
+            if not cursor:
+                return
+
+    def __await__(self):
+        return self._collect().__await__()
+
+    async def _collect(self) -> builtins.list[Message]:
+        return [message async for message in self]
+
+
 class MessagesAPI:
     """Sub-API for managing email messages in the queue. Access via ``client.messages``."""
 
@@ -280,6 +321,89 @@ class MessagesAPI:
         data = await self._client._get("/messages/list", params=params or None)
         return [Message.from_dict(m) for m in data]
 
+    def stream(
+        self,
+        tenant_id: str | None = None,
+        active_only: bool = False,
+        include_history: bool = False,
+        fields: builtins.list[str] | None = None,
+        page_size: int = 100,
+    ) -> MessageListing:
+        """List messages in the queue, following the server's page cursors.
+
+        Args:
+            tenant_id: Tenant to list (defaults to the client's tenant).
+            active_only: Only pending/deferred messages.
+            include_history: Include the event history of each message.
+            fields: Fields to return; add "message" to get subject, sender
+                and recipients. The payload is not transferred by default.
+            page_size: Messages per request (at most 1000).
+
+        Returns:
+            MessageListing: ``async for`` it, or await it for a list.
+        """
+        return MessageListing(
+            self,
+            {
+                "tenant_id": tenant_id,
+                "active_only": active_only,
+                "include_history": include_history,
+                "fields": fields,
+                "limit": page_size,
+            },
+        )
+
+    @smartasync
+    async def page(
+        self,
+        tenant_id: str | None = None,
+        active_only: bool = False,
+        include_history: bool = False,
+        fields: builtins.list[str] | None = None,
+        limit: int = 100,
+        cursor: str | None = None,
+    ) -> tuple[builtins.list[Message], str | None]:
+        """Fetch one page of messages; returns (messages, next_cursor)."""
+        params: dict[str, Any] = {"limit": limit}
+        if tenant_id or self._client.tenant_id:
+            params["tenant_id"] = tenant_id or self._client.tenant_id
+        if active_only:
+            params["active_only"] = "true"
+        if include_history:
+            params["include_history"] = "true"
+        if fields:
+            params["fields"] = ",".join(fields)
+        if cursor:
+            params["cursor"] = cursor
+        data = await self._client._get("/messages/list_page", params=params)
+        return [Message.from_dict(m) for m in data["messages"]], data.get("next_cursor")
+
+    def export(
+        self, tenant_id: str | None = None, active_only: bool = False
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream all messages of a tenant with payload (NDJSON export).
+
+        Use with ``async for``; records arrive as the server reads them.
+        """
+        params: dict[str, Any] = {"tenant_id": tenant_id or self._client.tenant_id}
+        if active_only:
+            params["active_only"] = "true"
+        return self._client._stream("/messages/export", params=params)
+
+    def export_events(
+        self,
+        tenant_id: str | None = None,
+        since_ts: int | None = None,
+        until_ts: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream the delivery events of a tenant's messages (NDJSON export)."""
+        params: dict[str, Any] = {"tenant_id": tenant_id or self._client.tenant_id}
+        if since_ts:
+            params["since_ts"] = since_ts
+        if until_ts:
+            params["until_ts"] = until_ts
+        return self._client._stream("/messages/export_events", params=params)
+
     @smartasync
     async def get(self, message_id: str, tenant_id: str) -> Message:
         """Get a specific message by ID."""
@@ -718,6 +842,26 @@ class CommandLogAPI:
             params["until_ts"] = until_ts
         return await self._client._get("/command_log/export", params=params or None)
 
+    def export_stream(
+        self,
+        tenant_id: str | None = None,
+        since_ts: int | None = None,
+        until_ts: int | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream commands in replay-friendly format (NDJSON export).
+
+        Use with ``async for``; unlike export(), the log is never held in
+        memory as a whole, on either side.
+        """
+        params: dict[str, Any] = {}
+        if tenant_id:
+            params["tenant_id"] = tenant_id
+        if since_ts:
+            params["since_ts"] = since_ts
+        if until_ts:
+            params["until_ts"] = until_ts
+        return self._client._stream("/command_log/export_stream", params=params or None)
+
     @smartasync
     async def purge(self, threshold_ts: int) -> dict[str, Any]:
         """Delete command logs older than threshold."""
@@ -805,6 +949,21 @@ class MailProxyClient:
             resp.raise_for_status()
             return resp.json()
 
+    async def _stream(self, path: str, params: dict[str, Any] | None = None) -> AsyncIterator[Any]:
+        """Make a streaming GET request and yield its NDJSON records."""
+        async with httpx.AsyncClient() as client:
+            async with client.stream(
+                "GET",
+                f"{self.url}{path}",
+                headers=self._headers(),
+                params=params,
+                timeout=30,
+            ) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if line:
+                        yield json.loads(line)
+
     async def _post(
         self,
         path: str,
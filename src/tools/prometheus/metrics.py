@@ -10,8 +10,22 @@ Metrics exposed:
     - ``gmp_deferred_total``: Counter of deferred emails per account.
     - ``gmp_rate_limited_total``: Counter of rate limit hits per account.
     - ``gmp_pending_messages``: Gauge of messages currently in queue.
+    - ``gmp_queue_messages``: Gauge of queued messages by tenant, account,
+      priority and state (pending, deferred, in_flight).
+    - ``gmp_queue_oldest_pending_seconds``: Gauge of the age of the oldest
+      pending message by tenant, account and priority.
+    - ``gmp_retention_purged_messages_total``: Counter of messages removed
+      by the retention purger.
+    - ``gmp_retention_purged_events_total``: Counter of message events
+      removed with them.
+    - ``gmp_retention_dropped_partitions_total``: Counter of table
+      partitions dropped (or detached) by the retention purger.
+    - ``gmp_retention_run_seconds``: Gauge of the duration of the last
+      purger run.
+    - ``gmp_retention_pass_timestamp_seconds``: Gauge of the Unix time the
+      purger last finished a full pass over the messages table.
 
-All counters are labeled by:
+The dispatch counters are labeled by:
     - ``tenant_id``: Tenant identifier
     - ``tenant_name``: Human-readable tenant name
     - ``account_id``: SMTP account identifier
@@ -25,6 +39,10 @@ Example:
     Returns Prometheus text format suitable for scraping.
 """
 
+import time
+from collections.abc import Mapping
+from typing import Any
+
 from prometheus_client import (
     CollectorRegistry,
     Counter,
@@ -39,6 +57,10 @@ disable_created_metrics()
 # Label names for all counters
 LABEL_NAMES = ["tenant_id", "tenant_name", "account_id", "account_name"]
 
+# Label names of the queue gauges
+QUEUE_LABEL_NAMES = ["tenant_id", "account_id", "priority"]
+QUEUE_STATES = ("pending", "deferred", "in_flight")
+
 
 class MailMetrics:
     """Prometheus metrics collector for the mail dispatcher.
@@ -54,6 +76,11 @@ class MailMetrics:
         deferred: Counter tracking temporarily deferred messages.
         rate_limited: Counter tracking rate limit enforcement events.
         pending: Gauge showing current queue depth.
+        retention_purged_messages: Counter of messages removed by retention.
+        retention_purged_events: Counter of events removed by retention.
+        retention_dropped_partitions: Counter of partitions dropped by retention.
+        retention_run_seconds: Gauge with the duration of the last purger run.
+        retention_pass_ts: Gauge with the time of the last completed purge pass.
     """
 
     def __init__(self, registry: CollectorRegistry | None = None):
@@ -94,6 +121,44 @@ class MailMetrics:
             "Current pending messages",
             registry=self.registry,
         )
+        self.retention_purged_messages = Counter(
+            "gmp_retention_purged_messages",
+            "Total messages removed by the retention purger",
+            registry=self.registry,
+        )
+        self.retention_purged_events = Counter(
+            "gmp_retention_purged_events",
+            "Total message events removed by the retention purger",
+            registry=self.registry,
+        )
+        self.retention_dropped_partitions = Counter(
+            "gmp_retention_dropped_partitions",
+            "Total table partitions dropped by the retention purger",
+            registry=self.registry,
+        )
+        self.retention_run_seconds = Gauge(
+            "gmp_retention_run_seconds",
+            "Duration of the last retention purger run",
+            registry=self.registry,
+        )
+        self.retention_pass_ts = Gauge(
+            "gmp_retention_pass_timestamp_seconds",
+            "Unix time of the last completed retention pass",
+            registry=self.registry,
+        )
+        self.queue_messages = Gauge(
+            "gmp_queue_messages",
+            "Queued messages by state",
+            [*QUEUE_LABEL_NAMES, "state"],
+            registry=self.registry,
+        )
+        self.queue_oldest_pending = Gauge(
+            "gmp_queue_oldest_pending_seconds",
+            "Age of the oldest pending message",
+            QUEUE_LABEL_NAMES,
+            registry=self.registry,
+        )
+        self._queue_keys: set[tuple[str, str, str]] = set()
 
     def _labels(
         self,
@@ -162,6 +227,62 @@ class MailMetrics:
         """
         self.pending.set(value)
 
+    def set_queue_stats(self, stats: Mapping[tuple[str, str, int], Any]) -> None:
+        """Publish the queue stats as labeled gauges.
+
+        Label sets of groups no longer in the queue are removed, so the
+        output only holds non-empty queues. gmp_pending_messages is set
+        to the total.
+
+        Args:
+            stats: Map of (tenant_id, account_id, priority) to counts with
+                pending, deferred, in_flight and oldest_pending_ts
+                attributes (see QueueStats.snapshot()).
+        """
+        now = time.time()
+        keys: set[tuple[str, str, str]] = set()
+        total = 0
+        for (tenant_id, account_id, priority), counts in stats.items():
+            key = (tenant_id or "default", account_id or "default", str(priority))
+            keys.add(key)
+            for state in QUEUE_STATES:
+                value = getattr(counts, state)
+                total += value
+                self.queue_messages.labels(*key, state).set(value)
+            oldest = counts.oldest_pending_ts
+            self.queue_oldest_pending.labels(*key).set(max(0.0, now - oldest) if oldest else 0)
+        for key in self._queue_keys - keys:
+            for state in QUEUE_STATES:
+                self.queue_messages.remove(*key, state)
+            self.queue_oldest_pending.remove(*key)
+        self._queue_keys = keys
+        self.pending.set(total)
+
+    def record_retention_run(
+        self,
+        messages: int,
+        events: int,
+        duration: float,
+        pass_completed_ts: float | None = None,
+        partitions: int = 0,
+    ) -> None:
+        """Record the progress of one retention purger run.
+
+        Args:
+            messages: Messages removed in the run.
+            events: Message events removed in the run.
+            duration: Seconds the run took.
+            pass_completed_ts: Unix time the run finished a full pass, or
+                None if the pass continues in the next run.
+            partitions: Table partitions dropped in the run.
+        """
+        self.retention_purged_messages.inc(messages)
+        self.retention_purged_events.inc(events)
+        self.retention_dropped_partitions.inc(partitions)
+        self.retention_run_seconds.set(duration)
+        if pass_completed_ts is not None:
+            self.retention_pass_ts.set(pass_completed_ts)
+
     def init_account(
         self,
         tenant_id: str | None = None,
@@ -47,6 +47,9 @@ class DummyMetrics:
     def set_pending(self, value: int):
         pass
 
+    def set_queue_stats(self, stats):
+        pass
+
     def inc_sent(self, account_id: str):
         self.sent_count += 1
 
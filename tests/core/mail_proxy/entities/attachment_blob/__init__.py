@@ -0,0 +1,2 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for attachment blob entity."""
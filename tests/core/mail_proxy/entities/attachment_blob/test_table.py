@@ -0,0 +1,96 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for AttachmentBlobsTable - content-addressed attachment storage."""
+
+import hashlib
+import time
+
+import pytest
+
+from core.mail_proxy.proxy_base import MailProxyBase
+from core.mail_proxy.proxy_config import ProxyConfig
+
+
+@pytest.fixture
+async def db(tmp_path):
+    """Create database with schema only (no init logic)."""
+    proxy = MailProxyBase(ProxyConfig(db_path=str(tmp_path / "test.db")))
+    await proxy.db.connect()
+    await proxy.db.check_structure()
+    yield proxy.db
+    await proxy.close()
+
+
+class TestAttachmentBlobsTablePut:
+    """Tests for AttachmentBlobsTable.put() and get_content()."""
+
+    async def test_put_returns_md5_and_size(self, db):
+        """put() keys content by its MD5."""
+        content = b"%PDF-1.4 test document"
+        md5, size = await db.table("attachment_blobs").put(content)
+        assert md5 == hashlib.md5(content).hexdigest()
+        assert size == len(content)
+
+    async def test_get_content_roundtrip(self, db):
+        """get_content() returns the stored bytes."""
+        blobs = db.table("attachment_blobs")
+        content = bytes(range(256)) * 4
+        md5, _ = await blobs.put(content)
+        assert await blobs.get_content(md5) == content
+
+    async def test_get_content_missing(self, db):
+        """get_content() returns None for unknown blobs."""
+        assert await db.table("attachment_blobs").get_content("0" * 32) is None
+
+    async def test_put_same_content_stores_once(self, db):
+        """Identical content is deduplicated."""
+        blobs = db.table("attachment_blobs")
+        await blobs.put(b"same")
+        await blobs.put(b"same")
+        rows = await blobs.select()
+        assert len(rows) == 1
+
+
+class TestAttachmentBlobsTableRemoveUnreferenced:
+    """Tests for AttachmentBlobsTable.remove_unreferenced()."""
+
+    async def test_removes_only_unreferenced(self, db):
+        """Blobs still referenced are kept."""
+        blobs = db.table("attachment_blobs")
+        kept, _ = await blobs.put(b"kept")
+        dropped, _ = await blobs.put(b"dropped")
+
+        removed = await blobs.remove_unreferenced({kept}, older_than_ts=int(time.time()) + 1)
+
+        assert removed == 1
+        assert await blobs.get_content(kept) == b"kept"
+        assert await blobs.get_content(dropped) is None
+
+    async def test_recent_blobs_are_kept(self, db):
+        """Blobs stored after the threshold survive even if unreferenced."""
+        blobs = db.table("attachment_blobs")
+        md5, _ = await blobs.put(b"just enqueued")
+
+        removed = await blobs.remove_unreferenced(set(), older_than_ts=int(time.time()) - 60)
+
+        assert removed == 0
+        assert await blobs.get_content(md5) == b"just enqueued"
+
+    async def test_orphans_deleted_in_chunks(self, db):
+        """Orphans are deleted with one statement per batch_chunk_size md5s."""
+        blobs = db.table("attachment_blobs")
+        blobs.batch_chunk_size = 2
+        md5s = [(await blobs.put(f"blob{i}".encode()))[0] for i in range(5)]
+        deletes = []
+        execute = db.adapter.execute
+
+        async def spy(query, params=None):
+            if query.startswith("DELETE"):
+                deletes.append(params)
+            return await execute(query, params)
+
+        db.adapter.execute = spy
+        removed = await blobs.remove_unreferenced({md5s[0]}, older_than_ts=int(time.time()) + 1)
+
+        assert removed == 4
+        assert [len(p) - 1 for p in deletes] == [2, 2]
+        assert [row["md5"] for row in await blobs.select()] == [md5s[0]]
@@ -81,6 +81,21 @@ class TestCommandLogEndpointExport:
         )
 
 
+class TestCommandLogEndpointExportStream:
+    """Tests for CommandLogEndpoint.export_stream() method."""
+
+    async def test_export_stream_returns_iterator(self, endpoint, mock_table):
+        """export_stream() returns the table's streaming iterator."""
+        mock_table.iter_export = MagicMock(return_value="iterator")
+        result = await endpoint.export_stream(tenant_id="t1", since_ts=1000)
+        assert result == "iterator"
+        mock_table.iter_export.assert_called_once_with(
+            tenant_id="t1",
+            since_ts=1000,
+            until_ts=None,
+        )
+
+
 class TestCommandLogEndpointPurge:
     """Tests for CommandLogEndpoint.purge() method."""
 
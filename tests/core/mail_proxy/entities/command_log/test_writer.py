@@ -0,0 +1,161 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for CommandLogWriter buffered audit writes."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core.mail_proxy.entities.command_log import CommandLogWriter
+
+
+@pytest.fixture
+def db():
+    """Mock database whose command_log table records each written batch."""
+    table = MagicMock()
+    table.batches = []
+
+    async def log_commands(entries):
+        table.batches.append(list(entries))
+        return len(entries)
+
+    table.log_commands = AsyncMock(side_effect=log_commands)
+    mock_db = MagicMock()
+    mock_db.table = MagicMock(return_value=table)
+    return mock_db
+
+
+class TestCommandLogWriter:
+    """Tests for buffering, batching, policies and shutdown."""
+
+    def test_unknown_policy_rejected(self, db):
+        """An unknown policy is rejected at construction."""
+        with pytest.raises(ValueError):
+            CommandLogWriter(db, policy="everything")
+
+    async def test_submit_does_not_wait_for_write(self, db):
+        """submit() returns before anything is written."""
+        writer = CommandLogWriter(db, flush_interval=10)
+
+        await writer.submit("addTenant", {"id": "t1"}, tenant_id="t1", response_status=200)
+
+        assert db.table("command_log").batches == []
+        await writer.stop()
+        entry = db.table("command_log").batches[0][0]
+        assert entry["endpoint"] == "addTenant"
+        assert entry["tenant_id"] == "t1"
+        assert entry["command_ts"] > 0
+
+    async def test_entries_written_in_one_batch(self, db):
+        """Entries buffered within the interval share one insert."""
+        writer = CommandLogWriter(db, flush_interval=0.02)
+
+        for i in range(5):
+            await writer.submit("addTenant", {"id": f"t{i}"})
+        await asyncio.sleep(0.1)
+
+        assert [len(b) for b in db.table("command_log").batches] == [5]
+        await writer.stop()
+
+    async def test_interval_expiry_writes_partial_batch(self, db):
+        """Entries below batch_size are written when flush_interval expires."""
+        writer = CommandLogWriter(db, batch_size=500, flush_interval=0.02)
+
+        await writer.submit("addTenant", {"id": "t1"})
+        await asyncio.sleep(0.1)
+        await writer.submit("addTenant", {"id": "t2"})
+        await asyncio.sleep(0.1)
+
+        assert [len(b) for b in db.table("command_log").batches] == [1, 1]
+        assert not writer._task.done()
+        await writer.stop()
+
+    async def test_full_batch_written_without_waiting(self, db):
+        """Reaching batch_size writes before the interval expires."""
+        writer = CommandLogWriter(db, batch_size=2, flush_interval=10)
+
+        await writer.submit("addTenant", {"id": "t1"})
+        await writer.submit("addTenant", {"id": "t2"})
+        await asyncio.sleep(0.05)
+
+        assert [len(b) for b in db.table("command_log").batches] == [2]
+        await writer.stop()
+
+    async def test_policy_applied_on_submit(self, db):
+        """Payloads and responses are reduced by the configured policy."""
+        writer = CommandLogWriter(db, policy="digest")
+
+        await writer.submit(
+            "addMessages",
+            {"tenant_id": "t1", "messages": [{"id": "m1", "body": "x" * 1000}]},
+            response_body={"ok": True, "queued": 1, "rejected": []},
+        )
+        await writer.stop()
+
+        entry = db.table("command_log").batches[0][0]
+        assert entry["payload"]["message_ids"] == ["m1"]
+        assert "messages" not in entry["payload"]
+        assert entry["response_body"] == {"ok": True, "queued": 1, "rejected": 0}
+
+    async def test_buffer_full_waits_for_write(self, db):
+        """With a full buffer, submit() waits for the write instead of dropping."""
+        table = db.table("command_log")
+        release = asyncio.Event()
+        written = []
+
+        async def slow_log_commands(entries):
+            await release.wait()
+            written.extend(entries)
+            return len(entries)
+
+        table.log_commands = AsyncMock(side_effect=slow_log_commands)
+        writer = CommandLogWriter(db, max_pending_bytes=300, flush_interval=10)
+
+        await writer.submit("addTenant", {"id": "t0"})
+        await writer.submit("addTenant", {"id": "t1"})
+        third = asyncio.create_task(writer.submit("addTenant", {"id": "t2"}))
+        await asyncio.sleep(0.05)
+        assert not third.done()
+        assert writer.pending_bytes <= 300
+
+        release.set()
+        await asyncio.wait_for(third, timeout=1)
+        await writer.stop()
+        assert [e["payload"]["id"] for e in written] == ["t0", "t1", "t2"]
+        assert writer.dropped == 0
+        assert writer.pending_bytes == 0
+
+    async def test_buffer_full_drops_entries_when_enabled(self, db):
+        """With drop_when_full, entries beyond max_pending_bytes are dropped and counted."""
+        writer = CommandLogWriter(db, max_pending_bytes=300, flush_interval=10, drop_when_full=True)
+
+        for i in range(3):
+            await writer.submit("addTenant", {"id": f"t{i}"})
+
+        assert writer.dropped == 1
+        await writer.stop()
+        assert sum(len(b) for b in db.table("command_log").batches) == 2
+
+    async def test_oversized_entry_accepted_in_empty_buffer(self, db):
+        """An entry larger than the buffer is written, not blocked forever."""
+        writer = CommandLogWriter(db, max_pending_bytes=10, flush_interval=10)
+
+        await asyncio.wait_for(writer.submit("addTenant", {"id": "t" * 100}), timeout=1)
+        await writer.stop()
+
+        assert sum(len(b) for b in db.table("command_log").batches) == 1
+
+    async def test_write_failure_is_logged_not_raised(self, db):
+        """A failed insert is logged and later entries are still written."""
+        table = db.table("command_log")
+        table.log_commands = AsyncMock(side_effect=[RuntimeError("db down"), 1])
+        logger = MagicMock()
+        writer = CommandLogWriter(db, flush_interval=0, logger=logger)
+
+        await writer.submit("addTenant", {"id": "t1"})
+        await asyncio.sleep(0.02)
+        await writer.submit("addTenant", {"id": "t2"})
+        await writer.stop()
+
+        assert table.log_commands.await_count == 2
+        logger.warning.assert_called_once()
@@ -22,8 +22,11 @@ def mock_table():
     table = MagicMock()
     table.insert_batch = AsyncMock(return_value=[{"id": "test", "pk": "pk-123"}])
     table.get = AsyncMock(return_value=None)
+    table.get_archived = AsyncMock(return_value=None)
     table.list_all = AsyncMock(return_value=[])
+    table.list_page = AsyncMock(return_value=([], None))
     table.remove_by_pk = AsyncMock(return_value=True)
+    table.remove_for_tenant = AsyncMock(side_effect=lambda ids, tenant_id: set(ids))
     table.count_active = AsyncMock(return_value=0)
     table.count_pending_for_tenant = AsyncMock(return_value=0)
     table.get_ids_for_tenant = AsyncMock(return_value=set())
@@ -197,6 +200,48 @@ class TestMessageEndpointGet:
         with pytest.raises(ValueError, match="Message 'nonexistent' not found"):
             await endpoint.get("nonexistent", "t1")
 
+    async def test_get_falls_back_to_archive(self, endpoint, mock_table):
+        """get() returns archived messages, flagged as such."""
+        mock_table.get_archived = AsyncMock(
+            return_value={"id": "old", "smtp_ts": 100, "error": None, "history": []}
+        )
+        result = await endpoint.get("old", "t1")
+        assert result["archived"] is True
+        assert result["status"] == MessageStatus.SENT.value
+        mock_table.get_archived.assert_awaited_once_with("old", "t1")
+
+
+class TestMessageEndpointList:
+    """Tests for MessageEndpoint.list() and list_page()."""
+
+    async def test_list_returns_every_message(self, endpoint, mock_table):
+        """list() returns the full listing, payload included, as a plain list."""
+        mock_table.list_all = AsyncMock(return_value=[
+            {"id": f"m{i}", "smtp_ts": None, "deferred_ts": None, "message": {"to": "x"}}
+            for i in range(150)
+        ])
+        result = await endpoint.list("t1")
+        assert len(result) == 150
+        assert result[0]["message"] == {"to": "x"}
+        mock_table.list_page.assert_not_called()
+
+    async def test_list_page_returns_page(self, endpoint, mock_table):
+        """list_page() passes the projection and cursor and returns the next cursor."""
+        mock_table.list_page = AsyncMock(
+            return_value=([{"id": "m1", "smtp_ts": None, "deferred_ts": None}], "next")
+        )
+        result = await endpoint.list_page("t1", fields="id, message", limit=10, cursor="c1")
+        assert result == {
+            "messages": [
+                {"id": "m1", "smtp_ts": None, "deferred_ts": None, "status": "pending"}
+            ],
+            "next_cursor": "next",
+        }
+        kwargs = mock_table.list_page.call_args.kwargs
+        assert kwargs["fields"] == ["id", "message"]
+        assert kwargs["limit"] == 10
+        assert kwargs["cursor"] == "c1"
+
 
 class TestMessageEndpointAddBatch:
     """Tests for add_batch() validation paths."""
@@ -292,8 +337,7 @@ class TestMessageEndpointDeleteBatch:
     async def test_delete_batch_remove_fails(self, endpoint, mock_table):
         """delete_batch() handles remove failure."""
         mock_table.get_ids_for_tenant = AsyncMock(return_value={"msg-1"})
-        mock_table.get = AsyncMock(return_value={"pk": "pk-1"})
-        mock_table.remove_by_pk = AsyncMock(return_value=False)  # Fails
+        mock_table.remove_for_tenant = AsyncMock(return_value=set())  # Fails
 
         result = await endpoint.delete_batch("t1", ["msg-1"])
 
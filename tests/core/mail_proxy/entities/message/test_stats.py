@@ -0,0 +1,73 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for QueueStats - incrementally maintained queue counts."""
+
+from core.mail_proxy.entities.message.stats import QueueCounts, QueueStats
+
+KEY = ("t1", "a1", 2)
+
+
+def row(pk="p1", deferred_ts=None, **kwargs):
+    return {
+        "pk": pk,
+        "tenant_id": "t1",
+        "account_id": "a1",
+        "priority": 2,
+        "deferred_ts": deferred_ts,
+        **kwargs,
+    }
+
+
+class TestQueueStats:
+    """Tests for QueueStats updates."""
+
+    def test_added_counts_pending_and_deferred(self):
+        """New messages are counted by state; the first pending sets the oldest time."""
+        stats = QueueStats()
+        stats.added(row("p1"), created_ts=100.0)
+        stats.added(row("p2"), created_ts=200.0)
+        stats.added(row("p3", deferred_ts=500))
+
+        counts = stats.snapshot()[KEY]
+        assert (counts.pending, counts.deferred, counts.in_flight) == (2, 1, 0)
+        assert counts.oldest_pending_ts == 100.0
+        assert stats.total("t1") == 3
+        assert stats.total("t2") == 0
+
+    def test_dispatch_outcomes(self):
+        """Dispatched messages move to in_flight and out of the queue or to deferred."""
+        stats = QueueStats()
+        for pk in ("p1", "p2", "p3"):
+            stats.added(row(pk))
+            stats.dispatch_started(row(pk))
+        assert stats.snapshot()[KEY] == QueueCounts(in_flight=3)
+
+        stats.dispatch_finished("p1", "sent")
+        stats.dispatch_finished("p2", "deferred")
+        stats.dispatch_finished("p3", None)  # Unexpected failure: back to waiting
+
+        counts = stats.snapshot()[KEY]
+        assert (counts.pending, counts.deferred, counts.in_flight) == (1, 1, 0)
+
+    def test_empty_groups_are_dropped(self):
+        """Groups without messages are left out of snapshots."""
+        stats = QueueStats()
+        stats.added(row())
+        stats.dispatch_started(row())
+        stats.dispatch_finished("p1", "error")
+        assert stats.snapshot() == {}
+
+    def test_reconcile_keeps_in_flight(self):
+        """Reconciliation replaces counts; messages in flight are not counted twice."""
+        stats = QueueStats()
+        stats.added(row("p1"))
+        stats.dispatch_started(row("p1"))
+        stats.invalidate()
+        assert not stats.is_fresh(60)
+
+        stats.reconcile([{**row(), "pending": 4, "deferred": 1, "oldest_pending_ts": 50.0}])
+
+        counts = stats.snapshot()[KEY]
+        assert (counts.pending, counts.deferred, counts.in_flight) == (3, 1, 1)
+        assert counts.oldest_pending_ts == 50.0
+        assert stats.is_fresh(60)
+        assert not stats.is_fresh(0)
@@ -1,12 +1,18 @@
 # Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
 """Tests for MessagesTable - CE table methods."""
 
+import base64
+import hashlib
+import json
 import time
 
 import pytest
 
+from core.mail_proxy.entities.message.table import BLOB_MIN_SIZE
 from core.mail_proxy.proxy_base import MailProxyBase
 from core.mail_proxy.proxy_config import ProxyConfig
+from core.mail_proxy.smtp.partition import account_hash, account_partition
+from tools.compression import COMPRESSED_PREFIX
 
 
 @pytest.fixture
@@ -176,6 +182,144 @@ class TestMessagesTableInsertBatch:
         msg = await messages.get("msg1", "t1")
         assert msg["priority"] == 0  # Updated
 
+    async def test_insert_batch_notifies_dispatcher(self, db):
+        """insert_batch() wakes the dispatcher only when messages were queued."""
+        notified = []
+        db.parent.notify_workers = lambda target, key: notified.append(target)
+        messages = db.table("messages")
+        await insert_message(db, "sent", smtp_ts=12345)
+        await messages.insert_batch([
+            {"id": "sent", "tenant_id": "t1", "account_id": "a1", "payload": {"to": "x@x.com"}}
+        ], auto_pec=False)
+        assert notified == []
+        await messages.insert_batch([
+            {"id": "msg1", "tenant_id": "t1", "account_id": "a1", "payload": {"to": "x@x.com"}}
+        ], auto_pec=False)
+        assert notified == ["dispatch"]
+
+
+class TestMessagesTableInsertBatchBulkLoad:
+    """Tests for the bulk-load (copy_merge) path of insert_batch()."""
+
+    @pytest.fixture
+    def messages(self, db):
+        """Messages table forced onto the bulk-load path for small batches.
+
+        SQLite runs the DbAdapter.copy_merge() fallback; PostgreSQL uses
+        binary COPY into a staging table with the same results.
+        """
+        table = db.table("messages")
+        table.copy_min_rows = 3
+        db.adapter.supports_copy = True
+        return table
+
+    async def test_bulk_load_new_and_existing(self, messages, db):
+        """New rows are bulk-loaded; pending rows updated, sent rows skipped, in order."""
+        acc = await db.table("accounts").get("t1", "a1")
+        pending_pk = await insert_message(db, "pending", priority=2)
+        await insert_message(db, "sent", smtp_ts=12345)
+        entries = [
+            {"id": "new1", "account_id": "a1", "payload": {"to": "1@x.com"}},
+            {"id": "pending", "account_id": "a1", "priority": 0, "payload": {"to": "p@x.com"}},
+            {"id": "new2", "account_id": "a1", "payload": {"to": "2@x.com"}},
+            {"id": "sent", "account_id": "a1", "payload": {"to": "s@x.com"}},
+            {"id": "new3", "account_id": "a1", "payload": {"to": "3@x.com"}},
+        ]
+
+        result = await messages.insert_batch(entries, tenant_id="t1", auto_pec=False)
+
+        assert [r["id"] for r in result] == ["new1", "pending", "new2", "new3"]
+        assert result[1]["pk"] == pending_pk
+        new1 = await messages.get("new1", "t1")
+        assert new1["pk"] == result[0]["pk"]
+        assert new1["account_pk"] == acc["pk"]
+        assert new1["message"] == {"to": "1@x.com"}
+        assert (await messages.get("pending", "t1"))["priority"] == 0
+
+    async def test_small_new_share_uses_row_path(self, messages, db):
+        """Batches with fewer new rows than copy_min_rows are upserted row by row."""
+        messages.db.adapter.copy_merge = None  # Must not be called
+        for i in range(3):
+            await insert_message(db, f"m{i}")
+        entries = [
+            {"id": f"m{i}", "tenant_id": "t1", "account_id": "a1", "payload": {}}
+            for i in range(4)
+        ]
+
+        result = await messages.insert_batch(entries, auto_pec=False)
+
+        assert [r["id"] for r in result] == ["m0", "m1", "m2", "m3"]
+
+    async def test_repeated_ids_use_row_path(self, messages):
+        """A batch repeating an id keeps the last values, as row by row."""
+        entries = [
+            {"id": "dup", "tenant_id": "t1", "account_id": "a1", "priority": p, "payload": {}}
+            for p in (3, 2, 1, 0)
+        ]
+
+        result = await messages.insert_batch(entries, auto_pec=False)
+
+        assert len({r["pk"] for r in result}) == 1
+        assert (await messages.get("dup", "t1"))["priority"] == 0
+
+
+class TestMessagesTableInlineBlobs:
+    """Tests for inline attachment extraction in insert_batch()."""
+
+    @staticmethod
+    def _payload(content: bytes) -> dict:
+        return {
+            "to": "x@x.com",
+            "attachments": [
+                {
+                    "filename": "doc.pdf",
+                    "storage_path": base64.b64encode(content).decode(),
+                    "fetch_mode": "base64",
+                }
+            ],
+        }
+
+    async def test_large_inline_attachment_stored_once(self, db):
+        """Identical inline attachments are stored once and referenced by MD5."""
+        messages = db.table("messages")
+        content = b"%PDF" * 1024
+        await messages.insert_batch([
+            {"id": f"msg{i}", "tenant_id": "t1", "account_id": "a1", "payload": self._payload(content)}
+            for i in range(3)
+        ], auto_pec=False)
+
+        md5 = hashlib.md5(content).hexdigest()
+        for i in range(3):
+            msg = await messages.get(f"msg{i}", "t1")
+            att = msg["message"]["attachments"][0]
+            assert att["storage_path"] == f"blob:{md5}"
+            assert att["fetch_mode"] == "blob"
+            assert att["content_md5"] == md5
+            assert att["size"] == len(content)
+        assert len(await db.table("attachment_blobs").select()) == 1
+        assert await messages.referenced_blob_md5s() == {md5}
+
+    async def test_small_inline_attachment_stays_inline(self, db):
+        """Attachments below BLOB_MIN_SIZE are left in the payload."""
+        messages = db.table("messages")
+        payload = self._payload(b"tiny")
+        await messages.insert_batch([
+            {"id": "msg1", "tenant_id": "t1", "account_id": "a1", "payload": payload}
+        ], auto_pec=False)
+
+        msg = await messages.get("msg1", "t1")
+        assert msg["message"]["attachments"][0]["fetch_mode"] == "base64"
+        assert await db.table("attachment_blobs").select() == []
+
+    async def test_caller_payload_not_modified(self, db):
+        """Extraction works on a copy of the caller's payload."""
+        payload = self._payload(b"x" * BLOB_MIN_SIZE)
+        original = payload["attachments"][0]["storage_path"]
+        await db.table("messages").insert_batch([
+            {"id": "msg1", "tenant_id": "t1", "account_id": "a1", "payload": payload}
+        ], auto_pec=False)
+        assert payload["attachments"][0]["storage_path"] == original
+
 
 class TestMessagesTableFetchReady:
     """Tests for MessagesTable.fetch_ready() method."""
@@ -247,6 +391,129 @@ class TestMessagesTableFetchReady:
         assert len(result) == 1
         assert result[0]["id"] == "p0"
 
+    async def test_fetch_ready_filter_by_partition(self, db):
+        """Each message is fetched by exactly one partition, the one owning its account."""
+        messages = db.table("messages")
+        accounts = db.table("accounts")
+        owner = {}
+        for i in range(12):
+            pk = await accounts.add(
+                {"id": f"acc{i}", "tenant_id": "t1", "host": "smtp.example.com", "port": 25}
+            )
+            await insert_message(db, f"msg{i}", account_id=f"acc{i}", account_pk=pk)
+            owner[f"msg{i}"] = account_partition(pk, 3)
+        await insert_message(db, "default", account_id=None)
+        await insert_message(db, "orphan", account_pk="deleted-account-pk")
+        owner["default"] = owner["orphan"] = 0
+        now_ts = int(time.time())
+
+        for index in range(3):
+            result = await messages.fetch_ready(
+                limit=100, now_ts=now_ts, partition=index, partitions=3
+            )
+            assert sorted(m["id"] for m in result) == sorted(
+                mid for mid, part in owner.items() if part == index
+            )
+
+    async def test_fetch_ready_partition_without_backfilled_hash(self, db):
+        """Accounts whose dispatch_hash is not filled yet are sent by partition 0."""
+        messages = db.table("messages")
+        a1_pk = (await db.table("accounts").get("t1", "a1"))["pk"]
+        await db.adapter.execute("UPDATE accounts SET dispatch_hash = NULL")
+        await insert_message(db, "msg1", account_pk=a1_pk)
+        now_ts = int(time.time())
+
+        fetched = []
+        for index in range(2):
+            rows = await messages.fetch_ready(limit=10, now_ts=now_ts, partition=index, partitions=2)
+            fetched.append([m["id"] for m in rows])
+        assert fetched == [["msg1"], []]
+
+        await db.table("accounts").sync_schema()
+        row = await db.adapter.fetch_one("SELECT dispatch_hash FROM accounts")
+        assert row["dispatch_hash"] == account_hash(a1_pk)
+
+
+class TestMessagesTableLazyPayload:
+    """Tests for fetch_ready(include_payload=False) and fetch_payloads()."""
+
+    async def test_fetch_ready_without_payload(self, db):
+        """Scheduling columns are returned without reading the payload."""
+        messages = db.table("messages")
+        await insert_message(db, "msg1")
+        ready = await messages.fetch_ready(
+            limit=10, now_ts=int(time.time()) + 1, include_payload=False
+        )
+        assert len(ready) == 1
+        assert ready[0]["id"] == "msg1"
+        assert ready[0]["message"] is None
+
+    async def test_fetch_payloads_bulk(self, db):
+        """fetch_payloads() decodes payloads keyed by pk."""
+        messages = db.table("messages")
+        await insert_message(db, "msg1", pk="pk1")
+        await insert_message(db, "msg2", pk="pk2")
+        payloads = await messages.fetch_payloads(["pk1", "pk2", "missing"])
+        assert payloads == {
+            "pk1": {"to": "test@example.com"},
+            "pk2": {"to": "test@example.com"},
+        }
+
+    async def test_fetch_payloads_empty(self, db):
+        """fetch_payloads() with no pks does not query."""
+        assert await db.table("messages").fetch_payloads([]) == {}
+
+    async def test_fetch_attachment_refs(self, db):
+        """fetch_attachment_refs() returns only attachments that need a download."""
+        remote = {"storage_path": "https://files.example.com/a.pdf", "filename": "a.pdf"}
+        inline = {"storage_path": "base64:aGVsbG8=", "filename": "b.txt"}
+        await insert_message(
+            db, "msg1", pk="pk1", payload=json.dumps({"attachments": [remote, inline]})
+        )
+        await insert_message(db, "msg2", pk="pk2", payload=json.dumps({"attachments": [inline]}))
+        await insert_message(db, "msg3", pk="pk3")
+
+        refs = await db.table("messages").fetch_attachment_refs(["pk1", "pk2", "pk3"])
+
+        assert refs == {"pk1": [remote]}
+
+
+class TestMessagesTableCompressedPayload:
+    """Tests for payload compression in MessagesTable."""
+
+    async def test_large_payload_stored_compressed(self, db):
+        """Large payloads are compressed on disk and decoded transparently."""
+        db.parent.config.payload_codec = "zlib"
+        messages = db.table("messages")
+        body = "<p>Newsletter content</p>" * 500
+        await messages.insert_batch([
+            {"id": "msg1", "tenant_id": "t1", "account_id": "a1", "payload": {"body": body}}
+        ], auto_pec=False)
+
+        raw = await db.adapter.fetch_one("SELECT payload FROM messages WHERE id = 'msg1'")
+        assert raw["payload"].startswith(COMPRESSED_PREFIX)
+        assert len(raw["payload"]) < len(body)
+
+        msg = await messages.get("msg1", "t1")
+        assert msg["message"] == {"body": body}
+
+    async def test_payload_stored_plain_by_default(self, db):
+        """Without a codec, payloads stay plain JSON readable by older versions."""
+        body = "<p>Newsletter content</p>" * 500
+        await db.table("messages").insert_batch(
+            [{"id": "msg1", "tenant_id": "t1", "account_id": "a1", "payload": {"body": body}}],
+            auto_pec=False,
+        )
+
+        raw = await db.adapter.fetch_one("SELECT payload FROM messages WHERE id = 'msg1'")
+        assert raw["payload"] == json.dumps({"body": body})
+
+    async def test_uncompressed_rows_still_decoded(self, db):
+        """Rows written before compression keep working."""
+        await insert_message(db, "legacy", payload='{"to": "old@example.com"}')
+        msg = await db.table("messages").get("legacy", "t1")
+        assert msg["message"] == {"to": "old@example.com"}
+
 
 class TestMessagesTableMarkSent:
     """Tests for MessagesTable.mark_sent() method."""
@@ -305,6 +572,155 @@ class TestMessagesTableDeferred:
         assert msg["deferred_ts"] is None
 
 
+class TestMessagesTableUpdateReturning:
+    """Tests for single-statement transitions via Table.update_returning()."""
+
+    async def test_update_returning_returns_selected_columns(self, db):
+        """update_returning() writes the values and returns the requested columns."""
+        messages = db.table("messages")
+        pk = await insert_message(db, "msg1")
+
+        row = await messages.update_returning(
+            {"priority": 0}, {"pk": pk}, returning=["pk", "priority"]
+        )
+
+        assert row == {"pk": pk, "priority": 0}
+        assert (await messages.get_by_pk(pk))["priority"] == 0
+
+    async def test_update_returning_condition_not_met(self, db):
+        """A false condition writes nothing and returns None."""
+        messages = db.table("messages")
+        pk = await insert_message(db, "msg1", smtp_ts=12345)
+
+        row = await messages.update_returning(
+            {"priority": 0}, {"pk": pk}, condition="smtp_ts IS NULL"
+        )
+
+        assert row is None
+        assert (await messages.get_by_pk(pk))["priority"] == 2
+
+    async def test_update_returning_missing_row(self, db):
+        """An unknown key returns None."""
+        assert await db.table("messages").update_returning({"priority": 0}, {"pk": "nope"}) is None
+
+    async def test_update_returning_feeds_triggers(self, db):
+        """trigger_on_updating and trigger_on_updated see the values and returned row."""
+        messages = db.table("messages")
+        pk = await insert_message(db, "msg1")
+        seen = []
+
+        async def on_updating(record, old_record):
+            record["priority"] = 1
+            return record
+
+        async def on_updated(record, old_record):
+            seen.append(record)
+
+        messages.trigger_on_updating = on_updating
+        messages.trigger_on_updated = on_updated
+
+        await messages.update_returning({"priority": 3}, {"pk": pk}, returning=["pk", "priority"])
+
+        assert seen == [{"pk": pk, "priority": 1}]
+
+    async def test_clear_deferred_skips_non_deferred(self, db):
+        """clear_deferred() on a non-deferred message writes nothing."""
+        messages = db.table("messages")
+        pk = await insert_message(db, "msg1")
+
+        await messages.clear_deferred(pk)
+
+        assert (await messages.get_by_pk(pk))["deferred_ts"] is None
+
+    async def test_update_payload_keeps_other_columns(self, db):
+        """update_payload() only rewrites the payload."""
+        messages = db.table("messages")
+        pk = await insert_message(db, "msg1", deferred_ts=99999)
+
+        await messages.update_payload(pk, {"to": "new@example.com", "retry_count": 1})
+
+        msg = await messages.get_by_pk(pk)
+        assert msg["message"]["retry_count"] == 1
+        assert msg["deferred_ts"] == 99999
+
+
+class TestMessagesTableBulkOperations:
+    """Tests for set-based Table.update_batch/delete_batch and remove_for_tenant()."""
+
+    async def test_remove_for_tenant(self, db):
+        """remove_for_tenant() deletes only the tenant's messages."""
+        messages = db.table("messages")
+        messages.batch_chunk_size = 2
+        await db.table("tenants").insert({"id": "t2", "name": "Tenant 2", "active": 1})
+        await db.table("accounts").add({"id": "a2", "tenant_id": "t2", "host": "h", "port": 25})
+        acc1 = await db.table("accounts").get("t1", "a1")
+        acc2 = await db.table("accounts").get("t2", "a2")
+        for i in range(3):
+            await insert_message(db, f"msg{i}", account_pk=acc1["pk"])
+        await insert_message(db, "other", tenant_id="t2", account_id="a2", account_pk=acc2["pk"])
+
+        removed = await messages.remove_for_tenant(["msg0", "msg1", "msg2", "other", "nope"], "t1")
+
+        assert removed == {"msg0", "msg1", "msg2"}
+        remaining = await messages.list_all()
+        assert [m["id"] for m in remaining] == ["other"]
+
+    async def test_delete_batch_calls_triggers(self, db):
+        """delete_batch() calls delete triggers for each removed record."""
+        messages = db.table("messages")
+        messages.batch_chunk_size = 2
+        pks = [await insert_message(db, f"msg{i}") for i in range(3)]
+        deleting, deleted = [], []
+
+        async def on_deleting(record):
+            deleting.append(record["pk"])
+
+        async def on_deleted(record):
+            deleted.append(record["pk"])
+
+        messages.trigger_on_deleting = on_deleting
+        messages.trigger_on_deleted = on_deleted
+
+        assert await messages.delete_batch(pks) == 3
+        assert sorted(deleting) == sorted(pks)
+        assert sorted(deleted) == sorted(pks)
+        assert await messages.list_all() == []
+
+    async def test_update_batch_without_triggers(self, db):
+        """update_batch() without triggers updates every record."""
+        messages = db.table("messages")
+        messages.batch_chunk_size = 2
+        pks = [await insert_message(db, f"msg{i}") for i in range(3)]
+
+        assert await messages.update_batch(pks, {"priority": 0}) == 3
+        for pk in pks:
+            assert (await messages.get_by_pk(pk))["priority"] == 0
+
+    async def test_update_batch_writes_trigger_changes(self, db):
+        """update_batch() writes values changed by trigger_on_updating."""
+        messages = db.table("messages")
+        pks = [await insert_message(db, f"msg{i}") for i in range(2)]
+        updated = []
+
+        async def on_updating(record, old_record):
+            record["batch_code"] = f"code-{record['id']}"
+            return record
+
+        async def on_updated(record, old_record):
+            updated.append((record["pk"], old_record["priority"], record["priority"]))
+
+        messages.trigger_on_updating = on_updating
+        messages.trigger_on_updated = on_updated
+
+        assert await messages.update_batch(pks, {"priority": 1}) == 2
+
+        for i, pk in enumerate(pks):
+            msg = await messages.get_by_pk(pk)
+            assert msg["priority"] == 1
+            assert msg["batch_code"] == f"code-msg{i}"
+        assert sorted(updated) == sorted((pk, 2, 1) for pk in pks)
+
+
 class TestMessagesTableListAll:
     """Tests for MessagesTable.list_all() method."""
 
@@ -344,6 +760,172 @@ class TestMessagesTableListAll:
         assert result[0]["id"] == "pending"
 
 
+class TestMessagesTableListPage:
+    """Tests for MessagesTable.list_page() keyset pagination."""
+
+    async def test_pages_follow_cursor(self, db):
+        """Pages cover every message once, in (priority, created_at, pk) order."""
+        messages = db.table("messages")
+        for i in range(7):
+            await insert_message(db, f"msg{i}", priority=i % 3)
+
+        pages, cursor = [], None
+        while True:
+            page, cursor = await messages.list_page(tenant_id="t1", limit=3, cursor=cursor)
+            pages.append(page)
+            if cursor is None:
+                break
+
+        assert [len(p) for p in pages] == [3, 3, 1]
+        listed = [m for page in pages for m in page]
+        keys = [(m["priority"], m["created_at"], m["pk"]) for m in listed]
+        assert keys == sorted(keys)
+        assert {m["id"] for m in listed} == {f"msg{i}" for i in range(7)}
+
+    async def test_projection_excludes_payload(self, db):
+        """The payload is only read when "message" is requested."""
+        messages = db.table("messages")
+        await insert_message(db, "msg1", batch_code="b1")
+
+        page, _ = await messages.list_page()
+        assert "message" not in page[0]
+        assert page[0]["batch_code"] == "b1"
+
+        page, _ = await messages.list_page(fields=["message"])
+        assert page[0]["message"] == {"to": "test@example.com"}
+        assert "batch_code" not in page[0]
+        assert page[0]["id"] == "msg1"
+
+    async def test_last_error(self, db):
+        """The last error event of each message is returned."""
+        messages = db.table("messages")
+        pk = await insert_message(db, "msg1", smtp_ts=100)
+        events = db.table("message_events")
+        await events.add_event(pk, "error", 100, description="first")
+        await events.add_event(pk, "error", 200, description="second")
+
+        page, _ = await messages.list_page(fields=["error_ts"])
+        assert page[0]["error"] == "second"
+        assert page[0]["error_ts"] == 200
+
+    async def test_page_size_bounded(self, db):
+        """The page size is capped at list_page_max."""
+        messages = db.table("messages")
+        messages.list_page_max = 2
+        for i in range(3):
+            await insert_message(db, f"msg{i}")
+        page, cursor = await messages.list_page(limit=10_000)
+        assert len(page) == 2
+        assert cursor is not None
+
+    async def test_invalid_arguments(self, db):
+        """Unknown fields and malformed cursors raise ValueError."""
+        messages = db.table("messages")
+        with pytest.raises(ValueError, match="payload"):
+            await messages.list_page(fields=["payload"])
+        with pytest.raises(ValueError, match="cursor"):
+            await messages.list_page(cursor="not-a-cursor")
+
+    @pytest.mark.parametrize(
+        ("tenant_id", "index"),
+        [(None, "idx_messages_list"), ("t1", "idx_messages_tenant_list")],
+    )
+    async def test_pages_read_from_index(self, db, tenant_id, index):
+        """Keyset pages are searched in the listing index, without a sort."""
+        messages = db.table("messages")
+        await messages.sync_schema()
+        for i in range(3):
+            await insert_message(db, f"msg{i}")
+        _, cursor = await messages.list_page(tenant_id=tenant_id, limit=1)
+
+        queries = []
+        fetch_all = db.adapter.fetch_all
+
+        async def record(query, params=None):
+            queries.append((query, params))
+            return await fetch_all(query, params)
+
+        db.adapter.fetch_all = record
+        await messages.list_page(tenant_id=tenant_id, limit=1, cursor=cursor)
+        db.adapter.fetch_all = fetch_all
+
+        query, params = queries[0]
+        plan = await db.adapter.fetch_all(f"EXPLAIN QUERY PLAN {query}", params)
+        details = " ".join(row["detail"] for row in plan)
+        assert f"SEARCH m USING INDEX {index}" in details
+        assert "TEMP B-TREE" not in details
+
+
+class TestMessagesTableIterAll:
+    """Tests for MessagesTable.iter_all() streaming."""
+
+    async def test_iter_all_matches_list_all(self, db):
+        """iter_all() yields the list_all() messages in the same order."""
+        messages = db.table("messages")
+        for i in range(5):
+            await insert_message(db, f"msg{i}", priority=i % 2)
+
+        streamed = [m async for m in messages.iter_all(chunk_size=2)]
+
+        assert [m["id"] for m in streamed] == [m["id"] for m in await messages.list_all()]
+        assert streamed[0]["message"] == {"to": "test@example.com"}
+
+    async def test_select_iter_streams_rows(self, db):
+        """Table.select_iter() yields all matching rows, chunk by chunk."""
+        messages = db.table("messages")
+        for i in range(5):
+            await insert_message(db, f"msg{i}")
+
+        rows = [
+            row
+            async for row in messages.select_iter(
+                columns=["id"], where={"tenant_id": "t1"}, order_by="id", chunk_size=2
+            )
+        ]
+
+        assert rows == [{"id": f"msg{i}"} for i in range(5)]
+
+    async def test_referenced_blob_md5s_streams_payloads(self, db):
+        """referenced_blob_md5s() collects blob references from all payloads."""
+        messages = db.table("messages")
+        for i in range(3):
+            payload = {"attachments": [{"fetch_mode": "blob", "storage_path": f"blob:md5{i}"}]}
+            await insert_message(db, f"msg{i}", payload=json.dumps(payload))
+
+        assert await messages.referenced_blob_md5s() == {"md50", "md51", "md52"}
+
+    async def test_referenced_blob_md5s_reads_blob_refs_column(self, db):
+        """Messages written by insert_batch() are resolved from blob_refs, not the payload."""
+        messages = db.table("messages")
+        payload = {"attachments": [{"fetch_mode": "blob", "storage_path": "blob:abc"}]}
+        await messages.insert_batch(
+            [
+                {"id": "msg1", "tenant_id": "t1", "account_id": "a1", "payload": payload},
+                {"id": "msg2", "tenant_id": "t1", "account_id": "a1", "payload": {"subject": "x"}},
+            ],
+            auto_pec=False,
+        )
+        rows = await db.adapter.fetch_all("SELECT id, blob_refs FROM messages ORDER BY id")
+        assert [row["blob_refs"] for row in rows] == ["abc", ""]
+
+        await db.adapter.execute("UPDATE messages SET payload = '{}' WHERE id = 'msg1'")
+        assert await messages.referenced_blob_md5s() == {"abc"}
+
+    async def test_update_payload_refreshes_blob_refs(self, db):
+        """update_payload() keeps blob_refs in step with the new payload."""
+        messages = db.table("messages")
+        await messages.insert_batch(
+            [{"id": "msg1", "tenant_id": "t1", "account_id": "a1", "payload": {"subject": "x"}}],
+            auto_pec=False,
+        )
+        msg = await messages.get("msg1", "t1")
+        payload = {"attachments": [{"fetch_mode": "blob", "storage_path": "blob:def"}]}
+
+        await messages.update_payload(msg["pk"], payload)
+
+        assert await messages.referenced_blob_md5s() == {"def"}
+
+
 class TestMessagesTableCountActive:
     """Tests for MessagesTable.count_active() method."""
 
@@ -376,6 +958,119 @@ class TestMessagesTablePurgeForAccount:
         assert count == 0
 
 
+async def insert_reported(db, msg_id, reported_ts, events=1, **kwargs):
+    """Helper to insert a processed message with reported events."""
+    pk = await insert_message(db, msg_id, smtp_ts=reported_ts, **kwargs)
+    for _ in range(events):
+        await db.table("message_events").insert({
+            "message_pk": pk,
+            "event_type": "sent",
+            "event_ts": reported_ts,
+            "reported_ts": reported_ts,
+        })
+    return pk
+
+
+class TestMessagesTablePurgeReported:
+    """Tests for chunked removal of fully reported messages."""
+
+    async def test_purge_chunk_removes_messages_and_events(self, db):
+        """Old fully reported messages are removed with their events."""
+        messages = db.table("messages")
+        old = await insert_reported(db, "old", 1000, events=2)
+        recent = await insert_reported(db, "recent", 5000)
+
+        deleted, events, cursor = await messages.purge_reported_chunk(2000)
+
+        assert (deleted, events, cursor) == (1, 2, None)
+        assert await messages.get_by_pk(old) is None
+        assert await messages.get_by_pk(recent) is not None
+        remaining = await db.adapter.fetch_all("SELECT message_pk FROM message_events")
+        assert [row["message_pk"] for row in remaining] == [recent]
+
+    async def test_purge_chunk_keeps_unreported_and_pending(self, db):
+        """Messages with unreported events, no events or no smtp_ts stay."""
+        messages = db.table("messages")
+        partial = await insert_reported(db, "partial", 1000)
+        await db.table("message_events").insert({
+            "message_pk": partial, "event_type": "bounce", "event_ts": 1100,
+        })
+        no_events = await insert_message(db, "no-events", smtp_ts=1000)
+        pending = await insert_message(db, "pending")
+
+        deleted, events, _ = await messages.purge_reported_chunk(2000)
+
+        assert (deleted, events) == (0, 0)
+        for pk in (partial, no_events, pending):
+            assert await messages.get_by_pk(pk) is not None
+
+    async def test_purge_chunk_counts_rows_actually_deleted(self, db):
+        """A message that gets a new event between scan and delete is not counted."""
+        messages = db.table("messages")
+        kept = await insert_reported(db, "kept", 1000, events=2)
+        gone = await insert_reported(db, "gone", 1000)
+        execute_batch = db.adapter.execute_batch
+
+        async def event_arrives_first(steps):
+            await db.table("message_events").insert({
+                "message_pk": kept, "event_type": "bounce", "event_ts": 1500,
+            })
+            return await execute_batch(steps)
+
+        db.adapter.execute_batch = event_arrives_first
+        deleted, events, _ = await messages.purge_reported_chunk(2000)
+
+        assert (deleted, events) == (1, 1)
+        assert await messages.get_by_pk(kept) is not None
+        assert await messages.get_by_pk(gone) is None
+
+    async def test_purge_chunk_keyset_cursor(self, db):
+        """Each call scans one window and returns the cursor to resume from."""
+        messages = db.table("messages")
+        pks = sorted([await insert_reported(db, f"m{i}", 1000) for i in range(5)])
+
+        deleted, _, cursor = await messages.purge_reported_chunk(2000, limit=2)
+        assert deleted == 2
+        assert cursor == pks[1]
+
+        deleted, _, cursor = await messages.purge_reported_chunk(2000, cursor, limit=2)
+        assert (deleted, cursor) == (2, pks[3])
+
+        deleted, _, cursor = await messages.purge_reported_chunk(2000, cursor, limit=2)
+        assert (deleted, cursor) == (1, None)
+
+    async def test_purge_chunk_for_tenant(self, db):
+        """Tenant-scoped chunks only scan the tenant's messages."""
+        messages = db.table("messages")
+        account = await db.table("accounts").get("t1", "a1")
+        await db.table("tenants").insert({"id": "t2", "name": "Other", "active": 1})
+        await db.table("accounts").add({
+            "id": "a2", "tenant_id": "t2", "host": "smtp.example.com", "port": 587,
+        })
+        other = await db.table("accounts").get("t2", "a2")
+        mine = await insert_reported(db, "mine", 1000, account_pk=account["pk"])
+        theirs = await insert_reported(
+            db, "theirs", 1000, tenant_id="t2", account_id="a2", account_pk=other["pk"]
+        )
+
+        deleted, _, _ = await messages.purge_reported_chunk(2000, tenant_id="t1")
+
+        assert deleted == 1
+        assert await messages.get_by_pk(mine) is None
+        assert await messages.get_by_pk(theirs) is not None
+
+    async def test_remove_fully_reported_before_runs_all_chunks(self, db):
+        """remove_fully_reported_before() completes the scan chunk by chunk."""
+        messages = db.table("messages")
+        messages.batch_chunk_size = 2
+        for i in range(5):
+            await insert_reported(db, f"m{i}", 1000)
+        await insert_reported(db, "recent", 5000)
+
+        assert await messages.remove_fully_reported_before(2000) == 5
+        assert await messages.count() == 1
+
+
 class TestMessagesTableExistingIds:
     """Tests for MessagesTable.existing_ids() method."""
 
@@ -675,3 +1370,166 @@ class TestMessagesTableMigrateAccountPk:
             {"pk": pk}
         )
         assert row["account_pk"] is None
+
+
+class TestMessagesTableMigrationChunked:
+    """Tests for the chunked copy of migrate_from_legacy_schema()."""
+
+    async def test_migration_copies_all_rows_across_chunks(self, tmp_path):
+        """Rows sharing an id across tenants are all copied, chunk by chunk."""
+        proxy = MailProxyBase(ProxyConfig(db_path=str(tmp_path / "legacy.db")))
+        await proxy.db.adapter.connect()
+        await proxy.db.adapter.execute("""
+            CREATE TABLE messages (
+                id TEXT NOT NULL,
+                tenant_id TEXT NOT NULL,
+                account_id TEXT,
+                priority INTEGER NOT NULL DEFAULT 2,
+                payload TEXT NOT NULL,
+                batch_code TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                deferred_ts INTEGER,
+                smtp_ts INTEGER,
+                is_pec INTEGER DEFAULT 0,
+                PRIMARY KEY (tenant_id, id)
+            )
+        """)
+        await proxy.db.adapter.execute_many(
+            "INSERT INTO messages (id, tenant_id, payload) VALUES (:id, :tenant_id, '{}')",
+            [{"id": f"msg{i}", "tenant_id": t} for t in ("t1", "t2") for i in range(4)],
+        )
+
+        messages = proxy.db.table("messages")
+        messages.batch_chunk_size = 3
+        assert await messages.migrate_from_legacy_schema() is True
+
+        rows = await proxy.db.adapter.fetch_all("SELECT pk, id, tenant_id FROM messages")
+        assert len(rows) == 8
+        assert len({row["pk"] for row in rows}) == 8
+        assert {(row["tenant_id"], row["id"]) for row in rows} == {
+            (t, f"msg{i}") for t in ("t1", "t2") for i in range(4)
+        }
+
+        await proxy.close()
+
+    async def test_purge_chunk_archives_messages(self, db, monkeypatch, tmp_path):
+        """With archive_path set, purged messages stay readable from the archive."""
+        monkeypatch.setattr(db.parent.config, "archive_path", str(tmp_path / "archive"))
+        messages = db.table("messages")
+        pk = await insert_reported(db, "old", 1000, events=2)
+
+        deleted, events, _ = await messages.purge_reported_chunk(2000)
+
+        assert (deleted, events) == (1, 2)
+        assert await messages.get("old", "t1") is None
+        archived = await messages.get_archived("old", "t1")
+        assert archived["pk"] == pk
+        assert archived["message"] == {"to": "test@example.com"}
+        assert [e["event_type"] for e in archived["history"]] == ["sent", "sent"]
+
+    async def test_get_archived_disabled(self, db):
+        """Without archive_path, purged messages are gone for good."""
+        messages = db.table("messages")
+        await insert_reported(db, "old", 1000)
+        await messages.purge_reported_chunk(2000)
+        assert await messages.get_archived("old", "t1") is None
+
+
+class TestMessagesTableQueueStats:
+    """Tests for the queue stats maintained by MessagesTable."""
+
+    @staticmethod
+    def entry(msg_id, **kwargs):
+        return {"id": msg_id, "tenant_id": "t1", "account_id": "a1",
+                "payload": {"to": "x@example.com"}, **kwargs}
+
+    async def test_insert_batch_counts_new_messages(self, db):
+        """New messages are counted; updating a queued one marks the stats dirty."""
+        messages = db.table("messages")
+        await messages.reconcile_stats()
+        await messages.insert_batch(
+            [self.entry("m1"), self.entry("m2", deferred_ts=9999999999)], auto_pec=False
+        )
+
+        counts = messages.stats.snapshot()[("t1", "a1", 2)]
+        assert (counts.pending, counts.deferred) == (1, 1)
+        assert messages.stats.is_fresh(60)
+
+        await messages.insert_batch([self.entry("m1", priority=1)], auto_pec=False)
+        assert messages.stats.dirty
+
+    async def test_reconcile_stats(self, db):
+        """reconcile_stats() groups waiting messages by tenant, account and priority."""
+        messages = db.table("messages")
+        await insert_message(db, "m1", priority=1)
+        await insert_message(db, "m2", priority=1, deferred_ts=2000)
+        await insert_message(db, "m3")
+        await insert_message(db, "m4", smtp_ts=1000)
+
+        snapshot = (await messages.reconcile_stats()).snapshot()
+
+        assert set(snapshot) == {("t1", "a1", 1), ("t1", "a1", 2)}
+        high = snapshot[("t1", "a1", 1)]
+        assert (high.pending, high.deferred) == (1, 1)
+        assert time.time() - high.oldest_pending_ts < 3600
+        assert snapshot[("t1", "a1", 2)].pending == 1
+
+    async def test_count_pending_uses_fresh_stats(self, db):
+        """count_pending_for_tenant() answers from fresh stats, and queries otherwise."""
+        messages = db.table("messages")
+        account = await db.table("accounts").get("t1", "a1")
+        await insert_message(db, "m1", account_pk=account["pk"])
+        await messages.reconcile_stats()
+        await insert_message(db, "m2", account_pk=account["pk"])  # Not seen by the stats
+
+        assert await messages.count_pending_for_tenant("t1") == 1
+        messages.stats.invalidate()
+        assert await messages.count_pending_for_tenant("t1") == 2
+
+    async def test_count_pending_paths_agree(self, db):
+        """Stats and query count the same rows, including messages without an account."""
+        messages = db.table("messages")
+        account = await db.table("accounts").get("t1", "a1")
+        await insert_message(db, "linked", account_pk=account["pk"])
+        await insert_message(db, "default", account_id=None)
+        await insert_message(db, "deleted", account_pk="deleted-account-pk")
+
+        await messages.reconcile_stats()
+        assert await messages.count_pending_for_tenant("t1") == 3
+        messages.stats.invalidate()
+        assert await messages.count_pending_for_tenant("t1") == 3
+
+    async def test_count_pending_without_stats_counts(self, db):
+        """With stats_counts disabled the table is always queried."""
+        messages = db.table("messages")
+        messages.stats_counts = False
+        await insert_message(db, "m1")
+        await messages.reconcile_stats()
+        await insert_message(db, "m2")
+
+        assert await messages.count_pending_for_tenant("t1") == 2
+
+    async def test_remove_invalidates_stats(self, db):
+        """Deleting messages marks the stats dirty."""
+        messages = db.table("messages")
+        pk = await insert_message(db, "m1")
+        await messages.reconcile_stats()
+        await messages.remove_by_pk(pk)
+        assert not messages.stats.is_fresh(60)
+
+    async def test_status_counts(self, db):
+        """status_counts() counts messages by delivery status."""
+        messages = db.table("messages")
+        await insert_message(db, "pending")
+        await insert_message(db, "deferred", deferred_ts=2000)
+        await insert_message(db, "sent", smtp_ts=1000)
+        failed = await insert_message(db, "failed", smtp_ts=1000)
+        await db.table("message_events").insert({
+            "message_pk": failed, "event_type": "error", "event_ts": 1000,
+        })
+
+        assert await messages.status_counts() == {
+            "total": 4, "pending": 1, "deferred": 1, "sent": 1, "error": 1,
+        }
+
@@ -0,0 +1,109 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for MessageArchiveTable - cold archive of reported messages."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.mail_proxy.proxy_base import MailProxyBase
+from core.mail_proxy.proxy_config import ProxyConfig
+
+
+@pytest.fixture
+async def db(tmp_path):
+    """Create database with schema and an archive directory."""
+    proxy = MailProxyBase(
+        ProxyConfig(db_path=str(tmp_path / "test.db"), archive_path=str(tmp_path / "archive"))
+    )
+    await proxy.db.connect()
+    await proxy.db.check_structure()
+    yield proxy.db
+    await proxy.close()
+
+
+def record(pk, msg_id, tenant_id="t1", **kwargs):
+    return {"pk": pk, "id": msg_id, "tenant_id": tenant_id, "message": {"subject": pk}, **kwargs}
+
+
+async def archive_block(db, records):
+    archive = db.table("message_archive")
+    entries = await archive.write_block(records)
+    await db.adapter.execute_batch(archive.index_statements(entries))
+    return entries
+
+
+class TestMessageArchiveTable:
+    """Tests for writing and looking up archive blocks."""
+
+    async def test_disabled_without_path(self, tmp_path):
+        """The archive is disabled when no archive_path is configured."""
+        proxy = MailProxyBase(ProxyConfig(db_path=str(tmp_path / "plain.db")))
+        assert not proxy.db.table("message_archive").enabled
+
+    async def test_roundtrip(self, db):
+        """Archived messages are found by (tenant_id, id)."""
+        await archive_block(db, [record("p1", "m1"), record("p2", "m2", history=[{"x": 1}])])
+        archive = db.table("message_archive")
+
+        found = await archive.lookup("m2", "t1")
+        assert found["pk"] == "p2"
+        assert found["history"] == [{"x": 1}]
+        assert await archive.lookup("m2", "other") is None
+        assert await archive.lookup("missing", "t1") is None
+
+    async def test_blocks_are_appended(self, db, tmp_path):
+        """Each block is appended to the day's segment after the previous ones."""
+        first = await archive_block(db, [record("p1", "m1")])
+        second = await archive_block(db, [record("p2", "m2")])
+
+        assert first[0]["segment"] == second[0]["segment"]
+        assert second[0]["block_offset"] == first[0]["block_size"]
+        segment = tmp_path / "archive" / first[0]["segment"]
+        assert segment.stat().st_size == first[0]["block_size"] + second[0]["block_size"]
+        assert (await db.table("message_archive").lookup("m1", "t1"))["pk"] == "p1"
+
+    async def test_rearchived_message_points_to_newest_block(self, db):
+        """Archiving a message again replaces its index row."""
+        await archive_block(db, [record("p1", "m1", error=None)])
+        await archive_block(db, [record("p1", "m1", error="late bounce")])
+
+        assert await db.table("message_archive").count() == 1
+        assert (await db.table("message_archive").lookup("m1", "t1"))["error"] == "late bounce"
+
+    async def test_missing_segment(self, db, tmp_path):
+        """A lookup whose segment was removed returns None."""
+        entries = await archive_block(db, [record("p1", "m1")])
+        (tmp_path / "archive" / entries[0]["segment"]).unlink()
+        assert await db.table("message_archive").lookup("m1", "t1") is None
+
+    async def test_blob_attachments_archived_inline(self, db):
+        """Blob content is copied into the block and returned inline after the blob is gone."""
+        md5, _ = await db.table("attachment_blobs").put(b"%PDF shared")
+        att = {"filename": "a.pdf", "fetch_mode": "blob", "storage_path": f"blob:{md5}"}
+        await archive_block(
+            db,
+            [
+                record("p1", "m1", message={"attachments": [dict(att)]}),
+                record("p2", "m2", message={"attachments": [dict(att)]}),
+            ],
+        )
+        await db.table("attachment_blobs").remove_unreferenced(set(), older_than_ts=2**31)
+
+        found = await db.table("message_archive").lookup("m2", "t1")
+        attachment = found["message"]["attachments"][0]
+        assert attachment["fetch_mode"] == "base64"
+        assert attachment["storage_path"] == "base64:JVBERiBzaGFyZWQ="
+        assert attachment["filename"] == "a.pdf"
+
+    async def test_concurrent_appends_do_not_interleave(self, db, tmp_path):
+        """Writers with their own file handles get disjoint, contiguous blocks."""
+        archive = db.table("message_archive")
+        blocks = [bytes([i]) * (1000 + i) for i in range(32)]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            offsets = list(pool.map(lambda b: archive._append("2025-01-01.seg", b), blocks))
+
+        data = (tmp_path / "archive" / "2025-01-01.seg").read_bytes()
+        assert len(data) == sum(len(b) for b in blocks)
+        for offset, block in zip(offsets, blocks, strict=True):
+            assert data[offset : offset + len(block)] == block
@@ -1,6 +1,8 @@
 # Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
 """Tests for MessageEventTable - CE table methods."""
 
+import asyncio
+import sqlite3
 import time
 
 import pytest
@@ -231,6 +233,20 @@ class TestMessageEventTableMarkReported:
         result = await events.fetch_unreported(limit=10)
         assert len(result) == 0
 
+    async def test_mark_reported_chunked(self, db):
+        """mark_reported() updates every event when ids span several chunks."""
+        events = db.table("message_events")
+        events.batch_chunk_size = 2
+        pk = await create_message(db, "msg1")
+        ts = int(time.time())
+        for i in range(5):
+            await events.add_event(pk, "bounce", ts + i)
+        event_ids = [e["event_id"] for e in await events.fetch_unreported(limit=10)]
+
+        await events.mark_reported(event_ids, ts + 20)
+
+        assert await events.fetch_unreported(limit=10) == []
+
     async def test_mark_reported_multiple(self, db):
         """mark_reported() sets reported_ts for multiple events."""
         events = db.table("message_events")
@@ -254,6 +270,45 @@ class TestMessageEventTableMarkReported:
         await events.mark_reported([], int(time.time()))  # Should not raise
 
 
+class TestMessageEventTableIterEvents:
+    """Tests for MessageEventTable.iter_events() streaming."""
+
+    async def test_iter_events_filters(self, db):
+        """iter_events() streams events in order, filtered by tenant and time."""
+        await db.table("tenants").insert({"id": "t2", "name": "Tenant 2", "active": 1})
+        pk1 = await create_message(db, "msg1")
+        pk2 = await create_message(db, "msg2", tenant_id="t2")
+        events = db.table("message_events")
+        await events.add_event(pk1, "deferred", 100, metadata={"deferred_ts": 150})
+        await events.add_event(pk1, "sent", 200)
+        await events.add_event(pk2, "sent", 150)
+
+        streamed = [e async for e in events.iter_events(tenant_id="t1", chunk_size=1)]
+        assert [(e["message_id"], e["event_type"]) for e in streamed] == [
+            ("msg1", "deferred"),
+            ("msg1", "sent"),
+        ]
+        assert streamed[0]["metadata"] == {"deferred_ts": 150}
+
+        recent = [e async for e in events.iter_events(since_ts=150)]
+        assert [e["event_ts"] for e in recent] == [150, 200]
+
+    async def test_writes_proceed_while_stream_paused(self, db):
+        """A paused export holds no lock: events and messages can be written meanwhile."""
+        pk = await create_message(db, "msg1")
+        events = db.table("message_events")
+        for ts in (100, 200, 300):
+            await events.add_event(pk, "deferred", ts)
+
+        stream = events.iter_events(chunk_size=2)
+        first = await anext(stream)
+        await asyncio.wait_for(events.add_event(pk, "sent", 400), timeout=2)
+        await asyncio.wait_for(create_message(db, "msg2"), timeout=2)
+        rest = [e["event_ts"] async for e in stream]
+
+        assert [first["event_ts"], *rest] == [100, 200, 300, 400]
+
+
 class TestMessageEventTableDeleteForMessage:
     """Tests for MessageEventTable.delete_for_message() method."""
 
@@ -401,3 +456,87 @@ class TestMessageEventTableTrigger:
         msg = await messages.get_by_pk(pk)
         assert msg["smtp_ts"] is None
         assert msg["deferred_ts"] is None
+
+
+class TestMessageEventTableAddEvents:
+    """Tests for MessageEventTable.add_events() - batched group commit."""
+
+    async def test_add_events_empty(self, db):
+        """add_events() with no events is a no-op."""
+        assert await db.table("message_events").add_events([]) == 0
+
+    async def test_add_events_inserts_and_updates_messages(self, db):
+        """add_events() inserts all events and applies message state like the trigger."""
+        events = db.table("message_events")
+        messages = db.table("messages")
+        sent_pk = await create_message(db, "msg1")
+        error_pk = await create_message(db, "msg2")
+        deferred_pk = await create_message(db, "msg3")
+        ts = int(time.time())
+
+        count = await events.add_events([
+            {"message_pk": sent_pk, "event_type": "sent", "event_ts": ts},
+            {"message_pk": error_pk, "event_type": "error", "event_ts": ts,
+             "description": "550 rejected"},
+            {"message_pk": deferred_pk, "event_type": "deferred", "event_ts": ts,
+             "metadata": {"deferred_ts": ts + 60}},
+        ])
+
+        assert count == 3
+        assert (await messages.get_by_pk(sent_pk))["smtp_ts"] == ts
+        assert (await messages.get_by_pk(error_pk))["smtp_ts"] == ts
+        deferred = await messages.get_by_pk(deferred_pk)
+        assert deferred["deferred_ts"] == ts + 60
+        assert deferred["smtp_ts"] is None
+        error_events = await events.get_events_for_message(error_pk)
+        assert error_events[0]["description"] == "550 rejected"
+        deferred_events = await events.get_events_for_message(deferred_pk)
+        assert deferred_events[0]["metadata"] == {"deferred_ts": ts + 60}
+
+    async def test_add_events_last_event_wins(self, db):
+        """A later event for the same message overrides an earlier one in the batch."""
+        events = db.table("message_events")
+        messages = db.table("messages")
+        pk = await create_message(db, "msg1")
+        ts = int(time.time())
+
+        await events.add_events([
+            {"message_pk": pk, "event_type": "deferred", "event_ts": ts,
+             "metadata": {"deferred_ts": ts + 60}},
+            {"message_pk": pk, "event_type": "sent", "event_ts": ts + 1},
+        ])
+
+        msg = await messages.get_by_pk(pk)
+        assert msg["smtp_ts"] == ts + 1
+        assert msg["deferred_ts"] is None
+        assert len(await events.get_events_for_message(pk)) == 2
+
+    async def test_add_events_other_types_no_update(self, db):
+        """Non-outcome events are stored without touching the message."""
+        events = db.table("message_events")
+        messages = db.table("messages")
+        pk = await create_message(db, "msg1")
+
+        await events.add_events([
+            {"message_pk": pk, "event_type": "bounce", "event_ts": int(time.time())},
+        ])
+
+        msg = await messages.get_by_pk(pk)
+        assert msg["smtp_ts"] is None
+        assert msg["deferred_ts"] is None
+
+    async def test_add_events_is_atomic(self, db):
+        """A failing statement rolls back the whole batch."""
+        events = db.table("message_events")
+        messages = db.table("messages")
+        pk = await create_message(db, "msg1")
+        ts = int(time.time())
+
+        with pytest.raises(sqlite3.IntegrityError):
+            await events.add_events([
+                {"message_pk": pk, "event_type": "sent", "event_ts": ts},
+                {"message_pk": pk, "event_type": None, "event_ts": ts},
+            ])
+
+        assert await events.get_events_for_message(pk) == []
+        assert (await messages.get_by_pk(pk))["smtp_ts"] is None
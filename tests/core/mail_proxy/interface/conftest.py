@@ -9,6 +9,7 @@ These fixtures provide:
 
 from __future__ import annotations
 
+import json
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
@@ -110,6 +111,20 @@ async def client(app: FastAPI) -> AsyncGenerator[MailProxyClient, None]:
                 resp.raise_for_status()
                 return resp.json()
 
+        async def _stream(self, path, params=None):
+            async with httpx.AsyncClient(transport=self._transport) as http:
+                async with http.stream(
+                    "GET",
+                    f"{self.url}{path}",
+                    headers=self._headers(),
+                    params=params,
+                    timeout=30,
+                ) as resp:
+                    resp.raise_for_status()
+                    async for line in resp.aiter_lines():
+                        if line:
+                            yield json.loads(line)
+
         async def _put(self, path, data=None):
             async with httpx.AsyncClient(transport=self._transport) as http:
                 resp = await http.put(
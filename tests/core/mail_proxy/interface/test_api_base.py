@@ -8,6 +8,7 @@ endpoint classes, and that calling these routes exercises the full stack
 
 from __future__ import annotations
 
+import json
 import secrets
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -341,6 +342,46 @@ class TestMessageEndpointViaApi:
         data = response.json()
         assert len(data) >= 1
 
+    def test_list_page_messages(self, client):
+        """GET /messages/list_page returns one page and the next cursor."""
+        for i in range(3):
+            client.post("/messages/add", json={
+                "id": f"page{i}", "tenant_id": "t1", "account_id": "smtp1",
+                "from_addr": "a@b.com", "to": ["c@d.com"],
+                "subject": "Test", "body": "Hi",
+            })
+
+        response = client.get("/messages/list_page", params={"tenant_id": "t1", "limit": 2})
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["messages"]) == 2
+        assert "message" not in data["messages"][0]
+        assert data["next_cursor"]
+
+        response = client.get("/messages/list_page", params={
+            "tenant_id": "t1", "cursor": data["next_cursor"], "fields": "message",
+        })
+        data = response.json()
+        assert [m["message"]["subject"] for m in data["messages"]] == ["Test"]
+        assert data["next_cursor"] is None
+
+    async def test_legacy_list_messages_returns_everything(self, db):
+        """The listMessages command returns every message, payload included."""
+        from core.mail_proxy.interface import EndpointDispatcher
+
+        await db.table("tenants").insert({"id": "t2", "name": "T2", "active": 1})
+        await db.table("accounts").add({"id": "a2", "tenant_id": "t2", "host": "h", "port": 25})
+        await db.table("messages").insert_batch([
+            {"id": f"m{i}", "tenant_id": "t2", "account_id": "a2", "payload": {"to": "x@y.com"}}
+            for i in range(150)
+        ], auto_pec=False)
+
+        result = await EndpointDispatcher(db).dispatch("listMessages", {"tenant_id": "t2"})
+        assert result["ok"] is True
+        assert len(result["messages"]) == 150
+        assert result["messages"][0]["message"] == {"to": "x@y.com"}
+        assert "next_cursor" not in result
+
     def test_list_messages_active_only(self, client):
         """GET /messages/list with active_only filter."""
         response = client.get("/messages/list", params={
@@ -363,6 +404,36 @@ class TestMessageEndpointViaApi:
         assert response.status_code == 200
         assert isinstance(response.json(), int)
 
+    def test_export_streams_ndjson(self, client):
+        """GET /messages/export streams one JSON record per line, gzip when accepted."""
+        for i in range(3):
+            client.post("/messages/add", json={
+                "id": f"msg{i}", "tenant_id": "t1", "account_id": "smtp1",
+                "from_addr": "a@b.com", "to": ["c@d.com"],
+                "subject": f"Test {i}", "body": "Hi",
+            })
+
+        response = client.get(
+            "/messages/export",
+            params={"tenant_id": "t1"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.headers["content-encoding"] == "gzip"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["id"] for r in records] == ["msg0", "msg1", "msg2"]
+        assert records[0]["message"]["subject"] == "Test 0"
+        assert records[0]["status"] == "pending"
+
+        plain = client.get(
+            "/messages/export",
+            params={"tenant_id": "t1"},
+            headers={"Accept-Encoding": "identity"},
+        )
+        assert "content-encoding" not in plain.headers
+        assert len(plain.text.splitlines()) == 3
+
 
 # =============================================================================
 # Instance Endpoint Tests via api_base
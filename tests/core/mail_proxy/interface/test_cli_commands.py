@@ -8,6 +8,7 @@ import click
 import pytest
 from click.testing import CliRunner
 
+from core.mail_proxy.entities.message.stats import QueueStats
 from core.mail_proxy.interface.cli_commands import (
     _run_async,
     add_connect_command,
@@ -67,11 +68,15 @@ class TestAddStatsCommand:
         db.table("accounts").list_all = AsyncMock(return_value=[
             {"id": "a1", "tenant_id": "t1"},
         ])
-        db.table("messages").list_all = AsyncMock(return_value=[
-            {"id": "m1", "smtp_ts": None, "error_ts": None},  # pending
-            {"id": "m2", "smtp_ts": 1234567890, "error_ts": None},  # sent
-            {"id": "m3", "smtp_ts": None, "error_ts": 1234567890},  # error
-        ])
+        db.table("messages").status_counts = AsyncMock(return_value={
+            "total": 4, "pending": 1, "deferred": 1, "sent": 1, "error": 1,
+        })
+        stats = QueueStats()
+        stats.reconcile([{
+            "tenant_id": "t1", "account_id": "a1", "priority": 2,
+            "pending": 1, "deferred": 1, "oldest_pending_ts": 1000.0,
+        }])
+        db.table("messages").reconcile_stats = AsyncMock(return_value=stats)
         return db
 
     def test_stats_json_output(self, cli_group, mock_db):
@@ -83,6 +88,10 @@ class TestAddStatsCommand:
         data = json.loads(result.output)
         assert data["tenants"] == 2
         assert data["accounts"] == 1
+        assert data["messages"]["deferred"] == 1
+        assert data["queues"][0]["tenant_id"] == "t1"
+        assert data["queues"][0]["pending"] == 1
+        assert data["queues"][0]["oldest_pending_age"] > 0
 
     def test_stats_text_output(self, cli_group, mock_db):
         """stats outputs formatted text."""
@@ -92,6 +101,7 @@ class TestAddStatsCommand:
         assert result.exit_code == 0
         assert "Tenants:" in result.output
         assert "Accounts:" in result.output
+        assert "t1/a1 p2: 1 pending, 1 deferred" in result.output
 
 
 class TestAddSendCommand:
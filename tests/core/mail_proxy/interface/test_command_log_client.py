@@ -116,6 +116,13 @@ class TestCommandLogAPI:
 
         assert isinstance(exported, list)
 
+    async def test_export_stream_matches_export(self, client: MailProxyClient, setup_tenant):
+        """The streamed export yields the same records as export()."""
+        exported = await client.command_log.export(tenant_id=setup_tenant)
+        streamed = [cmd async for cmd in client.command_log.export_stream(tenant_id=setup_tenant)]
+
+        assert streamed == exported
+
     # =========================================================================
     # Purge Operations
     # =========================================================================
@@ -118,6 +118,50 @@ class TestMessagesAPI:
         ids = {m.id for m in messages}
         assert ids == {"msg-1", "msg-2"}
 
+    async def test_stream_messages_pages(self, client: MailProxyClient, setup_account):
+        """stream() follows the page cursors; the payload is opt-in."""
+        tenant_id, account_id = setup_account
+        for i in range(5):
+            await client.messages.add(
+                id=f"page-{i}",
+                tenant_id=tenant_id,
+                account_id=account_id,
+                from_addr="a@b.com",
+                to=["c@d.com"],
+                subject=f"Subject {i}",
+                body="body",
+            )
+
+        ids = [m.id async for m in client.messages.stream(tenant_id=tenant_id, page_size=2)]
+        assert sorted(ids) == [f"page-{i}" for i in range(5)]
+
+        messages, cursor = await client.messages.page(tenant_id=tenant_id, limit=2)
+        assert len(messages) == 2 and cursor
+        assert messages[0].subject == ""
+
+        with_payload = await client.messages.stream(tenant_id=tenant_id, fields=["message"])
+        assert {m.subject for m in with_payload} == {f"Subject {i}" for i in range(5)}
+
+    async def test_export_streams_messages_and_events(self, client: MailProxyClient, setup_account):
+        """export() and export_events() stream NDJSON records."""
+        tenant_id, account_id = setup_account
+        await client.messages.add(
+            id="exp-1",
+            tenant_id=tenant_id,
+            account_id=account_id,
+            from_addr="a@b.com",
+            to=["c@d.com"],
+            subject="Exported",
+            body="body",
+        )
+
+        exported = [m async for m in client.messages.export(tenant_id=tenant_id)]
+        assert [m["id"] for m in exported] == ["exp-1"]
+        assert exported[0]["message"]["subject"] == "Exported"
+
+        events = [e async for e in client.messages.export_events(tenant_id=tenant_id)]
+        assert events == []
+
     async def test_list_messages_active_only(self, client: MailProxyClient, setup_account):
         """List only active (pending/deferred) messages."""
         tenant_id, account_id = setup_account
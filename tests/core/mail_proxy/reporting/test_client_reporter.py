@@ -309,10 +309,11 @@ class TestClientReporterProcessCycle:
         await reporter._process_cycle()
         reporter.db.table("message_events").fetch_unreported.assert_called_once()
 
-    async def test_applies_retention(self, reporter):
-        """Applies retention after processing."""
+    async def test_does_not_apply_retention(self, reporter):
+        """Retention is left to RetentionPurger, not run in the report cycle."""
         await reporter._process_cycle()
-        reporter.db.table("messages").remove_fully_reported_before.assert_called()
+        reporter.db.table("messages").remove_fully_reported_before.assert_not_called()
+        reporter.db.table("messages").purge_reported_chunk.assert_not_called()
 
 
 class TestClientReporterSendDeliveryReports:
@@ -381,35 +382,6 @@ class TestClientReporterSendDeliveryReports:
             assert call_kwargs["headers"]["Authorization"] == "Bearer secret-token"
 
 
-class TestClientReporterApplyRetention:
-    """Tests for _apply_retention method."""
-
-    @pytest.fixture
-    def reporter(self):
-        proxy = MockProxy()
-        proxy._tables["messages"].remove_fully_reported_before = AsyncMock(return_value=0)
-        return ClientReporter(proxy)
-
-    async def test_skips_if_retention_zero(self, reporter):
-        """Skips cleanup if retention is 0."""
-        reporter.proxy._report_retention_seconds = 0
-        await reporter._apply_retention()
-        reporter.db.table("messages").remove_fully_reported_before.assert_not_called()
-
-    async def test_removes_old_messages(self, reporter):
-        """Removes messages older than retention."""
-        reporter.proxy._report_retention_seconds = 3600
-        await reporter._apply_retention()
-        reporter.db.table("messages").remove_fully_reported_before.assert_called_once()
-
-    async def test_refreshes_gauge_when_removed(self, reporter):
-        """Refreshes queue gauge when messages removed."""
-        reporter.proxy._report_retention_seconds = 3600
-        reporter.db.table("messages").remove_fully_reported_before = AsyncMock(return_value=5)
-        await reporter._apply_retention()
-        reporter.proxy._refresh_queue_gauge.assert_called()
-
-
 class TestDefaultSyncInterval:
     """Tests for default sync interval constant."""
 
@@ -940,10 +912,6 @@ class TestClientReporterPropertiesExtended:
         """_smtp_batch_size delegates to proxy."""
         assert reporter._smtp_batch_size == reporter.proxy._smtp_batch_size
 
-    def test_report_retention_seconds_delegates(self, reporter):
-        """_report_retention_seconds delegates to proxy."""
-        assert reporter._report_retention_seconds == reporter.proxy._report_retention_seconds
-
     def test_client_sync_url_delegates(self, reporter):
         """_client_sync_url delegates to proxy."""
         assert reporter._client_sync_url == reporter.proxy._client_sync_url
@@ -0,0 +1,164 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Unit tests for RetentionPurger."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.mail_proxy.reporting.retention import RetentionPurger
+
+
+class MockProxy:
+    """Mock proxy for RetentionPurger tests."""
+
+    def __init__(self):
+        self.db = MagicMock()
+        self.db.tables = {}
+        self._tables = {"messages": MagicMock(), "message_events": MagicMock()}
+        self._tables["messages"].partitions = AsyncMock(return_value=None)
+        self.db.table = MagicMock(side_effect=lambda name: self._tables[name])
+        self.logger = MagicMock()
+        self.metrics = MagicMock()
+        self._test_mode = True
+        self._active = True
+        self._report_retention_seconds = 3600
+        self._refresh_queue_gauge = AsyncMock()
+        self._utc_now_epoch = MagicMock(return_value=10000)
+
+
+def chunks(*results):
+    """purge_reported_chunk mock returning the given (deleted, events, cursor) results."""
+    return AsyncMock(side_effect=list(results))
+
+
+class TestRetentionPurgerRunOnce:
+    """Tests for RetentionPurger.run_once()."""
+
+    @pytest.fixture
+    def purger(self):
+        return RetentionPurger(MockProxy(), chunk_size=2, time_budget=10.0)
+
+    async def test_skips_if_retention_zero(self, purger):
+        """Nothing is purged when retention is disabled."""
+        purger.proxy._report_retention_seconds = 0
+        purger.proxy._tables["messages"].purge_reported_chunk = chunks()
+        assert await purger.run_once() == 0
+        purger.proxy._tables["messages"].purge_reported_chunk.assert_not_called()
+
+    async def test_runs_chunks_until_pass_ends(self, purger):
+        """Chunks follow the keyset cursor until the scan completes."""
+        messages = purger.proxy._tables["messages"]
+        messages.purge_reported_chunk = chunks((2, 3, "pk-2"), (1, 1, None))
+
+        assert await purger.run_once() == 3
+
+        calls = messages.purge_reported_chunk.call_args_list
+        assert calls[0].args == (6400,)
+        assert calls[0].kwargs == {"after_pk": "", "limit": 2}
+        assert calls[1].kwargs["after_pk"] == "pk-2"
+        assert not purger.in_progress
+        purger.proxy._refresh_queue_gauge.assert_awaited_once()
+        purger.metrics.record_retention_run.assert_called_once()
+        args = purger.metrics.record_retention_run.call_args.args
+        assert args[:2] == (3, 4)
+        assert args[3] is not None
+
+    async def test_stops_at_time_budget_and_resumes(self, purger):
+        """A run over budget keeps the cursor and threshold for the next run."""
+        purger.time_budget = 0.0
+        messages = purger.proxy._tables["messages"]
+        messages.purge_reported_chunk = chunks((2, 2, "pk-2"), (0, 0, None))
+
+        assert await purger.run_once() == 2
+        assert purger.in_progress
+        assert purger.metrics.record_retention_run.call_args.args[3] is None
+
+        purger.proxy._utc_now_epoch.return_value = 20000
+        await purger.run_once()
+
+        second = messages.purge_reported_chunk.call_args_list[1]
+        assert second.args == (6400,)  # Same threshold for the whole pass
+        assert second.kwargs["after_pk"] == "pk-2"
+        assert not purger.in_progress
+
+    async def test_collects_blobs_after_pass(self, purger):
+        """Unreferenced attachment blobs are collected when a pass removed messages."""
+        messages = purger.proxy._tables["messages"]
+        messages.purge_reported_chunk = chunks((1, 1, None))
+        messages.referenced_blob_md5s = AsyncMock(return_value={"abc"})
+        blobs = MagicMock()
+        blobs.remove_unreferenced = AsyncMock(return_value=1)
+        purger.proxy._tables["attachment_blobs"] = blobs
+        purger.proxy.db.tables = {"attachment_blobs": blobs}
+
+        await purger.run_once()
+
+        blobs.remove_unreferenced.assert_awaited_once_with({"abc"}, older_than_ts=6400)
+
+    async def test_no_gauge_refresh_when_nothing_removed(self, purger):
+        """The queue gauge is left alone when nothing was purged."""
+        purger.proxy._tables["messages"].purge_reported_chunk = chunks((0, 0, None))
+        await purger.run_once()
+        purger.proxy._refresh_queue_gauge.assert_not_called()
+
+
+class TestRetentionPurgerPartitions:
+    """Tests for retention on partitioned tables."""
+
+    @pytest.fixture
+    def purger(self):
+        purger = RetentionPurger(MockProxy(), detach_partitions=True)
+        messages = purger.proxy._tables["messages"]
+        events = purger.proxy._tables["message_events"]
+        messages.partitions = AsyncMock(return_value=["messages_default"])
+        for table in (messages, events):
+            table.ensure_partitions = AsyncMock(return_value=[])
+            table.drop_reported_partitions = AsyncMock(return_value=[])
+        messages.purge_reported_chunk = chunks()
+        return purger
+
+    async def test_drops_partitions_instead_of_rows(self, purger):
+        """Partitioned tables are purged by dropping partitions, not deleting rows."""
+        messages = purger.proxy._tables["messages"]
+        events = purger.proxy._tables["message_events"]
+        messages.drop_reported_partitions.return_value = ["messages_p20261001"]
+        events.drop_reported_partitions.return_value = ["message_events_p20261001"]
+
+        assert await purger.run_once() == 2
+
+        messages.purge_reported_chunk.assert_not_called()
+        messages.ensure_partitions.assert_awaited_once()
+        events.ensure_partitions.assert_awaited_once()
+        messages.drop_reported_partitions.assert_awaited_once_with(6400, True)
+        events.drop_reported_partitions.assert_awaited_once_with(6400, True)
+        purger.proxy._refresh_queue_gauge.assert_awaited_once()
+        assert purger.metrics.record_retention_run.call_args.kwargs == {"partitions": 2}
+        assert not purger.in_progress
+
+    async def test_nothing_expired(self, purger):
+        """Runs without expired partitions only create the upcoming ones."""
+        assert await purger.run_once() == 0
+        purger.proxy._refresh_queue_gauge.assert_not_called()
+
+
+class TestRetentionPurgerLifecycle:
+    """Tests for the purge loop."""
+
+    async def test_interval_zero_does_not_start(self):
+        """A zero interval disables the background loop."""
+        purger = RetentionPurger(MockProxy(), interval=0)
+        await purger.start()
+        assert purger._task is None
+
+    async def test_wake_runs_purge(self):
+        """wake() triggers a run in test mode, stop() ends the loop."""
+        purger = RetentionPurger(MockProxy(), interval=60)
+        with patch.object(purger, "run_once", AsyncMock(return_value=0)) as run_once:
+            await purger.start()
+            purger.wake()
+            for _ in range(10):
+                await asyncio.sleep(0)
+            await purger.stop()
+        run_once.assert_awaited_once()
+        assert purger._task is None
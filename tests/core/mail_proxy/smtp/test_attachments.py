@@ -214,11 +214,154 @@ class TestHttpFetcher:
         result = await fetcher.fetch("https://cdn.example.com/file.pdf")
         # Note: This test is simplified; in reality would need proper mock setup
 
+    @patch("aiohttp.ClientSession")
+    async def test_content_length_from_head(self, mock_session_class, fetcher):
+        """content_length() reads Content-Length from a HEAD request."""
+        mock_response = MagicMock(status=200, content_length=2048)
+        mock_session = MagicMock()
+        mock_session.head = MagicMock(
+            return_value=AsyncMock(__aenter__=AsyncMock(return_value=mock_response))
+        )
+        mock_session_class.return_value.__aenter__ = AsyncMock(return_value=mock_session)
+        mock_session_class.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        assert await fetcher.content_length("https://cdn.example.com/file.pdf") == 2048
+
+    async def test_content_length_endpoint_path_not_probed(self, fetcher):
+        """Endpoint (POST) paths have no Content-Length to probe."""
+        assert await fetcher.content_length("doc_id=123") is None
+
     def test_default_endpoint_property(self, fetcher):
         """default_endpoint property returns configured endpoint."""
         assert fetcher.default_endpoint == "https://api.example.com/attachments"
 
 
+class TestHttpFetcherRanged:
+    """Tests for parallel, resumable Range downloads against a local server."""
+
+    CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+    @pytest.fixture
+    async def origin(self):
+        """Serve CONTENT honouring Range, with optional injected failures."""
+        from aiohttp import web
+
+        state = {"requests": [], "if_range": [], "fail_once": set(), "ranges": True, "etag": '"v1"'}
+
+        async def handler(request):
+            range_header = request.headers.get("Range")
+            state["requests"].append(range_header)
+            if_range = request.headers.get("If-Range")
+            if if_range:
+                state["if_range"].append(if_range)
+            if not range_header or not state["ranges"] or if_range not in (None, state["etag"]):
+                return web.Response(body=self.CONTENT)
+            start, end = (int(v) for v in range_header.split("=")[1].split("-"))
+            if start in state["fail_once"]:
+                state["fail_once"].discard(start)
+                return web.Response(status=503)
+            end = min(end, len(self.CONTENT) - 1)
+            return web.Response(
+                status=206,
+                body=self.CONTENT[start : end + 1],
+                headers={
+                    "Content-Range": f"bytes {start}-{end}/{len(self.CONTENT)}",
+                    "ETag": state["etag"],
+                },
+            )
+
+        app = web.Application()
+        app.router.add_get("/file.bin", handler)
+        app.router.add_post("/attachments", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        state["base"] = f"http://127.0.0.1:{port}"
+        yield state
+        await runner.cleanup()
+
+    async def test_ranged_download_in_chunks(self, origin):
+        """Large responses are assembled from parallel Range requests."""
+        fetcher = HttpFetcher(range_chunk_size=4096)
+
+        content = await fetcher.fetch(f"{origin['base']}/file.bin")
+
+        assert content == self.CONTENT
+        assert sorted(origin["requests"]) == sorted(
+            ["bytes=0-4095", "bytes=4096-8191", "bytes=8192-10239"]
+        )
+
+    async def test_endpoint_post_not_ranged(self, origin):
+        """Endpoint (POST) fetches are a single request without Range."""
+        fetcher = HttpFetcher(
+            default_endpoint=f"{origin['base']}/attachments", range_chunk_size=4096
+        )
+        assert await fetcher.fetch("doc_id=1") == self.CONTENT
+        assert origin["requests"] == [None]
+
+    async def test_chunks_sent_with_if_range(self, origin):
+        """Chunk requests carry the first response's ETag as If-Range."""
+        fetcher = HttpFetcher(range_chunk_size=4096)
+
+        await fetcher.fetch(f"{origin['base']}/file.bin")
+
+        assert origin["if_range"] == ['"v1"', '"v1"']
+
+    async def test_resource_changed_mid_download_not_retried(self, origin, monkeypatch):
+        """A 200 answer to If-Range aborts the download without retrying."""
+        from core.mail_proxy.smtp.attachments import RangeMismatchError
+
+        fetcher = HttpFetcher(range_chunk_size=4096, range_parallelism=1)
+        real_range = fetcher._fetch_range
+
+        async def change_after_first(*args, **kwargs):
+            origin["etag"] = '"v2"'
+            return await real_range(*args, **kwargs)
+
+        monkeypatch.setattr(fetcher, "_fetch_range", change_after_first)
+
+        with pytest.raises(RangeMismatchError):
+            await fetcher.fetch(f"{origin['base']}/file.bin")
+        assert origin["requests"].count("bytes=4096-8191") == 1
+
+    async def test_origin_without_range_support(self, origin):
+        """A 200 answer to the probe is used as the full body."""
+        origin["ranges"] = False
+        fetcher = HttpFetcher(range_chunk_size=4096)
+
+        assert await fetcher.fetch(f"{origin['base']}/file.bin") == self.CONTENT
+        assert len(origin["requests"]) == 1
+
+    async def test_failed_chunk_is_retried(self, origin, monkeypatch):
+        """A transient chunk failure is retried without restarting the download."""
+        monkeypatch.setattr("asyncio.sleep", AsyncMock())
+        origin["fail_once"].add(4096)
+        fetcher = HttpFetcher(range_chunk_size=4096)
+
+        assert await fetcher.fetch(f"{origin['base']}/file.bin") == self.CONTENT
+        assert origin["requests"].count("bytes=4096-8191") == 2
+
+    async def test_interrupted_download_resumes_from_disk(self, origin, tmp_path, monkeypatch):
+        """Chunks already on disk are not downloaded again on the next attempt."""
+        from core.mail_proxy.smtp.cache import TieredCache
+
+        monkeypatch.setattr("asyncio.sleep", AsyncMock())
+        cache = TieredCache(disk_dir=str(tmp_path / "cache"))
+        await cache.init()
+        fetcher = HttpFetcher(range_chunk_size=4096, range_retries=1, cache=cache)
+
+        origin["fail_once"].add(8192)
+        with pytest.raises(ValueError, match="8192"):
+            await fetcher.fetch(f"{origin['base']}/file.bin")
+
+        origin["requests"].clear()
+        assert await fetcher.fetch(f"{origin['base']}/file.bin") == self.CONTENT
+        # Only the probe and the missing chunk hit the origin again
+        assert sorted(origin["requests"]) == ["bytes=0-4095", "bytes=8192-10239"]
+
+
 class TestAttachmentManager:
     """Tests for high-level attachment manager."""
 
@@ -344,6 +487,63 @@ class TestAttachmentManager:
         assert result[0] == content
         assert result[1] == "hello.txt"
 
+    # =========================================================================
+    # fetch - blob mode
+    # =========================================================================
+
+    def test_parse_storage_path_blob(self, manager):
+        """blob fetch_mode strips the blob: prefix to the MD5."""
+        path_type, parsed = manager._parse_storage_path("blob:abc123", fetch_mode="blob")
+        assert path_type == "blob"
+        assert parsed == "abc123"
+
+    async def test_fetch_blob_from_store(self):
+        """Blob references are resolved through the blob store."""
+        blob_store = MagicMock()
+        blob_store.get_content = AsyncMock(return_value=b"blob content")
+        manager = AttachmentManager(blob_store=blob_store)
+
+        result = await manager.fetch({
+            "storage_path": "blob:abc123",
+            "fetch_mode": "blob",
+            "filename": "doc.pdf",
+        })
+
+        assert result == (b"blob content", "doc.pdf")
+        blob_store.get_content.assert_awaited_once_with("abc123")
+
+    async def test_fetch_blob_served_from_cache(self):
+        """A cached blob does not hit the store."""
+        from core.mail_proxy.smtp.cache import TieredCache
+
+        cache = TieredCache(memory_max_mb=1, memory_ttl_seconds=60)
+        await cache.init()
+        content = b"blob content"
+        md5 = TieredCache.compute_md5(content)
+        await cache.set(md5, content)
+        blob_store = MagicMock()
+        blob_store.get_content = AsyncMock()
+        manager = AttachmentManager(cache=cache, blob_store=blob_store)
+
+        result = await manager.fetch({
+            "storage_path": f"blob:{md5}",
+            "fetch_mode": "blob",
+            "content_md5": md5,
+            "filename": "doc.pdf",
+        })
+
+        assert result[0] == content
+        blob_store.get_content.assert_not_called()
+
+    async def test_fetch_blob_without_store_raises(self, manager):
+        """Blob references need a configured blob store."""
+        with pytest.raises(ValueError, match="blob store"):
+            await manager.fetch({
+                "storage_path": "blob:abc123",
+                "fetch_mode": "blob",
+                "filename": "doc.pdf",
+            })
+
     # =========================================================================
     # fetch - storage mode
     # =========================================================================
@@ -417,6 +617,124 @@ class TestAttachmentManager:
         cached = await cache.get(md5)
         assert cached == result[0]
 
+    # =========================================================================
+    # iter_chunks
+    # =========================================================================
+
+    async def test_iter_chunks_storage_mount(self, manager):
+        """Mount paths are streamed in chunks."""
+        chunks = [c async for c in manager.iter_chunks({"storage_path": "data:test.txt"}, 5)]
+        assert chunks == [b"test ", b"conte", b"nt"]
+
+    async def test_iter_chunks_absolute_path(self, manager, base_dir):
+        """Absolute paths are streamed in chunks."""
+        att = {"storage_path": str(base_dir / "test.txt")}
+        assert b"".join([c async for c in manager.iter_chunks(att, 4)]) == b"test content"
+
+    async def test_iter_chunks_missing_file(self, manager):
+        """Missing files raise FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            async for _ in manager.iter_chunks({"storage_path": "data:missing.txt"}):
+                pass
+
+    # =========================================================================
+    # estimate_size
+    # =========================================================================
+
+    async def test_estimate_size_declared(self, manager):
+        """Declared size wins over probing the source."""
+        assert await manager.estimate_size({"storage_path": "data:test.txt", "size": 42}) == 42
+
+    async def test_estimate_size_base64(self, manager):
+        """Base64 content size is derived from the encoded length."""
+        encoded = base64.b64encode(b"x" * 300).decode()
+        assert await manager.estimate_size({"storage_path": f"base64:{encoded}"}) == 300
+
+    async def test_estimate_size_storage(self, manager, base_dir):
+        """Storage paths report the stored file size."""
+        assert await manager.estimate_size({"storage_path": "data:test.txt"}) == 12
+        path = str(base_dir / "test.txt")
+        assert await manager.estimate_size({"storage_path": path}) == 12
+
+    async def test_estimate_size_missing_file(self, manager):
+        """Unknown size is reported as None."""
+        assert await manager.estimate_size({"storage_path": "data:missing.txt"}) is None
+
+    async def test_estimate_size_endpoint_unknown(self, manager):
+        """Endpoint paths are not probed."""
+        assert await manager.estimate_size({"storage_path": "doc_id=123"}) is None
+
+    async def test_estimate_size_cached_not_probed(self, storage_manager):
+        """Cached content reports its size without a HEAD request."""
+        from core.mail_proxy.smtp.cache import TieredCache
+
+        cache = TieredCache(memory_max_mb=1, memory_ttl_seconds=60)
+        await cache.init()
+        manager = AttachmentManager(storage_manager=storage_manager, cache=cache)
+        content = b"cached content"
+        md5 = TieredCache.compute_md5(content)
+        await cache.set(md5, content)
+        manager._http_fetcher.content_length = AsyncMock()
+
+        att = {"storage_path": "https://cdn.example.com/a.pdf", "content_md5": md5}
+        assert await manager.estimate_size(att) == len(content)
+        manager._http_fetcher.content_length.assert_not_called()
+
+    # =========================================================================
+    # prefetch
+    # =========================================================================
+
+    async def test_prefetch_without_cache_is_noop(self, manager):
+        """prefetch() does nothing when no cache is configured."""
+        assert await manager.prefetch({"storage_path": "data:test.txt"}) == 0
+
+    async def test_prefetch_then_fetch_served_from_cache(self, base_dir, storage_manager):
+        """Content prefetched without a declared MD5 is served once by fetch()."""
+        from core.mail_proxy.smtp.cache import TieredCache
+
+        cache = TieredCache(memory_max_mb=1, memory_ttl_seconds=60)
+        await cache.init()
+        manager = AttachmentManager(storage_manager=storage_manager, cache=cache)
+        att = {"storage_path": "data:test.txt", "filename": "test.txt"}
+
+        assert await manager.prefetch(att) == len(b"test content")
+        # Stored once, under the source key only
+        assert cache._memory.entry_count == 1
+        # Already warm: nothing more to download
+        assert await manager.prefetch(att) == 0
+
+        (base_dir / "test.txt").unlink()
+        result = await manager.fetch(att)
+        assert result == (b"test content", "test.txt")
+
+        # The source entry is consumed by the first fetch
+        with pytest.raises(FileNotFoundError):
+            await manager.fetch(att)
+
+    async def test_prefetch_with_declared_md5(self, base_dir, storage_manager):
+        """Prefetch stores content under its MD5 for declared attachments."""
+        from core.mail_proxy.smtp.cache import TieredCache
+
+        cache = TieredCache(memory_max_mb=1, memory_ttl_seconds=60)
+        await cache.init()
+        manager = AttachmentManager(storage_manager=storage_manager, cache=cache)
+        md5 = TieredCache.compute_md5(b"test content")
+
+        await manager.prefetch({"storage_path": "data:test.txt", "content_md5": md5})
+
+        assert await cache.get(md5) == b"test content"
+
+    async def test_prefetch_skips_base64(self, storage_manager):
+        """Inline base64 attachments are not prefetched."""
+        from core.mail_proxy.smtp.cache import TieredCache
+
+        cache = TieredCache(memory_max_mb=1, memory_ttl_seconds=60)
+        manager = AttachmentManager(storage_manager=storage_manager, cache=cache)
+        encoded = base64.b64encode(b"inline").decode()
+
+        assert await manager.prefetch({"storage_path": f"base64:{encoded}"}) == 0
+        assert cache._memory.entry_count == 0
+
     # =========================================================================
     # fetch - empty/missing
     # =========================================================================
@@ -0,0 +1,92 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Unit tests for ByteBudget weighted semaphore."""
+
+import asyncio
+
+import pytest
+
+from core.mail_proxy.smtp.budget import ByteBudget
+
+
+class TestByteBudget:
+    """Tests for byte-weighted admission."""
+
+    def test_capacity_must_be_positive(self):
+        """Zero or negative capacity is rejected."""
+        with pytest.raises(ValueError):
+            ByteBudget(0)
+
+    async def test_acquire_within_capacity_does_not_wait(self):
+        """Reservations that fit are admitted immediately."""
+        budget = ByteBudget(100)
+        assert await budget.acquire(40) == 40
+        assert await budget.acquire(60) == 60
+        assert budget.available == 0
+
+    async def test_oversized_request_is_clamped(self):
+        """A request larger than capacity reserves the whole budget."""
+        budget = ByteBudget(100)
+        async with budget.reserve(500) as weight:
+            assert weight == 100
+            assert budget.in_use == 100
+        assert budget.in_use == 0
+
+    async def test_waits_until_released(self):
+        """A reservation that does not fit waits for a release."""
+        budget = ByteBudget(100)
+        await budget.acquire(80)
+
+        waiter = asyncio.create_task(budget.acquire(50))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        budget.release(80)
+        assert await asyncio.wait_for(waiter, timeout=1) == 50
+        assert budget.in_use == 50
+
+    async def test_waiters_admitted_in_fifo_order(self):
+        """Small reservations queue behind a waiting large one, so it is not starved."""
+        budget = ByteBudget(100)
+        await budget.acquire(60)
+        large = asyncio.create_task(budget.acquire(90))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(budget.acquire(10))
+        await asyncio.sleep(0)
+
+        assert not large.done()
+        assert not small.done()
+
+        budget.release(60)
+        assert await asyncio.wait_for(large, timeout=1) == 90
+        assert await asyncio.wait_for(small, timeout=1) == 10
+        assert budget.in_use == 100
+
+    async def test_cancelled_head_unblocks_next_waiter(self):
+        """Cancelling the waiter at the head admits the ones behind it that fit."""
+        budget = ByteBudget(100)
+        await budget.acquire(60)
+        large = asyncio.create_task(budget.acquire(90))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(budget.acquire(10))
+        await asyncio.sleep(0)
+
+        large.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await large
+
+        assert await asyncio.wait_for(small, timeout=1) == 10
+        assert budget.in_use == 70
+
+    async def test_cancelled_waiter_does_not_leak(self):
+        """Cancelling a waiter leaves the budget consistent."""
+        budget = ByteBudget(100)
+        await budget.acquire(100)
+        waiter = asyncio.create_task(budget.acquire(30))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        budget.release(100)
+        assert budget.in_use == 0
+        assert budget.available == 100
@@ -483,6 +483,42 @@ class TestTieredCacheEdgeCases:
 
         assert cache._memory.entry_count == 0
 
+    async def test_discard_removes_from_both_tiers(self, tmp_path):
+        """discard() drops an entry from memory and disk."""
+        cache = TieredCache(
+            memory_max_mb=1,
+            memory_ttl_seconds=60,
+            disk_dir=str(tmp_path / "cache"),
+            disk_threshold_kb=0.1,
+        )
+        await cache.init()
+
+        await cache.set("small", b"x")
+        await cache.set("large", b"y" * 200)
+        await cache.discard("small")
+        await cache.discard("large")
+        await cache.discard("missing")
+
+        assert await cache.get("small") is None
+        assert await cache.get("large") is None
+
+    async def test_size_reads_both_tiers_without_content(self, tmp_path):
+        """size() reports entry sizes from memory and disk metadata."""
+        cache = TieredCache(
+            memory_max_mb=1,
+            memory_ttl_seconds=60,
+            disk_dir=str(tmp_path / "cache"),
+            disk_threshold_kb=0.1,
+        )
+        await cache.init()
+
+        await cache.set("small", b"x")
+        await cache.set("large", b"y" * 200)
+
+        assert await cache.size("small") == 1
+        assert await cache.size("large") == 200
+        assert await cache.size("missing") is None
+
 
 class TestDiskCacheSpaceManagement:
     """Tests for DiskCache space eviction logic."""
@@ -0,0 +1,140 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Unit tests for EventWriter group-commit batching."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core.mail_proxy.smtp.event_writer import EventWriter
+
+
+@pytest.fixture
+def db():
+    """Mock database whose message_events table records each committed batch."""
+    events_table = MagicMock()
+    events_table.batches = []
+
+    async def add_events(events):
+        events_table.batches.append(list(events))
+        return len(events)
+
+    events_table.add_events = AsyncMock(side_effect=add_events)
+    mock_db = MagicMock()
+    mock_db.table = MagicMock(return_value=events_table)
+    return mock_db
+
+
+class TestEventWriter:
+    """Tests for batching, durability and shutdown."""
+
+    async def test_concurrent_events_share_one_commit(self, db):
+        """Events submitted within the window are committed together."""
+        writer = EventWriter(db, max_batch=100, max_delay=0.05)
+
+        await asyncio.gather(*(writer.add_event(f"pk{i}", "sent", 1000 + i) for i in range(10)))
+
+        batches = db.table("message_events").batches
+        assert len(batches) == 1
+        assert [e["message_pk"] for e in batches[0]] == [f"pk{i}" for i in range(10)]
+        await writer.stop()
+
+    async def test_full_batch_commits_without_waiting(self, db):
+        """Reaching max_batch commits before the window expires."""
+        writer = EventWriter(db, max_batch=3, max_delay=10)
+
+        await asyncio.wait_for(
+            asyncio.gather(*(writer.add_event(f"pk{i}", "sent", 1) for i in range(6))),
+            timeout=1,
+        )
+
+        assert [len(b) for b in db.table("message_events").batches] == [3, 3]
+        await writer.stop()
+
+    async def test_window_expiry_commits_partial_batch(self, db):
+        """A batch below max_batch is committed when max_delay expires."""
+        writer = EventWriter(db, max_batch=500, max_delay=0.02)
+
+        await asyncio.wait_for(writer.add_event("pk1", "sent", 1), timeout=1)
+        await asyncio.wait_for(writer.add_event("pk2", "sent", 2), timeout=1)
+
+        batches = db.table("message_events").batches
+        assert [[e["message_pk"] for e in b] for b in batches] == [["pk1"], ["pk2"]]
+        assert not writer._task.done()
+        await writer.stop()
+
+    async def test_add_event_returns_after_commit(self, db):
+        """add_event() does not return before its batch is committed."""
+        writer = EventWriter(db, max_batch=100, max_delay=0.01)
+
+        await writer.add_event(
+            "pk1", "deferred", 1, description="rate_limit", metadata={"deferred_ts": 60}
+        )
+
+        batches = db.table("message_events").batches
+        assert batches == [
+            [
+                {
+                    "message_pk": "pk1",
+                    "event_type": "deferred",
+                    "event_ts": 1,
+                    "description": "rate_limit",
+                    "metadata": {"deferred_ts": 60},
+                }
+            ]
+        ]
+        await writer.stop()
+
+    async def test_commit_failure_raised_to_every_waiter(self, db):
+        """A failed commit is raised to all callers of the batch."""
+        db.table("message_events").add_events = AsyncMock(side_effect=RuntimeError("db down"))
+        writer = EventWriter(db, max_batch=100, max_delay=0.01)
+
+        results = await asyncio.gather(
+            writer.add_event("pk1", "sent", 1),
+            writer.add_event("pk2", "sent", 1),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        await writer.stop()
+
+    async def test_writer_recovers_after_failure(self, db):
+        """A failed batch does not stop later commits."""
+        table = db.table("message_events")
+        table.add_events = AsyncMock(side_effect=[RuntimeError("db down"), 1])
+        writer = EventWriter(db, max_batch=100, max_delay=0)
+
+        with pytest.raises(RuntimeError):
+            await writer.add_event("pk1", "sent", 1)
+        await writer.add_event("pk2", "sent", 1)
+
+        assert table.add_events.await_count == 2
+        await writer.stop()
+
+    async def test_stop_flushes_pending_events(self, db):
+        """stop() commits queued events and resolves their waiters."""
+        writer = EventWriter(db, max_batch=100, max_delay=10)
+        waiter = asyncio.create_task(writer.add_event("pk1", "sent", 1))
+        await asyncio.sleep(0)
+
+        await asyncio.wait_for(writer.stop(), timeout=1)
+
+        await asyncio.wait_for(waiter, timeout=1)
+        assert db.table("message_events").batches == [
+            [
+                {
+                    "message_pk": "pk1",
+                    "event_type": "sent",
+                    "event_ts": 1,
+                    "description": None,
+                    "metadata": None,
+                }
+            ]
+        ]
+
+    async def test_stop_without_events(self, db):
+        """stop() on an idle writer is a no-op."""
+        writer = EventWriter(db)
+        await writer.stop()
+        db.table("message_events").add_events.assert_not_called()
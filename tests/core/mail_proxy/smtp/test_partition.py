@@ -0,0 +1,52 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for account partitioning between dispatcher processes."""
+
+import pytest
+
+from core.mail_proxy.entities.account.table import AccountsTable
+from core.mail_proxy.smtp.partition import DispatchPartition, account_hash, account_partition
+
+
+class TestAccountPartition:
+    """Tests for account_partition()."""
+
+    def test_stable_and_in_range(self):
+        """The same pk always maps to the same partition."""
+        pks = [f"account-{i}" for i in range(200)]
+        first = [account_partition(pk, 4) for pk in pks]
+        assert first == [account_partition(pk, 4) for pk in pks]
+        assert set(first) == {0, 1, 2, 3}
+
+    def test_single_partition_and_default_account(self):
+        """One partition owns everything; messages without an account go to 0."""
+        assert account_partition("account-1", 1) == 0
+        assert account_partition(None, 4) == 0
+
+    def test_hash_matches_stored_column(self):
+        """account_hash() is the accounts.dispatch_hash value, within a signed INTEGER."""
+        for pk in (f"account-{i}" for i in range(50)):
+            assert account_hash(pk) == AccountsTable.dispatch_hash(pk)
+            assert 0 <= account_hash(pk) < 2**31
+
+
+class TestDispatchPartition:
+    """Tests for DispatchPartition."""
+
+    def test_default_owns_everything(self):
+        """The default partition dispatches every account."""
+        partition = DispatchPartition()
+        assert not partition.partitioned
+        assert partition.owns("any") and partition.owns(None)
+
+    def test_each_account_has_one_owner(self):
+        """Across the partitions of a deployment each account has exactly one owner."""
+        partitions = [DispatchPartition(i, 3) for i in range(3)]
+        for pk in (f"account-{i}" for i in range(50)):
+            assert sum(p.owns(pk) for p in partitions) == 1
+        assert [p.owns_unassigned for p in partitions] == [True, False, False]
+
+    @pytest.mark.parametrize(("index", "count"), [(0, 0), (2, 2), (-1, 2)])
+    def test_invalid(self, index, count):
+        """Out-of-range partitions are rejected."""
+        with pytest.raises(ValueError):
+            DispatchPartition(index, count)
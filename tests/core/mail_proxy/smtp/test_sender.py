@@ -158,6 +158,8 @@ class TestSmtpSenderEmailBuilding:
         proxy.attachments = MagicMock()
         proxy._attachment_cache = None
         proxy._attachment_semaphore = None
+        proxy._attachment_budget = None
+        proxy._event_writer = None
         proxy._max_concurrent_attachments = 5
         proxy._attachment_timeout = 30.0
         return proxy
@@ -7,10 +7,13 @@ from unittest.mock import AsyncMock, MagicMock, patch, PropertyMock
 
 import pytest
 
+from core.mail_proxy.entities.message.stats import QueueStats
+from core.mail_proxy.smtp.partition import DispatchPartition
 from core.mail_proxy.smtp.sender import (
     SmtpSender,
     AccountConfigurationError,
     AttachmentTooLargeError,
+    LargeFileStorageError,
 )
 
 
@@ -34,6 +37,8 @@ class MockProxy:
         self._max_concurrent_attachments = 5
         self._attachment_timeout = 30.0
         self._attachment_semaphore = None
+        self._attachment_budget = None
+        self._event_writer = None
         self._attachment_cache = None
         self._log_delivery_activity = True
         self.default_host = None
@@ -50,6 +55,9 @@ class MockProxy:
             "message_events": MagicMock(),
             "storages": MagicMock(),
         }
+        self._tables["messages"].fetch_payloads = AsyncMock(
+            side_effect=lambda pks: {pk: {} for pk in pks}
+        )
         self.db.table = MagicMock(side_effect=self._get_table)
 
         # Also add _refresh_queue_gauge mock at proxy level
@@ -169,6 +177,99 @@ class TestSmtpSenderProcessCycle:
 
         assert result is False
 
+    async def test_process_cycle_prefetches_next_batch(self, sender, mock_proxy):
+        """Attachments of the following batch are prefetched when a cache is set."""
+        mock_proxy._attachment_cache = MagicMock()
+        mock_proxy._prefetch_budget_bytes = 1024
+        mock_proxy._prefetch_messages = 20
+        mock_proxy._tables["messages"].fetch_ready = AsyncMock(side_effect=[
+            [],
+            [{"pk": "2", "id": "m2", "account_id": "a1"}],
+        ])
+        sender._prefetch_next_batch = AsyncMock(return_value=0)
+
+        await sender._process_cycle()
+
+        sender._prefetch_next_batch.assert_awaited_once()
+        assert sender._prefetch_next_batch.call_args.kwargs["offset"] == 1
+
+    async def test_process_cycle_fetches_only_owned_accounts(self, sender, mock_proxy):
+        """A partitioned dispatcher fetches the messages of its accounts only."""
+        sender.partition = DispatchPartition(1, 3)
+        mock_proxy._tables["messages"].fetch_ready = AsyncMock(return_value=[])
+
+        await sender._process_cycle()
+
+        for call in mock_proxy._tables["messages"].fetch_ready.call_args_list:
+            assert (call.kwargs["partition"], call.kwargs["partitions"]) == (1, 3)
+
+    async def test_process_cycle_unpartitioned_fetches_all(self, sender, mock_proxy):
+        """A single dispatcher does not filter by account."""
+        mock_proxy._tables["messages"].fetch_ready = AsyncMock(return_value=[])
+
+        await sender._process_cycle()
+
+        call = mock_proxy._tables["messages"].fetch_ready.call_args
+        assert "partitions" not in call.kwargs
+
+
+class TestSmtpSenderPrefetch:
+    """Tests for _prefetch_next_batch."""
+
+    @pytest.fixture
+    def mock_proxy(self):
+        proxy = MockProxy()
+        proxy._prefetch_budget_bytes = 100
+        proxy._prefetch_messages = 10
+        return proxy
+
+    @pytest.fixture
+    def sender(self, mock_proxy):
+        return SmtpSender(mock_proxy)
+
+    async def test_prefetch_peeks_after_current_batch(self, sender, mock_proxy):
+        """Lookahead query skips the messages being dispatched."""
+        mock_proxy._tables["messages"].fetch_ready = AsyncMock(return_value=[])
+        mock_proxy._tables["messages"].fetch_attachment_refs = AsyncMock(return_value={})
+
+        assert await sender._prefetch_next_batch(1000, offset=7) == 0
+
+        kwargs = mock_proxy._tables["messages"].fetch_ready.call_args.kwargs
+        assert kwargs["offset"] == 7
+        assert kwargs["limit"] == 10
+        assert kwargs["min_priority"] == 1
+        assert kwargs["include_payload"] is False
+
+    async def test_prefetch_stops_at_byte_budget(self, sender, mock_proxy):
+        """No further messages are prefetched once the budget is spent."""
+        upcoming = [{"pk": str(i), "tenant_id": "t1"} for i in range(3)]
+        mock_proxy._tables["messages"].fetch_ready = AsyncMock(return_value=upcoming)
+        mock_proxy._tables["messages"].fetch_attachment_refs = AsyncMock(
+            return_value={str(i): [{"storage_path": f"/f{i}"}] for i in range(3)}
+        )
+        manager = MagicMock()
+        manager.prefetch = AsyncMock(return_value=60)
+        sender._get_attachment_manager_for_message = AsyncMock(return_value=manager)
+
+        fetched = await sender._prefetch_next_batch(1000, offset=0)
+
+        assert fetched == 120
+        assert manager.prefetch.await_count == 2
+        sender._get_attachment_manager_for_message.assert_awaited_with(upcoming[1])
+
+    async def test_prefetch_failures_are_not_fatal(self, sender, mock_proxy):
+        """A failing attachment download is skipped."""
+        upcoming = [{"pk": "1", "tenant_id": "t1"}]
+        mock_proxy._tables["messages"].fetch_ready = AsyncMock(return_value=upcoming)
+        mock_proxy._tables["messages"].fetch_attachment_refs = AsyncMock(
+            return_value={"1": [{"storage_path": "/a"}]}
+        )
+        manager = MagicMock()
+        manager.prefetch = AsyncMock(side_effect=FileNotFoundError("gone"))
+        sender._get_attachment_manager_for_message = AsyncMock(return_value=manager)
+
+        assert await sender._prefetch_next_batch(1000, offset=0) == 0
+
 
 class TestSmtpSenderDispatchBatch:
     """Tests for _dispatch_batch."""
@@ -228,6 +329,59 @@ class TestSmtpSenderDispatchBatch:
         # Only 1 message should be dispatched due to account-specific batch_size
         assert sender._dispatch_message.call_count == 1
 
+    async def test_dispatch_batch_loads_payloads_for_sent_messages_only(self, sender, mock_proxy):
+        """Payloads are loaded in one query, skipping messages over the account limit."""
+        mock_proxy._batch_size_per_account = 2
+        mock_proxy._tables["messages"].fetch_payloads = AsyncMock(
+            return_value={"1": {"subject": "one"}, "2": {"subject": "two"}}
+        )
+        batch = [
+            {"pk": "1", "id": "m1", "account_id": "acct1", "tenant_id": "t1", "message": None},
+            {"pk": "2", "id": "m2", "account_id": "acct1", "tenant_id": "t1", "message": None},
+            {"pk": "3", "id": "m3", "account_id": "acct1", "tenant_id": "t1", "message": None},
+        ]
+
+        await sender._dispatch_batch(batch, 12345)
+
+        mock_proxy._tables["messages"].fetch_payloads.assert_awaited_once_with(["1", "2"])
+        dispatched = [call.args[0] for call in sender._dispatch_message.call_args_list]
+        assert sorted(e["message"]["subject"] for e in dispatched) == ["one", "two"]
+
+    async def test_dispatch_batch_skips_messages_removed_before_load(self, sender, mock_proxy):
+        """Messages whose payload is gone by load time are not dispatched."""
+        mock_proxy._tables["messages"].fetch_payloads = AsyncMock(return_value={"1": {}})
+        batch = [
+            {"pk": "1", "id": "m1", "account_id": "acct1", "tenant_id": "t1", "message": None},
+            {"pk": "2", "id": "m2", "account_id": "acct1", "tenant_id": "t1", "message": None},
+        ]
+
+        await sender._dispatch_batch(batch, 12345)
+
+        assert sender._dispatch_message.call_count == 1
+
+    async def test_dispatch_batch_tracks_in_flight(self, sender, mock_proxy):
+        """Dispatched messages are in flight until their outcome updates the stats."""
+        stats = QueueStats()
+        mock_proxy._tables["messages"].stats = stats
+        batch = [
+            {"pk": pk, "id": pk, "account_id": "acct1", "tenant_id": "t1", "priority": 2}
+            for pk in ("1", "2")
+        ]
+        for entry in batch:
+            stats.added(entry)
+        seen = []
+
+        async def dispatch(entry, now_ts):
+            seen.append(stats.snapshot()[("t1", "acct1", 2)].in_flight)
+            return "sent" if entry["pk"] == "1" else "deferred"
+
+        sender._dispatch_message = dispatch
+        await sender._dispatch_batch(batch, 12345)
+
+        assert seen == [2, 1]
+        counts = stats.snapshot()[("t1", "acct1", 2)]
+        assert (counts.pending, counts.deferred, counts.in_flight) == (0, 1, 0)
+
     async def test_dispatch_batch_default_account_handling(self, sender, mock_proxy):
         """Messages without account_id use 'default'."""
         batch = [
@@ -647,6 +801,93 @@ class TestSmtpSenderAttachments:
         with pytest.raises(TimeoutError):
             await sender._fetch_attachment_with_timeout({"filename": "file.txt"})
 
+    async def test_process_attachments_reserves_byte_budget(self, sender, mock_proxy):
+        """The whole message is admitted against the byte budget while building."""
+        from core.mail_proxy.smtp.budget import ByteBudget
+
+        budget = ByteBudget(1000)
+        mock_proxy._attachment_budget = budget
+        mock_proxy._tables["tenants"].get = AsyncMock(return_value=None)
+        mock_proxy.attachments.estimate_size = AsyncMock(side_effect=[100, None])
+        in_use_during_fetch = []
+
+        async def fetch(att):
+            in_use_during_fetch.append(budget.in_use)
+            return (b"content", att["filename"])
+
+        mock_proxy.attachments.fetch = fetch
+        msg = EmailMessage()
+        msg.set_content("Body")
+
+        await sender._process_attachments(
+            msg,
+            {"tenant_id": "t1"},
+            [
+                {"filename": "a.txt", "storage_path": "/a", "size": 100},
+                {"filename": "b.txt", "storage_path": "/b"},
+            ],
+            "plain",
+        )
+
+        # Declared 100 bytes + unknown size weighing capacity / max_concurrent_attachments
+        assert in_use_during_fetch == [300, 300]
+        assert budget.in_use == 0
+
+    async def test_reservation_held_until_send_finishes(self, sender, mock_proxy):
+        """Attachment bytes stay reserved while the built message is being sent."""
+        from core.mail_proxy.smtp.budget import ByteBudget
+
+        budget = ByteBudget(1000)
+        mock_proxy._attachment_budget = budget
+        mock_proxy._tables["tenants"].get = AsyncMock(return_value=None)
+        mock_proxy._tables["messages"].clear_deferred = AsyncMock()
+        mock_proxy.attachments.estimate_size = AsyncMock(return_value=100)
+        mock_proxy.attachments.fetch = AsyncMock(return_value=(b"content", "a.txt"))
+        in_use_during_send = []
+
+        async def send_with_limits(*args):
+            in_use_during_send.append(budget.in_use)
+            return {"id": "m1", "status": "sent"}
+
+        sender._send_with_limits = send_with_limits
+        sender._publish_result = AsyncMock()
+        entry = {
+            "pk": "p1",
+            "id": "m1",
+            "message": {
+                "from": "a@example.com",
+                "to": ["b@example.com"],
+                "subject": "S",
+                "attachments": [{"filename": "a.txt", "storage_path": "/a", "size": 100}],
+            },
+        }
+
+        assert await sender._dispatch_message(entry, 0) == "sent"
+
+        assert in_use_during_send == [100]
+        assert budget.in_use == 0
+
+    async def test_sizes_probed_concurrently(self, sender, mock_proxy):
+        """Attachment sizes are probed in parallel, not one after another."""
+        running = 0
+        peak = 0
+
+        async def estimate_size(att):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return 10
+
+        mock_proxy.attachments.estimate_size = estimate_size
+        attachments = [{"filename": f"{i}.txt", "storage_path": f"/{i}"} for i in range(3)]
+
+        sizes = await sender._probe_attachment_sizes(attachments, mock_proxy.attachments)
+
+        assert sizes == [10, 10, 10]
+        assert peak == 3
+
 
 class TestSmtpSenderAccountResolutionExtended:
     """Extended tests for account resolution."""
@@ -833,6 +1074,130 @@ class TestSmtpSenderLargeFileRewrite:
         # Should log warning but still attach
         mock_proxy.logger.warning.assert_called()
 
+    async def test_process_attachments_rejects_before_download(self, sender, mock_proxy):
+        """A known oversized attachment is rejected without fetching it."""
+        mock_proxy._tables["tenants"].get = AsyncMock(return_value={
+            "large_file_config": {"enabled": True, "max_size_mb": 1.0, "action": "reject"}
+        })
+        manager = MagicMock()
+        manager.parse_filename = MagicMock(return_value=("big.bin", None))
+        manager.estimate_size = AsyncMock(return_value=5 * 1024 * 1024)
+        manager.fetch = AsyncMock()
+        sender._get_attachment_manager_for_message = AsyncMock(return_value=manager)
+
+        msg = EmailMessage()
+        msg.set_content("Body")
+
+        with pytest.raises(AttachmentTooLargeError):
+            await sender._process_attachments(
+                msg, {"tenant_id": "t1"}, [{"filename": "big.bin", "storage_path": "/big"}], "plain"
+            )
+        manager.fetch.assert_not_called()
+
+    async def test_process_attachments_streams_oversized_to_storage(self, sender, mock_proxy):
+        """A known oversized attachment is streamed to large-file storage, not fetched."""
+        mock_proxy._tables["tenants"].get = AsyncMock(return_value={
+            "large_file_config": {
+                "enabled": True,
+                "max_size_mb": 1.0,
+                "action": "rewrite",
+                "storage_url": "s3://bucket/files",
+            }
+        })
+        manager = MagicMock()
+        manager.parse_filename = MagicMock(return_value=("big.bin", None))
+        manager.estimate_size = AsyncMock(return_value=5 * 1024 * 1024)
+        manager.fetch = AsyncMock()
+        manager.iter_chunks = MagicMock(return_value="chunk-iterator")
+        sender._get_attachment_manager_for_message = AsyncMock(return_value=manager)
+        storage = MagicMock()
+        storage.upload_stream = AsyncMock(return_value="files/x/big.bin")
+        storage.get_download_url = MagicMock(return_value="https://dl.example.com/big.bin")
+        sender._create_large_file_storage = MagicMock(return_value=storage)
+
+        msg = EmailMessage()
+        msg.set_content("Body")
+
+        await sender._process_attachments(
+            msg, {"tenant_id": "t1"}, [{"filename": "big.bin", "storage_path": "/big"}], "plain"
+        )
+
+        manager.fetch.assert_not_called()
+        assert storage.upload_stream.call_args.args[1] == "chunk-iterator"
+        assert "https://dl.example.com/big.bin" in msg.get_content()
+
+    @pytest.fixture
+    def streaming(self, sender, mock_proxy):
+        """Sender set up to stream an oversized attachment into a mocked storage."""
+        mock_proxy._tables["tenants"].get = AsyncMock(
+            return_value={
+                "large_file_config": {
+                    "enabled": True,
+                    "max_size_mb": 1.0,
+                    "action": "rewrite",
+                    "storage_url": "s3://bucket/files",
+                }
+            }
+        )
+        manager = MagicMock()
+        manager.parse_filename = MagicMock(return_value=("big.bin", None))
+        manager.estimate_size = AsyncMock(return_value=5 * 1024 * 1024)
+        manager.fetch = AsyncMock()
+        sender._get_attachment_manager_for_message = AsyncMock(return_value=manager)
+        storage = MagicMock()
+        storage.delete = AsyncMock()
+        sender._create_large_file_storage = MagicMock(return_value=storage)
+        return manager, storage
+
+    @pytest.mark.parametrize("failure", ["upload_error", "timeout"])
+    async def test_failed_stream_fails_message(self, sender, mock_proxy, streaming, failure):
+        """A failed or timed-out upload fails the message and deletes the partial object."""
+        manager, storage = streaming
+        if failure == "timeout":
+            mock_proxy._attachment_timeout = 0.01
+
+            async def hang(*args):
+                await asyncio.sleep(10)
+
+            storage.upload_stream = AsyncMock(side_effect=hang)
+        else:
+            storage.upload_stream = AsyncMock(side_effect=LargeFileStorageError("denied"))
+
+        msg = EmailMessage()
+        msg.set_content("Body")
+        with pytest.raises(ValueError, match="big.bin could not be stored"):
+            await sender._process_attachments(
+                msg, {"tenant_id": "t1"}, [{"filename": "big.bin", "storage_path": "/big"}], "plain"
+            )
+
+        manager.fetch.assert_not_called()
+        file_id = storage.upload_stream.call_args.args[0]
+        storage.delete.assert_awaited_once_with(file_id, "big.bin")
+
+    async def test_cancelled_stream_deletes_partial_object(self, sender, streaming):
+        """Cancelling the send while streaming deletes the partial object."""
+        _, storage = streaming
+        started = asyncio.Event()
+
+        async def upload_stream(*args):
+            started.set()
+            await asyncio.sleep(10)
+
+        storage.upload_stream = AsyncMock(side_effect=upload_stream)
+        msg = EmailMessage()
+        msg.set_content("Body")
+        task = asyncio.create_task(
+            sender._process_attachments(
+                msg, {"tenant_id": "t1"}, [{"filename": "big.bin", "storage_path": "/big"}], "plain"
+            )
+        )
+        await started.wait()
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        storage.delete.assert_awaited_once()
+
     async def test_create_large_file_storage_returns_none_without_url(self, sender, mock_proxy):
         """_create_large_file_storage returns None without storage_url."""
         result = sender._create_large_file_storage({"enabled": True})
@@ -6,6 +6,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from core.mail_proxy.entities.message.stats import QueueStats
 from core.mail_proxy.proxy import (
     MailProxy,
     PRIORITY_LABELS,
@@ -13,6 +14,7 @@ from core.mail_proxy.proxy import (
     DEFAULT_PRIORITY,
 )
 from core.mail_proxy.proxy_config import ProxyConfig
+from core.mail_proxy.smtp.partition import DispatchPartition
 
 
 class MockDb:
@@ -279,17 +281,20 @@ class TestMailProxyDeleteMessages:
     async def test_deletes_authorized_messages(self, proxy):
         """Only authorized messages are deleted."""
         proxy.db.table("messages").get_ids_for_tenant = AsyncMock(return_value={"m1", "m2"})
-        proxy.db.table("messages").delete = AsyncMock(return_value=True)
+        proxy.db.table("messages").remove_for_tenant = AsyncMock(return_value={"m1", "m2"})
 
         removed, not_found, unauthorized = await proxy._delete_messages(["m1", "m2", "m3"], "tenant1")
 
         assert removed == 2
         assert unauthorized == ["m3"]
+        proxy.db.table("messages").remove_for_tenant.assert_awaited_once_with(
+            ["m1", "m2"], "tenant1"
+        )
 
     async def test_tracks_not_found_messages(self, proxy):
         """Messages that fail to delete are tracked as not_found."""
         proxy.db.table("messages").get_ids_for_tenant = AsyncMock(return_value={"m1"})
-        proxy.db.table("messages").delete = AsyncMock(return_value=False)
+        proxy.db.table("messages").remove_for_tenant = AsyncMock(return_value=set())
 
         removed, not_found, unauthorized = await proxy._delete_messages(["m1"], "tenant1")
 
@@ -521,6 +526,93 @@ class TestMailProxyLifecycle:
         proxy.db.adapter.close.assert_called_once()
 
 
+class TestMailProxyRoles:
+    """Tests for process roles and the wake channel."""
+
+    def _proxy(self, **config):
+        with patch('core.mail_proxy.proxy.SmtpSender'), \
+             patch('core.mail_proxy.proxy.ClientReporter'), \
+             patch('core.mail_proxy.proxy_base.SqlDb') as mock_db_cls:
+            mock_db_cls.return_value = MockDb()
+            p = MailProxy(config=ProxyConfig(**config))
+            p.smtp_sender.start = AsyncMock()
+            p.smtp_sender.stop = AsyncMock()
+            p.client_reporter.start = AsyncMock()
+            p.client_reporter.stop = AsyncMock()
+            p.retention_purger = MagicMock()
+            p.retention_purger.start = AsyncMock()
+            p.retention_purger.stop = AsyncMock()
+            p.init = AsyncMock()
+            return p
+
+    def test_unknown_role_rejected(self):
+        """An unknown role is a configuration error."""
+        with pytest.raises(ValueError, match="Unknown proxy role"):
+            self._proxy(role="worker")
+
+    async def test_api_role_starts_no_background_task(self):
+        """role=api serves requests only."""
+        proxy = self._proxy(role="api")
+        await proxy.start()
+        proxy.smtp_sender.start.assert_not_called()
+        proxy.client_reporter.start.assert_not_called()
+        proxy.retention_purger.start.assert_not_called()
+        await proxy.stop()
+
+    async def test_dispatcher_role_starts_sender_only(self):
+        """role=dispatcher runs the SMTP dispatch loop only."""
+        proxy = self._proxy(role="dispatcher")
+        await proxy.start()
+        proxy.smtp_sender.start.assert_called_once()
+        proxy.client_reporter.start.assert_not_called()
+        await proxy.stop()
+
+    def test_queue_stats_counts_only_in_full_dispatcher(self):
+        """Only processes dispatching every account answer counts from the stats."""
+        assert self._proxy(role="all").db.table("messages").stats_counts is True
+        assert self._proxy(role="dispatcher").db.table("messages").stats_counts is True
+        assert self._proxy(role="api").db.table("messages").stats_counts is False
+        assert self._proxy(role="reporter").db.table("messages").stats_counts is False
+        partitioned = self._proxy(role="dispatcher", dispatch_partitions=2)
+        assert partitioned.db.table("messages").stats_counts is False
+
+    def test_dispatch_partition_passed_to_sender(self):
+        """The configured account partition is the one the sender dispatches."""
+        proxy = self._proxy(role="dispatcher", dispatch_partition=2, dispatch_partitions=4)
+        assert proxy.smtp_sender.partition == DispatchPartition(2, 4)
+        with pytest.raises(ValueError, match="out of range"):
+            self._proxy(role="dispatcher", dispatch_partition=4, dispatch_partitions=4)
+
+    async def test_reporter_role_starts_reporting_tasks(self):
+        """role=reporter runs reports and retention."""
+        proxy = self._proxy(role="reporter")
+        await proxy.start()
+        proxy.smtp_sender.start.assert_not_called()
+        proxy.client_reporter.start.assert_called_once()
+        proxy.retention_purger.start.assert_called_once()
+        await proxy.stop()
+
+    async def test_api_writes_wake_other_processes(self, tmp_path):
+        """notify_workers() reaches the dispatcher and reporter processes."""
+        api = self._proxy(role="api", wake_dir=str(tmp_path))
+        dispatcher = self._proxy(role="dispatcher", wake_dir=str(tmp_path))
+        reporter = self._proxy(role="reporter", wake_dir=str(tmp_path))
+        for proxy in (api, dispatcher, reporter):
+            await proxy.start()
+        try:
+            api.notify_workers("dispatch")
+            api.notify_workers("report", "acme")
+            await asyncio.sleep(0.05)
+            dispatcher.smtp_sender.wake.assert_called_once()
+            dispatcher.client_reporter.wake.assert_not_called()
+            reporter.client_reporter.wake.assert_called_once_with("acme")
+            reporter.smtp_sender.wake.assert_not_called()
+        finally:
+            for proxy in (api, dispatcher, reporter):
+                await proxy.stop()
+        assert not list(tmp_path.glob("*.sock"))
+
+
 class TestMailProxyLogDeliveryEvent:
     """Tests for _log_delivery_event method."""
 
@@ -1142,6 +1234,27 @@ class TestMailProxyInitMethod:
 
         assert proxy._attachment_cache is None
 
+    @pytest.mark.parametrize("max_attachment_mb, enabled", [(64.0, True), (0, False)])
+    @patch("core.mail_proxy.proxy.SmtpSender")
+    @patch("core.mail_proxy.proxy.ClientReporter")
+    @patch("core.mail_proxy.proxy_base.SqlDb")
+    async def test_attachment_budget_switch(
+        self, mock_db_cls, mock_reporter_cls, mock_sender_cls, max_attachment_mb, enabled
+    ):
+        """max_attachment_mb=0 turns the attachment byte budget off."""
+        from core.mail_proxy.proxy_config import ConcurrencyConfig, ProxyConfig
+
+        mock_db_cls.return_value = MockDb()
+        config = ProxyConfig(concurrency=ConcurrencyConfig(max_attachment_mb=max_attachment_mb))
+        proxy = MailProxy(config=config)
+        proxy._refresh_queue_gauge = AsyncMock()
+        proxy._init_account_metrics = AsyncMock()
+
+        with patch.object(MailProxy.__bases__[0], "init", new_callable=AsyncMock):
+            await proxy.init()
+
+        assert (proxy._attachment_budget is not None) is enabled
+
 
 class TestMailProxyDeleteMessagesCommand:
     """Tests for deleteMessages command through handle_command."""
@@ -1165,7 +1278,7 @@ class TestMailProxyDeleteMessagesCommand:
     async def test_delete_messages_success(self, proxy):
         """deleteMessages command deletes messages and returns counts."""
         proxy.db.table("messages").get_ids_for_tenant = AsyncMock(return_value={"m1", "m2"})
-        proxy.db.table("messages").delete = AsyncMock(return_value=True)
+        proxy.db.table("messages").remove_for_tenant = AsyncMock(return_value={"m1", "m2"})
 
         result = await proxy.handle_command("deleteMessages", {
             "tenant_id": "t1",
@@ -1256,6 +1369,56 @@ class TestMailProxyDeleteAccountCommand:
         assert "not found" in result["error"]
 
 
+class TestMailProxyCommandLog:
+    """Tests for audit logging of commands through handle_command."""
+
+    def _make_proxy(self, **command_log):
+        from core.mail_proxy.proxy_config import CommandLogConfig
+
+        with patch('core.mail_proxy.proxy.SmtpSender'), \
+             patch('core.mail_proxy.proxy.ClientReporter'), \
+             patch('core.mail_proxy.proxy_base.SqlDb') as mock_db_cls:
+            mock_db_cls.return_value = MockDb()
+            p = MailProxy(ProxyConfig(command_log=CommandLogConfig(**command_log)))
+            p._dispatcher = MagicMock()
+            p._dispatcher.dispatch = AsyncMock(return_value={"ok": True, "queued": 1})
+            p.db.table("command_log").log_command = AsyncMock()
+            return p
+
+    async def test_logged_command_is_buffered(self):
+        """Logged commands are submitted to the writer, not written inline."""
+        proxy = self._make_proxy()
+        proxy._command_log_writer = MagicMock()
+        proxy._command_log_writer.submit = AsyncMock()
+
+        result = await proxy.handle_command("addTenant", {"tenant_id": "t1", "id": "t1"})
+
+        assert result["ok"] is True
+        proxy._command_log_writer.submit.assert_awaited_once()
+        args, kwargs = proxy._command_log_writer.submit.call_args
+        assert args[0] == "addTenant"
+        assert kwargs["tenant_id"] == "t1"
+        assert kwargs["response_status"] == 200
+        proxy.db.table("command_log").log_command.assert_not_called()
+
+    async def test_unbuffered_writes_inline_with_policy(self):
+        """batch_size <= 1 writes before returning, applying the policy."""
+        proxy = self._make_proxy(batch_size=1, policy="digest")
+        assert proxy._command_log_writer is None
+
+        await proxy.handle_command("addTenant", {"id": "t1", "config": {"x": 1}})
+
+        kwargs = proxy.db.table("command_log").log_command.call_args.kwargs
+        assert kwargs["payload"]["id"] == "t1"
+        assert kwargs["payload"]["digest"].startswith("sha256:")
+        assert "config" not in kwargs["payload"]
+
+    def test_unknown_policy_rejected(self):
+        """An unknown policy fails at construction."""
+        with pytest.raises(ValueError, match="command log policy"):
+            self._make_proxy(policy="everything")
+
+
 class TestMailProxyInitAccountMetrics:
     """Tests for _init_account_metrics method."""
 
@@ -1296,6 +1459,40 @@ class TestMailProxyInitAccountMetrics:
         assert proxy.metrics.init_account.call_count >= 3
 
 
+class TestMailProxyRefreshQueueGauge:
+    """Tests for _refresh_queue_gauge method."""
+
+    @pytest.fixture
+    def proxy(self):
+        with patch('core.mail_proxy.proxy.SmtpSender'), \
+             patch('core.mail_proxy.proxy.ClientReporter'), \
+             patch('core.mail_proxy.proxy_base.SqlDb') as mock_db_cls:
+            mock_db_cls.return_value = MockDb()
+            p = MailProxy()
+            p.metrics = MagicMock()
+            messages = p.db.table("messages")
+            messages.stats = QueueStats()
+            messages.reconcile_stats = AsyncMock(side_effect=lambda: messages.stats.reconcile([]))
+            return p
+
+    async def test_reconciles_stale_stats(self, proxy):
+        """Stats never reconciled (or dirty) are rebuilt before publishing."""
+        await proxy._refresh_queue_gauge()
+        proxy.db.table("messages").reconcile_stats.assert_awaited_once()
+        proxy.metrics.set_queue_stats.assert_called_once_with({})
+
+    async def test_fresh_stats_skip_query(self, proxy):
+        """Fresh stats are published without querying the database."""
+        messages = proxy.db.table("messages")
+        await proxy._refresh_queue_gauge()
+        messages.stats.added({"tenant_id": "t1", "account_id": "a1", "priority": 2})
+        await proxy._refresh_queue_gauge()
+
+        messages.reconcile_stats.assert_awaited_once()
+        published = proxy.metrics.set_queue_stats.call_args.args[0]
+        assert published[("t1", "a1", 2)].pending == 1
+
+
 class TestMailProxyLogDeliveryEventExtended:
     """Extended tests for _log_delivery_event method."""
 
@@ -105,6 +105,21 @@ class TestMailProxyBaseEncryptionKey:
                 proxy.set_encryption_key(b"short")
 
 
+class TestMailProxyBasePayloadCodec:
+    """Tests for payload_codec validation."""
+
+    @patch("core.mail_proxy.proxy_base.SqlDb")
+    def test_compression_disabled_by_default(self, mock_db_cls):
+        """Payloads are stored uncompressed unless a codec is configured."""
+        assert MailProxyBase().payload_codec is None
+
+    @patch("core.mail_proxy.proxy_base.SqlDb")
+    def test_unknown_codec_raises_at_init(self, mock_db_cls):
+        """An unavailable codec fails at startup, not on the first insert."""
+        with pytest.raises(ValueError, match="Unknown compression codec"):
+            MailProxyBase(ProxyConfig(payload_codec="lz4"))
+
+
 class TestMailProxyBaseEndpoint:
     """Tests for endpoint() method."""
 
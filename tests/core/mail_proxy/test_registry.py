@@ -0,0 +1,49 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for the precomputed entity registry."""
+
+from __future__ import annotations
+
+from core.mail_proxy import registry
+from core.mail_proxy.interface.endpoint_base import BaseEndpoint
+from core.mail_proxy.proxy_base import MailProxyBase
+
+
+class TestRegistry:
+    """The registry must match a package scan and compose classes once."""
+
+    def test_tables_match_scan(self):
+        """TABLES is up to date (regenerate with python -m core.mail_proxy.registry)."""
+        assert MailProxyBase.scan_tables() == registry.TABLES
+
+    def test_endpoints_match_scan(self):
+        """ENDPOINTS is up to date (regenerate with python -m core.mail_proxy.registry)."""
+        assert BaseEndpoint.scan() == registry.ENDPOINTS
+
+    def test_classes_composed_once(self):
+        """Composed classes are cached and shared by every proxy."""
+        assert registry.table_classes() is registry.table_classes()
+        assert BaseEndpoint.discover() == list(registry.endpoint_classes())
+
+    def test_ee_mixin_first_in_mro(self):
+        """EE mixins take precedence over the CE class."""
+        from enterprise.mail_proxy.entities.tenant.table_ee import TenantsTable_EE
+
+        tenants = next(c for c in registry.table_classes() if c.name == "tenants")
+        assert tenants.__mro__[1] is TenantsTable_EE
+
+    def test_missing_ee_mixin_falls_back_to_ce(self):
+        """Without the enterprise package the CE class is used alone."""
+        from core.mail_proxy.entities.tenant.table import TenantsTable
+
+        composed = registry._compose(
+            "core.mail_proxy.entities.tenant.table:TenantsTable",
+            "enterprise_missing.tenant.table_ee:TenantsTable_EE",
+        )
+        assert composed is TenantsTable
+
+    def test_generate_round_trips(self):
+        """generate() produces source defining the current registry."""
+        namespace: dict = {}
+        exec(registry.generate(), namespace)
+        assert namespace["TABLES"] == registry.TABLES
+        assert namespace["ENDPOINTS"] == registry.ENDPOINTS
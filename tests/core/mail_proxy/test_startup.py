@@ -0,0 +1,69 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Cold start budget: what importing the package and building the CLI costs.
+
+Each test runs a fresh interpreter with ``python -X importtime`` and checks
+which modules were loaded. Heavy optional parts (FastAPI, uvicorn, aiohttp,
+Rich forms, fsspec, EE receivers) must stay out of plain imports and CLI
+startup; the time budget is generous and only catches gross regressions.
+"""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+# Cumulative import time of core.mail_proxy, in microseconds
+IMPORT_BUDGET_US = 1_500_000
+
+HEAVY_MODULES = {
+    "fastapi",
+    "uvicorn",
+    "aiohttp",
+    "fsspec",
+    "core.mail_proxy.interface.api_base",
+    "core.mail_proxy.interface.forms",
+    "enterprise.mail_proxy.bounce",
+    "enterprise.mail_proxy.pec",
+    "enterprise.mail_proxy.imap",
+}
+
+
+def _importtime(code: str) -> dict[str, int]:
+    """Run code with -X importtime and return module -> cumulative microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    modules: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestStartup:
+    """Import-time checks for the package and the CLI."""
+
+    def test_import_skips_heavy_modules(self):
+        """import core.mail_proxy loads no API, HTTP client or receiver code."""
+        modules = _importtime("import core.mail_proxy")
+        assert not HEAVY_MODULES & modules.keys()
+
+    def test_cli_startup_skips_api_stack(self):
+        """Building the CLI (as mail-proxy does) does not import FastAPI."""
+        modules = _importtime(
+            "from core.mail_proxy.proxy import MailProxy\n"
+            "from core.mail_proxy.proxy_config import ProxyConfig\n"
+            "MailProxy(config=ProxyConfig(db_path=':memory:')).cli\n"
+        )
+        assert "click" in modules
+        assert not HEAVY_MODULES & modules.keys()
+
+    def test_import_time_budget(self):
+        """import core.mail_proxy stays within the cold start budget."""
+        modules = _importtime("import core.mail_proxy")
+        assert modules["core.mail_proxy"] < IMPORT_BUDGET_US
@@ -0,0 +1,65 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for the supervisor of partitioned dispatcher processes."""
+
+from __future__ import annotations
+
+import sys
+import time
+
+import pytest
+
+from core.mail_proxy.supervisor import DispatchSupervisor
+
+SLEEPER = (sys.executable, "-c", "import time; time.sleep(60)")
+
+
+@pytest.fixture
+def supervisor():
+    sup = DispatchSupervisor(2, env={"GMP_DB_PATH": "x.db"}, command=SLEEPER, stop_timeout=5)
+    yield sup
+    sup.stop()
+
+
+class TestDispatchSupervisor:
+    """Tests for DispatchSupervisor."""
+
+    def test_worker_env(self, supervisor):
+        """Each worker is a dispatcher owning its own partition."""
+        env = supervisor.worker_env(1)
+        assert env["GMP_DB_PATH"] == "x.db"
+        assert env["GMP_ROLE"] == "dispatcher"
+        assert (env["GMP_DISPATCH_PARTITION"], env["GMP_DISPATCH_PARTITIONS"]) == ("1", "2")
+
+    def test_start_and_stop(self, supervisor):
+        """start() runs one process per partition; stop() ends them all."""
+        supervisor.start()
+        assert sorted(supervisor.pids) == [0, 1]
+        supervisor.stop()
+        assert supervisor.pids == {}
+
+    def test_check_restarts_exited_worker(self):
+        """A worker that exits is restarted on the same partition."""
+        sup = DispatchSupervisor(1, env={}, command=(sys.executable, "-c", "pass"))
+        try:
+            sup.start()
+            first = sup.pids[0]
+            deadline = time.monotonic() + 10
+            while sup.check() == 0 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert sup.pids[0] != first
+        finally:
+            sup.stop()
+
+    def test_resize_replaces_every_worker(self, supervisor):
+        """A new worker count restarts all workers with the new partitioning."""
+        supervisor.start()
+        old = set(supervisor.pids.values())
+        supervisor.resize(3)
+        assert sorted(supervisor.pids) == [0, 1, 2]
+        assert not old & set(supervisor.pids.values())
+        assert supervisor.worker_env(2)["GMP_DISPATCH_PARTITIONS"] == "3"
+
+    def test_needs_a_worker(self):
+        """Zero workers is a configuration error."""
+        with pytest.raises(ValueError):
+            DispatchSupervisor(0)
@@ -0,0 +1,65 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for the cross-process wake channel."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+
+import pytest
+
+from core.mail_proxy.wake import WakeChannel
+
+pytestmark = pytest.mark.skipif(not WakeChannel.supported(), reason="needs Unix sockets")
+
+
+class TestWakeChannel:
+    """Tests for WakeChannel."""
+
+    async def test_send_reaches_listeners(self, tmp_path):
+        """send() delivers (target, key) to every other listener."""
+        received: list[tuple[str, str | None]] = []
+        listener = WakeChannel(tmp_path)
+        await listener.listen("dispatcher", lambda target, key: received.append((target, key)))
+        sender = WakeChannel(tmp_path)
+        try:
+            assert sender.send("dispatch") == 1
+            assert sender.send("report", "acme") == 1
+            await asyncio.sleep(0.05)
+            assert received == [("dispatch", None), ("report", "acme")]
+        finally:
+            listener.close()
+            sender.close()
+
+    async def test_send_skips_own_socket(self, tmp_path):
+        """A listener does not wake itself."""
+        channel = WakeChannel(tmp_path)
+        await channel.listen("all", lambda target, key: None)
+        try:
+            assert channel.send("dispatch") == 0
+        finally:
+            channel.close()
+
+    def test_send_without_listeners(self, tmp_path):
+        """send() is a no-op when nobody listens (or the directory is missing)."""
+        assert WakeChannel(tmp_path).send("dispatch") == 0
+        assert WakeChannel(tmp_path / "missing").send("dispatch") == 0
+
+    def test_stale_socket_removed(self, tmp_path):
+        """Sockets of processes that are gone are cleaned up."""
+        stale = tmp_path / "dispatcher-1.sock"
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(stale))
+        sock.close()
+        channel = WakeChannel(tmp_path)
+        assert channel.send("dispatch") == 0
+        assert not stale.exists()
+        channel.close()
+
+    async def test_close_removes_socket(self, tmp_path):
+        """close() removes the listener's socket file."""
+        channel = WakeChannel(tmp_path)
+        await channel.listen("reporter", lambda target, key: None)
+        assert len(list(tmp_path.glob("*.sock"))) == 1
+        channel.close()
+        assert not list(tmp_path.glob("*.sock"))
@@ -1,6 +1,7 @@
 # Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
 """Unit tests for LargeFileStorage with mocked fsspec."""
 
+import asyncio
 import time
 from unittest.mock import MagicMock, patch
 
@@ -166,6 +167,70 @@ class TestLargeFileStorageUpload:
         with pytest.raises(UploadError, match="Failed to upload"):
             await storage.upload("file-002", b"content", "file.txt")
 
+    async def test_upload_stream_writes_chunks(self, storage):
+        """upload_stream writes each chunk as it arrives."""
+        mock_file = MagicMock()
+        mock_file.__enter__ = MagicMock(return_value=mock_file)
+        mock_file.__exit__ = MagicMock(return_value=False)
+        storage._fs.open.return_value = mock_file
+
+        async def chunks():
+            yield b"part1"
+            yield b"part2"
+
+        result = await storage.upload_stream("file-003", chunks(), "big.zip")
+
+        assert result == "files/file-003/big.zip"
+        assert [c.args[0] for c in mock_file.write.call_args_list] == [b"part1", b"part2"]
+
+    async def test_upload_stream_source_failure_removes_partial(self, storage):
+        """A failing source raises UploadError and removes the partial file."""
+        mock_file = MagicMock()
+        mock_file.__enter__ = MagicMock(return_value=mock_file)
+        mock_file.__exit__ = MagicMock(return_value=False)
+        storage._fs.open.return_value = mock_file
+        storage._fs.exists.return_value = True
+
+        async def chunks():
+            yield b"part1"
+            raise ConnectionError("origin reset")
+
+        with pytest.raises(UploadError, match="Failed to stream"):
+            await storage.upload_stream("file-004", chunks(), "big.zip")
+        storage._fs.rm.assert_called_once_with("files/file-004/big.zip")
+
+    async def test_upload_stream_cancelled_removes_partial(self, storage):
+        """A cancelled upload aborts the file and removes the partial object."""
+        mock_file = MagicMock()
+        storage._fs.open.return_value = mock_file
+        storage._fs.exists.return_value = True
+        started = asyncio.Event()
+
+        async def chunks():
+            yield b"part1"
+            started.set()
+            await asyncio.sleep(10)
+            yield b"part2"
+
+        task = asyncio.create_task(storage.upload_stream("file-005", chunks(), "big.zip"))
+        await started.wait()
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        mock_file.discard.assert_called_once()
+        mock_file.close.assert_not_called()
+        storage._fs.rm.assert_called_once_with("files/file-005/big.zip")
+
+    async def test_delete_ignores_storage_errors(self, storage):
+        """delete() logs storage failures instead of raising."""
+        storage._fs.exists.return_value = True
+        storage._fs.rm.side_effect = PermissionError("Access denied")
+
+        await storage.delete("file-006", "big.zip")
+
+        storage._fs.rm.assert_called_once_with("files/file-006/big.zip")
+
 
 class TestLargeFileStorageDownloadUrl:
     """Tests for get_download_url method."""
@@ -90,6 +90,153 @@ class TestCommandLogTableLogCommand:
         assert before <= cmd["command_ts"] <= after
 
 
+class TestCommandLogTableCompression:
+    """Tests for compressed payload and response_body storage."""
+
+    async def test_large_payload_roundtrip(self, db):
+        """Large payloads are stored compressed and returned decoded."""
+        db.parent.config.payload_codec = "zlib"
+        cmd_log = db.table("command_log")
+        payload = {"messages": [{"id": f"m{i}", "body": "x" * 100} for i in range(50)]}
+        response = {"queued": 50, "rejected": [{"id": f"r{i}"} for i in range(100)]}
+
+        cmd_id = await cmd_log.log_command(
+            endpoint="POST /commands/add-messages",
+            payload=payload,
+            response_body=response,
+        )
+
+        raw = await db.adapter.fetch_one(
+            "SELECT payload, response_body FROM command_log WHERE id = :id", {"id": cmd_id}
+        )
+        assert raw["payload"].startswith("ZC:")
+        assert raw["response_body"].startswith("ZC:")
+
+        cmd = await cmd_log.get_command(cmd_id)
+        assert cmd["payload"] == payload
+        assert cmd["response_body"] == response
+
+
+class TestCommandLogTableLogCommands:
+    """Tests for CommandLogTable.log_commands() batched insert."""
+
+    async def test_log_commands_empty(self, db):
+        """log_commands() with no entries writes nothing."""
+        assert await db.table("command_log").log_commands([]) == 0
+
+    async def test_log_commands_inserts_all(self, db):
+        """log_commands() stores every entry with its fields."""
+        cmd_log = db.table("command_log")
+
+        count = await cmd_log.log_commands(
+            [
+                {
+                    "endpoint": "addTenant",
+                    "payload": {"id": "t1"},
+                    "tenant_id": "t1",
+                    "response_status": 200,
+                    "response_body": {"ok": True},
+                    "command_ts": 1000,
+                },
+                {"endpoint": "deleteTenant", "payload": {"id": "t1"}, "command_ts": 1001},
+            ]
+        )
+
+        assert count == 2
+        commands = await cmd_log.list_commands()
+        assert [c["endpoint"] for c in commands] == ["addTenant", "deleteTenant"]
+        assert commands[0]["payload"] == {"id": "t1"}
+        assert commands[0]["response_body"] == {"ok": True}
+        assert commands[1]["response_body"] is None
+
+
+class TestCommandLogTablePolicies:
+    """Tests for reduce_payload() / reduce_response() storage policies."""
+
+    PAYLOAD = {
+        "tenant_id": "t1",
+        "messages": [
+            {
+                "id": "m1",
+                "account_id": "a1",
+                "from": "a@example.com",
+                "to": ["b@example.com"],
+                "subject": "Hello",
+                "body": "<html>" + "x" * 1000 + "</html>",
+                "attachments": [
+                    {
+                        "filename": "a.pdf",
+                        "storage_path": "base64:" + "A" * 1000,
+                        "fetch_mode": "base64",
+                        "auth": {"token": "secret"},
+                    },
+                ],
+            },
+            {"id": "m2", "subject": "Other", "body": "text"},
+        ],
+    }
+
+    def test_full_keeps_payload(self):
+        """The full policy stores the request unchanged."""
+        from core.mail_proxy.entities.command_log import CommandLogTable
+
+        assert CommandLogTable.reduce_payload(self.PAYLOAD, "full") is self.PAYLOAD
+
+    def test_headers_drops_bodies_and_content(self):
+        """The headers policy keeps envelope fields and attachment metadata."""
+        from core.mail_proxy.entities.command_log import CommandLogTable
+
+        reduced = CommandLogTable.reduce_payload(self.PAYLOAD, "headers")
+
+        msg = reduced["messages"][0]
+        assert msg["subject"] == "Hello"
+        assert msg["to"] == ["b@example.com"]
+        assert "body" not in msg
+        assert msg["attachments"] == [{"filename": "a.pdf", "fetch_mode": "base64"}]
+        assert reduced["tenant_id"] == "t1"
+        assert "body" in self.PAYLOAD["messages"][0]  # Input untouched
+
+    def test_digest_references_messages(self):
+        """The digest policy keeps a hash, scalar fields and message ids."""
+        from core.mail_proxy.entities.command_log import CommandLogTable
+
+        reduced = CommandLogTable.reduce_payload(self.PAYLOAD, "digest")
+
+        assert reduced["tenant_id"] == "t1"
+        assert reduced["message_ids"] == ["m1", "m2"]
+        assert reduced["digest"].startswith("sha256:")
+        assert reduced["size"] > 2000
+        assert "messages" not in reduced
+        assert CommandLogTable.reduce_payload(self.PAYLOAD, "digest") == reduced
+
+    def test_digest_delete_ids(self):
+        """deleteMessages ids are kept as message references."""
+        from core.mail_proxy.entities.command_log import CommandLogTable
+
+        reduced = CommandLogTable.reduce_payload({"tenant_id": "t1", "ids": ["m1"]}, "digest")
+        assert reduced["message_ids"] == ["m1"]
+
+    def test_digest_response_counts_lists(self):
+        """Digest responses keep scalars and replace lists by their length."""
+        from core.mail_proxy.entities.command_log import CommandLogTable
+
+        response = {"ok": True, "queued": 1, "rejected": [{"id": "m2", "reason": "x"}]}
+
+        assert CommandLogTable.reduce_response(response, "headers") is response
+        assert CommandLogTable.reduce_response(response, "digest") == {
+            "ok": True,
+            "queued": 1,
+            "rejected": 1,
+        }
+
+    def test_unknown_policy_rejected(self):
+        """Unknown policies raise ValueError."""
+        from core.mail_proxy.entities.command_log import CommandLogTable
+
+        with pytest.raises(ValueError, match="Unknown command log policy"):
+            CommandLogTable.reduce_payload({}, "everything")
+
+
 class TestCommandLogTableGetCommand:
     """Tests for CommandLogTable.get_command() method."""
 
@@ -286,6 +433,35 @@ class TestCommandLogTableExportCommands:
         assert result[0]["endpoint"] == "POST /b"
 
 
+class TestCommandLogTableIterCommands:
+    """Tests for CommandLogTable.iter_commands() streaming."""
+
+    async def test_iter_commands_streams_in_order(self, db):
+        """iter_commands() yields every entry in timestamp order across chunks."""
+        cmd_log = db.table("command_log")
+        base_ts = 1700000000
+        for i in reversed(range(5)):
+            await cmd_log.log_command(
+                endpoint=f"POST /{i}", payload={"n": i}, command_ts=base_ts + i
+            )
+
+        result = [cmd async for cmd in cmd_log.iter_commands(chunk_size=2)]
+
+        assert [c["endpoint"] for c in result] == [f"POST /{i}" for i in range(5)]
+        assert result[0]["payload"] == {"n": 0}
+
+    async def test_iter_commands_filters(self, db):
+        """iter_commands() applies tenant and time filters."""
+        cmd_log = db.table("command_log")
+        await cmd_log.log_command(endpoint="POST /a", payload={}, tenant_id="t1", command_ts=10)
+        await cmd_log.log_command(endpoint="POST /b", payload={}, tenant_id="t1", command_ts=20)
+        await cmd_log.log_command(endpoint="POST /c", payload={}, tenant_id="t2", command_ts=20)
+
+        result = [cmd async for cmd in cmd_log.iter_commands(tenant_id="t1", since_ts=15)]
+
+        assert [c["endpoint"] for c in result] == ["POST /b"]
+
+
 class TestCommandLogTablePurgeBefore:
     """Tests for CommandLogTable.purge_before() method."""
 
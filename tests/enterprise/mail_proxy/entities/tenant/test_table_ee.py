@@ -279,6 +279,62 @@ class TestTenantsTableApiKeys:
         assert result is False
 
 
+class TestTenantsTableTokenCache:
+    """Tests for the token verification cache (EE)."""
+
+    async def test_valid_token_served_from_cache(self, db):
+        """A second lookup of a valid token does not query the database."""
+        tenants = db.table("tenants")
+        api_key = await tenants.add({"id": "t1", "name": "Test"})
+        await tenants.get_tenant_by_token(api_key)
+        hits = tenants.token_cache.hits
+        tenant = await tenants.get_tenant_by_token(api_key)
+        assert tenant["id"] == "t1"
+        assert tenants.token_cache.hits == hits + 1
+
+    async def test_invalid_token_cached(self, db):
+        """Repeated lookups of a bad token are answered from the cache."""
+        tenants = db.table("tenants")
+        assert await tenants.get_tenant_by_token("invalid-key") is None
+        misses = tenants.token_cache.misses
+        assert await tenants.get_tenant_by_token("invalid-key") is None
+        assert tenants.token_cache.misses == misses
+
+    async def test_revoke_invalidates_cached_token(self, db):
+        """revoke_api_key() takes effect immediately despite a cached lookup."""
+        tenants = db.table("tenants")
+        api_key = await tenants.add({"id": "t1", "name": "Test"})
+        assert await tenants.get_tenant_by_token(api_key) is not None
+        await tenants.revoke_api_key("t1")
+        assert await tenants.get_tenant_by_token(api_key) is None
+
+    async def test_create_api_key_invalidates_cached_tokens(self, db):
+        """create_api_key() drops the old key and clears a cached rejection of the new one."""
+        tenants = db.table("tenants")
+        old_key = await tenants.add({"id": "t1", "name": "Test"})
+        assert await tenants.get_tenant_by_token(old_key) is not None
+        new_key = await tenants.create_api_key("t1")
+        assert await tenants.get_tenant_by_token(old_key) is None
+        assert (await tenants.get_tenant_by_token(new_key))["id"] == "t1"
+
+    async def test_update_fields_refreshes_cached_tenant(self, db):
+        """update_fields() invalidates the cached tenant data."""
+        tenants = db.table("tenants")
+        api_key = await tenants.add({"id": "t1", "name": "Test"})
+        await tenants.get_tenant_by_token(api_key)
+        await tenants.update_fields("t1", {"active": False})
+        tenant = await tenants.get_tenant_by_token(api_key)
+        assert tenant["active"] is False
+
+    async def test_remove_invalidates_cached_token(self, db):
+        """remove() makes the tenant's token stop working immediately."""
+        tenants = db.table("tenants")
+        api_key = await tenants.add({"id": "t1", "name": "Test"})
+        await tenants.get_tenant_by_token(api_key)
+        await tenants.remove("t1")
+        assert await tenants.get_tenant_by_token(api_key) is None
+
+
 class TestTenantsTableBatchSuspension:
     """Tests for TenantsTable batch suspension methods (EE)."""
 
@@ -0,0 +1,71 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: BSL-1.1
+"""Tests for TokenCache."""
+
+import time
+
+from enterprise.mail_proxy.entities.tenant.token_cache import TokenCache
+
+
+class TestTokenCache:
+    """Tests for the token verification cache."""
+
+    def test_miss_then_hit(self):
+        """get() misses until set(), then returns a copy of the tenant."""
+        cache = TokenCache()
+        assert cache.get("h") == (False, None)
+        cache.set("h", {"id": "t1"})
+        found, tenant = cache.get("h")
+        assert found and tenant == {"id": "t1"}
+        tenant["id"] = "changed"
+        assert cache.get("h")[1] == {"id": "t1"}
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_invalid_entry(self):
+        """set_invalid() caches a rejection."""
+        cache = TokenCache()
+        cache.set_invalid("h")
+        assert cache.get("h") == (True, None)
+
+    def test_ttl_expiry(self):
+        """Entries expire after their TTL."""
+        cache = TokenCache(ttl=0.01)
+        cache.set("h", {"id": "t1"})
+        time.sleep(0.02)
+        assert cache.get("h") == (False, None)
+        assert len(cache) == 0
+
+    def test_key_expiry_caps_ttl(self):
+        """A key expiring sooner than the TTL is not cached past its expiry."""
+        cache = TokenCache(ttl=60)
+        cache.set("h", {"id": "t1"}, expires_at=time.time() - 1)
+        assert cache.get("h") == (False, None)
+
+    def test_zero_negative_ttl_disables_negative_caching(self):
+        """negative_ttl=0 never caches rejections."""
+        cache = TokenCache(negative_ttl=0)
+        cache.set_invalid("h")
+        assert len(cache) == 0
+
+    def test_invalidate_tenant(self):
+        """invalidate_tenant() drops only that tenant's tokens."""
+        cache = TokenCache()
+        cache.set("a", {"id": "t1"})
+        cache.set("b", {"id": "t1"})
+        cache.set("c", {"id": "t2"})
+        cache.set_invalid("d")
+        cache.invalidate_tenant("t1")
+        assert cache.get("a")[0] is False
+        assert cache.get("b")[0] is False
+        assert cache.get("c")[1] == {"id": "t2"}
+        assert cache.get("d") == (True, None)
+
+    def test_maxsize_evicts_least_recently_used(self):
+        """The least recently used entry is evicted beyond maxsize."""
+        cache = TokenCache(maxsize=2)
+        cache.set("a", {"id": "t1"})
+        cache.set("b", {"id": "t2"})
+        cache.get("a")
+        cache.set_invalid("c")
+        assert len(cache) == 2
+        assert cache.get("b")[0] is False
+        assert cache.get("a")[0] is True
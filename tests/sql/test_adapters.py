@@ -3,9 +3,13 @@
 
 from __future__ import annotations
 
+import asyncio
+import sqlite3
+
 import pytest
 
 from sql.adapters import ADAPTERS, DbAdapter, SqliteAdapter, get_adapter
+from sql.adapters.base import StatementCache
 
 
 class TestGetAdapter:
@@ -91,3 +95,176 @@ class TestAdaptersRegistry:
         # DbAdapter should be abstract (cannot instantiate)
         with pytest.raises(TypeError):
             DbAdapter()  # type: ignore
+
+
+class TestStatementCache:
+    """Tests for the per-adapter statement cache."""
+
+    def test_builds_once_per_key(self):
+        """Entries are built on the first lookup only."""
+        cache = StatementCache(maxsize=4)
+        calls = []
+
+        def build():
+            calls.append(1)
+            return "SELECT 1"
+
+        assert cache.get(("k",), build) == "SELECT 1"
+        assert cache.get(("k",), build) == "SELECT 1"
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used(self):
+        """The least recently used entry is dropped when full."""
+        cache = StatementCache(maxsize=2)
+        cache.get("a", lambda: 1)
+        cache.get("b", lambda: 2)
+        cache.get("a", lambda: 1)
+        cache.get("c", lambda: 3)
+
+        assert len(cache) == 2
+        assert cache.get("a", lambda: "rebuilt") == 1
+        assert cache.get("b", lambda: "rebuilt") == "rebuilt"
+
+
+class _ConnectionAdapter(DbAdapter):
+    """Adapter on one sqlite3 connection, without execute_batch override."""
+
+    def __init__(self):
+        super().__init__()
+        self.conn = sqlite3.connect(":memory:")
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        self.conn.close()
+
+    async def execute(self, query, params=None):
+        return self.conn.execute(query, params or {}).rowcount
+
+    async def execute_many(self, query, params_list):
+        return self.conn.executemany(query, params_list).rowcount
+
+    async def fetch_one(self, query, params=None):
+        row = self.conn.execute(query, params or {}).fetchone()
+        return None if row is None else {"n": row[0]}
+
+    async def fetch_all(self, query, params=None):
+        return [{"n": row[0]} for row in self.conn.execute(query, params or {})]
+
+    async def execute_script(self, script):
+        self.conn.executescript(script)
+
+    async def commit(self):
+        self.conn.commit()
+
+    async def rollback(self):
+        self.conn.rollback()
+
+
+class TestExecuteBatchFallback:
+    """Tests for the DbAdapter.execute_batch() fallback."""
+
+    async def test_commits_all_steps(self):
+        """All steps are committed and their row counts returned."""
+        adapter = _ConnectionAdapter()
+        await adapter.execute_script("CREATE TABLE items (n INTEGER PRIMARY KEY)")
+
+        counts = await adapter.execute_batch(
+            [
+                ("INSERT INTO items (n) VALUES (:n)", [{"n": 1}, {"n": 2}]),
+                ("DELETE FROM items WHERE n = :n", []),
+                ("DELETE FROM items WHERE n = :n", [{"n": 1}]),
+            ]
+        )
+
+        assert counts == [2, 0, 1]
+        adapter.conn.rollback()
+        assert await adapter.fetch_all("SELECT n FROM items") == [{"n": 2}]
+
+    async def test_failing_step_rolls_back_earlier_steps(self):
+        """An error in a later step leaves no row of the earlier ones."""
+        adapter = _ConnectionAdapter()
+        await adapter.execute_script("CREATE TABLE items (n INTEGER PRIMARY KEY)")
+
+        with pytest.raises(sqlite3.IntegrityError):
+            await adapter.execute_batch(
+                [
+                    ("INSERT INTO items (n) VALUES (:n)", [{"n": 1}]),
+                    ("INSERT INTO items (n) VALUES (:n)", [{"n": 2}, {"n": 2}]),
+                ]
+            )
+
+        assert await adapter.fetch_all("SELECT n FROM items") == []
+
+
+class TestSqliteFetchKeyset:
+    """Tests for SqliteAdapter.fetch_keyset() chunked reads."""
+
+    @pytest.fixture
+    async def adapter(self, tmp_path):
+        adapter = SqliteAdapter(str(tmp_path / "keyset.db"))
+        await adapter.execute_script('CREATE TABLE items ("id" INTEGER PRIMARY KEY, "grp" TEXT)')
+        await adapter.execute_many(
+            "INSERT INTO items (id, grp) VALUES (:id, :grp)",
+            [{"id": i, "grp": "a" if i % 2 else "b"} for i in range(1, 8)],
+        )
+        return adapter
+
+    async def test_chunks_follow_keys(self, adapter):
+        """Rows come in key order, chunk_size at a time, filtered by the query."""
+        chunks = [
+            [row["id"] for row in rows]
+            async for rows in adapter.fetch_keyset(
+                "SELECT id FROM items WHERE grp = :grp", {"grp": "a"}, [("id", "id")], 2
+            )
+        ]
+        assert chunks == [[1, 3], [5, 7]]
+
+    async def test_write_during_paused_stream(self, adapter):
+        """A write succeeds while the consumer holds the stream between chunks."""
+        stream = adapter.fetch_keyset("SELECT id FROM items WHERE 1=1", None, [("id", "id")], 3)
+        first = await anext(stream)
+
+        await asyncio.wait_for(
+            adapter.execute("INSERT INTO items (id, grp) VALUES (100, 'c')"), timeout=2
+        )
+        await adapter.execute("DELETE FROM items WHERE id = 1")
+
+        rest = [row["id"] async for rows in stream for row in rows]
+        assert [row["id"] for row in first] == [1, 2, 3]
+        assert rest == [4, 5, 6, 7, 100]
+
+
+class TestSqliteAdapterCaching:
+    """Tests for compiled statements and row decoders in SqliteAdapter."""
+
+    @pytest.fixture
+    async def adapter(self, tmp_path):
+        adapter = SqliteAdapter(str(tmp_path / "cache.db"))
+        await adapter.execute_script(
+            'CREATE TABLE items ("id" TEXT PRIMARY KEY, "name" TEXT, "active" INTEGER)'
+        )
+        return adapter
+
+    async def test_crud_sql_cached_per_shape(self, adapter):
+        """Repeated CRUD calls with the same shape reuse the built SQL."""
+        await adapter.insert("items", {"id": "a", "name": "A", "active": 1})
+        await adapter.insert("items", {"id": "b", "name": "B", "active": 0})
+        misses = adapter.statements.misses
+
+        await adapter.select("items", where={"id": "a"})
+        await adapter.select("items", where={"id": "b"})
+
+        assert adapter.statements.misses == misses + 2  # SELECT + row decoder
+        assert adapter.statements.hits >= 3
+
+    async def test_row_decoder_converts_booleans(self, adapter):
+        """Boolean-like columns are converted, other integers are not."""
+        await adapter.insert("items", {"id": "a", "name": "A", "active": 1})
+
+        row = await adapter.fetch_one('SELECT "id", "active", 1 AS "one" FROM items')
+
+        assert row == {"id": "a", "active": True, "one": 1}
+        assert row["active"] is True
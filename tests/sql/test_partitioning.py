@@ -0,0 +1,146 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for time-range partitioning of tables."""
+
+from __future__ import annotations
+
+import contextlib
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from sql.partitioning import (
+    default_partition_name,
+    partition_lower,
+    partition_name,
+    partition_ranges,
+    partition_start,
+    partition_step,
+)
+
+NOW = datetime(2026, 10, 18, 15, 30)  # A Sunday
+
+
+class TestPartitionLayout:
+    """Tests for partition bounds and names."""
+
+    def test_day_start(self):
+        """Daily partitions start at midnight UTC."""
+        assert partition_start(NOW, "day") == datetime(2026, 10, 18)
+
+    def test_week_start_is_monday(self):
+        """Weekly partitions start on Monday."""
+        assert partition_start(NOW, "week") == datetime(2026, 10, 12)
+
+    def test_ranges_cover_current_and_ahead(self):
+        """partition_ranges() returns the current range and the next ones."""
+        ranges = partition_ranges("day", NOW, ahead=2)
+        assert ranges == [
+            (datetime(2026, 10, 18), datetime(2026, 10, 19)),
+            (datetime(2026, 10, 19), datetime(2026, 10, 20)),
+            (datetime(2026, 10, 20), datetime(2026, 10, 21)),
+        ]
+
+    def test_name_round_trip(self):
+        """Partition names encode their lower bound."""
+        name = partition_name("messages", datetime(2026, 10, 12))
+        assert name == "messages_p20261012"
+        assert partition_lower("messages", name) == datetime(2026, 10, 12)
+        assert partition_lower("messages", default_partition_name("messages")) is None
+        assert partition_lower("message_events", name) is None
+
+    def test_unknown_interval(self):
+        """Unknown intervals are rejected."""
+        with pytest.raises(ValueError, match="month"):
+            partition_step("month")
+
+
+class TestPartitionedTableSql:
+    """Tests for CREATE TABLE of partitioned tables."""
+
+    async def test_messages_partitioned_sql(self, pg_db, monkeypatch):
+        """Partitioned tables add the partition column to keys and constraints."""
+        monkeypatch.setattr(pg_db.parent.config, "db_partitioning", "day")
+        messages = pg_db.table("messages")
+        sql = messages.create_table_sql()
+        assert sql.endswith('PARTITION BY RANGE ("created_at")')
+        assert 'PRIMARY KEY ("pk", "created_at")' in sql
+        assert 'UNIQUE ("tenant_id", "id", "created_at")' in sql
+
+    async def test_events_serial_key(self, pg_db, monkeypatch):
+        """Autoincrement keys move to a composite primary key."""
+        monkeypatch.setattr(pg_db.parent.config, "db_partitioning", "week")
+        sql = pg_db.table("message_events").create_table_sql()
+        assert '"id" SERIAL,' in sql
+        assert 'PRIMARY KEY ("id", "event_ts")' in sql
+
+
+class TestPartitionedTables:
+    """Tests for partition maintenance and retention on PostgreSQL."""
+
+    @pytest.fixture
+    async def part_db(self, pg_db, monkeypatch):
+        monkeypatch.setattr(pg_db.parent.config, "db_partitioning", "day")
+        for name in ("message_events", "messages"):
+            await pg_db.execute(f'DROP TABLE IF EXISTS "{name}" CASCADE')
+            await pg_db.table(name).create_schema()
+        yield pg_db
+        for name in ("message_events", "messages"):
+            with contextlib.suppress(Exception):
+                await pg_db.execute(f'DROP TABLE IF EXISTS "{name}" CASCADE')
+
+    async def test_create_schema_creates_partitions(self, part_db):
+        """create_schema() creates the default, current and upcoming partitions."""
+        messages = part_db.table("messages")
+        names = await messages.partitions()
+        assert default_partition_name("messages") in names
+        assert len(names) == messages.partition_premake + 2
+        assert await messages.ensure_partitions() == []
+
+    async def test_unpartitioned_table_reported(self, pg_db):
+        """Tables created without partitioning are left alone."""
+        assert await pg_db.table("messages").partitions() is None
+        assert await pg_db.table("messages").ensure_partitions() == []
+
+    async def test_drop_reported_partitions(self, part_db):
+        """Old partitions are dropped only when all their rows are removable."""
+        messages = part_db.table("messages")
+        events = part_db.table("message_events")
+        old = datetime.utcnow() - timedelta(days=10)
+        await messages.ensure_partitions(now=old)
+        old_name = partition_name("messages", partition_start(old, "day"))
+        old_ts = int(old.timestamp())
+        await events.ensure_partitions(now=old)
+
+        await part_db.execute(
+            """INSERT INTO messages (pk, id, tenant_id, payload, smtp_ts, created_at)
+               VALUES ('p1', 'm1', 't1', '{}', :ts, :created)""",
+            {"ts": old_ts, "created": old},
+        )
+        await part_db.execute(
+            """INSERT INTO message_events (message_pk, event_type, event_ts)
+               VALUES ('p1', 'sent', :ts)""",
+            {"ts": old_ts},
+        )
+        threshold = int(time.time()) - 86400
+
+        # Unreported event: both partitions are kept
+        assert await messages.drop_reported_partitions(threshold) == []
+        assert await events.drop_reported_partitions(threshold) == []
+
+        await part_db.execute("UPDATE message_events SET reported_ts = :ts", {"ts": old_ts})
+        assert await messages.drop_reported_partitions(threshold) == [old_name]
+        assert await events.drop_reported_partitions(threshold) == [
+            partition_name("message_events", partition_start(old, "day"))
+        ]
+        assert await messages.count() == 0
+        assert await events.count() == 0
+
+    async def test_insert_batch_on_partitioned_messages(self, part_db):
+        """Idempotent enqueue still works with the partition-wide unique key."""
+        messages = part_db.table("messages")
+        entry = {"id": "m1", "tenant_id": "t1", "account_id": None, "payload": {"x": 1}}
+        first = await messages.insert_batch([entry], auto_pec=False)
+        second = await messages.insert_batch([entry], auto_pec=False)
+        assert first[0]["pk"] == second[0]["pk"]
+        assert await messages.count() == 1
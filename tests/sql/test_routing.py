@@ -0,0 +1,103 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for read routing to PostgreSQL replicas."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from sql.adapters import get_adapter
+from sql.routing import (
+    PRIMARY,
+    REPLICA,
+    current_read_route,
+    primary_reads,
+    replica_read,
+    replica_reads,
+)
+
+
+class TestReadRoute:
+    """Tests for the routing context."""
+
+    def test_default_is_primary(self):
+        """Reads go to the primary unless marked."""
+        assert current_read_route() == PRIMARY
+
+    def test_replica_reads_block(self):
+        """replica_reads() marks the block and restores on exit."""
+        with replica_reads():
+            assert current_read_route() == REPLICA
+        assert current_read_route() == PRIMARY
+
+    def test_primary_pin_overrides_replica_mark(self):
+        """primary_reads() wins over replica marks nested inside it."""
+        with primary_reads(), replica_reads():
+            assert current_read_route() == PRIMARY
+
+    async def test_decorator_marks_coroutine(self):
+        """replica_read marks the method's reads and keeps its signature."""
+
+        class Reader:
+            @replica_read
+            async def read(self, value: int) -> str:
+                """Read something."""
+                return current_read_route()
+
+        assert await Reader().read(1) == REPLICA
+        assert Reader.read.__doc__ == "Read something."
+        assert current_read_route() == PRIMARY
+
+    async def test_mark_does_not_leak_to_other_tasks(self):
+        """A replica mark in one task is not seen by a concurrent task."""
+        seen = []
+
+        async def marked():
+            with replica_reads():
+                await asyncio.sleep(0.01)
+
+        async def unmarked():
+            await asyncio.sleep(0.005)
+            seen.append(current_read_route())
+
+        await asyncio.gather(marked(), unmarked())
+        assert seen == [PRIMARY]
+
+
+class TestReplicaConfiguration:
+    """Tests for replica configuration in get_adapter()."""
+
+    def test_sqlite_rejects_replicas(self):
+        """Replicas are only supported with PostgreSQL."""
+        with pytest.raises(ValueError, match="PostgreSQL"):
+            get_adapter("/tmp/test.db", replicas=["postgresql://replica/db"])
+
+    def test_postgresql_receives_replica_dsns(self):
+        """Replica URLs are normalized into DSNs."""
+        pytest.importorskip("psycopg")
+        adapter = get_adapter(
+            "postgresql://primary/db",
+            replicas=["postgresql://replica1/db", "postgres://replica2/db"],
+        )
+        assert adapter.replica_dsns == ["postgresql://replica1/db", "postgresql://replica2/db"]
+
+
+class TestReplicaRouting:
+    """Tests for PostgresAdapter routing (the primary doubles as replica)."""
+
+    async def test_marked_reads_use_replica_pool(self, pg_url):
+        """Marked reads use a replica pool, writes and unmarked reads the primary."""
+        pytest.importorskip("psycopg")
+        adapter = get_adapter(pg_url, replicas=[pg_url])
+        await adapter.connect()
+        try:
+            assert adapter._read_pool() is adapter._pool
+            with replica_reads():
+                assert adapter._read_pool() is adapter._replica_pools[0]
+                row = await adapter.fetch_one("SELECT 1 AS one")
+                assert row == {"one": 1}
+                with primary_reads():
+                    assert adapter._read_pool() is adapter._pool
+        finally:
+            await adapter.close()
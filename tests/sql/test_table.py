@@ -511,6 +511,75 @@ class TestTableBatchOps:
         assert len([c for c in trigger_calls if c[0] == "updating"]) == 2
         assert len([c for c in trigger_calls if c[0] == "updated"]) == 2
 
+    async def test_update_batch_values_from_triggers(self, pg_db):
+        """update_batch writes per-record trigger values with one set-based update."""
+        table = TestTable(pg_db)
+        await table.create_schema()
+
+        async def per_record(record, old_record):
+            record["value"] = old_record["value"] * 10
+            return record
+
+        table.trigger_on_updating = per_record
+        await table.insert({"pk": "set-1", "name": "One", "value": 1})
+        await table.insert({"pk": "set-2", "name": "Two", "value": 2})
+
+        count = await table.update_batch(["set-1", "set-2"], {"name": "Same"})
+
+        assert count == 2
+        r1 = await table.select_one(where={"pk": "set-1"})
+        r2 = await table.select_one(where={"pk": "set-2"})
+        assert (r1["value"], r2["value"]) == (10, 20)
+        assert r1["name"] == r2["name"] == "Same"
+
+    async def test_delete_batch_chunked(self, pg_db):
+        """delete_batch removes records across chunks."""
+        table = TestTable(pg_db)
+        table.batch_chunk_size = 2
+        await table.create_schema()
+        for i in range(5):
+            await table.insert({"pk": f"del-{i}", "name": "Del"})
+
+        count = await table.delete_batch([f"del-{i}" for i in range(5)])
+
+        assert count == 5
+        assert await table.count({"name": "Del"}) == 0
+
+    async def test_select_iter_streams_rows(self, pg_db):
+        """select_iter yields decoded rows through a server-side cursor."""
+        table = TestTable(pg_db)
+        await table.create_schema()
+        for i in range(5):
+            await table.insert({"pk": f"it-{i}", "name": "Iter", "value": i})
+
+        rows = [
+            row
+            async for row in table.select_iter(
+                where={"name": "Iter"}, order_by="value", chunk_size=2
+            )
+        ]
+
+        assert [row["value"] for row in rows] == [0, 1, 2, 3, 4]
+
+    async def test_copy_merge_skips_conflicts(self, pg_db):
+        """copy_merge bulk-loads with binary COPY and skips existing keys."""
+        table = TestTable(pg_db)
+        await table.create_schema()
+        await table.insert({"pk": "copy-0", "name": "Existing", "value": 0})
+
+        inserted = await pg_db.adapter.copy_merge(
+            table.name,
+            ("pk", "name", "value"),
+            [("copy-0", "Dup", 9), ("copy-1", "One", 1), ("copy-2", "Two", 2)],
+            conflict=("pk",),
+            returning="pk",
+            types=table._column_types(),
+        )
+
+        assert sorted(inserted) == ["copy-1", "copy-2"]
+        assert (await table.select_one(where={"pk": "copy-0"}))["name"] == "Existing"
+        assert (await table.select_one(where={"pk": "copy-2"}))["value"] == 2
+
     async def test_update_batch_empty(self, pg_db):
         """update_batch with empty list returns 0."""
         table = TestTable(pg_db)
@@ -661,6 +730,47 @@ class TestTableTriggers:
         assert deleting_records[0]["pk"] == "trig-del"
 
 
+class TestTableUpdateReturning:
+    """Tests for single-statement update_returning()."""
+
+    async def test_update_returning_row(self, pg_db):
+        """update_returning updates and returns the row in one statement."""
+        table = TestTable(pg_db)
+        await table.create_schema()
+        await table.insert({"pk": "ret-1", "name": "Before", "value": 1})
+
+        row = await table.update_returning({"value": 2}, {"pk": "ret-1"})
+
+        assert row["value"] == 2
+        assert row["name"] == "Before"
+
+    async def test_update_returning_condition(self, pg_db):
+        """update_returning returns None when the condition does not hold."""
+        table = TestTable(pg_db)
+        await table.create_schema()
+        await table.insert({"pk": "ret-2", "name": "Cond", "value": 5})
+
+        row = await table.update_returning(
+            {"value": 6}, {"pk": "ret-2"}, condition="value < :max", params={"max": 5}
+        )
+
+        assert row is None
+        result = await table.select_one(where={"pk": "ret-2"})
+        assert result["value"] == 5
+
+    async def test_update_returning_encodes_fields(self, pg_db):
+        """JSON fields are encoded on write and decoded in the returned row."""
+        table = TestTable(pg_db)
+        await table.create_schema()
+        await table.insert({"pk": "ret-3", "name": "Json"})
+
+        row = await table.update_returning(
+            {"metadata": {"a": 1}}, {"pk": "ret-3"}, returning=["pk", "metadata"]
+        )
+
+        assert row == {"pk": "ret-3", "metadata": {"a": 1}}
+
+
 # =============================================================================
 # Raw query tests
 # =============================================================================
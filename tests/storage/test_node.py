@@ -184,6 +184,15 @@ class TestStorageNodeLocalIO:
 
         assert await node.size() == 5
 
+    async def test_iter_bytes(self, storage):
+        """iter_bytes streams file content in chunks."""
+        node = storage.node("data:chunked.bin")
+        await node.write_bytes(b"abcdefghij")
+
+        chunks = [chunk async for chunk in node.iter_bytes(chunk_size=4)]
+
+        assert chunks == [b"abcd", b"efgh", b"ij"]
+
     async def test_mtime(self, storage):
         """mtime returns modification time."""
         import time
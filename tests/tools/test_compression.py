@@ -0,0 +1,88 @@
+# Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
+"""Tests for tools.compression module."""
+
+import json
+
+import pytest
+
+from tools.compression import (
+    COMPRESSED_PREFIX,
+    Codec,
+    CompressionError,
+    compress_value,
+    decompress_value,
+    is_compressed,
+    register_codec,
+)
+
+LARGE_TEXT = json.dumps({"body": "<p>Hello world</p>" * 200, "to": ["a@example.com"] * 50})
+
+
+class TestCompression:
+    """Tests for compress/decompress functions."""
+
+    def test_roundtrip(self):
+        """Compressed values decompress to the original text."""
+        stored = compress_value(LARGE_TEXT, "zlib")
+        assert stored.startswith(f"{COMPRESSED_PREFIX}zlib:")
+        assert len(stored) < len(LARGE_TEXT)
+        assert decompress_value(stored) == LARGE_TEXT
+
+    def test_short_values_stored_as_is(self):
+        """Values below the minimum size are not compressed."""
+        assert compress_value('{"to": "a@b.com"}', "zlib") == '{"to": "a@b.com"}'
+
+    def test_codec_none_disables(self):
+        """A None codec leaves values uncompressed."""
+        assert compress_value(LARGE_TEXT, None) == LARGE_TEXT
+
+    def test_incompressible_value_stored_as_is(self):
+        """Values that would grow are stored uncompressed."""
+        import base64
+        import os
+
+        noise = base64.b64encode(os.urandom(2048)).decode()
+        assert compress_value(noise, "zlib") == noise
+
+    def test_legacy_value_passes_through(self):
+        """Values written before compression are returned unchanged."""
+        assert decompress_value('{"legacy": true}') == '{"legacy": true}'
+        assert not is_compressed('{"legacy": true}')
+
+    def test_unknown_codec_raises(self):
+        """Decoding with an unregistered codec fails explicitly."""
+        with pytest.raises(CompressionError):
+            decompress_value(f"{COMPRESSED_PREFIX}nope:AAAA")
+        with pytest.raises(CompressionError):
+            compress_value(LARGE_TEXT, "nope")
+
+    def test_corrupted_value_raises(self):
+        """Corrupted data raises CompressionError."""
+        with pytest.raises(CompressionError):
+            decompress_value(f"{COMPRESSED_PREFIX}zlib:bm90IGRlZmxhdGU=")
+
+    def test_register_custom_codec(self):
+        """Custom codecs are selected by name."""
+
+        class ReverseCodec(Codec):
+            name = "test-reverse"
+
+            def compress(self, data: bytes) -> bytes:
+                return data[::-1][: len(data) // 2]
+
+            def decompress(self, data: bytes) -> bytes:
+                return b"ok"
+
+        register_codec(ReverseCodec())
+        stored = compress_value(LARGE_TEXT, "test-reverse")
+        assert stored.startswith(f"{COMPRESSED_PREFIX}test-reverse:")
+        assert decompress_value(stored) == "ok"
+
+    def test_register_rejects_invalid_name(self):
+        """Codec names cannot contain the marker separator."""
+
+        class BadCodec(Codec):
+            name = "bad:name"
+
+        with pytest.raises(ValueError):
+            register_codec(BadCodec())
@@ -1,6 +1,8 @@
 # Copyright 2025 Softwell S.r.l. - SPDX-License-Identifier: Apache-2.0
 """Tests for tools.prometheus.metrics module."""
 
+from types import SimpleNamespace
+
 import pytest
 from prometheus_client import CollectorRegistry
 
@@ -138,6 +140,35 @@ class TestMailMetrics:
         assert 'tenant_id="tenant1"' in output
         assert 'tenant_id="tenant2"' in output
 
+    def test_record_retention_run(self, metrics):
+        """record_retention_run should update the retention counters and gauges."""
+        metrics.record_retention_run(3, 7, 0.25)
+        metrics.record_retention_run(2, 2, 0.5, pass_completed_ts=1700000000)
+
+        output = metrics.generate_latest().decode()
+        assert "gmp_retention_purged_messages_total 5.0" in output
+        assert "gmp_retention_purged_events_total 9.0" in output
+        assert "gmp_retention_run_seconds 0.5" in output
+        assert "gmp_retention_pass_timestamp_seconds 1.7e+09" in output
+
+    def test_set_queue_stats(self, metrics):
+        """set_queue_stats should publish labeled gauges and drop emptied queues."""
+        counts = SimpleNamespace(pending=3, deferred=1, in_flight=2, oldest_pending_ts=None)
+        metrics.set_queue_stats({("t1", "a1", 2): counts})
+
+        output = metrics.generate_latest().decode()
+        assert (
+            'gmp_queue_messages{account_id="a1",priority="2",state="pending",tenant_id="t1"} 3.0'
+            in output
+        )
+        assert "gmp_queue_oldest_pending_seconds{" in output
+        assert "gmp_pending_messages 6.0" in output
+
+        metrics.set_queue_stats({})
+        output = metrics.generate_latest().decode()
+        assert 'tenant_id="t1"' not in output
+        assert "gmp_pending_messages 0.0" in output
+
     def test_default_registry_if_none_provided(self):
         """Should create own registry if none provided."""
         metrics = MailMetrics()